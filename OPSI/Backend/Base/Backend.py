@@ -16,6 +16,7 @@ import inspect
 import os
 import re
 import time
+from functools import lru_cache
 from hashlib import md5
 from textwrap import dedent
 from typing import Union
@@ -43,7 +44,7 @@ from OPSI.Types import (
 from OPSI.Util import compareVersions, getPublicKey
 from opsicommon.logging import get_logger
 
-__all__ = ("describeInterface", "Backend")
+__all__ = ("describeInterface", "compileObjectHashFilter", "Backend")
 
 OPSI_MODULES_FILE = "/etc/opsi/modules"
 OPSI_LICENSE_PATH = "/etc/opsi/licenses"
@@ -113,6 +114,152 @@ def describeInterface(instance):  # pylint: disable=too-many-locals
 	return [methods[name] for name in sorted(list(methods.keys()))]
 
 
+_FILTER_OPERATOR_REGEX = re.compile(r"^\s*([>=<]+)\s*([\d.]+)")
+
+
+def _compileAttributeMatcher(attribute, filterValue):  # pylint: disable=too-many-locals
+	"""
+	Returns a function checking if a value matches `filterValue`.
+
+	Everything not depending on the value is done once: filter values
+	are converted, wildcards compiled to regular expressions and
+	class names of type filters resolved to the names of their subclasses.
+	"""
+	filterValues = forceUnicodeList(filterValue)
+	filterValueSet = set(filterValues)
+
+	if attribute == "type":
+		typeNames = set()
+		typeError = None
+		try:
+			for name in filterValues:
+				typeNames.update(eval(name).subClasses)  # pylint: disable=eval-used
+		except Exception as err:  # pylint: disable=broad-except
+			typeError = err
+
+	comparisons = []
+	operatorComparisons = []
+	wildcards = []
+	for value in filterValues:
+		match = _FILTER_OPERATOR_REGEX.search(value)
+		if match:
+			operatorComparisons.append((match.group(1), match.group(2)))
+			comparisons.append((match.group(1), match.group(2)))
+			continue
+
+		comparisons.append(("==", value))
+		if "*" in value:
+			try:
+				wildcards.append(re.compile(f"^{value.replace('*', '.*')}$"))
+			except re.error as err:
+				wildcards.append(err)
+
+	def matches(value):  # pylint: disable=too-many-return-statements
+		if forceUnicode(value) in filterValueSet or forceUnicodeList(value) == filterValues:
+			return True
+
+		if attribute == "type":
+			if typeError:
+				raise typeError
+			return isinstance(value, str) and value in typeNames
+
+		if isinstance(value, list):
+			return any(filterValue in value for filterValue in filterValues)
+
+		if value is None or isinstance(value, bool):
+			return False
+
+		isNumber = isinstance(value, (float, int))
+		for (operator, compareValue) in comparisons if isNumber else operatorComparisons:
+			try:
+				if compareVersions(value, operator, compareValue):
+					return True
+			except Exception:  # pylint: disable=broad-except
+				pass
+
+		if isNumber:
+			return False
+
+		for regex in wildcards:
+			if isinstance(regex, Exception):
+				raise regex
+			if regex.search(value):
+				return True
+
+		return False
+
+	return matches
+
+
+def _freezeFilter(filter):  # pylint: disable=redefined-builtin
+	"""
+	Returns a hashable version of `filter`.
+
+	Values are stored together with their type because values like \
+`True`, `1` and `1.0` are equal but are matched differently.
+	"""
+	frozen = []
+	for attribute, value in filter.items():
+		if isinstance(value, (list, tuple)):
+			value = (list, tuple((type(item), item) for item in value))
+		else:
+			value = (type(value), value)
+		frozen.append((attribute, value))
+	return tuple(sorted(frozen, key=lambda item: item[0]))
+
+
+def _thawFilter(frozenFilter):
+	thawed = {}
+	for attribute, (valueType, value) in frozenFilter:
+		if valueType is list:
+			value = [item for (_itemType, item) in value]
+		thawed[attribute] = value
+	return thawed
+
+
+@lru_cache(maxsize=256)
+def _compileFrozenFilter(frozenFilter):
+	return _compileObjectHashFilter(_thawFilter(frozenFilter))
+
+
+def _compileObjectHashFilter(filter):  # pylint: disable=redefined-builtin
+	matchers = {attribute: _compileAttributeMatcher(attribute, value) for attribute, value in filter.items() if value}
+
+	def objectHashMatches(objHash):
+		for attribute, value in objHash.items():
+			matcher = matchers.get(attribute)
+			if matcher is None:
+				continue
+
+			try:
+				if not matcher(value):
+					return False
+			except Exception as err:  # pylint: disable=broad-except
+				raise BackendError(
+					f"Testing match of filter {filter[attribute]} of attribute '{attribute}' with value {value} failed: {err}"
+				) from err
+		return True
+
+	return objectHashMatches
+
+
+def compileObjectHashFilter(filter):  # pylint: disable=redefined-builtin
+	"""
+	Compile a filter into a function checking if an opsi object hash matches.
+
+	The returned function takes an object hash and returns a bool.
+	Matching follows the rules of `Backend._objectHashMatches`.
+	Compiled filters are cached, so compiling the same filter
+	again is cheap.
+	"""
+	filter = filter or {}
+	try:
+		return _compileFrozenFilter(_freezeFilter(filter))
+	except TypeError:
+		# Filter contains unhashable values
+		return _compileObjectHashFilter(filter)
+
+
 class BackendOptions:
 	"""
 	A class used to combine option defaults and changed options
@@ -224,75 +371,16 @@ This defaults to ``self``.
 		"""Getting the context backend."""
 		return self._context
 
-	def _objectHashMatches(self, objHash, **filter):  # pylint: disable=redefined-builtin,too-many-branches,no-self-use
+	def _objectHashMatches(self, objHash, **filter):  # pylint: disable=redefined-builtin,no-self-use
 		"""
 		Checks if the opsi object hash matches the filter.
 
+		To check many objects against the same filter use
+		`compileObjectHashFilter` once and call the result for every object.
+
 		:rtype: bool
 		"""
-		for attribute, value in objHash.items():  # pylint: disable=too-many-nested-blocks
-			if not filter.get(attribute):
-				continue
-			matched = False
-
-			try:
-				logger.debug("Testing match of filter %s of attribute %s with value %s", filter[attribute], attribute, value)
-				filterValues = forceUnicodeList(filter[attribute])
-				if forceUnicodeList(value) == filterValues or forceUnicode(value) in filterValues:
-					matched = True
-				else:
-					for filterValue in filterValues:
-						if attribute == "type":
-							match = False
-							Class = eval(filterValue)  # pylint: disable=eval-used
-							for subClass in Class.subClasses:
-								if subClass == value:
-									matched = True
-									break
-
-							continue
-
-						if isinstance(value, list):
-							if filterValue in value:
-								matched = True
-								break
-							continue
-
-						if value is None or isinstance(value, bool):
-							continue
-
-						if isinstance(value, (float, int)) or re.search(r"^\s*([>=<]+)\s*([\d.]+)", forceUnicode(filterValue)):
-							operator = "=="
-							val = forceUnicode(filterValue)
-							match = re.search(r"^\s*([>=<]+)\s*([\d.]+)", filterValue)
-							if match:
-								operator = match.group(1)  # pylint: disable=maybe-no-member
-								val = match.group(2)  # pylint: disable=maybe-no-member
-
-							try:
-								matched = compareVersions(value, operator, val)
-								if matched:
-									break
-							except Exception:  # pylint: disable=broad-except
-								pass
-
-							continue
-
-						if "*" in filterValue and re.search(f"^{filterValue.replace('*', '.*')}$", value):
-							matched = True
-							break
-
-				if matched:
-					logger.debug("Value %s matched filter %s, attribute %s", value, filter[attribute], attribute)
-				else:
-					# No match, we can stop further checks.
-					return False
-			except Exception as err:  # pylint: disable=broad-except
-				raise BackendError(
-					f"Testing match of filter {filter[attribute]} of attribute '{attribute}' " f"with value {value} failed: {err}"
-				) from err
-
-		return True
+		return compileObjectHashFilter(filter)(objHash)
 
 	def backend_setOptions(self, options):
 		"""
@@ -26,6 +26,7 @@ from opsicommon.license import (
 )
 from opsicommon.logging import get_logger, secret_filter
 
+from OPSI.Backend import no_export
 from OPSI.Config import OPSI_ADMIN_GROUP
 from OPSI.Exceptions import (
 	BackendBadValueError,
@@ -516,6 +517,11 @@ depot where the method is.
 		host = forceObjectClass(host, Host)
 		host.setDefaults()
 
+	@no_export
+	def host_bulkInsertObjects(self, hosts):
+		for host in forceObjectClassList(hosts, Host):
+			self.host_insertObject(host)
+
 	def host_updateObject(self, host):  # pylint: disable=no-self-use
 		host = forceObjectClass(host, Host)
 
@@ -599,6 +605,11 @@ depot where the method is.
 			if configState.configId not in configIds:
 				raise BackendReferentialIntegrityError(f"Config with id '{configState.configId}' not found")
 
+	@no_export
+	def configState_bulkInsertObjects(self, configStates):
+		for configState in forceObjectClassList(configStates, ConfigState):
+			self.configState_insertObject(configState)
+
 	def configState_updateObject(self, configState):  # pylint: disable=no-self-use
 		configState = forceObjectClass(configState, ConfigState)
 
@@ -875,6 +886,11 @@ depot where the method is.
 		objectToGroup = forceObjectClass(objectToGroup, ObjectToGroup)
 		objectToGroup.setDefaults()
 
+	@no_export
+	def objectToGroup_bulkInsertObjects(self, objectToGroups):
+		for objectToGroup in forceObjectClassList(objectToGroups, ObjectToGroup):
+			self.objectToGroup_insertObject(objectToGroup)
+
 	def objectToGroup_updateObject(self, objectToGroup):  # pylint: disable=no-self-use
 		objectToGroup = forceObjectClass(objectToGroup, ObjectToGroup)
 
@@ -1037,6 +1053,11 @@ depot where the method is.
 		auditSoftware = forceObjectClass(auditSoftware, AuditSoftware)
 		auditSoftware.setDefaults()
 
+	@no_export
+	def auditSoftware_bulkInsertObjects(self, auditSoftwares):
+		for auditSoftware in forceObjectClassList(auditSoftwares, AuditSoftware):
+			self.auditSoftware_insertObject(auditSoftware)
+
 	def auditSoftware_updateObject(self, auditSoftware):  # pylint: disable=no-self-use
 		auditSoftware = forceObjectClass(auditSoftware, AuditSoftware)
 
@@ -1057,6 +1078,11 @@ depot where the method is.
 		auditSoftwareToLicensePool = forceObjectClass(auditSoftwareToLicensePool, AuditSoftwareToLicensePool)
 		auditSoftwareToLicensePool.setDefaults()
 
+	@no_export
+	def auditSoftwareToLicensePool_bulkInsertObjects(self, auditSoftwareToLicensePools):
+		for auditSoftwareToLicensePool in forceObjectClassList(auditSoftwareToLicensePools, AuditSoftwareToLicensePool):
+			self.auditSoftwareToLicensePool_insertObject(auditSoftwareToLicensePool)
+
 	def auditSoftwareToLicensePool_updateObject(self, auditSoftwareToLicensePool):  # pylint: disable=no-self-use
 		auditSoftwareToLicensePool = forceObjectClass(auditSoftwareToLicensePool, AuditSoftwareToLicensePool)
 
@@ -1077,6 +1103,11 @@ depot where the method is.
 		auditSoftwareOnClient = forceObjectClass(auditSoftwareOnClient, AuditSoftwareOnClient)
 		auditSoftwareOnClient.setDefaults()
 
+	@no_export
+	def auditSoftwareOnClient_bulkInsertObjects(self, auditSoftwareOnClients):
+		for auditSoftwareOnClient in forceObjectClassList(auditSoftwareOnClients, AuditSoftwareOnClient):
+			self.auditSoftwareOnClient_insertObject(auditSoftwareOnClient)
+
 	def auditSoftwareOnClient_updateObject(self, auditSoftwareOnClient):  # pylint: disable=no-self-use
 		auditSoftwareOnClient = forceObjectClass(auditSoftwareOnClient, AuditSoftwareOnClient)
 
@@ -1255,8 +1286,8 @@ depot where the method is.
 	# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 	# -   direct access                                                                            -
 	# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-	def getData(self, query):  # pylint: disable=no-self-use
+	def getData(self, query, stream=False):  # pylint: disable=no-self-use,unused-argument
 		return query
 
-	def getRawData(self, query):  # pylint: disable=no-self-use
+	def getRawData(self, query, stream=False):  # pylint: disable=no-self-use,unused-argument
 		return query
@@ -35,7 +35,7 @@ from OPSI.Types import *  # this is needed for dynamic loading  # pylint: disabl
 from OPSI.Util import timestamp
 from opsicommon.logging import get_logger
 
-from .Backend import Backend
+from .Backend import Backend, compileObjectHashFilter
 
 logger = get_logger("opsi.general")
 
@@ -194,6 +194,25 @@ class ExtendedConfigDataBackend(ExtendedBackend):  # pylint: disable=too-many-pu
 	def __repr__(self):
 		return f"<{self.__class__.__name__}(configDataBackend={self._backend})>"
 
+	def _insertObjects(self, backendMethodPrefix, objects):
+		"""
+		Inserts `objects` with the bulk insert method of the backend.
+
+		Falls back to inserting one object after another if the backend
+		does not provide `<backendMethodPrefix>_bulkInsertObjects`.
+		"""
+		if not objects:
+			return
+
+		bulkInsert = getattr(self._backend, f"{backendMethodPrefix}_bulkInsertObjects", None)
+		if bulkInsert:
+			bulkInsert(objects)
+			return
+
+		insert = getattr(self._backend, f"{backendMethodPrefix}_insertObject")
+		for obj in objects:
+			insert(obj)
+
 	def host_getIdents(self, returnType="unicode", **filter):  # pylint: disable=redefined-builtin
 		return [host.getIdent(returnType) for host in self.host_getObjects(attributes=["id"], **filter)]  # pylint: disable=no-member
 
@@ -335,7 +354,7 @@ class ExtendedConfigDataBackend(ExtendedBackend):  # pylint: disable=too-many-pu
 		forcedHosts = forceObjectClassList(hosts, Host)
 		for host in forcedHosts:
 			logger.info("Creating host '%s'", host)
-			self._backend.host_insertObject(host)
+		self._insertObjects("host", forcedHosts)
 
 		if self._options["returnObjectsOnUpdateAndCreate"]:
 			return self._backend.host_getObjects(id=[host.id for host in forcedHosts])
@@ -833,15 +852,24 @@ class ExtendedConfigDataBackend(ExtendedBackend):  # pylint: disable=too-many-pu
 			if not self.host_getIdents(type="OpsiDepotserver", id=depotId, isMasterDepot=True):
 				raise ValueError(f"Depot '{depotId}' does not exist or is not a master depot")
 
-	def configState_insertObject(self, configState):
+	def _configState_checkInsert(self, configState):
+		"""
+		Checks if `configState` is valid and has to be inserted.
+
+		ConfigStates which match the default are not inserted.
+		"""
 		if self._options["deleteConfigStateIfDefault"] and self._configStateMatchesDefault(configState):
 			# Do not insert configStates which match the default
 			logger.debug("Not inserting configState %s, because it does not differ from defaults", configState)
-			return
+			return False
 
-		configState = forceObjectClass(configState, ConfigState)
 		self._configState_checkValid(configState)
-		self._backend.configState_insertObject(configState)
+		return True
+
+	def configState_insertObject(self, configState):
+		configState = forceObjectClass(configState, ConfigState)
+		if self._configState_checkInsert(configState):
+			self._backend.configState_insertObject(configState)
 
 	def configState_updateObject(self, configState):
 		if self._options["deleteConfigStateIfDefault"] and self._configStateMatchesDefault(configState):
@@ -857,10 +885,16 @@ class ExtendedConfigDataBackend(ExtendedBackend):  # pylint: disable=too-many-pu
 		returnObjects = self._options["returnObjectsOnUpdateAndCreate"]
 
 		result = []
-		for configState in forceObjectClassList(configStates, ConfigState):
+		configStates = forceObjectClassList(configStates, ConfigState)
+		insertConfigStates = []
+		for configState in configStates:
 			logger.info("Creating configState '%s'", configState)
-			self.configState_insertObject(configState)
-			if returnObjects:
+			if self._configState_checkInsert(configState):
+				insertConfigStates.append(configState)
+		self._insertObjects("configState", insertConfigStates)
+
+		if returnObjects:
+			for configState in configStates:
 				result.extend(self._backend.configState_getObjects(configId=configState.configId, objectId=configState.objectId))
 
 		return result
@@ -1728,7 +1762,8 @@ into the IDs of these depots are to be found in the list behind \
 			logger.debug("   * generating productOnClient sequence")
 			productOnClients = self.productOnClient_generateSequence(productOnClients)
 
-		return [productOnClient for productOnClient in productOnClients if self._objectHashMatches(productOnClient.toHash(), **filter)]
+		matches = compileObjectHashFilter(filter)
+		return [productOnClient for productOnClient in productOnClients if matches(productOnClient.toHash())]
 
 	def _productOnClientUpdateOrCreate(self, productOnClient, update=False):
 		nextProductOnClient = None
@@ -2014,11 +2049,13 @@ into the IDs of these depots are to be found in the list behind \
 		returnObjects = self._options["returnObjectsOnUpdateAndCreate"]
 
 		result = []
-		for objectToGroup in forceObjectClassList(objectToGroups, ObjectToGroup):
+		objectToGroups = forceObjectClassList(objectToGroups, ObjectToGroup)
+		for objectToGroup in objectToGroups:
 			logger.info("Creating objectToGroup %s", objectToGroup)
-			self._backend.objectToGroup_insertObject(objectToGroup)
+		self._insertObjects("objectToGroup", objectToGroups)
 
-			if returnObjects:
+		if returnObjects:
+			for objectToGroup in objectToGroups:
 				result.extend(
 					self._backend.objectToGroup_getObjects(
 						groupType=objectToGroup.groupType, groupId=objectToGroup.groupId, objectId=objectToGroup.objectId
@@ -2500,11 +2537,13 @@ into the IDs of these depots are to be found in the list behind \
 		returnObjects = self._options["returnObjectsOnUpdateAndCreate"]
 
 		result = []
-		for auditSoftware in forceObjectClassList(auditSoftwares, AuditSoftware):
+		auditSoftwares = forceObjectClassList(auditSoftwares, AuditSoftware)
+		for auditSoftware in auditSoftwares:
 			logger.info("Creating auditSoftware %s", auditSoftware)
-			self._backend.auditSoftware_insertObject(auditSoftware)
+		self._insertObjects("auditSoftware", auditSoftwares)
 
-			if returnObjects:
+		if returnObjects:
+			for auditSoftware in auditSoftwares:
 				result.extend(
 					self._backend.auditSoftware_getObjects(
 						name=auditSoftware.name,
@@ -2590,11 +2629,13 @@ into the IDs of these depots are to be found in the list behind \
 		returnObjects = self._options["returnObjectsOnUpdateAndCreate"]
 
 		result = []
-		for auditSoftwareToLicensePool in forceObjectClassList(auditSoftwareToLicensePools, AuditSoftwareToLicensePool):
+		auditSoftwareToLicensePools = forceObjectClassList(auditSoftwareToLicensePools, AuditSoftwareToLicensePool)
+		for auditSoftwareToLicensePool in auditSoftwareToLicensePools:
 			logger.info("Creating %s", auditSoftwareToLicensePool)
-			self._backend.auditSoftwareToLicensePool_insertObject(auditSoftwareToLicensePool)
+		self._insertObjects("auditSoftwareToLicensePool", auditSoftwareToLicensePools)
 
-			if returnObjects:
+		if returnObjects:
+			for auditSoftwareToLicensePool in auditSoftwareToLicensePools:
 				result.extend(
 					self._backend.auditSoftwareToLicensePool_getObjects(
 						name=auditSoftwareToLicensePool.name,
@@ -2675,11 +2716,13 @@ into the IDs of these depots are to be found in the list behind \
 		returnObjects = self._options["returnObjectsOnUpdateAndCreate"]
 
 		result = []
-		for auditSoftwareOnClient in forceObjectClassList(auditSoftwareOnClients, AuditSoftwareOnClient):
+		auditSoftwareOnClients = forceObjectClassList(auditSoftwareOnClients, AuditSoftwareOnClient)
+		for auditSoftwareOnClient in auditSoftwareOnClients:
 			logger.info("Creating auditSoftwareOnClient %s", auditSoftwareOnClient)
-			self._backend.auditSoftwareOnClient_insertObject(auditSoftwareOnClient)
+		self._insertObjects("auditSoftwareOnClient", auditSoftwareOnClients)
 
-			if returnObjects:
+		if returnObjects:
+			for auditSoftwareOnClient in auditSoftwareOnClients:
 				result.extend(
 					self._backend.auditSoftwareOnClient_getObjects(
 						name=auditSoftwareOnClient.name,
@@ -8,7 +8,7 @@ Backends.
 
 from __future__ import absolute_import
 
-from .Backend import Backend, describeInterface
+from .Backend import Backend, compileObjectHashFilter, describeInterface
 from .ConfigData import ConfigDataBackend
 from .Extended import ExtendedBackend, ExtendedConfigDataBackend
 from .ModificationTracking import (
@@ -18,6 +18,7 @@ from .ModificationTracking import (
 
 __all__ = (
 	"describeInterface",
+	"compileObjectHashFilter",
 	"Backend",
 	"ExtendedBackend",
 	"ConfigDataBackend",
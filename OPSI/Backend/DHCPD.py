@@ -15,9 +15,10 @@ import socket
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from functools import lru_cache
-from typing import Any, Callable, Generator, List
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
 
 from opsicommon.logging import get_logger, secret_filter
 
@@ -33,13 +34,14 @@ from OPSI.Exceptions import (
 	BackendUnaccomplishableError,
 )
 from OPSI.Object import ConfigState, Host, OpsiClient
-from OPSI.Types import forceBool, forceDict, forceHostId, forceObjectClass
+from OPSI.Types import forceBool, forceDict, forceFloat, forceHostId, forceObjectClass, forceObjectClassList
 from OPSI.Util import getfqdn
 from OPSI.Util.File import DHCPDConfFile
 
 __all__ = ("DHCPDBackend",)
 
 WAIT_AFTER_RELOAD = 4.0
+RESOLVE_WORKERS = 16
 
 logger = get_logger("opsi.general")
 
@@ -82,6 +84,14 @@ class DHCPDBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attr
 	"""This Backend holds information for DHCP functionality"""
 
 	def __init__(self, **kwargs) -> None:
+		"""
+		Backend editing the dhcpd configuration.
+
+		:param updateDelay: Seconds to collect host changes before they \
+are written to the dhcpd configuration together. Defaults to 0, which \
+writes every change immediately.
+		:type updateDelay: float
+		"""
 		self._name = "dhcpd"
 
 		ConfigDataBackend.__init__(self, **kwargs)
@@ -96,6 +106,7 @@ class DHCPDBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attr
 
 		self._defaultClientParameters = {"next-server": next_server, "filename": "linux/pxelinux.0"}
 		self._dhcpdOnDepot = False
+		self._updateDelay = 0.0
 
 		# Parse arguments
 		for option, value in kwargs.items():
@@ -112,6 +123,8 @@ class DHCPDBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attr
 				self._fixedAddressFormat = value
 			elif option == "dhcpdondepot":
 				self._dhcpdOnDepot = forceBool(value)
+			elif option == "updatedelay":
+				self._updateDelay = max(0.0, forceFloat(value))
 
 		if self._defaultClientParameters.get("next-server") and self._defaultClientParameters["next-server"].startswith("127"):
 			raise BackendBadValueError(
@@ -123,6 +136,10 @@ class DHCPDBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attr
 		self._depotId = forceHostId(getfqdn())
 		self._opsiHostKey = None
 		self._depotConnections = {}
+		self._queuedHostChanges = {}
+		self._queueLock = threading.Lock()
+		self._flushLock = threading.Lock()
+		self._flushTimer = None
 
 	def _get_opsi_host_key(self, backend: Backend = None) -> None:
 		if backend is None:
@@ -223,128 +240,292 @@ class DHCPDBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attr
 		return depotId
 
 	def backend_exit(self) -> None:
+		self._flushHostChanges()
 		if self._reloadThread:
 			logger.info("Waiting for reload thread")
 			for _i in range(10):
 				if self._reloadThread.isBusy:
 					time.sleep(1)
 
-	def _dhcpd_updateHost(self, host: Host) -> Any:
-		host = forceObjectClass(host, Host)
+	def _getForwardDepotId(self, host: Host) -> Optional[str]:
+		"""
+		Get the depot to forward the dhcpd configuration of `host` to.
 
+		Returns `None` if this depot is responsible for the client.
+		"""
 		if self._dhcpdOnDepot:
 			depotId = self._getResponsibleDepotId(host.id)  # pylint: disable=maybe-no-member
 			if depotId != self._depotId:
-				logger.info(
-					"Not responsible for client '%s', forwarding request to depot '%s'", host.id, depotId
-				)  # pylint: disable=maybe-no-member
-				return self._getDepotConnection(depotId).dhcpd_updateHost(host)  # pylint: disable=maybe-no-member
-		return self.dhcpd_updateHost(host)
+				return depotId
+		return None
 
-	def dhcpd_updateHost(self, host: Host) -> None:  # pylint: disable=too-many-branches
+	def _dhcpd_updateHost(self, host: Host) -> Any:
 		host = forceObjectClass(host, Host)
 
-		if not host.hardwareAddress:  # pylint: disable=maybe-no-member
-			logger.warning("Cannot update dhcpd configuration for client %s: hardware address unknown", host)
-			return
+		depotId = self._getForwardDepotId(host)
+		if depotId:
+			logger.info(
+				"Not responsible for client '%s', forwarding request to depot '%s'", host.id, depotId
+			)  # pylint: disable=maybe-no-member
+			return self._getDepotConnection(depotId).dhcpd_updateHost(host)  # pylint: disable=maybe-no-member
+		return self.dhcpd_updateHost(host)
 
-		hostname = _getHostname(host.id)  # pylint: disable=maybe-no-member
+	def _resolveIpAddresses(self, hosts: List[Host]) -> Dict[str, Optional[str]]:  # pylint: disable=no-self-use
+		"""
+		Get the ip addresses of `hosts` by host id.
 
-		ipAddress = host.ipAddress  # pylint: disable=maybe-no-member
-		if not ipAddress:
+		Hosts without a known ip address are looked up concurrently, \
+failed lookups are returned as `None`.
+		"""
+		ipAddresses = {host.id: host.ipAddress for host in hosts}  # pylint: disable=maybe-no-member
+		hostIds = [hostId for hostId, ipAddress in ipAddresses.items() if not ipAddress]
+		if not hostIds:
+			return ipAddresses
+
+		def resolve(hostId: str) -> Optional[str]:
 			try:
-				logger.info("Ip addess of client %s unknown, trying to get host by name", host)
-				ipAddress = socket.gethostbyname(host.id)  # pylint: disable=maybe-no-member
+				logger.info("Ip addess of client %s unknown, trying to get host by name", hostId)
+				ipAddress = socket.gethostbyname(hostId)
 				logger.info("Client fqdn resolved to %s", ipAddress)
+				return ipAddress
 			except Exception as err:  # pylint: disable=broad-except
 				logger.debug("Failed to get IP by hostname: %s", err)
-				with dhcpd_lock("config_read"):
-					self._dhcpdConfFile.parse()
-					currentHostParams = self._dhcpdConfFile.getHost(hostname)
+				return None
+
+		with ThreadPoolExecutor(max_workers=min(RESOLVE_WORKERS, len(hostIds)), thread_name_prefix="dhcpd-resolve") as executor:
+			for hostId, ipAddress in zip(hostIds, executor.map(resolve, hostIds)):
+				ipAddresses[hostId] = ipAddress
+		return ipAddresses
+
+	def _getHostConfigs(self, hosts: List[Host]) -> Tuple[List[Dict[str, Any]], List[str]]:  # pylint: disable=too-many-branches
+		"""
+		Get the dhcpd configurations of `hosts`.
+
+		Hosts without hardware address are skipped.
+		Returns the host configurations and the errors of the hosts \
+whose configuration could not be determined.
+		"""
+		hostConfigs = []
+		errors = []
 
-				if currentHostParams:
-					logger.debug("Trying to use address for %s from existing DHCP configuration.", hostname)
+		hostsWithHardwareAddress = []
+		for host in hosts:
+			if not host.hardwareAddress:  # pylint: disable=maybe-no-member
+				logger.warning("Cannot update dhcpd configuration for client %s: hardware address unknown", host)
+				continue
+			hostsWithHardwareAddress.append(host)
 
-					if currentHostParams.get("fixed-address"):
-						ipAddress = currentHostParams["fixed-address"]
-					else:
-						raise BackendIOError(
+		ipAddresses = self._resolveIpAddresses(hostsWithHardwareAddress)
+		unresolvedHosts = [host for host in hostsWithHardwareAddress if not ipAddresses[host.id]]
+		if unresolvedHosts:
+			with dhcpd_lock("config_read"):
+				self._dhcpdConfFile.parse()
+				for host in unresolvedHosts:
+					hostname = _getHostname(host.id)
+					currentHostParams = self._dhcpdConfFile.getHost(hostname)
+					if not currentHostParams:
+						errors.append(
+							f"Cannot update dhcpd configuration for client {host.id}: " "ip address unknown and failed to get host by name"
+						)
+					elif not currentHostParams.get("fixed-address"):
+						errors.append(
 							f"Cannot update dhcpd configuration for client {host.id}: "
 							"ip address unknown and failed to get ip address from DHCP configuration file."
-						) from err
-				else:
-					raise BackendIOError(
-						f"Cannot update dhcpd configuration for client {host.id}: " "ip address unknown and failed to get host by name"
-					) from err
-
-		fixedAddress = ipAddress
-		if self._fixedAddressFormat == "FQDN":
-			fixedAddress = host.id  # pylint: disable=maybe-no-member
-
-		parameters = forceDict(self._defaultClientParameters)
-		if not self._dhcpdOnDepot:
-			try:
-				depot = self._context.host_getObjects(id=self._getResponsibleDepotId(host.id))[0]  # pylint: disable=maybe-no-member
-				if depot.ipAddress:
-					parameters["next-server"] = depot.ipAddress
-			except Exception as err:  # pylint: disable=broad-except
-				logger.error("Failed to get depot info: %s", err)
+						)
+					else:
+						logger.debug("Trying to use address for %s from existing DHCP configuration.", hostname)
+						ipAddresses[host.id] = currentHostParams["fixed-address"]
+
+		depotAddresses = {}
+		for host in hostsWithHardwareAddress:
+			ipAddress = ipAddresses[host.id]
+			if not ipAddress:
+				continue
+
+			fixedAddress = ipAddress
+			if self._fixedAddressFormat == "FQDN":
+				fixedAddress = host.id  # pylint: disable=maybe-no-member
+
+			parameters = dict(self._defaultClientParameters)
+			if not self._dhcpdOnDepot:
+				try:
+					depotId = self._getResponsibleDepotId(host.id)  # pylint: disable=maybe-no-member
+					if depotId not in depotAddresses:
+						depotAddresses[depotId] = self._context.host_getObjects(id=depotId)[0].ipAddress  # pylint: disable=maybe-no-member
+					if depotAddresses[depotId]:
+						parameters["next-server"] = depotAddresses[depotId]
+				except Exception as err:  # pylint: disable=broad-except
+					logger.error("Failed to get depot info: %s", err)
+
+			hostConfigs.append(
+				{
+					"hostname": _getHostname(host.id),  # pylint: disable=maybe-no-member
+					"hardwareAddress": host.hardwareAddress,  # pylint: disable=maybe-no-member
+					"ipAddress": ipAddress,
+					"fixedAddress": fixedAddress,
+					"parameters": parameters,
+				}
+			)
+
+		return hostConfigs, errors
 
+	def _writeHostChanges(self, hostConfigs: List[Dict[str, Any]] = (), deleteHostnames: List[str] = ()) -> List[str]:
+		"""
+		Apply host changes in a single parse and `generate()` of the \
+config file and trigger a single reload afterwards.
+
+		:param hostConfigs: Host configurations as returned by `_getHostConfigs`.
+		:param deleteHostnames: Names of the hosts to remove.
+		:returns: The errors of the hosts that could not be added and \
+of writing the config file.
+		"""
+		errors = []
+		changed = False
 		with dhcpd_lock("config_update"):
 			try:
 				self._dhcpdConfFile.parse()
-				currentHostParams = self._dhcpdConfFile.getHost(hostname)
-				if (
-					currentHostParams
-					and (currentHostParams.get("hardware", " ").split(" ")[1] == host.hardwareAddress)
-					and (currentHostParams.get("fixed-address") == fixedAddress)
-					and (currentHostParams.get("next-server") == parameters.get("next-server"))
-				):
-					logger.debug("DHCPD config of host '%s' unchanged, no need to update config file", host)
-					return
-
-				self._dhcpdConfFile.addHost(
-					hostname=hostname,
-					hardwareAddress=host.hardwareAddress,  # pylint: disable=maybe-no-member
-					ipAddress=ipAddress,
-					fixedAddress=fixedAddress,
-					parameters=parameters,
-				)
-				self._dhcpdConfFile.generate()
+				for hostname in deleteHostnames:
+					if self._dhcpdConfFile.getHost(hostname):
+						self._dhcpdConfFile.deleteHost(hostname)
+						changed = True
+
+				for hostConfig in hostConfigs:
+					currentHostParams = self._dhcpdConfFile.getHost(hostConfig["hostname"])
+					if (
+						currentHostParams
+						and (currentHostParams.get("hardware", " ").split(" ")[1] == hostConfig["hardwareAddress"])
+						and (currentHostParams.get("fixed-address") == hostConfig["fixedAddress"])
+						and (currentHostParams.get("next-server") == hostConfig["parameters"].get("next-server"))
+					):
+						logger.debug("DHCPD config of host '%s' unchanged, no need to update config file", hostConfig["hostname"])
+						continue
+
+					try:
+						self._dhcpdConfFile.addHost(**hostConfig)
+						changed = True
+					except Exception as err:  # pylint: disable=broad-except
+						logger.error(err, exc_info=True)
+						errors.append(f"Failed to add host '{hostConfig['hostname']}' to dhcpd configuration: {err}")
+
+				if changed:
+					self._dhcpdConfFile.generate()
 			except Exception as err:  # pylint: disable=broad-except
 				logger.error(err, exc_info=True)
+				errors.append(f"Failed to update dhcpd configuration: {err}")
 
-		self._triggerReload()
+		if changed:
+			self._triggerReload()
+		return errors
 
-	def _dhcpd_deleteHost(self, host: Host) -> None:
+	def dhcpd_updateHost(self, host: Host) -> None:
 		host = forceObjectClass(host, Host)
+		self.dhcpd_updateHosts([host])
+
+	def dhcpd_updateHosts(self, hosts: List[Host]) -> None:
+		"""
+		Update the dhcpd configuration of many hosts at once.
+
+		The config file is written and the dhcpd is reloaded only once.
+		Hosts that cannot be updated do not stop the others from being \
+updated, their errors are raised afterwards.
+		"""
+		hosts = forceObjectClassList(hosts, Host)
+
+		hostConfigs, errors = self._getHostConfigs(hosts)
+		if hostConfigs:
+			errors.extend(self._writeHostChanges(hostConfigs=hostConfigs))
+
+		if errors:
+			raise BackendIOError(", ".join(errors))
+
+	def _forwardDeleteHost(self, host: Host) -> None:
 		if self._dhcpdOnDepot:
 			for depot in self._context.host_getObjects(id=self._depotId):  # pylint: disable=maybe-no-member
 				if depot.id != self._depotId:
 					self._getDepotConnection(depot.id).dhcpd_deleteHost(host)  # pylint: disable=maybe-no-member
+
+	def _dhcpd_deleteHost(self, host: Host) -> None:
+		host = forceObjectClass(host, Host)
+		self._forwardDeleteHost(host)
 		self.dhcpd_deleteHost(host)
 
 	def dhcpd_deleteHost(self, host: Host) -> None:
 		host = forceObjectClass(host, Host)
+		self._writeHostChanges(deleteHostnames=[_getHostname(host.id)])
+
+	def _queueHostChange(self, host: Host, delete: bool = False) -> None:
+		"""
+		Queue a change of `host` to be applied after `updateDelay` seconds.
+
+		All changes queued in the meantime are applied together.
+		Updates of a host are merged into an already queued update, \
+a deletion discards the queued update of the host.
+		"""
+		with self._queueLock:
+			deleteHost, updateHost = self._queuedHostChanges.pop(host.id, (None, None))
+			if delete:
+				deleteHost, updateHost = host, None
+			elif updateHost:
+				updateHost = updateHost.clone()
+				updateHost.update(host, updateWithNoneValues=False)
+			else:
+				updateHost = host
+			self._queuedHostChanges[host.id] = (deleteHost, updateHost)
+			if not self._flushTimer:
+				self._flushTimer = threading.Timer(self._updateDelay, self._flushHostChanges)
+				self._flushTimer.daemon = True
+				self._flushTimer.start()
+
+	def _flushHostChanges(self) -> None:
+		"""Apply all queued host changes with a single update of the config file."""
+		with self._flushLock:
+			with self._queueLock:
+				if self._flushTimer:
+					self._flushTimer.cancel()
+					self._flushTimer = None
+				changes = list(self._queuedHostChanges.values())
+				self._queuedHostChanges = {}
+
+			if not changes:
+				return
+
+			logger.info("Applying %d queued host changes to dhcpd configuration", len(changes))
+			updateHosts = []
+			deleteHostnames = []
+			for deleteHost, updateHost in changes:
+				host = deleteHost or updateHost
+				try:
+					if deleteHost:
+						self._forwardDeleteHost(deleteHost)
+						deleteHostnames.append(_getHostname(deleteHost.id))
+
+					if updateHost:
+						host = updateHost
+						depotId = self._getForwardDepotId(updateHost)
+						if depotId:
+							logger.info("Not responsible for client '%s', forwarding request to depot '%s'", updateHost.id, depotId)
+							self._getDepotConnection(depotId).dhcpd_updateHost(updateHost)  # pylint: disable=maybe-no-member
+						else:
+							updateHosts.append(updateHost)
+				except Exception as err:  # pylint: disable=broad-except
+					logger.error("Failed to update dhcpd configuration of client %s: %s", host.id, err, exc_info=True)
 
-		with dhcpd_lock("config_update"):
 			try:
-				self._dhcpdConfFile.parse()
-				hostname = _getHostname(host.id)
-				if not self._dhcpdConfFile.getHost(hostname):  # pylint: disable=maybe-no-member
-					return
-				self._dhcpdConfFile.deleteHost(hostname)  # pylint: disable=maybe-no-member
-				self._dhcpdConfFile.generate()
+				hostConfigs, errors = self._getHostConfigs(updateHosts)
+				for error in errors:
+					logger.error(error)
+				self._writeHostChanges(hostConfigs=hostConfigs, deleteHostnames=deleteHostnames)
 			except Exception as err:  # pylint: disable=broad-except
-				logger.error(err, exc_info=True)
-
-		self._triggerReload()
+				logger.error("Failed to apply queued host changes: %s", err, exc_info=True)
 
 	def host_insertObject(self, host: Host) -> None:
 		if not isinstance(host, OpsiClient):
 			return
 
 		logger.debug("Inserting host: %s", host)
+		if self._updateDelay:
+			self._queueHostChange(host)
+			return
 		self._dhcpd_updateHost(host)
 
 	def host_updateObject(self, host: Host) -> None:
@@ -356,6 +537,9 @@ class DHCPDBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attr
 			return
 
 		logger.debug("Updating host: %s", host)
+		if self._updateDelay:
+			self._queueHostChange(host)
+			return
 		try:
 			self._dhcpd_updateHost(host)
 		except Exception as err:  # pylint: disable=broad-except
@@ -369,6 +553,10 @@ class DHCPDBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attr
 			if not isinstance(host, OpsiClient):
 				continue
 
+			if self._updateDelay:
+				self._queueHostChange(host, delete=True)
+				continue
+
 			try:
 				self._dhcpd_deleteHost(host)
 			except Exception as err:  # pylint: disable=broad-except
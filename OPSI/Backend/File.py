@@ -11,15 +11,20 @@ This backend stores all it's data in plaintext files.
 # pylint: disable=too-many-lines
 
 import grp
+import hashlib
 import os
 import pwd
 import re
 import shutil
-from typing import Dict, Union
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Union
 
 from opsicommon.logging import get_logger
 
-from OPSI.Backend.Base import ConfigDataBackend
+from OPSI.Backend.Base import ConfigDataBackend, compileObjectHashFilter
 from OPSI.Config import FILE_ADMIN_GROUP, OPSICONFD_USER
 from OPSI.Exceptions import (
 	BackendBadValueError,
@@ -45,17 +50,237 @@ from OPSI.Util import fromJson, getfqdn, toJson
 from OPSI.Util.File import IniFile, LockableFile
 from OPSI.Util.File.Opsi import HostKeyFile, PackageControlFile
 
-__all__ = ('FileBackend', )
+__all__ = ('AuditSoftwareFile', 'FileBackend', 'FileBackendCache')
 
 
 logger = get_logger("opsi.general")
 
 
+class FileBackendCache:
+	"""
+	Process-wide cache of parsed backend files and directory listings.
+
+	Every entry is stored with size, mtime and inode of its path and is
+	only used while these are unchanged, so changes by other processes
+	are noticed. Cached values are shared and must not be modified.
+	"""
+
+	# Paths modified this recently can change again within the timestamp resolution
+	MIN_AGE_NS = 2_000_000_000
+
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._entries = {}
+
+	@staticmethod
+	def getSignature(path: str) -> Union[tuple, None]:
+		try:
+			pathStat = os.stat(path)
+		except FileNotFoundError:
+			return None
+		return (pathStat.st_mtime_ns, pathStat.st_size, pathStat.st_ino)
+
+	def get(self, kind: str, path: str, loader: Callable[[str], Any]) -> Any:
+		"""
+		Get the value of kind `kind` for `path`.
+
+		:param loader: Called with `path` to create the value if there \
+is no valid cached value.
+		"""
+		signature = self.getSignature(path)
+		with self._lock:
+			entry = self._entries.get(path, {}).get(kind)
+		if entry and signature and entry[0] == signature:
+			return entry[1]
+
+		value = loader(path)
+		with self._lock:
+			if signature and time.time_ns() - signature[0] >= self.MIN_AGE_NS and self.getSignature(path) == signature:
+				self._entries.setdefault(path, {})[kind] = (signature, value)
+			else:
+				self._entries.get(path, {}).pop(kind, None)
+		return value
+
+	def invalidate(self, path: str) -> None:
+		with self._lock:
+			self._entries.pop(path, None)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+
+class AuditSoftwareFile:
+	"""
+	Audit software entries of one ini file with an index by software ident.
+
+	New entries are appended to the file, only replacing and removing
+	entries rewrites it. The parsed entries are kept while the file is
+	unchanged. The file is locked during every access.
+
+	Entries are dicts of escaped values with lowercase attribute names.
+	"""
+
+	IDENT_ATTRIBUTES = ('name', 'version', 'subversion', 'language', 'architecture')
+	INSTANCE_CACHE_SIZE = 512
+
+	_instances = OrderedDict()
+	_instancesLock = threading.Lock()
+
+	def __init__(self, filename: str) -> None:
+		self.filename = forceFilename(filename)
+		self._lock = threading.Lock()
+		self._signature = None
+		self._ini = None
+		self._index = {}
+		self._nextNumber = 0
+		self._needsNewline = False
+
+	@classmethod
+	def get(cls, filename: str) -> 'AuditSoftwareFile':
+		"""Returns the process-wide instance for `filename`."""
+		filename = forceFilename(filename)
+		with cls._instancesLock:
+			instance = cls._instances.pop(filename, None) or cls(filename)
+			cls._instances[filename] = instance
+			while len(cls._instances) > cls.INSTANCE_CACHE_SIZE:
+				cls._instances.popitem(last=False)
+		return instance
+
+	@classmethod
+	def getKey(cls, values: Dict[str, Any]) -> tuple:
+		return tuple(values.get(attribute) for attribute in cls.IDENT_ATTRIBUTES)
+
+	@contextmanager
+	def _open(self, exclusive: bool):
+		lockableFile = LockableFile(self.filename)
+		handle = lockableFile.open('ab+' if exclusive else 'rb')
+		try:
+			self._load(handle)
+			yield handle
+		finally:
+			lockableFile.close()
+
+	def _setSignature(self, handle) -> None:
+		fileStat = os.fstat(handle.fileno())
+		self._signature = (fileStat.st_mtime_ns, fileStat.st_size, fileStat.st_ino)
+
+	def _load(self, handle) -> None:
+		signature = self._signature
+		self._setSignature(handle)
+		if self._ini is not None and signature == self._signature:
+			return
+
+		handle.seek(0)
+		data = handle.read()
+		self._needsNewline = bool(data) and not data.endswith(b'\n')
+		self._ini = IniFile(filename=self.filename).parse(lines=data.decode('utf-8', 'replace').splitlines() or [''])
+		self._index = {}
+		self._nextNumber = 0
+		for section in self._ini.sections():
+			self._index[self.getKey(dict(self._ini.items(section)))] = section
+			try:
+				self._nextNumber = max(self._nextNumber, int(section.rsplit('_', 1)[-1]) + 1)
+			except ValueError:
+				pass
+
+	def _formatSection(self, section: str) -> str:
+		lines = [f'[{section}]']
+		for option in sorted(self._ini.options(section)):
+			lines.append(f'{option} = {self._ini.get(section, option)}')
+		lines.append('\n')
+		return '\n'.join(lines)
+
+	def _rewrite(self, handle) -> None:
+		handle.seek(0)
+		handle.truncate()
+		handle.write(''.join(self._formatSection(section) for section in self._ini.sections()).encode('utf-8'))
+		handle.flush()
+		self._needsNewline = False
+		self._setSignature(handle)
+
+	def _append(self, handle, sections: List[str]) -> None:
+		data = ''.join(self._formatSection(section) for section in sections)
+		if self._needsNewline:
+			data = '\n' + data
+		handle.write(data.encode('utf-8'))
+		handle.flush()
+		self._needsNewline = False
+		self._setSignature(handle)
+
+	def getEntries(self) -> List[Dict[str, str]]:
+		with self._lock:
+			try:
+				with self._open(exclusive=False):
+					pass
+			except FileNotFoundError:
+				return []
+			return [dict(self._ini.items(section)) for section in self._ini.sections()]
+
+	def insert(self, entries: List[Dict[str, str]]) -> None:
+		"""Insert `entries`, entries with a known ident replace the existing ones."""
+		with self._lock, self._open(exclusive=True) as handle:
+			rewrite = False
+			newSections = []
+			for values in entries:
+				key = self.getKey(values)
+				section = self._index.get(key)
+				if section:
+					logger.debug("Replacing audit software section '%s' in '%s'", section, self.filename)
+					self._ini.remove_section(section)
+					rewrite = True
+				else:
+					section = f'software_{self._nextNumber}'
+					self._nextNumber += 1
+					self._index[key] = section
+					newSections.append(section)
+
+				self._ini.add_section(section)
+				for (attribute, value) in values.items():
+					if value is not None:
+						self._ini.set(section, attribute, value)
+
+			if rewrite:
+				self._rewrite(handle)
+			elif newSections:
+				self._append(handle, newSections)
+
+	def update(self, values: Dict[str, str]) -> bool:
+		"""
+		Update the entry with the ident of `values`.
+
+		:returns: `False` if there is no such entry.
+		"""
+		with self._lock, self._open(exclusive=True) as handle:
+			section = self._index.get(self.getKey(values))
+			if not section:
+				return False
+
+			for (attribute, value) in values.items():
+				if value is not None:
+					self._ini.set(section, attribute, value)
+			self._rewrite(handle)
+			return True
+
+	def remove(self, keys: List[tuple]) -> None:
+		with self._lock, self._open(exclusive=True) as handle:
+			removed = False
+			for key in keys:
+				section = self._index.pop(key, None)
+				if section:
+					self._ini.remove_section(section)
+					removed = True
+			if removed:
+				self._rewrite(handle)
+
+
 class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attributes,too-many-public-methods
 	"""Backend holding information in Plain textfile form."""
 
 	PRODUCT_FILENAME_REGEX = re.compile(r'^([a-zA-Z0-9_.-]+)_([\w.]+)-([\w.]+)\.(local|net)boot$')
 	PLACEHOLDER_REGEX = re.compile(r'^(.*)<([^>]+)>(.*)$')
+	# Shared by all file backends of the process
+	CACHE = FileBackendCache()
 
 	def __init__(self, **kwargs) -> None:  # pylint: disable=too-many-statements
 		self._name = 'file'
@@ -71,6 +296,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 		self.__dirGroup = FILE_ADMIN_GROUP
 		self.__dirUser = OPSICONFD_USER
 		self.__dirMode = 0o770
+		self._cache = self.CACHE
 
 		# Parse arguments
 		logger.trace('kwargs are: {0}'.format(kwargs))
@@ -92,6 +318,8 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 				self.__fileUser = forceUnicode(value)
 				logger.trace('Setting __dirUser to "{0}"'.format(value))
 				self.__dirUser = forceUnicode(value)
+			elif option == 'cache':
+				self._cache = self.CACHE if forceBool(value) else None
 
 		self.__fileUid = pwd.getpwnam(self.__fileUser)[2]
 		self.__fileGid = grp.getgrnam(self.__fileGroup)[2]
@@ -102,6 +330,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 		self.__depotConfigDir = os.path.join(self.__baseDir, 'depots')
 		self.__productDir = os.path.join(self.__baseDir, 'products')
 		self.__auditDir = os.path.join(self.__baseDir, 'audit')
+		self.__auditSoftwareDir = os.path.join(self.__auditDir, 'software')
 		self.__configFile = os.path.join(self.__baseDir, 'config.ini')
 		self.__clientGroupsFile = os.path.join(self.__baseDir, 'clientgroups.ini')
 		self.__productGroupsFile = os.path.join(self.__baseDir, 'productgroups.ini')
@@ -232,7 +461,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 		logger.notice("Creating base path: '%s'" % (self.__baseDir))
 		for dirname in (
 			self.__baseDir, self.__clientConfigDir, self.__depotConfigDir,
-			self.__productDir, self.__auditDir, self.__clientTemplateDir
+			self.__productDir, self.__auditDir, self.__auditSoftwareDir, self.__clientTemplateDir
 		):
 			if not os.path.isdir(dirname):
 				self._mkdir(dirname)
@@ -299,6 +528,38 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 			logger.debug("Cannot create existing file, only setting rights.")
 		self._setRights(filename)
 
+	def _loadCached(self, kind: str, path: str, loader: Callable[[str], Any]) -> Any:
+		if self._cache is None:
+			return loader(path)
+		return self._cache.get(kind, path, loader)
+
+	def _invalidateCache(self, path: str) -> None:
+		if self._cache is not None:
+			self._cache.invalidate(path)
+
+	def _listdir(self, directory: str) -> List[str]:
+		return self._loadCached('listdir', directory, os.listdir)
+
+	def _parseIniFile(self, filename: str) -> Any:
+		"""Returns the parsed ini file which must not be modified."""
+		return self._loadCached('ini', filename, lambda path: IniFile(filename=path, ignoreCase=False).parse())
+
+	def _getPackageControlFile(self, filename: str) -> PackageControlFile:
+		def load(path):
+			packageControlFile = PackageControlFile(filename=path)
+			packageControlFile.parse()
+			return packageControlFile
+
+		return self._loadCached('pro', filename, load)
+
+	def _getHostKeyFile(self, filename: str) -> HostKeyFile:
+		def load(path):
+			hostKeys = HostKeyFile(filename=path)
+			hostKeys.parse()
+			return hostKeys
+
+		return self._loadCached('key', filename, load)
+
 	@staticmethod
 	def __escape(string: str) -> str:
 		string = forceUnicode(string)
@@ -311,6 +572,46 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 		logger.trace("Unescaping string: '%s'" % (string))
 		return string.replace('\\n', '\n').replace('\\;', ';').replace('\\#', '#').replace('%%', '%')
 
+	def _getAuditSoftwareValues(self, ident: Dict[str, Any]) -> Dict[str, str]:
+		"""Returns the escaped values of `ident` as stored in audit software files."""
+		return {str(key).lower(): self.__escape(value) for (key, value) in ident.items() if value is not None}
+
+	def _getAuditSoftwareShard(self, values: Dict[str, str]) -> str:
+		key = '\n'.join(value or '' for value in AuditSoftwareFile.getKey(values))
+		shard = hashlib.md5(key.encode('utf-8'), usedforsecurity=False).hexdigest()[:2]
+		return os.path.join(self.__auditSoftwareDir, f'{shard}.sw')
+
+	def _getAuditSoftwareFile(self, filename: str, create: bool = False) -> AuditSoftwareFile:
+		if create and not os.path.exists(filename):
+			if not os.path.isdir(os.path.dirname(filename)):
+				self._mkdir(os.path.dirname(filename))
+			self._touch(filename)
+		return AuditSoftwareFile.get(filename)
+
+	def _shardAuditSoftware(self) -> None:
+		"""
+		Move the entries of the former single audit software file to \
+the shard files.
+		"""
+		legacyFile = os.path.join(self.__auditDir, 'global.sw')
+		if not os.path.exists(legacyFile):
+			return
+
+		logger.notice("Moving audit software from '%s' to '%s'", legacyFile, self.__auditSoftwareDir)
+		ini = IniFile(filename=legacyFile).parse()
+		shards = {}
+		for section in ini.sections():
+			values = dict(ini.items(section))
+			shards.setdefault(self._getAuditSoftwareShard(values), []).append(values)
+
+		for (filename, entries) in shards.items():
+			self._getAuditSoftwareFile(filename, create=True).insert(entries)
+
+		try:
+			os.unlink(legacyFile)
+		except FileNotFoundError:
+			pass  # Moved by another process
+
 	def _getConfigFile(self, objType: str, ident: Dict[str, Any], fileType: str) -> str:  # pylint: disable=too-many-branches,too-many-statements
 		logger.debug("Getting config file for '%s', '%s', '%s'", objType, ident, fileType)
 		filename = None
@@ -375,7 +676,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 
 		elif fileType == 'sw':
 			if objType == 'AuditSoftware':
-				filename = os.path.join(self.__auditDir, 'global.sw')
+				filename = self._getAuditSoftwareShard(self._getAuditSoftwareValues(ident))
 			elif objType == 'AuditSoftwareOnClient':
 				filename = os.path.join(self.__auditDir, ident['clientId'] + '.sw')
 
@@ -407,8 +708,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 		if objType in ('Config', 'UnicodeConfig', 'BoolConfig'):
 			filename = self._getConfigFile(objType, {}, 'ini')
 			if os.path.isfile(filename):
-				iniFile = IniFile(filename=filename, ignoreCase=False)
-				cp = iniFile.parse()
+				cp = self._parseIniFile(filename)
 				for section in cp.sections():
 					objIdents.append({'id': section})
 
@@ -419,8 +719,9 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 				idFilter = {'id': filter['clientId']}
 			else:
 				idFilter = {}
+			matchesId = compileObjectHashFilter(idFilter)
 
-			for entry in os.listdir(self.__clientConfigDir):
+			for entry in self._listdir(self.__clientConfigDir):
 				if not entry.lower().endswith('.ini'):
 					logger.trace("Ignoring invalid client file '%s'", entry)
 					continue
@@ -431,13 +732,12 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					logger.warning("Ignoring invalid client file '%s'", entry)
 					continue
 
-				if idFilter and not self._objectHashMatches({'id': hostId}, **idFilter):
+				if idFilter and not matchesId({'id': hostId}):
 					continue
 
 				if objType == 'ProductOnClient':
 					filename = self._getConfigFile(objType, {'clientId': hostId}, 'ini')
-					iniFile = IniFile(filename=filename, ignoreCase=False)
-					cp = iniFile.parse()
+					cp = self._parseIniFile(filename)
 
 					for section in cp.sections():
 						if section.endswith('-state'):
@@ -456,11 +756,12 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 				idFilter = {'id': filter['depotId']}
 			else:
 				idFilter = {}
+			matchesId = compileObjectHashFilter(idFilter)
 
 			if not os.path.isdir(self.__depotConfigDir):
 				raise BackendMissingDataError(f"Directory {self.__depotConfigDir} does not exist")
 
-			for entry in os.listdir(self.__depotConfigDir):
+			for entry in self._listdir(self.__depotConfigDir):
 				if not entry.lower().endswith('.ini'):
 					logger.trace("Ignoring invalid depot file '%s'", entry)
 					continue
@@ -471,7 +772,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					logger.warning("Ignoring invalid depot file '%s'", entry)
 					continue
 
-				if idFilter and not self._objectHashMatches({'id': hostId}, **idFilter):
+				if idFilter and not matchesId({'id': hostId}):
 					continue
 
 				if objType == 'OpsiConfigserver' and hostId != self.__serverId:
@@ -479,8 +780,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 
 				if objType == 'ProductOnDepot':
 					filename = self._getConfigFile(objType, {'depotId': hostId}, 'ini')
-					iniFile = IniFile(filename=filename, ignoreCase=False)
-					cp = iniFile.parse()
+					cp = self._parseIniFile(filename)
 
 					for section in cp.sections():
 						if section.endswith('-state'):
@@ -510,8 +810,9 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 				idFilter = {'id': filter['productId']}
 			else:
 				idFilter = {}
+			matchesId = compileObjectHashFilter(idFilter)
 
-			for entry in os.listdir(self.__productDir):
+			for entry in self._listdir(self.__productDir):
 				match = None
 
 				if entry.endswith('.localboot'):
@@ -529,7 +830,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					logger.warning("Ignoring invalid product file '%s'", entry)
 					continue
 
-				if idFilter and not self._objectHashMatches({'id': match.group(1)}, **idFilter):
+				if idFilter and not matchesId({'id': match.group(1)}):
 					continue
 
 				logger.trace("Found match: id='%s', productVersion='%s', packageVersion='%s'" % (match.group(1), match.group(2), match.group(3)))
@@ -538,8 +839,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					objIdents.append({'id': match.group(1), 'productVersion': match.group(2), 'packageVersion': match.group(3)})
 
 				elif objType in ('ProductProperty', 'UnicodeProductProperty', 'BoolProductProperty', 'ProductDependency'):
-					filename = os.path.join(self.__productDir, entry)
-					packageControlFile = PackageControlFile(filename=filename)
+					packageControlFile = self._getPackageControlFile(os.path.join(self.__productDir, entry))
 					if objType == 'ProductDependency':
 						for productDependency in packageControlFile.getProductDependencies():
 							objIdents.append(productDependency.getIdent(returnType='dict'))
@@ -548,8 +848,9 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 							objIdents.append(productProperty.getIdent(returnType='dict'))
 
 		elif objType in ('ConfigState', 'ProductPropertyState'):  # pylint: disable=too-many-nested-blocks
+			matchesFilter = compileObjectHashFilter(filter)
 			for path in (self.__depotConfigDir, self.__clientConfigDir):
-				for entry in os.listdir(path):
+				for entry in self._listdir(path):
 					filename = os.path.join(path, entry)
 
 					if not entry.lower().endswith('.ini'):
@@ -562,11 +863,10 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 						logger.warning("Ignoring invalid file '%s': %s", filename, err)
 						continue
 
-					if not self._objectHashMatches({'objectId': objectId}, **filter):
+					if not matchesFilter({'objectId': objectId}):
 						continue
 
-					iniFile = IniFile(filename=filename, ignoreCase=False)
-					cp = iniFile.parse()
+					cp = self._parseIniFile(filename)
 
 					if objType == 'ConfigState' and cp.has_section('generalconfig'):
 						for option in cp.options('generalconfig'):
@@ -610,8 +910,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 
 			for _pass in passes:
 				groupType = _pass['groupType']
-				iniFile = IniFile(filename=_pass['filename'], ignoreCase=False)
-				cp = iniFile.parse()
+				cp = self._parseIniFile(_pass['filename'])
 
 				for section in cp.sections():
 					if objType == 'ObjectToGroup':
@@ -654,7 +953,14 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 				fileType = 'sw'
 
 			filenames = []
-			if objType in ('AuditSoftware', 'AuditHardware'):
+			if objType == 'AuditSoftware':
+				self._shardAuditSoftware()
+				if os.path.isdir(self.__auditSoftwareDir):
+					filenames = [
+						os.path.join(self.__auditSoftwareDir, entry)
+						for entry in sorted(os.listdir(self.__auditSoftwareDir)) if entry.endswith('.sw')
+					]
+			elif objType == 'AuditHardware':
 				filename = self._getConfigFile(objType, {}, fileType)
 				if os.path.isfile(filename):
 					filenames.append(filename)
@@ -664,6 +970,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					idFilter = {'id': filter['clientId']}
 				elif objType == 'AuditHardwareOnHost' and filter.get('hostId'):
 					idFilter = {'id': filter['hostId']}
+				matchesId = compileObjectHashFilter(idFilter)
 
 				for entry in os.listdir(self.__auditDir):
 					entry = entry.lower()
@@ -672,11 +979,12 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					if entry in ('global.sw', 'global.hw'):
 						continue
 
-					if not entry.endswith('.%s' % fileType):
+					if not entry.endswith('.%s' % fileType) or not os.path.isfile(os.path.join(self.__auditDir, entry)):
 						logger.trace("Ignoring invalid file '%s'" % (entry))
+						continue
 
 					try:
-						if idFilter and not self._objectHashMatches({'id': forceHostId(entry[:-3])}, **idFilter):
+						if idFilter and not matchesId({'id': forceHostId(entry[:-3])}):
 							continue
 					except Exception:  # pylint: disable=broad-except
 						logger.warning("Ignoring invalid file '%s'", entry)
@@ -685,10 +993,13 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					filenames.append(os.path.join(self.__auditDir, entry))
 
 			for filename in filenames:
-				iniFile = IniFile(filename=filename)
-				cp = iniFile.parse()
+				if fileType == 'sw':
+					entries = self._getAuditSoftwareFile(filename).getEntries()
+				else:
+					cp = IniFile(filename=filename).parse()
+					entries = [dict(cp.items(section)) for section in cp.sections()]
 
-				for section in cp.sections():
+				for entry in entries:
 					if objType in ('AuditSoftware', 'AuditSoftwareOnClient'):
 						objIdent = {
 							'name': None,
@@ -700,15 +1011,15 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 
 						for key in list(objIdent):
 							option = key.lower()
-							if cp.has_option(section, option):
-								objIdent[key] = self.__unescape(cp.get(section, option))
+							if option in entry:
+								objIdent[key] = self.__unescape(entry[option])
 
 						if objType == 'AuditSoftwareOnClient':
 							objIdent['clientId'] = os.path.basename(filename)[:-3]
 					else:
 						objIdent = {}
 
-						for (key, value) in cp.items(section):
+						for (key, value) in entry.items():
 							objIdent[str(key)] = self.__unescape(value)
 
 						if objType == 'AuditHardwareOnHost':
@@ -733,11 +1044,8 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 			logger.trace("Returning idents without filter.")
 			return objIdents
 
-		return [
-			ident
-			for ident in objIdents
-			if self._objectHashMatches(ident, **filter)
-		]
+		matchesFilter = compileObjectHashFilter(filter)
+		return [ident for ident in objIdents if matchesFilter(ident)]
 
 	@staticmethod
 	def _adaptObjectHashAttributes(objHash: Dict[str, Any], ident: Dict[str, Any], attributes: List[str]) -> Dict[str, Any]:
@@ -796,8 +1104,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 
 		logger.trace("Using mappings %s" % mappings)
 
-		packageControlFileCache = {}
-		iniFileCache = {}
+		matchesFilter = compileObjectHashFilter(filter)
 		hostKeys = None
 
 		objects = []
@@ -812,20 +1119,16 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 
 				if fileType == 'key':
 					if not hostKeys:
-						hostKeys = HostKeyFile(filename=filename)
-						hostKeys.parse()
+						hostKeys = self._getHostKeyFile(filename)
 
 					for _mapping in mapping:
 						objHash[_mapping['attribute']] = hostKeys.getOpsiHostKey(ident['id'])
 
 				elif fileType == 'ini':
-					try:
-						cp = iniFileCache[filename]
-					except KeyError:
-						iniFile = IniFile(filename=filename, ignoreCase=False)
-						cp = iniFileCache[filename] = iniFile.parse()
-
+					cp = self._parseIniFile(filename)
 					if cp.has_section('LocalbootProduct_product_states') or cp.has_section('NetbootProduct_product_states'):
+						# The cached file must not be modified
+						cp = IniFile(filename=filename, ignoreCase=False).parse()
 						if cp.has_section('LocalbootProduct_product_states'):
 							if not cp.has_section('localboot_product_states'):
 								cp.add_section('localboot_product_states')
@@ -843,6 +1146,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 
 							cp.remove_section('NetbootProduct_product_states')
 						IniFile(filename=filename, ignoreCase=False).generate(cp)
+						self._invalidateCache(filename)
 
 					for _mapping in mapping:
 						attribute = _mapping['attribute']
@@ -888,12 +1192,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					logger.trace("Got object hash from ini file: %s" % objHash)
 
 				elif fileType == 'pro':
-					try:
-						packageControlFile = packageControlFileCache[filename]
-					except KeyError:
-						packageControlFileCache[filename] = PackageControlFile(filename=filename)
-						packageControlFileCache[filename].parse()
-						packageControlFile = packageControlFileCache[filename]
+					packageControlFile = self._getPackageControlFile(filename)
 
 					if objType in ('Product', 'LocalbootProduct', 'NetbootProduct'):
 						objHash = packageControlFile.getProduct().toHash()
@@ -917,7 +1216,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 								break
 
 			Class = eval(objType)  # pylint: disable=eval-used
-			if self._objectHashMatches(Class.fromHash(objHash).toHash(), **filter):
+			if matchesFilter(Class.fromHash(objHash).toHash()):
 				if Class is Config and "possibleValues" in objHash and objHash["possibleValues"]:
 					if (
 						len(objHash["possibleValues"]) == 2
@@ -986,6 +1285,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					hostKeys = HostKeyFile(filename=filename)
 					hostKeys.setOpsiHostKey(obj.getId(), obj.getOpsiHostKey())
 					hostKeys.generate()
+					self._invalidateCache(filename)
 
 			elif fileType == 'ini':
 				iniFile = IniFile(filename=filename, ignoreCase=False)
@@ -1082,6 +1382,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 
 				iniFile.setSectionSequence(['info', 'generalconfig', 'localboot_product_states', 'netboot_product_states'])
 				iniFile.generate(cp)
+				self._invalidateCache(filename)
 
 			elif fileType == 'pro':
 				if not os.path.exists(filename):
@@ -1129,6 +1430,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 						packageControlFile.setProductProperties(currentObjects)
 
 				packageControlFile.generate()
+				self._invalidateCache(filename)
 
 	def _delete(self, objList: List[Any]) -> None:  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
 		if not objList:
@@ -1152,7 +1454,9 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					obj.getType(), obj.getIdent(returnType='dict'), 'ini')
 				if os.path.isfile(filename):
 					os.unlink(filename)
+					self._invalidateCache(filename)
 			hostKeyFile.generate()
+			self._invalidateCache(hostKeyFile.getFilename())
 
 		elif objType in ('Config', 'UnicodeConfig', 'BoolConfig'):
 			filename = self._getConfigFile(objType, {}, 'ini')
@@ -1164,6 +1468,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					cp.remove_section(obj.getId())
 					logger.trace("Removed section '%s'" % obj.getId())
 			iniFile.generate(cp)
+			self._invalidateCache(filename)
 
 		elif objType == 'ConfigState':
 			filenames = set(self._getConfigFile(obj.getType(), obj.getIdent(returnType='dict'), 'ini') for obj in objList)
@@ -1181,6 +1486,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 						logger.trace("Removed option in generalconfig '%s'" % obj.getConfigId())
 
 				iniFile.generate(cp)
+				self._invalidateCache(filename)
 
 		elif objType in ('Product', 'LocalbootProduct', 'NetbootProduct'):
 			for obj in objList:
@@ -1189,6 +1495,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 				logger.debug("Deleting %s: '%s'", obj.getType(), obj.getIdent())
 				if os.path.isfile(filename):
 					os.unlink(filename)
+					self._invalidateCache(filename)
 					logger.trace("Removed file '%s'" % filename)
 
 		elif objType in ('ProductProperty', 'UnicodeProductProperty', 'BoolProductProperty', 'ProductDependency'):
@@ -1221,6 +1528,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					packageControlFile.setProductProperties(newList)
 
 				packageControlFile.generate()
+				self._invalidateCache(filename)
 
 		elif objType in ('ProductOnDepot', 'ProductOnClient'):
 			filenames = set(self._getConfigFile(obj.getType(), obj.getIdent(returnType='dict'), 'ini') for obj in objList)
@@ -1236,6 +1544,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 						logger.trace("Removed section '%s'" % obj.getProductId() + '-state')
 
 				iniFile.generate(cp)
+				self._invalidateCache(filename)
 
 		elif objType == 'ProductPropertyState':
 			for obj in objList:
@@ -1257,6 +1566,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					logger.trace("Removed empty section '%s'" % section)
 
 				iniFile.generate(cp)
+				self._invalidateCache(filename)
 
 		elif objType in ('Group', 'HostGroup', 'ProductGroup', 'ObjectToGroup'):
 			passes = [
@@ -1292,13 +1602,14 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 							logger.trace("Removed section '%s'" % section)
 
 				iniFile.generate(cp)
+				self._invalidateCache(_pass['filename'])
 		else:
 			logger.warning("_delete(): unhandled objType: '%s' object: %s", objType, objList[0])
 
-	def getData(self, query: str) -> Any:
+	def getData(self, query: str, stream: bool = False) -> Any:  # pylint: disable=unused-argument
 		raise BackendConfigurationError("You have tried to execute a method, that will not work with filebackend.")
 
-	def getRawData(self, query: str) -> Any:
+	def getRawData(self, query: str, stream: bool = False) -> Any:  # pylint: disable=unused-argument
 		raise BackendConfigurationError("You have tried to execute a method, that will not work with filebackend.")
 
 	# Hosts
@@ -1628,101 +1939,38 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 		self._delete(forceObjectClassList(objectToGroups, ObjectToGroup))
 
 	# AuditSoftwares
-	def auditSoftware_insertObject(self, auditSoftware: AuditSoftware) -> None:  # pylint: disable=too-many-branches
+	def auditSoftware_insertObject(self, auditSoftware: AuditSoftware) -> None:
 		auditSoftware = forceObjectClass(auditSoftware, AuditSoftware)
 		ConfigDataBackend.auditSoftware_insertObject(self, auditSoftware)
 
 		logger.debug("Inserting auditSoftware: '%s'", auditSoftware.getIdent())  # pylint: disable=maybe-no-member
-		filename = self._getConfigFile('AuditSoftware', {}, 'sw')
-
-		if not os.path.exists(filename):
-			self._touch(filename)
-
-		iniFile = IniFile(filename=filename)
-		ini = iniFile.parse()
-
+		self._shardAuditSoftware()
 		auditSoftware = auditSoftware.toHash()  # pylint: disable=maybe-no-member
-		for attribute in auditSoftware.keys():
-			if (auditSoftware[attribute] is None) or (attribute == 'type'):
-				continue
-			auditSoftware[attribute] = self.__escape(auditSoftware[attribute])
-
-		newNum = 0
-		removeSection = None
-		for section in ini.sections():
-			num = int(section.split('_')[-1])
-			if num >= newNum:
-				newNum = num + 1
-
-			matches = True
-			for attribute in ('name', 'version', 'subVersion', 'language', 'architecture'):
-				if not ini.has_option(section, attribute):
-					if auditSoftware[attribute] is not None:
-						matches = False
-						break
-				elif ini.get(section, attribute) != auditSoftware[attribute]:
-					matches = False
-					break
-
-			if matches:
-				removeSection = section
-				newNum = num
-				logger.debug("Found auditSoftware section '%s' to replace", removeSection)
-				break
-
-		section = 'software_%d' % newNum
-		if removeSection:
-			ini.remove_section(removeSection)
-		else:
-			logger.debug("Inserting new auditSoftware section '%s'", section)
-
-		ini.add_section(section)
-		for (attribute, value) in auditSoftware.items():
-			if value is None or attribute == 'type':
-				continue
-			ini.set(section, attribute, value)
-		iniFile.generate(ini)
+		del auditSoftware['type']
+		values = self._getAuditSoftwareValues(auditSoftware)
+		self._getAuditSoftwareFile(self._getAuditSoftwareShard(values), create=True).insert([values])
 
 	def auditSoftware_updateObject(self, auditSoftware: AuditSoftware) -> None:
 		auditSoftware = forceObjectClass(auditSoftware, AuditSoftware)
 		ConfigDataBackend.auditSoftware_updateObject(self, auditSoftware)
 
 		logger.debug("Updating auditSoftware: '%s'", auditSoftware.getIdent())  # pylint: disable=maybe-no-member
-		filename = self._getConfigFile('AuditSoftware', {}, 'sw')
-		iniFile = IniFile(filename=filename)
-		ini = iniFile.parse()
-		ident = auditSoftware.getIdent(returnType='dict')  # pylint: disable=maybe-no-member
-
-		for section in ini.sections():
-			found = True
-			for (key, value) in ident.items():
-				if self.__unescape(ini.get(section, key.lower())) != value:
-					found = False
-					break
-
-			if found:
-				for (key, value) in auditSoftware.toHash().items():  # pylint: disable=maybe-no-member
-					if value is None:
-						continue
-					ini.set(section, key, self.__escape(value))
-				iniFile.generate(ini)
-				return
-
-		raise BackendMissingDataError("AuditSoftware %s not found" % auditSoftware)
+		self._shardAuditSoftware()
+		values = self._getAuditSoftwareValues(auditSoftware.toHash())  # pylint: disable=maybe-no-member
+		filename = self._getAuditSoftwareShard(values)
+		if not os.path.exists(filename) or not self._getAuditSoftwareFile(filename).update(values):
+			raise BackendMissingDataError("AuditSoftware %s not found" % auditSoftware)
 
 	def auditSoftware_getObjects(self, attributes: List[str] = None, **filter) -> List[AuditSoftware]:  # pylint: disable=redefined-builtin,unused-argument
 		attributes = attributes or []
 		ConfigDataBackend.auditSoftware_getObjects(self, attributes=[], **filter)
 
 		logger.debug("Getting auditSoftwares ...")
-		filename = self._getConfigFile('AuditSoftware', {}, 'sw')
-		if not os.path.exists(filename):
+		self._shardAuditSoftware()
+		if not os.path.isdir(self.__auditSoftwareDir):
 			return []
 
-		iniFile = IniFile(filename=filename)
-		ini = iniFile.parse()
 		fastFilter = {}
-
 		if filter:
 			for (attribute, value) in filter.items():
 				if attribute in ("name", "version", "subVersion", "language", "architecture") and value:
@@ -1730,32 +1978,43 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					if len(value) == 1 and value[0].find('*') == -1:
 						fastFilter[attribute] = value[0]
 
+		if len(fastFilter) == len(AuditSoftwareFile.IDENT_ATTRIBUTES):
+			# The complete ident is known, only its shard can contain the software
+			filenames = [self._getConfigFile('AuditSoftware', fastFilter, 'sw')]
+		else:
+			filenames = [
+				os.path.join(self.__auditSoftwareDir, entry)
+				for entry in sorted(os.listdir(self.__auditSoftwareDir)) if entry.endswith('.sw')
+			]
+
 		result = []
-		for section in ini.sections():
-			objHash = {
-				"name": None,
-				"version": None,
-				"subVersion": None,
-				"language": None,
-				"architecture": None,
-				"windowsSoftwareId": None,
-				"windowsDisplayName": None,
-				"windowsDisplayVersion": None,
-				"installSize": None
-			}
-			fastFiltered = False
-			for (key, value) in objHash.items():
-				try:
-					value = self.__unescape(ini.get(section, key.lower()))
+		matchesFilter = compileObjectHashFilter(filter)
+		for filename in filenames:
+			for entry in self._getAuditSoftwareFile(filename).getEntries():
+				objHash = {
+					"name": None,
+					"version": None,
+					"subVersion": None,
+					"language": None,
+					"architecture": None,
+					"windowsSoftwareId": None,
+					"windowsDisplayName": None,
+					"windowsDisplayVersion": None,
+					"installSize": None
+				}
+				fastFiltered = False
+				for key in list(objHash):
+					option = key.lower()
+					if option not in entry:
+						continue
+					value = self.__unescape(entry[option])
 					if fastFilter and value and key in fastFilter and (fastFilter[key] != value):
 						fastFiltered = True
 						break
 					objHash[key] = value
-				except Exception:  # pylint: disable=broad-except
-					pass
-			if not fastFiltered and self._objectHashMatches(objHash, **filter):
-				# TODO: adaptObjHash?
-				result.append(AuditSoftware.fromHash(objHash))
+				if not fastFiltered and matchesFilter(objHash):
+					# TODO: adaptObjHash?
+					result.append(AuditSoftware.fromHash(objHash))
 
 		return result
 
@@ -1763,87 +2022,25 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 		ConfigDataBackend.auditSoftware_deleteObjects(self, auditSoftwares)
 
 		logger.debug("Deleting auditSoftwares ...")
-		filename = self._getConfigFile('AuditSoftware', {}, 'sw')
-		if not os.path.exists(filename):
-			return
-		iniFile = IniFile(filename=filename)
-		ini = iniFile.parse()
-		idents = [
-			auditSoftware.getIdent(returnType='dict') for auditSoftware
-			in forceObjectClassList(auditSoftwares, AuditSoftware)
-		]
+		self._shardAuditSoftware()
+		keys = {}
+		for auditSoftware in forceObjectClassList(auditSoftwares, AuditSoftware):
+			values = self._getAuditSoftwareValues(auditSoftware.getIdent(returnType='dict'))
+			keys.setdefault(self._getAuditSoftwareShard(values), []).append(AuditSoftwareFile.getKey(values))
 
-		removeSections = []
-		for section in ini.sections():
-			for ident in idents:
-				found = True
-				for (key, value) in ident.items():
-					if self.__unescape(ini.get(section, key.lower())) != value:
-						found = False
-						break
-
-				if found and section not in removeSections:
-					removeSections.append(section)
-
-		if removeSections:
-			for section in removeSections:
-				ini.remove_section(section)
-			iniFile.generate(ini)
+		for (filename, shardKeys) in keys.items():
+			if os.path.exists(filename):
+				self._getAuditSoftwareFile(filename).remove(shardKeys)
 
 	# AuditSoftwareOnClients
-	def auditSoftwareOnClient_insertObject(self, auditSoftwareOnClient: AuditSoftwareOnClient) -> None:  # pylint: disable=too-many-branches
+	def auditSoftwareOnClient_insertObject(self, auditSoftwareOnClient: AuditSoftwareOnClient) -> None:
 		auditSoftwareOnClient = forceObjectClass(auditSoftwareOnClient, AuditSoftwareOnClient)
 		ConfigDataBackend.auditSoftwareOnClient_insertObject(self, auditSoftwareOnClient)
 
 		logger.debug("Inserting auditSoftwareOnClient: '%s'", auditSoftwareOnClient.getIdent())  # pylint: disable=maybe-no-member
 		filename = self._getConfigFile('AuditSoftwareOnClient', {"clientId": auditSoftwareOnClient.clientId}, 'sw')  # pylint: disable=maybe-no-member
-
-		if not os.path.exists(filename):
-			self._touch(filename)
-
-		iniFile = IniFile(filename=filename)
-		ini = iniFile.parse()
-
-		auditSoftwareOnClient = auditSoftwareOnClient.toHash()  # pylint: disable=maybe-no-member
-		for attribute in auditSoftwareOnClient.keys():
-			if auditSoftwareOnClient[attribute] is None:
-				continue
-			auditSoftwareOnClient[attribute] = self.__escape(auditSoftwareOnClient[attribute])
-		newNum = 0
-		removeSection = None
-		for section in ini.sections():
-			num = int(section.split('_')[-1])
-			if num >= newNum:
-				newNum = num + 1
-
-			matches = True
-			for attribute in ('name', 'version', 'subVersion', 'language', 'architecture'):
-				if not ini.has_option(section, attribute):
-					if auditSoftwareOnClient[attribute] is not None:
-						matches = False
-						break
-				elif ini.get(section, attribute) != auditSoftwareOnClient[attribute]:
-					matches = False
-					break
-
-			if matches:
-				removeSection = section
-				newNum = num
-				logger.debug("Found auditSoftwareOnClient section '%s' to replace", removeSection)
-				break
-
-		section = 'software_%d' % newNum
-		if removeSection:
-			ini.remove_section(removeSection)
-		else:
-			logger.debug("Inserting new auditSoftwareOnClient section '%s'", section)
-
-		ini.add_section(section)
-		for (attribute, value) in auditSoftwareOnClient.items():
-			if value is None:
-				continue
-			ini.set(section, attribute, value)
-		iniFile.generate(ini)
+		values = self._getAuditSoftwareValues(auditSoftwareOnClient.toHash())  # pylint: disable=maybe-no-member
+		self._getAuditSoftwareFile(filename, create=True).insert([values])
 
 	def auditSoftwareOnClient_updateObject(self, auditSoftwareOnClient: AuditSoftwareOnClient) -> None:
 		auditSoftwareOnClient = forceObjectClass(auditSoftwareOnClient, AuditSoftwareOnClient)
@@ -1851,26 +2048,9 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 
 		logger.debug("Updating auditSoftwareOnClient: '%s'", auditSoftwareOnClient.getIdent())  # pylint: disable=maybe-no-member
 		filename = self._getConfigFile('AuditSoftwareOnClient', {"clientId": auditSoftwareOnClient.clientId}, 'sw')  # pylint: disable=maybe-no-member
-		iniFile = IniFile(filename=filename)
-		ini = iniFile.parse()
-		ident = auditSoftwareOnClient.getIdent(returnType='dict')  # pylint: disable=maybe-no-member
-
-		for section in ini.sections():
-			found = True
-			for (key, value) in ident.items():
-				if self.__unescape(ini.get(section, key.lower())) != value:
-					found = False
-					break
-
-			if found:
-				for (key, value) in auditSoftwareOnClient.toHash().items():  # pylint: disable=maybe-no-member
-					if value is None:
-						continue
-					ini.set(section, key, self.__escape(value))
-				iniFile.generate(ini)
-				return
-
-		raise BackendMissingDataError("auditSoftwareOnClient %s not found" % auditSoftwareOnClient)
+		values = self._getAuditSoftwareValues(auditSoftwareOnClient.toHash())  # pylint: disable=maybe-no-member
+		if not os.path.exists(filename) or not self._getAuditSoftwareFile(filename).update(values):
+			raise BackendMissingDataError("auditSoftwareOnClient %s not found" % auditSoftwareOnClient)
 
 	def auditSoftwareOnClient_getObjects(self, attributes: List[str] = None, **filter) -> List[AuditSoftwareOnClient]:  # pylint: disable=redefined-builtin,unused-argument
 		attributes = attributes or []
@@ -1883,12 +2063,9 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 				filenames[ident['clientId']] = self._getConfigFile('AuditSoftwareOnClient', ident, 'sw')
 
 		result = []
+		matchesFilter = compileObjectHashFilter(filter)
 		for (_clientId, filename) in filenames.items():
-			if not os.path.exists(filename):
-				continue
-			iniFile = IniFile(filename=filename)
-			ini = iniFile.parse()
-			for section in ini.sections():
+			for entry in self._getAuditSoftwareFile(filename).getEntries():
 				objHash = {
 					"name": None,
 					"version": None,
@@ -1906,12 +2083,11 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					"licenseKey": None
 				}
 				for key in list(objHash):
-					try:
-						objHash[key] = self.__unescape(ini.get(section, key.lower()))
-					except Exception:  # pylint: disable=broad-except
-						pass
+					option = key.lower()
+					if option in entry:
+						objHash[key] = self.__unescape(entry[option])
 
-				if self._objectHashMatches(objHash, **filter):
+				if matchesFilter(objHash):
 					result.append(AuditSoftwareOnClient.fromHash(objHash))
 
 		return result
@@ -1920,36 +2096,15 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 		ConfigDataBackend.auditSoftwareOnClient_deleteObjects(self, auditSoftwareOnClients)
 
 		logger.debug("Deleting auditSoftwareOnClients ...")
-		filenames = {}
-		idents = {}
+		keys = {}
 		for auditSoftwareOnClient in forceObjectClassList(auditSoftwareOnClients, AuditSoftwareOnClient):
 			ident = auditSoftwareOnClient.getIdent(returnType='dict')
-			try:
-				idents[ident['clientId']].append(ident)
-			except KeyError:
-				idents[ident['clientId']] = [ident]
-
-			if ident['clientId'] not in filenames:
-				filenames[ident['clientId']] = self._getConfigFile('AuditSoftwareOnClient', ident, 'sw')
-
-		for (clientId, filename) in filenames.items():
-			iniFile = IniFile(filename=filename)
-			ini = iniFile.parse()
-			removeSections = []
-			for section in ini.sections():
-				for ident in idents[clientId]:
-					found = True
-					for (key, value) in ident.items():
-						if self.__unescape(ini.get(section, key.lower())) != value:
-							found = False
-							break
-					if found and section not in removeSections:
-						removeSections.append(section)
+			filename = self._getConfigFile('AuditSoftwareOnClient', ident, 'sw')
+			keys.setdefault(filename, []).append(AuditSoftwareFile.getKey(self._getAuditSoftwareValues(ident)))
 
-			if removeSections:
-				for section in removeSections:
-					ini.remove_section(section)
-				iniFile.generate(ini)
+		for (filename, clientKeys) in keys.items():
+			if os.path.exists(filename):
+				self._getAuditSoftwareFile(filename).remove(clientKeys)
 
 	# AuditHardwares
 	def auditHardware_insertObject(self, auditHardware: AuditHardware) -> None:
@@ -1976,6 +2131,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 			return []
 
 		result = []
+		matchesFilter = compileObjectHashFilter(filter)
 		iniFile = IniFile(filename=filename)
 		ini = iniFile.parse()
 		for section in ini.sections():
@@ -1987,7 +2143,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 					objHash[str(option)] = self.__unescape(ini.get(section, option))
 
 			auditHardware = AuditHardware.fromHash(objHash)
-			if self._objectHashMatches(auditHardware.toHash(), **filter):
+			if matchesFilter(auditHardware.toHash()):
 				result.append(auditHardware)
 
 		return result
@@ -2026,6 +2182,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 				filenames[ident['hostId']] = self._getConfigFile('AuditHardwareOnHost', ident, 'hw')
 
 		result = []
+		matchesFilter = compileObjectHashFilter(filter)
 		for (hostId, filename) in filenames.items():
 			if not os.path.exists(filename):
 				continue
@@ -2043,7 +2200,7 @@ class FileBackend(ConfigDataBackend):  # pylint: disable=too-many-instance-attri
 						objHash[str(option)] = self.__unescape(ini.get(section, option))
 
 				auditHardwareOnHost = AuditHardwareOnHost.fromHash(objHash)
-				if self._objectHashMatches(auditHardwareOnHost.toHash(), **filter):
+				if matchesFilter(auditHardwareOnHost.toHash()):
 					result.append(auditHardwareOnHost)
 
 		return result
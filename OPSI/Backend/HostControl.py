@@ -8,14 +8,20 @@ HostControl backend.
 This backend can be used to control hosts.
 """
 
+import asyncio
+import base64
+import gzip
 import ipaddress
+import json
 import socket
-import struct
+import ssl
 import time
-from contextlib import closing
-from typing import Any, Dict, List
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, closing
+from typing import Any, Coroutine, Dict, List, Tuple
 
-from opsicommon.client.jsonrpc import JSONRPCClient
 from opsicommon.logging import get_logger
 from opsicommon.objects import Host
 
@@ -25,102 +31,270 @@ from OPSI.Backend.Base.Backend import Backend
 from OPSI.Exceptions import BackendMissingDataError, BackendUnaccomplishableError
 from OPSI.Types import (
 	forceBool,
-	forceHostId,
 	forceHostIdList,
 	forceInt,
-	forceIpAddress,
 	forceList,
 	forceUnicode,
 )
-from OPSI.Util.Thread import KillableThread
 
-__all__ = ("RpcThread", "ConnectionThread", "HostControlBackend")
+__all__ = ("HostControlTarget", "HostControlEngine", "WakeOnLanSender", "HostControlBackend")
 
 logger = get_logger("opsi.general")
 
 
-class RpcThread(KillableThread):  # pylint: disable=too-many-instance-attributes
+HostControlTarget = namedtuple("HostControlTarget", ("hostId", "ipAddress", "port", "password"), defaults=(None, None, None))
 
-	_USER_AGENT = f"opsi-RpcThread/{__version__}"
 
-	def __init__(  # pylint: disable=too-many-arguments
-		self,
-		hostControlBackend: ExtendedBackend,
-		hostId: str,
-		address: str,
-		username: str,
-		password: str,
-		method: str,
-		params: List = None,
-		hostPort: int = 0
-	) -> None:
-		KillableThread.__init__(self)
-		self.hostControlBackend = hostControlBackend
-		self.hostId = forceHostId(hostId)
-		self.method = forceUnicode(method)
-		self.params = forceList(params or [])
-		self.address = address
-		self.error = None
-		self.result = None
-		self.started = 0
-		self.ended = 0
-		if hostPort:
-			hostPort = forceInt(hostPort)
-		else:
-			hostPort = self.hostControlBackend._opsiclientdPort
-
-		self.jsonrpc = JSONRPCClient(
-			address=f"https://{self.address}:{hostPort}/opsiclientd",
-			username=forceUnicode(username),
-			password=forceUnicode(password),
-			connect_timeout=max(self.hostControlBackend._hostRpcTimeout, 0),
-			read_timeout=max(self.hostControlBackend._hostRpcTimeout, 0),
-			connect_on_init=False,
-			create_methods=False,
-			retry=0,
-		)
+class HostControlEngine:
+	"""
+	Event loop based engine for contacting many opsiclientd control servers.
+
+	Every host is handled by a coroutine instead of a thread, the
+	number of simultaneous connections is bounded by `maxConnections`
+	and every host has its own timeout.
+	"""
+
+	_USER_AGENT = f"opsi-HostControlEngine/{__version__}"
+
+	def __init__(self, maxConnections: int = 50, resolveHostAddress: bool = False, sslContext: ssl.SSLContext = None) -> None:
+		self._maxConnections = max(forceInt(maxConnections), 1)
+		self._resolveHostAddress = forceBool(resolveHostAddress)
+		self._sslContext = sslContext
+
+	@staticmethod
+	def createSSLContext() -> ssl.SSLContext:
+		"""Client context which, like the JSONRPCClient default, does not verify the server certificate."""
+		context = ssl.create_default_context()
+		context.check_hostname = False
+		context.verify_mode = ssl.CERT_NONE
+		return context
+
+	@staticmethod
+	def run(coroutine: Coroutine) -> Any:
+		"""Run `coroutine` in a new event loop, using a helper thread if the caller already runs one."""
+		try:
+			asyncio.get_running_loop()
+		except RuntimeError:
+			return asyncio.run(coroutine)
+
+		with ThreadPoolExecutor(max_workers=1, thread_name_prefix="HostControlEngine") as executor:
+			return executor.submit(asyncio.run, coroutine).result()
+
+	def reachable(self, targets: List[HostControlTarget], timeout: float) -> Dict[str, bool]:
+		return self.run(self._gather(targets, self._checkReachable, timeout))
+
+	def executeRpc(self, targets: List[HostControlTarget], method: str, params: List = None, timeout: float = 15) -> Dict[str, Any]:
+		return self.run(self._gather(targets, self._executeRpc, forceUnicode(method), forceList(params or []), timeout))
+
+	async def _gather(self, targets: List[HostControlTarget], function: Any, *args) -> Dict[str, Any]:
+		semaphore = asyncio.Semaphore(self._maxConnections)
+
+		async def limited(target):
+			async with semaphore:
+				return await function(target, *args)
+
+		results = await asyncio.gather(*[limited(target) for target in targets])
+		return {target.hostId: result for target, result in zip(targets, results)}
+
+	async def _lookup(self, hostId: str) -> str:
+		loop = asyncio.get_running_loop()
+		addresses = await loop.getaddrinfo(hostId, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+		return addresses[0][4][0]
+
+	async def _getHostAddress(self, target: HostControlTarget) -> str:
+		"""Non-blocking equivalent of `HostControlBackend._getHostAddress`."""
+		address = None
+		if self._resolveHostAddress:
+			try:
+				address = await self._lookup(target.hostId)
+			except socket.error as lookupError:
+				logger.trace("Failed to lookup ip address for %s: %s", target.hostId, lookupError)
+		if not address:
+			address = target.ipAddress
+		if not address and not self._resolveHostAddress:
+			try:
+				address = await self._lookup(target.hostId)
+			except socket.error as err:
+				raise BackendUnaccomplishableError(f"Failed to resolve ip address for host '{target.hostId}'") from err
+		if not address:
+			raise BackendUnaccomplishableError(f"Failed to get ip address for host '{target.hostId}'")
+		return address
+
+	async def _checkReachable(self, target: HostControlTarget, timeout: float) -> bool:
+		try:
+			address = await self._getHostAddress(target)
+		except Exception as err:  # pylint: disable=broad-except
+			logger.debug("Problem found: '%s'", err)
+			return False
+
+		logger.info("Trying connection to '%s:%d'", address, target.port)
+		try:
+			_reader, writer = await asyncio.wait_for(asyncio.open_connection(address, target.port), max(timeout, 0))
+		except Exception as err:  # pylint: disable=broad-except
+			logger.info("Host %s (address: %s) not reachable: %s", target.hostId, address, err or err.__class__.__name__)
+			return False
+
+		writer.close()
+		try:
+			await writer.wait_closed()
+		except Exception as err:  # pylint: disable=broad-except
+			logger.debug("Failed to close connection to %s: %s", address, err)
+		return True
 
-	def run(self) -> None:
-		self.started = time.time()
+	async def _executeRpc(self, target: HostControlTarget, method: str, params: List, timeout: float) -> Dict[str, Any]:
+		started = time.monotonic()
 		try:
-			self.result = self.jsonrpc.execute_rpc(self.method, self.params)
+			address = await self._getHostAddress(target)
+			logger.debug("Starting rpc to host %s (address: %s)", target.hostId, address)
+			result = await asyncio.wait_for(self._request(address, target, method, params), max(timeout, 0))
+		except asyncio.TimeoutError:
+			error = f"timed out after {time.monotonic() - started:0.2f} seconds"
+			logger.info("Rpc to host %s timed out, error: %s", target.hostId, error)
+			return {"result": None, "error": error}
 		except Exception as err:  # pylint: disable=broad-except
-			self.error = str(err)
+			logger.info("Rpc to host %s failed, error: %s", target.hostId, err)
+			return {"result": None, "error": str(err)}
+
+		logger.info("Rpc to host %s successful, result: %s", target.hostId, result)
+		return {"result": result, "error": None}
+
+	async def _request(self, address: str, target: HostControlTarget, method: str, params: List) -> Any:
+		reader, writer = await asyncio.open_connection(address, target.port, ssl=self._sslContext)
+		try:
+			body = json.dumps({"id": 1, "method": method, "params": params}).encode("utf-8")
+			authorization = base64.b64encode(f":{target.password or ''}".encode("utf-8")).decode("ascii")
+			hostHeader = f"[{address}]:{target.port}" if ":" in address else f"{address}:{target.port}"
+			writer.write(
+				(
+					"POST /opsiclientd HTTP/1.1\r\n"
+					f"Host: {hostHeader}\r\n"
+					f"User-Agent: {self._USER_AGENT}\r\n"
+					f"Authorization: Basic {authorization}\r\n"
+					"Content-Type: application/json\r\n"
+					"Accept: application/json\r\n"
+					f"Content-Length: {len(body)}\r\n"
+					"Connection: close\r\n"
+					"\r\n"
+				).encode("ascii") + body
+			)
+			await writer.drain()
+			status, reason, content = await self._readResponse(reader)
 		finally:
+			writer.close()
 			try:
-				self.jsonrpc.disconnect()
+				await writer.wait_closed()
 			except Exception as err:  # pylint: disable=broad-except
-				logger.warning("Failed to clean up jsonrpc connection: %s", err, exc_info=True)
-			self.ended = time.time()
-
-
-class ConnectionThread(KillableThread):
-	def __init__(self, hostControlBackend: ExtendedBackend, hostId: str, address: str) -> None:
-		KillableThread.__init__(self)
-		self.hostControlBackend = hostControlBackend
-		self.hostId = forceHostId(hostId)
-		self.address = forceIpAddress(address)
-		self.result = False
-		self.started = 0
-		self.ended = 0
-
-	def run(self) -> None:
-		self.started = time.time()
-		timeout = max(self.hostControlBackend._hostReachableTimeout, 0)  # pylint: disable=protected-access
-
-		logger.info(
-			"Trying connection to '%s:%d'", self.address, self.hostControlBackend._opsiclientdPort  # pylint: disable=protected-access
-		)
+				logger.debug("Failed to close connection to %s: %s", address, err)
+
 		try:
-			sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-			sock.settimeout(timeout)
-			sock.connect((self.address, self.hostControlBackend._opsiclientdPort))  # pylint: disable=protected-access
-			self.result = True
-			sock.shutdown(socket.SHUT_RDWR)
-			sock.close()
-		except Exception as err:  # pylint: disable=broad-except
-			logger.info(err, exc_info=True)
-		self.ended = time.time()
+			response = json.loads(content)
+		except ValueError as err:
+			raise BackendUnaccomplishableError(f"Invalid response from opsiclientd: {status} {reason}") from err
+
+		error = response.get("error") if isinstance(response, dict) else None
+		if error:
+			if isinstance(error, dict):
+				error = error.get("message") or error
+			raise BackendUnaccomplishableError(str(error))
+		if status != 200:
+			raise BackendUnaccomplishableError(f"Request to opsiclientd failed: {status} {reason}")
+		return response.get("result")
+
+	@staticmethod
+	async def _readResponse(reader: asyncio.StreamReader):
+		statusLine = (await reader.readline()).decode("latin-1").split(None, 2)
+		if len(statusLine) < 2:
+			raise BackendUnaccomplishableError("Connection closed by opsiclientd")
+		status = int(statusLine[1])
+		reason = statusLine[2].strip() if len(statusLine) > 2 else ""
+
+		headers = {}
+		while True:
+			line = await reader.readline()
+			if line in (b"\r\n", b"\n", b""):
+				break
+			name, _sep, value = line.decode("latin-1").partition(":")
+			headers[name.strip().lower()] = value.strip()
+
+		if headers.get("transfer-encoding", "").lower() == "chunked":
+			chunks = []
+			while True:
+				size = int((await reader.readline()).split(b";", 1)[0], 16)
+				if not size:
+					break
+				chunks.append(await reader.readexactly(size))
+				await reader.readline()
+			content = b"".join(chunks)
+		elif "content-length" in headers:
+			content = await reader.readexactly(int(headers["content-length"]))
+		else:
+			content = await reader.read()
+
+		encoding = headers.get("content-encoding", "").lower()
+		if encoding == "gzip":
+			content = gzip.decompress(content)
+		elif encoding == "deflate":
+			content = zlib.decompress(content)
+		return status, reason, content
+
+
+class WakeOnLanSender:
+	"""
+	Sends Wake-on-LAN magic packets.
+
+	Packets are built once per host and every broadcast address gets
+	one socket which is reused for all hosts and ports. If
+	`packetsPerSecond` is set, sending is throttled to that rate.
+	"""
+
+	def __init__(self, packetsPerSecond: int = 0) -> None:
+		packetsPerSecond = max(forceInt(packetsPerSecond or 0), 0)
+		self._interval = 1.0 / packetsPerSecond if packetsPerSecond else 0.0
+		self._nextSend = 0.0
+
+	@staticmethod
+	def createMagicPacket(hardwareAddress: str) -> bytes:
+		mac = bytes.fromhex(hardwareAddress.replace(":", "").replace("-", ""))
+		if len(mac) != 6:
+			raise ValueError(f"Invalid hardware address '{hardwareAddress}'")
+		return b"\xff" * 6 + mac * 16
+
+	def _waitForSlot(self) -> None:
+		if not self._interval:
+			return
+		now = time.monotonic()
+		if self._nextSend > now:
+			time.sleep(self._nextSend - now)
+		self._nextSend = max(self._nextSend, now) + self._interval
+
+	def send(self, packets: Dict[str, Tuple[bytes, List[Tuple[str, Tuple[int, ...]]]]]) -> Dict[str, Dict[str, Any]]:
+		"""
+		Send the magic packets.
+
+		:param packets: Host ids mapped to the packet and the (broadcast address, ports) tuples to send it to.
+		:return: The result of every host.
+		"""
+		result = {}
+		sockets = {}
+		with ExitStack() as stack:
+			for hostId, (payload, destinations) in packets.items():
+				try:
+					for broadcastAddress, ports in destinations:
+						sock = sockets.get(broadcastAddress)
+						if not sock:
+							sock = stack.enter_context(closing(socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)))
+							sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, True)
+							sockets[broadcastAddress] = sock
+
+						logger.debug("Sending magic packet for %s to network broadcast %s %s", hostId, broadcastAddress, ports)
+						for port in ports:
+							self._waitForSlot()
+							sock.sendto(payload, (broadcastAddress, port))
+					result[hostId] = {"result": "sent", "error": None}
+				except Exception as err:  # pylint: disable=broad-except
+					logger.debug(err, exc_info=True)
+					result[hostId] = {"result": None, "error": str(err)}
+		return result
 
 
 class HostControlBackend(ExtendedBackend):
@@ -134,7 +308,9 @@ class HostControlBackend(ExtendedBackend):
 		self._hostReachableTimeout = 3
 		self._resolveHostAddress = False
 		self._maxConnections = 50
+		self._wolPacketsPerSecond = 0
 		self._broadcastAddresses = {}
+		self._sslContext = HostControlEngine.createSSLContext()
 
 		broadcastAddresses = {"0.0.0.0/0": {"255.255.255.255": [7, 9, 12287]}}
 
@@ -150,6 +326,8 @@ class HostControlBackend(ExtendedBackend):
 				self._resolveHostAddress = forceBool(value)
 			elif option == "maxconnections":
 				self._maxConnections = max(forceInt(value), 1)
+			elif option == "wolpacketspersecond":
+				self._wolPacketsPerSecond = max(forceInt(value), 0)
 			elif option == "broadcastaddresses" and value:
 				broadcastAddresses = value
 
@@ -209,9 +387,46 @@ class HostControlBackend(ExtendedBackend):
 			raise BackendUnaccomplishableError(f"Failed to get ip address for host '{host.id}'")
 		return address
 
-	def _opsiclientdRpc(
-		self, hostIds: List[str], method: str, params: List = None, timeout: int = None
-	):  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+	def _getEngine(self) -> HostControlEngine:
+		return HostControlEngine(
+			maxConnections=self._maxConnections, resolveHostAddress=self._resolveHostAddress, sslContext=self._sslContext
+		)
+
+	def _getOpsiclientdPorts(self, hostIds: List[str]) -> Dict[str, int]:
+		"""
+		Get the opsiclientd control server port of every host.
+
+		The config default and all config states are read with one
+		backend call each instead of one call per host.
+		"""
+		configId = "opsiclientd.control_server.port"
+		ports = {hostId: self._opsiclientdPort for hostId in hostIds}
+		if not hostIds:
+			return ports
+
+		values = {}
+		try:
+			for config in self._context.config_getObjects(attributes=["defaultValues"], id=configId):  # pylint: disable=maybe-no-member
+				if config.defaultValues:
+					values = {hostId: config.defaultValues for hostId in hostIds}
+			for configState in self._context.configState_getObjects(  # pylint: disable=maybe-no-member
+				attributes=["values"], configId=configId, objectId=hostIds
+			):
+				values[configState.objectId] = configState.values
+		except Exception as err:  # pylint: disable=broad-except
+			logger.warning("Failed to read custom opsiclientd ports: %s", err)
+
+		for hostId, hostValues in values.items():
+			if hostId not in ports or not hostValues:
+				continue
+			try:
+				ports[hostId] = int(hostValues[0])
+				logger.debug("Using port %s for opsiclientd at %s", ports[hostId], hostId)
+			except (TypeError, ValueError) as err:
+				logger.warning("Failed to read custom opsiclientd port for %s: %s", hostId, err)
+		return ports
+
+	def _opsiclientdRpc(self, hostIds: List[str], method: str, params: List = None, timeout: int = None) -> Dict[str, Any]:
 		if not hostIds:
 			raise BackendMissingDataError("No matching host ids found")
 		hostIds = forceHostIdList(hostIds)
@@ -221,82 +436,13 @@ class HostControlBackend(ExtendedBackend):
 			timeout = self._hostRpcTimeout
 		timeout = forceInt(timeout)
 
-		result = {}
-		rpcts = []
-		for host in self._context.host_getObjects(id=hostIds):  # pylint: disable=maybe-no-member
-			try:
-				port = None
-				try:
-					configState = self._context.configState_getObjects(configId="opsiclientd.control_server.port", objectId=host.id)
-					port = int(configState[0].values[0])
-					logger.info("Using port %s for opsiclientd at %s", port, host.id)
-				except IndexError:
-					pass  # No values found
-				except Exception as err:  # pylint: disable=broad-except
-					logger.warning("Failed to read custom opsiclientd port for %s: %s", host.id, err)
-
-				address = self._getHostAddress(host)
-				if ":" in address:
-					# IPv6
-					address = f"[{address}]"
-				logger.debug("Using address '%s' for host '%s'", address, host)
-				rpcts.append(
-					RpcThread(
-						hostControlBackend=self,
-						hostId=host.id,
-						hostPort=port,
-						address=address,
-						username="",
-						password=host.opsiHostKey,
-						method=method,
-						params=params,
-					)
-				)
-			except Exception as err:  # pylint: disable=broad-except
-				result[host.id] = {"result": None, "error": str(err)}
-
-		runningThreads = 0
-		while rpcts:  # pylint: disable=too-many-nested-blocks
-			newRpcts = []
-			for rpct in rpcts:
-				if rpct.ended:
-					if rpct.error:
-						logger.info("Rpc to host %s failed, error: %s", rpct.hostId, rpct.error)
-						result[rpct.hostId] = {"result": None, "error": rpct.error}
-					else:
-						logger.info("Rpc to host %s successful, result: %s", rpct.hostId, rpct.result)
-						result[rpct.hostId] = {"result": rpct.result, "error": None}
-					runningThreads -= 1
-					continue
-
-				if not rpct.started:
-					if runningThreads < self._maxConnections:
-						logger.debug("Starting rpc to host %s", rpct.hostId)
-						rpct.start()
-						runningThreads += 1
-				else:
-					timeRunning = time.time() - rpct.started
-					if timeRunning >= timeout + 5:
-						# thread still alive 5 seconds after timeout => kill
-						logger.info(
-							"Rpc to host %s (address: %s) timed out after %0.2f seconds, terminating",
-							rpct.hostId,
-							rpct.address,
-							timeRunning,
-						)
-						result[rpct.hostId] = {"result": None, "error": f"timed out after {timeRunning:0.2f} seconds"}
-						if not rpct.ended:
-							try:
-								rpct.terminate()
-							except Exception as err:  # pylint: disable=broad-except
-								logger.error("Failed to terminate rpc thread: %s", err)
-						runningThreads -= 1
-						continue
-				newRpcts.append(rpct)
-			rpcts = newRpcts
-			time.sleep(0.1)
+		hosts = self._context.host_getObjects(attributes=["ipAddress", "opsiHostKey"], id=hostIds)  # pylint: disable=maybe-no-member
+		ports = self._getOpsiclientdPorts([host.id for host in hosts])
+		targets = [
+			HostControlTarget(hostId=host.id, ipAddress=host.ipAddress, port=ports[host.id], password=host.opsiHostKey) for host in hosts
+		]
 
-		return result
+		return self._getEngine().executeRpc(targets, method=method, params=params, timeout=timeout)
 
 	def _get_broadcast_addresses_for_host(self, host: Host) -> Any:  # pylint: disable=inconsistent-return-statements
 		if not self._broadcastAddresses:
@@ -326,33 +472,21 @@ class HostControlBackend(ExtendedBackend):
 		"""Switches on remote computers using WOL."""
 		hosts = self._context.host_getObjects(attributes=["hardwareAddress", "ipAddress"], id=hostIds or [])  # pylint: disable=maybe-no-member
 		result = {}
+		packets = {}
 		for host in hosts:
 			try:
 				if not host.hardwareAddress:
 					raise BackendMissingDataError(f"Failed to get hardware address for host '{host.id}'")
-
-				mac = host.hardwareAddress.replace(":", "")
-				data = b"".join([b"FFFFFFFFFFFF", mac.encode("ascii") * 16])  # Pad the synchronization stream.
-
-				# Split up the hex values and pack.
-				payload = b""
-				for i in range(0, len(data), 2):
-					payload = b"".join([payload, struct.pack("B", int(data[i : i + 2], 16))])
-
-				for broadcast_address, target_ports in self._get_broadcast_addresses_for_host(host):
-					logger.debug("Sending data to network broadcast %s %s [%s]", broadcast_address, target_ports, data)
-
-					for port in target_ports:
-						logger.debug("Broadcasting to port %s", port)
-						with closing(socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)) as sock:
-							sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, True)
-							sock.sendto(payload, (broadcast_address, port))
-
-				result[host.id] = {"result": "sent", "error": None}
+				packets[host.id] = (
+					WakeOnLanSender.createMagicPacket(host.hardwareAddress),
+					list(self._get_broadcast_addresses_for_host(host)),
+				)
 			except Exception as err:  # pylint: disable=broad-except
 				logger.debug(err, exc_info=True)
 				result[host.id] = {"result": None, "error": str(err)}
-		return result
+
+		result.update(WakeOnLanSender(self._wolPacketsPerSecond).send(packets))
+		return {host.id: result[host.id] for host in hosts}
 
 	def hostControl_shutdown(self, hostIds: List[str] = None) -> Dict[str, Any]:
 		if not hostIds:
@@ -409,7 +543,7 @@ class HostControlBackend(ExtendedBackend):
 		hostIds = self._context.host_getIdents(id=hostIds or [], returnType="unicode")  # pylint: disable=maybe-no-member
 		return self._opsiclientdRpc(hostIds=hostIds, method=method, params=params or [], timeout=timeout)
 
-	def hostControl_reachable(self, hostIds: List[str] = None, timeout: int = None) -> Dict[str, Any]:  # pylint: disable=too-many-branches
+	def hostControl_reachable(self, hostIds: List[str] = None, timeout: int = None) -> Dict[str, Any]:
 		hostIds = self._context.host_getIdents(id=hostIds or [], returnType="unicode")  # pylint: disable=maybe-no-member
 		if not hostIds:
 			raise BackendMissingDataError("No matching host ids found")
@@ -419,52 +553,11 @@ class HostControlBackend(ExtendedBackend):
 			timeout = self._hostReachableTimeout
 		timeout = forceInt(timeout)
 
-		result = {}
-		threads = []
-		for host in self._context.host_getObjects(id=hostIds):  # pylint: disable=maybe-no-member
-			try:
-				address = self._getHostAddress(host)
-				threads.append(ConnectionThread(hostControlBackend=self, hostId=host.id, address=address))
-			except Exception as err:  # pylint: disable=broad-except
-				logger.debug("Problem found: '%s'", err)
-				result[host.id] = False
-
-		runningThreads = 0
-		while threads:  # pylint: disable=too-many-nested-blocks
-			newThreads = []
-			for thread in threads:
-				if thread.ended:
-					result[thread.hostId] = thread.result
-					runningThreads -= 1
-					continue
-
-				if not thread.started:
-					if runningThreads < self._maxConnections:
-						logger.debug("Trying to check host reachable %s", thread.hostId)
-						thread.start()
-						runningThreads += 1
-				else:
-					timeRunning = time.time() - thread.started
-					if timeRunning >= timeout + 5:
-						# thread still alive 5 seconds after timeout => kill
-						logger.error(
-							"Reachable check to host %s address %s timed out after %0.2f seconds, terminating",
-							thread.hostId,
-							thread.address,
-							timeRunning,
-						)
-						result[thread.hostId] = False
-						if not thread.ended:
-							try:
-								thread.terminate()
-							except Exception as err:  # pylint: disable=broad-except
-								logger.error("Failed to terminate reachable thread: %s", err)
-						runningThreads -= 1
-						continue
-				newThreads.append(thread)
-			threads = newThreads
-			time.sleep(0.1)
-		return result
+		targets = [
+			HostControlTarget(hostId=host.id, ipAddress=host.ipAddress, port=self._opsiclientdPort)
+			for host in self._context.host_getObjects(id=hostIds)  # pylint: disable=maybe-no-member
+		]
+		return self._getEngine().reachable(targets, timeout=timeout)
 
 	def hostControl_execute(  # pylint: disable=too-many-arguments
 		self,
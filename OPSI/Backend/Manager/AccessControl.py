@@ -23,6 +23,8 @@ from typing import Union  # pylint: disable=unused-import
 import opsicommon  # this is needed for dynamic loading # pylint: disable=unused-import
 from opsicommon.logging import get_logger
 
+import OPSI.Object
+
 from OPSI.Backend.Base import ConfigDataBackend, ExtendedConfigDataBackend
 from OPSI.Backend.Base.Extended import get_function_signature_and_args
 from OPSI.Backend.Depotserver import DepotserverBackend
@@ -38,13 +40,17 @@ from OPSI.Exceptions import (
 	BackendUnaccomplishableError,
 )
 from OPSI.Object import *  # this is needed for dynamic loading  # pylint: disable=wildcard-import,unused-wildcard-import
-from OPSI.Types import forceBool, forceList, forceUnicodeList, forceUnicodeLowerList
+from OPSI.Types import forceBool, forceInt, forceList, forceUnicodeList, forceUnicodeLowerList
 from OPSI.Util.File.Opsi import BackendACLFile, OpsiConfFile
 
 __all__ = ("BackendAccessControl",)
 
 logger = get_logger("opsi.general")
 
+PROJECTABLE_METHOD_REGEX = re.compile(r"^([a-zA-Z]+)_get(Objects|Hashes)$")
+# Attributes computed by the backend managers instead of being stored
+UNSTORED_ATTRIBUTES = {"ProductOnClient": ("actionSequence",)}
+
 
 class UserStore:  # pylint: disable=too-few-public-methods
 	"""Stores user information"""
@@ -62,6 +68,8 @@ class UserStore:  # pylint: disable=too-few-public-methods
 class BackendAccessControl:
 	"""Access control for a Backend"""
 
+	ACL_DECISION_CACHE_SIZE = 10000
+
 	def __init__(self, backend, **kwargs):  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
 
 		self._backend = backend
@@ -70,6 +78,9 @@ class BackendAccessControl:
 		self._aclFile = None
 		self._user_store = UserStore()
 		self._auth_module = None
+		self._aclDecisionCache = {}
+		self._aclDecisionCacheSize = self.ACL_DECISION_CACHE_SIZE
+		self._allowedAttributesCache = {}
 
 		pam_service = None
 		kwargs = {k.lower(): v for k, v in kwargs.items()}
@@ -87,6 +98,8 @@ class BackendAccessControl:
 				self._user_store = value
 			elif option in ("auth_module", "authmodule"):
 				self._auth_module = value
+			elif option == "acldecisioncachesize":
+				self._aclDecisionCacheSize = forceInt(value)
 
 		if not self._backend:
 			raise BackendAuthenticationError("No backend specified")
@@ -367,11 +380,46 @@ class BackendAccessControl:
 		meth = getattr(self._backend, methodName)
 		return meth(**kwargs)
 
-	def _executeMethodProtected(self, methodName, **kwargs):  # pylint: disable=too-many-branches,too-many-statements
+	def _getAccessDecisionKey(self, methodName):
+		user_store = self.user_store
+		host = user_store.host
+		return (
+			methodName,
+			user_store.username,
+			frozenset(user_store.userGroups or ()),
+			host.__class__.__name__ if host else None,
+			host.id if host else None,
+		)
+
+	def _getAccessDecision(self, methodName):
+		"""
+		Get the access granted for `methodName` and the acl entries granting it.
+
+		Decisions only depend on the method and the user, groups and
+		host of the session and are cached by these.
+
+		:returns: `True` for full access, `False` if access is denied \
+or a string describing the partial access, and the granting acl entries.
+		:rtype: (bool or str, [dict])
+		"""
+		if not self._aclDecisionCacheSize:
+			return self._resolveAccess(methodName)
+
+		key = self._getAccessDecisionKey(methodName)
+		try:
+			return self._aclDecisionCache[key]
+		except KeyError:
+			pass
+
+		decision = self._resolveAccess(methodName)
+		if len(self._aclDecisionCache) >= self._aclDecisionCacheSize:
+			self._aclDecisionCache.clear()
+		self._aclDecisionCache[key] = decision
+		return decision
+
+	def _resolveAccess(self, methodName):  # pylint: disable=too-many-branches
 		granted = False
-		newKwargs = {}
 		acls = []
-		logger.debug("Access control for method %s with params %s", methodName, kwargs)
 		for regex, acl in self._acl:
 			logger.trace("Testing if ACL pattern %s matches method %s", regex.pattern, methodName)  # pylint: disable=no-member
 			if not regex.search(methodName):  # pylint: disable=no-member
@@ -413,6 +461,12 @@ class BackendAccessControl:
 					break
 			break
 
+		return (granted, tuple(acls))
+
+	def _executeMethodProtected(self, methodName, **kwargs):
+		logger.debug("Access control for method %s with params %s", methodName, kwargs)
+		(granted, acls) = self._getAccessDecision(methodName)
+
 		logger.debug("Method %s using acls: %s", methodName, acls)
 		if granted is True:
 			logger.debug("Full access to method %s granted to user %s by acl %s", methodName, self.user_store.username, acls[0])
@@ -431,6 +485,11 @@ class BackendAccessControl:
 					f"Access to method '{methodName}' denied for user '{self.user_store.username}': {err}"
 				) from err
 
+			attributes = self._getProjectedAttributes(methodName, acls, newKwargs.get("attributes"))
+			if attributes is not None:
+				logger.debug("Requesting attributes %s of method %s allowed by acls", attributes, methodName)
+				newKwargs["attributes"] = attributes
+
 		if methodName == "backend_getLicensingInfo" and not self.user_store.isAdmin:
 			if newKwargs.get("licenses") or newKwargs.get("legacy_modules") or newKwargs.get("dates"):
 				raise BackendPermissionDeniedError(
@@ -447,6 +506,88 @@ class BackendAccessControl:
 
 		return self._filterResult(result, acls)
 
+	def _getAllowedAttributes(self, acl, Class):
+		"""
+		Get the attributes of `Class` the acl entry grants access to.
+
+		Computed once per acl entry and class. The acl entries are \
+		kept by `self._acl` for the lifetime of the instance.
+
+		:returns: The allowed attributes or `None` if objects of `Class` \
+have dynamic attributes.
+		:rtype: frozenset or None
+		"""
+		key = (id(acl), Class)
+		try:
+			return self._allowedAttributesCache[key]
+		except KeyError:
+			pass
+
+		classAttributes = _getClassAttributes(Class)
+		if acl.get("allowAttributes"):
+			allowedAttributes = frozenset(acl["allowAttributes"])
+		elif classAttributes is None:
+			allowedAttributes = None
+		elif acl.get("denyAttributes"):
+			allowedAttributes = frozenset(attribute for attribute in classAttributes if attribute not in acl["denyAttributes"])
+		else:
+			allowedAttributes = classAttributes
+
+		self._allowedAttributesCache[key] = allowedAttributes
+		return allowedAttributes
+
+	def _getProjectedAttributes(self, methodName, acls, attributes):
+		"""
+		Get the attributes to request from the backend for a `*_getObjects`
+		or `*_getHashes` call with partial access.
+
+		Forbidden attributes are not requested at all, so the backend
+		does not have to load them. If the caller did not ask for specific
+		attributes the allowed attributes the backend stores are requested.
+
+		:returns: The attributes to pass to the backend or `None` to \
+leave the requested attributes unchanged.
+		:rtype: [str] or None
+		"""
+		match = PROJECTABLE_METHOD_REGEX.search(methodName)
+		if not match:
+			return None
+
+		Class = _getObjectClass(match.group(1))
+		if not Class:
+			return None
+
+		if any(acl.get("type") == "self" for acl in acls):
+			# Access depends on the object, all attributes may be allowed
+			return None
+
+		# The backend returns objects of the subclasses as well
+		classes = [Class]
+		classes.extend(SubClass for SubClass in getattr(Class, "subClasses", {}).values() if SubClass is not Class)
+
+		allowedAttributes = set()
+		storedAttributes = set()
+		for SubClass in classes:
+			classStoredAttributes = _getStoredAttributes(SubClass)
+			if classStoredAttributes is None:
+				return None
+			storedAttributes.update(classStoredAttributes)
+
+			for acl in acls:
+				allowedAttributes.update(self._getAllowedAttributes(acl, SubClass))
+
+		requestedAttributes = forceUnicodeList(attributes or [])
+		if not requestedAttributes:
+			if allowedAttributes.issuperset(storedAttributes):
+				return None
+			requestedAttributes = sorted(storedAttributes)
+
+		projectedAttributes = [attribute for attribute in requestedAttributes if attribute in allowedAttributes]
+		if len(projectedAttributes) == len(requestedAttributes):
+			return None
+		# An empty list would request all attributes
+		return projectedAttributes or list(mandatoryConstructorArgs(Class))
+
 	def _filterParams(self, params, acls):
 		logger.debug("Filtering params: %s", params)
 		for (key, value) in tuple(params.items()):
@@ -474,40 +615,40 @@ class BackendAccessControl:
 
 	def _filterObjects(
 		self, objects, acls, exceptionOnTruncate=True, exceptionIfAllRemoved=True
-	):  # pylint: disable=too-many-branches,too-many-locals
+	):  # pylint: disable=too-many-branches,too-many-locals,too-many-statements
 		logger.info("Filtering objects by acls")
 		is_list = type(objects) in (tuple, list)
 		newObjects = []
 		for obj in forceList(objects):
 			isDict = isinstance(obj, dict)
-			if isDict:
-				objHash = obj
-			else:
-				objHash = obj.toHash()
+			# Objects are only converted to a hash if attributes have to be removed
+			objHash = obj if isDict else None
 
 			allowedAttributes = set()
 			for acl in acls:
 				if acl.get("type") == "self":
 					objectId = None
 					for identifier in ("id", "objectId", "hostId", "clientId", "depotId", "serverId"):
-						try:
-							objectId = objHash[identifier]
+						objectId = obj.get(identifier) if isDict else getattr(obj, identifier, None)
+						if objectId:
 							break
-						except KeyError:
-							pass
 
 					if not objectId or objectId != self.user_store.username:
 						continue
 
-				if acl.get("allowAttributes"):
-					attributesToAdd = acl["allowAttributes"]
-				elif acl.get("denyAttributes"):
-					attributesToAdd = (attribute for attribute in objHash if attribute not in acl["denyAttributes"])
-				else:
-					attributesToAdd = list(objHash.keys())
+				attributesToAdd = None if isDict else self._getAllowedAttributes(acl, obj.__class__)
+				if attributesToAdd is None:
+					if objHash is None:
+						objHash = obj.toHash()
 
-				for attribute in attributesToAdd:
-					allowedAttributes.add(attribute)
+					if acl.get("allowAttributes"):
+						attributesToAdd = acl["allowAttributes"]
+					elif acl.get("denyAttributes"):
+						attributesToAdd = (attribute for attribute in objHash if attribute not in acl["denyAttributes"])
+					else:
+						attributesToAdd = list(objHash.keys())
+
+				allowedAttributes.update(attributesToAdd)
 
 			if not allowedAttributes:
 				continue
@@ -518,12 +659,31 @@ class BackendAccessControl:
 				for attribute in mandatoryConstructorArgs(obj.__class__):
 					allowedAttributes.add(attribute)
 
+			if objHash is None:
+				forbiddenAttributes = [attribute for attribute in _getClassAttributes(obj.__class__) if attribute not in allowedAttributes]
+				if forbiddenAttributes and exceptionOnTruncate:
+					raise BackendPermissionDeniedError(f"Access to attribute '{forbiddenAttributes[0]}' denied")
+
+				if all(getattr(obj, attribute, None) is None for attribute in forbiddenAttributes):
+					# Unset attributes of objects are already what the filtered object would contain
+					newObjects.append(obj)
+					continue
+
+				objHash = obj.toHash()
+
 			keysToDelete = set()
-			for key in objHash.keys():
+			for key, value in objHash.items():
 				if key not in allowedAttributes:
 					if exceptionOnTruncate:
 						raise BackendPermissionDeniedError(f"Access to attribute '{key}' denied")
-					keysToDelete.add(key)
+					if isDict or value is not None:
+						# Unset attributes of objects are already what the filtered object would contain
+						keysToDelete.add(key)
+
+			if not keysToDelete:
+				# All attributes allowed, no need to rebuild the object
+				newObjects.append(obj)
+				continue
 
 			for key in keysToDelete:
 				del objHash[key]
@@ -543,6 +703,55 @@ class BackendAccessControl:
 		return newObjects if is_list else newObjects[0]
 
 
+@lru_cache(maxsize=None)
+def _getObjectClass(methodPrefix):
+	Class = getattr(OPSI.Object, methodPrefix[0].upper() + methodPrefix[1:], None)
+	if isinstance(Class, type) and issubclass(Class, BaseObject):
+		return Class
+	return None
+
+
+@lru_cache(maxsize=None)
+def _getClassAttributes(Class):
+	"""
+	Get the attributes objects of `Class` are made of.
+
+	These are the arguments of the constructor of the class itself \
+and `type`.
+
+	:returns: The attributes or `None` if the class takes dynamic attributes.
+	:rtype: frozenset or None
+	"""
+	argSpec = inspect.getfullargspec(Class.__init__)
+	if argSpec.varkw:
+		return None
+
+	attributes = set(argSpec.args)
+	attributes.discard("self")
+	attributes.add("type")
+	return frozenset(attributes)
+
+
+@lru_cache(maxsize=None)
+def _getStoredAttributes(Class):
+	"""
+	Get the attributes backends store for objects of `Class`.
+
+	Relationships are stored without their type and attributes \
+in `UNSTORED_ATTRIBUTES` are computed on reading.
+
+	:rtype: frozenset or None
+	"""
+	attributes = _getClassAttributes(Class)
+	if attributes is None:
+		return None
+
+	unstoredAttributes = set(UNSTORED_ATTRIBUTES.get(Class.__name__, ()))
+	if not issubclass(Class, Entity):
+		unstoredAttributes.add("type")
+	return attributes.difference(unstoredAttributes)
+
+
 @lru_cache(maxsize=None)
 def _readACLFile(path):
 	if not os.path.exists(path):
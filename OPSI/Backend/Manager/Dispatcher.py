@@ -10,7 +10,9 @@ import importlib
 import inspect
 import os
 import re
+import threading
 import types
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 
 # this is needed for dynamic loading
@@ -32,7 +34,7 @@ from OPSI.Backend.Base.Extended import (
 from OPSI.Backend.JSONRPC import JSONRPCBackend
 from OPSI.Exceptions import BackendConfigurationError
 from OPSI.Object import *  # this is needed for dynamic loading  # pylint: disable=wildcard-import,unused-wildcard-import
-from OPSI.Types import forceList
+from OPSI.Types import forceInt, forceList
 from OPSI.Util.File.Opsi import BackendDispatchConfigFile
 
 from .Config import loadBackendConfig
@@ -49,6 +51,12 @@ class BackendDispatcher(Backend):
 		self._dispatchConfigFile = None
 		self._dispatchConfig = []
 		self._dispatchIgnoreModules = []
+		self._dispatchConcurrency = 1
+		self._dispatchSequentialMethods = []
+		self._sequentialMethodCache = {}
+		self._dispatchExecutor = None
+		self._dispatchExecutorLock = threading.Lock()
+		self._dispatchThreadState = threading.local()
 		self._backendConfigDir = None
 		self._backends = {}
 		self._context = self
@@ -62,6 +70,10 @@ class BackendDispatcher(Backend):
 				self._dispatchConfigFile = value
 			elif option == "dispatchignoremodules" and value:
 				self._dispatchIgnoreModules = forceList(value)
+			elif option == "dispatchconcurrency" and value:
+				self._dispatchConcurrency = forceInt(value)
+			elif option == "dispatchsequentialmethods" and value:
+				self._dispatchSequentialMethods.extend(forceList(value))
 			elif option == "backendconfigdir":
 				self._backendConfigDir = value
 			elif option == "context":
@@ -103,7 +115,8 @@ class BackendDispatcher(Backend):
 			raise BackendConfigurationError("No dispatch config file defined")
 
 		try:
-			self._dispatchConfig = _loadDispatchConfig(self._dispatchConfigFile)
+			(self._dispatchConfig, sequentialMethods) = _loadDispatchConfig(self._dispatchConfigFile)
+			self._dispatchSequentialMethods.extend(sequentialMethods)
 			logger.debug("Read dispatch config from file %s: %s", self._dispatchConfigFile, self._dispatchConfig)
 		except Exception as err:
 			raise BackendConfigurationError(f"Failed to load dispatch config file '{self._dispatchConfigFile}': {err}") from err
@@ -156,8 +169,6 @@ class BackendDispatcher(Backend):
 
 		for Class in classes:  # pylint: disable=too-many-nested-blocks
 			for methodName, functionRef in inspect.getmembers(Class, inspect.isfunction):
-				if getattr(functionRef, "no_export", False):
-					continue
 				if methodName.startswith("_"):
 					# Not a public method
 					continue
@@ -201,6 +212,9 @@ class BackendDispatcher(Backend):
 					f'def {methodName}{sig}: return self._dispatchMethod({methodBackends}, "{methodName}", {arg})'
 				)
 				new_function = eval(methodName)  # pylint: disable=eval-used
+				if getattr(functionRef, "no_export", False):
+					# Dispatched for use by other backends but not exported
+					new_function.no_export = True
 				if getattr(functionRef, "deprecated", False):
 					new_function.deprecated = functionRef.deprecated
 				if getattr(functionRef, "alternative_method", None):
@@ -210,24 +224,79 @@ class BackendDispatcher(Backend):
 				setattr(self, methodName, types.MethodType(new_function, self))
 
 
+	def _isSequentialMethod(self, methodName):
+		try:
+			return self._sequentialMethodCache[methodName]
+		except KeyError:
+			sequential = any(re.search(regex, methodName) for regex in self._dispatchSequentialMethods)
+			self._sequentialMethodCache[methodName] = sequential
+			return sequential
+
+	def _dispatchConcurrently(self, methodBackends, methodName):
+		if self._dispatchConcurrency < 2 or len(methodBackends) < 2:
+			return False
+		if getattr(self._dispatchThreadState, "dispatching", False):
+			# Calls made by backends while executing a dispatched method
+			# must not wait for a worker of the pool they are occupying.
+			return False
+		return not self._isSequentialMethod(methodName)
+
+	def _getDispatchExecutor(self):
+		with self._dispatchExecutorLock:
+			if not self._dispatchExecutor:
+				self._dispatchExecutor = ThreadPoolExecutor(
+					max_workers=self._dispatchConcurrency, thread_name_prefix="BackendDispatcher"
+				)
+			return self._dispatchExecutor
+
+	def _executeDispatchedMethod(self, methodBackend, methodName, kwargs):
+		self._dispatchThreadState.dispatching = True
+		try:
+			return getattr(self._backends[methodBackend]["instance"], methodName)(**kwargs)
+		finally:
+			self._dispatchThreadState.dispatching = False
+
+	@staticmethod
+	def _mergeResult(result, res):
+		if isinstance(result, list) and isinstance(res, list):
+			result.extend(res)
+		elif isinstance(result, dict) and isinstance(res, dict):
+			result.update(res)
+		elif isinstance(result, set) and isinstance(res, set):
+			result = result.union(res)
+		elif isinstance(result, tuple) and isinstance(res, tuple):
+			result = result + res
+		elif res is not None:
+			result = res
+		return result
+
 	def _dispatchMethod(self, methodBackends, methodName, **kwargs):
 		logger.debug("Dispatching method %s to backends: %s", methodName, methodBackends)
 		result = None
 
-		for methodBackend in methodBackends:
-			meth = getattr(self._backends[methodBackend]["instance"], methodName)
-			res = meth(**kwargs)
-
-			if isinstance(result, list) and isinstance(res, list):
-				result.extend(res)
-			elif isinstance(result, dict) and isinstance(res, dict):
-				result.update(res)
-			elif isinstance(result, set) and isinstance(res, set):
-				result = result.union(res)
-			elif isinstance(result, tuple) and isinstance(res, tuple):
-				result = result + res
-			elif res is not None:
-				result = res
+		if self._dispatchConcurrently(methodBackends, methodName):
+			executor = self._getDispatchExecutor()
+			futures = [
+				(methodBackend, executor.submit(self._executeDispatchedMethod, methodBackend, methodName, kwargs))
+				for methodBackend in methodBackends
+			]
+			errors = []
+			for methodBackend, future in futures:
+				try:
+					result = self._mergeResult(result, future.result())
+				except Exception as err:  # pylint: disable=broad-except
+					logger.warning("Backend %s failed to execute %s: %s", methodBackend, methodName, err)
+					errors.append((methodBackend, err))
+
+			if errors:
+				(_methodBackend, error) = errors[0]
+				for (methodBackend, err) in errors[1:]:
+					error.add_note(f"Backend {methodBackend} failed too: {err}")
+				raise error
+		else:
+			for methodBackend in methodBackends:
+				meth = getattr(self._backends[methodBackend]["instance"], methodName)
+				result = self._mergeResult(result, meth(**kwargs))
 
 		logger.trace("Finished dispatching method %s", methodName)
 		return result
@@ -247,6 +316,11 @@ class BackendDispatcher(Backend):
 		for be in self._backends.values():
 			be["instance"].backend_exit()
 
+		with self._dispatchExecutorLock:
+			if self._dispatchExecutor:
+				self._dispatchExecutor.shutdown(wait=False)
+				self._dispatchExecutor = None
+
 	def dispatcher_getConfig(self):
 		return self._dispatchConfig
 
@@ -259,4 +333,5 @@ def _loadDispatchConfig(dispatchConfigFile):
 	if not os.path.exists(dispatchConfigFile):
 		raise BackendConfigurationError(f"Dispatch config file '{dispatchConfigFile}' not found")
 
-	return BackendDispatchConfigFile(dispatchConfigFile).parse()
+	dispatchConfigFile = BackendDispatchConfigFile(dispatchConfigFile)
+	return (dispatchConfigFile.parse(), tuple(dispatchConfigFile.getSequentialMethods()))
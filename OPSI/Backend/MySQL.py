@@ -50,6 +50,7 @@ class MySQL(SQL):  # pylint: disable=too-many-instance-attributes
 	ESCAPED_BACKSLASH = "\\\\"
 	ESCAPED_APOSTROPHE = "\\\'"
 	ESCAPED_ASTERISK = "\\*"
+	UPSERT_SUPPORTED = True
 
 	def __init__(self, **kwargs) -> None:
 		super().__init__(**kwargs)
@@ -191,6 +192,42 @@ class MySQL(SQL):  # pylint: disable=too-many-instance-attributes
 	def delete(self, session: scoped_session, table: str, where: str) -> Any:
 		return super().delete(session, table, where)
 
+	@retry_on_deadlock
+	def insertMany(self, session: scoped_session, table: str, valueHashes: List[Dict[str, Any]]) -> int:
+		return super().insertMany(session, table, valueHashes)
+
+	@retry_on_deadlock
+	def updateMany(  # pylint: disable=too-many-arguments
+		self, session: scoped_session, table: str, keyColumns: List[str], valueHashes: List[Dict[str, Any]], updateWhereNone: bool = False
+	) -> int:
+		return super().updateMany(session, table, keyColumns, valueHashes, updateWhereNone)
+
+	@retry_on_deadlock
+	def deleteMany(self, session: scoped_session, table: str, keyColumns: List[str], valueHashes: List[Dict[str, Any]]) -> int:
+		return super().deleteMany(session, table, keyColumns, valueHashes)
+
+	@retry_on_deadlock
+	def upsertMany(self, session: scoped_session, table: str, keyColumns: List[str], valueHashes: List[Dict[str, Any]]) -> int:
+		return super().upsertMany(session, table, keyColumns, valueHashes)
+
+	def upsertQuery(self, table: str, keyColumns: List[str], columns: List[str]) -> str:
+		updates = [f"`{column}` = VALUES(`{column}`)" for column in columns if column not in keyColumns]
+		if not updates:
+			# Nothing to update, assigning a key column to itself keeps the row as is
+			updates = [f"`{keyColumns[0]}` = `{keyColumns[0]}`"]
+		return (
+			f"INSERT INTO `{table}` ({','.join(f'`{column}`' for column in columns)}) "
+			f"VALUES ({','.join(f':{column}' for column in columns)}) "
+			f"ON DUPLICATE KEY UPDATE {','.join(updates)}"
+		)
+
+	def normalizeKeyValue(self, value: Any) -> Any:
+		# The tables use a case insensitive collation and MySQL
+		# ignores trailing spaces when comparing strings.
+		if isinstance(value, str):
+			return value.rstrip(" ").lower()
+		return value
+
 	def getTables(self, session: scoped_session) -> Dict[str, Any]:
 		"""
 		Get what tables are present in the database (do not return views).
@@ -325,10 +325,20 @@ class BackendReplicator:  # pylint: disable=too-many-instance-attributes
 						self.__currentProgressSubject.addToState(1)
 					else:
 						self.__currentProgressSubject.setEnd(len(objs))
+						remainingObjs = objs
+						bulkMeth = getattr(wb, '%s_bulkInsertObjects' % Class.backendMethodPrefix, None)
+						if bulkMeth and objs:
+							try:
+								bulkMeth(objs)
+								remainingObjs = []
+							except Exception as err:  # pylint: disable=broad-except
+								logger.debug(err, exc_info=True)
+								logger.info("Bulk insert of %s objects failed, falling back to single inserts: %s", objClass, err)
+
 						meth = '%s_insertObject' % Class.backendMethodPrefix
 						meth = getattr(wb, meth)
 
-						for obj in objs:
+						for obj in remainingObjs:
 							try:
 								meth(obj)
 							except Exception as err:  # pylint: disable=broad-except
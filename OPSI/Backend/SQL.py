@@ -16,8 +16,9 @@ import re
 import time
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Generator, List, Tuple
+from typing import Any, Callable, Dict, Generator, List, Set, Tuple
 
+from OPSI.Backend import no_export
 from OPSI.Backend.Base import Backend, BackendModificationListener, ConfigDataBackend
 from OPSI.Exceptions import (
 	BackendBadValueError,
@@ -112,6 +113,10 @@ class SQL:  # pylint: disable=too-many-public-methods
 	ESCAPED_PERCENT = "\\%"
 	ESCAPED_ASTERISK = "\\*"
 	ESCAPED_COLON = "\\:"
+	# Databases supporting upsert statements set this and implement
+	# `upsertQuery(table, keyColumns, columns)`, others select every
+	# row before inserting or updating it.
+	UPSERT_SUPPORTED = False
 
 	def __init__(self, **kwargs) -> None:  # pylint: disable=unused-argument
 		self.Session = lambda: None  # pylint: disable=invalid-name
@@ -148,6 +153,20 @@ class SQL:  # pylint: disable=too-many-public-methods
 		finally:
 			self.Session.remove()  # pylint: disable=no-member
 
+	@contextmanager
+	def streamingSession(self) -> Generator[Any, None, None]:
+		"""
+		Session for reading streamed results.
+
+		The session is not shared with the scoped session of the thread,
+		so other queries can run while a result is consumed.
+		"""
+		session = self.session_factory()
+		try:
+			yield session
+		finally:
+			session.close()
+
 	def connect(self, cursorType: Any = None) -> None:  # pylint: disable=no-self-use,unused-argument
 		logger.warning("Method 'connect' is deprecated")
 
@@ -157,13 +176,15 @@ class SQL:  # pylint: disable=too-many-public-methods
 	def execute(self, session: Any, query: str) -> None:  # pylint: disable=no-self-use
 		session.execute(query)  # pylint: disable=no-member
 
-	def getSet(self, session: Any, query: str) -> List[Dict[str, Any]]:  # pylint: disable=no-self-use
+	def getSet(self, session: Any, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:  # pylint: disable=no-self-use
 		"""
 		Return a list of rows, every row is a dict of key / values pairs
+
+		:param params: Values for the bind parameters used in `query`.
 		"""
-		logger.trace("getSet: %s", query)
+		logger.trace("getSet: %s - %s", query, params)
 		onlyAllowSelect(query)
-		result = session.execute(query).fetchall()  # pylint: disable=no-member
+		result = session.execute(query, params or {}).fetchall()  # pylint: disable=no-member
 		if not result:
 			return []
 		return [dict(row) for row in result if row is not None]
@@ -179,6 +200,43 @@ class SQL:  # pylint: disable=too-many-public-methods
 			return []
 		return [list(row) for row in result if row is not None]
 
+	def _iterResult(self, session: Any, query: str, chunkSize: int) -> Generator[Any, None, None]:  # pylint: disable=no-self-use
+		onlyAllowSelect(query)
+		# stream_results makes the MySQL dialect use a server side cursor (SSCursor).
+		# The SQLite cursor already reads rows from the database as they are fetched.
+		result = session.execute(query, execution_options={"stream_results": True})  # pylint: disable=no-member
+		try:
+			while True:
+				rows = result.fetchmany(chunkSize)
+				if not rows:
+					break
+				for row in rows:
+					if row is not None:
+						yield row
+		finally:
+			result.close()
+
+	def iterSet(self, session: Any, query: str, chunkSize: int = 1000) -> Generator[Dict[str, Any], None, None]:
+		"""
+		Yield rows as dict of key / values pairs without reading all rows first.
+
+		Rows are fetched from the database in chunks of `chunkSize`.
+		The session should not be used for other queries while iterating.
+		"""
+		logger.trace("iterSet: %s", query)
+		for row in self._iterResult(session, query, chunkSize):
+			yield dict(row)
+
+	def iterRows(self, session: Any, query: str, chunkSize: int = 1000) -> Generator[List[Any], None, None]:
+		"""
+		Yield rows as list of values without reading all rows first.
+
+		See `iterSet` for details.
+		"""
+		logger.trace("iterRows: %s", query)
+		for row in self._iterResult(session, query, chunkSize):
+			yield list(row)
+
 	def getRow(self, session: Any, query: str) -> List[Any]:  # pylint: disable=no-self-use
 		"""
 		Return one row as value list
@@ -223,6 +281,159 @@ class SQL:  # pylint: disable=too-many-public-methods
 		result = session.execute(query)  # pylint: disable=no-member
 		return result.rowcount
 
+	@staticmethod
+	def _groupRows(valueHashes: List[Dict[str, Any]], keyFunc: Callable) -> Dict[Tuple, List[Dict[str, Any]]]:
+		"""
+		Group rows that result in the same statement.
+
+		`executemany` needs the same statement for every row so rows are
+		grouped by the key returned by `keyFunc`.
+		"""
+		groups = {}
+		for valueHash in valueHashes:
+			groups.setdefault(keyFunc(valueHash), []).append(valueHash)
+		return groups
+
+	def insertMany(self, session: Any, table: str, valueHashes: List[Dict[str, Any]]) -> int:  # pylint: disable=no-self-use
+		"""
+		Insert multiple rows using `executemany` with bound parameters.
+
+		:returns: The number of inserted rows.
+		"""
+		if not valueHashes:
+			return 0
+
+		rowcount = 0
+		for columns, rows in self._groupRows(valueHashes, lambda valueHash: tuple(valueHash)).items():
+			if not columns:
+				raise BackendBadValueError("No values given")
+			col_names = [f"`{col_name}`" for col_name in columns]
+			bind_names = [f":{col_name}" for col_name in columns]
+			query = f"INSERT INTO `{table}` ({','.join(col_names)}) VALUES ({','.join(bind_names)})"
+			logger.trace("insertMany: %s - %d rows", query, len(rows))
+			result = session.execute(query, rows)  # pylint: disable=no-member
+			rowcount += max(result.rowcount, 0)
+		return rowcount
+
+	def updateMany(  # pylint: disable=too-many-arguments
+		self, session: Any, table: str, keyColumns: List[str], valueHashes: List[Dict[str, Any]], updateWhereNone: bool = False
+	) -> int:
+		"""
+		Update multiple rows using `executemany` with bound parameters.
+
+		Every row is identified by the values of `keyColumns` found in
+		the row itself. Key columns with a value of `None` are not part
+		of the condition, just like in `SQLBackend._uniqueCondition`.
+
+		:returns: The number of updated rows.
+		"""
+
+		def statementKey(valueHash):
+			updates = tuple(key for (key, value) in valueHash.items() if value is not None or updateWhereNone)
+			conditions = tuple(key for key in keyColumns if valueHash.get(key) is not None)
+			return (updates, conditions)
+
+		rowcount = 0
+		for (updates, conditions), rows in self._groupRows(valueHashes, statementKey).items():
+			if not updates:
+				continue
+			if not conditions:
+				raise BackendBadValueError(f"No key values given to update table {table}")
+			query = (
+				f"UPDATE `{table}` SET {','.join(f'`{key}` = :{key}' for key in updates)} "
+				f"WHERE {' AND '.join(f'`{key}` = :{key}' for key in conditions)}"
+			)
+			logger.trace("updateMany: %s - %d rows", query, len(rows))
+			result = session.execute(query, rows)  # pylint: disable=no-member
+			rowcount += max(result.rowcount, 0)
+		return rowcount
+
+	def deleteMany(self, session: Any, table: str, keyColumns: List[str], valueHashes: List[Dict[str, Any]]) -> int:
+		"""
+		Delete multiple rows using `executemany` with bound parameters.
+
+		:returns: The number of deleted rows.
+		"""
+
+		def statementKey(valueHash):
+			return tuple(key for key in keyColumns if valueHash.get(key) is not None)
+
+		rowcount = 0
+		for conditions, rows in self._groupRows(valueHashes, statementKey).items():
+			if not conditions:
+				raise BackendBadValueError(f"No key values given to delete from table {table}")
+			query = f"DELETE FROM `{table}` WHERE {' AND '.join(f'`{key}` = :{key}' for key in conditions)}"
+			logger.trace("deleteMany: %s - %d rows", query, len(rows))
+			result = session.execute(query, rows)  # pylint: disable=no-member
+			rowcount += max(result.rowcount, 0)
+		return rowcount
+
+	def _upsertManyWithoutStatement(
+		self, session: Any, table: str, keyColumns: List[str], valueHashes: List[Dict[str, Any]]
+	) -> int:
+		"""
+		Upsert rows by selecting every row by its key followed by an
+		insert or update. Used if `UPSERT_SUPPORTED` is not set.
+
+		Rows given more than once for the same key are merged, as if
+		they were upserted one after another.
+		"""
+		if not keyColumns:
+			raise BackendBadValueError(f"No key columns given to upsert into table {table}")
+
+		rows = {}
+		for valueHash in valueHashes:
+			key = tuple(self.normalizeKeyValue(valueHash.get(column)) for column in keyColumns)
+			rows.setdefault(key, {}).update(valueHash)
+
+		query = f"SELECT 1 FROM `{table}` WHERE {' AND '.join(f'`{column}` = :{column}' for column in keyColumns)}"
+		inserts = []
+		updates = []
+		for row in rows.values():
+			if session.execute(query, {column: row.get(column) for column in keyColumns}).fetchone():  # pylint: disable=no-member
+				updates.append(row)
+			else:
+				inserts.append(row)
+
+		return self.insertMany(session, table, inserts) + self.updateMany(session, table, keyColumns, updates, updateWhereNone=True)
+
+	def upsertMany(self, session: Any, table: str, keyColumns: List[str], valueHashes: List[Dict[str, Any]]) -> int:
+		"""
+		Insert multiple rows or update the rows already present in one go.
+
+		Rows are identified by `keyColumns` which have to be the primary
+		key of `table`. Columns of an existing row that are not part of
+		a value hash are left untouched.
+
+		:returns: The number of affected rows as reported by the database.
+		"""
+		if not valueHashes:
+			return 0
+
+		if not self.UPSERT_SUPPORTED:
+			return self._upsertManyWithoutStatement(session, table, keyColumns, valueHashes)
+
+		rowcount = 0
+		for columns, rows in self._groupRows(valueHashes, lambda valueHash: tuple(valueHash)).items():
+			if not columns:
+				raise BackendBadValueError("No values given")
+			query = self.upsertQuery(table, keyColumns, columns)  # pylint: disable=no-member
+			logger.trace("upsertMany: %s - %d rows", query, len(rows))
+			result = session.execute(query, rows)  # pylint: disable=no-member
+			rowcount += max(result.rowcount, 0)
+		return rowcount
+
+	def upsert(self, session: Any, table: str, keyColumns: List[str], valueHash: Dict[str, Any]) -> int:
+		return self.upsertMany(session, table, keyColumns, [valueHash])
+
+	def normalizeKeyValue(self, value: Any) -> Any:  # pylint: disable=no-self-use
+		"""
+		Returns `value` in the form the database compares key values.
+
+		Used to match rows read from the database against objects in Python.
+		"""
+		return value
+
 	def getTables(self, session: Any) -> Dict:  # pylint: disable=unused-argument,no-self-use
 		return {}
 
@@ -330,6 +541,29 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 	"""Backend holding information in MySQL form."""
 
 	_OPERATOR_IN_CONDITION_PATTERN = re.compile(r"^\s*([>=<]+)\s*(\d\.?\d*)")
+	# Maximum number of rows handled by one statement of the bulk methods
+	BULK_CHUNK_SIZE = 1000
+	# Number of rows fetched at once when streaming results
+	STREAM_CHUNK_SIZE = 1000
+	# Primary keys as created by backend_createBase.
+	# Objects whose unique condition matches the primary key of their
+	# table can be written with a single upsert statement.
+	_TABLE_PRIMARY_KEYS = {
+		"HOST": frozenset(("hostId",)),
+		"CONFIG": frozenset(("configId",)),
+		"PRODUCT": frozenset(("productId", "productVersion", "packageVersion")),
+		"PRODUCT_ON_DEPOT": frozenset(("productId", "depotId")),
+		"PRODUCT_PROPERTY": frozenset(("productId", "productVersion", "packageVersion", "propertyId")),
+		"PRODUCT_DEPENDENCY": frozenset(("productId", "productVersion", "packageVersion", "productAction", "requiredProductId")),
+		"PRODUCT_ON_CLIENT": frozenset(("productId", "clientId")),
+		"GROUP": frozenset(("type", "groupId")),
+		"LICENSE_CONTRACT": frozenset(("licenseContractId",)),
+		"SOFTWARE_LICENSE": frozenset(("softwareLicenseId",)),
+		"LICENSE_POOL": frozenset(("licensePoolId",)),
+		"SOFTWARE_LICENSE_TO_LICENSE_POOL": frozenset(("softwareLicenseId", "licensePoolId")),
+		"AUDIT_SOFTWARE_TO_LICENSE_POOL": frozenset(("name", "version", "subVersion", "language", "architecture")),
+		"SOFTWARE": frozenset(("name", "version", "subVersion", "language", "architecture")),
+	}
 
 	def __init__(self, **kwargs) -> None:
 		self._name = "sql"
@@ -339,11 +573,14 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		self._sql = None
 		self._auditHardwareConfig = {}
 		self.unique_hardware_addresses = True
+		self.upsert = True
 		self._setAuditHardwareConfig(self.auditHardware_getConfig())
 		# Parse arguments
 		for (option, value) in kwargs.items():
 			if option == "unique_hardware_addresses":
 				self.unique_hardware_addresses = forceBool(value)
+			elif option == "upsert":
+				self.upsert = forceBool(value)
 
 	def _setAuditHardwareConfig(self, config: Dict[str, Dict[str, Any]]) -> None:
 		self._auditHardwareConfig = {}
@@ -585,6 +822,175 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 
 		return " and ".join(createCondition())
 
+	def _uniqueKeyHash(self, object: Any) -> Dict[str, Any]:  # pylint: disable=redefined-builtin
+		"""
+		Returns the database columns and values identifying `object`.
+
+		This uses the same attributes as `_uniqueCondition`.
+		"""
+		keys = {}
+		for argument in mandatoryConstructorArgs(object.__class__):
+			value = getattr(object, argument)
+			if value is None:
+				continue
+			keys[self._objectAttributeToDatabaseAttribute(object.__class__, argument)] = value
+
+		if isinstance(object, (HostGroup, ProductGroup)):
+			keys["type"] = object.getType()
+
+		return keys
+
+	def _normalizedKey(self, keys: Dict[str, Any]) -> Tuple:
+		return tuple((column, self._sql.normalizeKeyValue(keys[column])) for column in sorted(keys))
+
+	def _getExistingKeys(self, session: Any, table: str, keyHashes: List[Dict[str, Any]]) -> Set[Tuple]:
+		"""
+		Returns the normalized keys of `keyHashes` already present in `table`.
+
+		One query with bound parameters is made for every distinct set
+		of key columns and every `BULK_CHUNK_SIZE` keys.
+		"""
+		existing = set()
+		keyHashesByColumns = {}
+		for keys in keyHashes:
+			keyHashesByColumns.setdefault(tuple(sorted(keys)), []).append(keys)
+
+		for (keyColumns, keyHashesOfColumns) in keyHashesByColumns.items():
+			for start in range(0, len(keyHashesOfColumns), self.BULK_CHUNK_SIZE):
+				chunk = keyHashesOfColumns[start : start + self.BULK_CHUNK_SIZE]
+				conditions = []
+				params = {}
+				for (columnIndex, column) in enumerate(keyColumns):
+					bindNames = []
+					for (valueIndex, value) in enumerate(dict.fromkeys(keys[column] for keys in chunk)):
+						bindName = f"k{columnIndex}_{valueIndex}"
+						bindNames.append(f":{bindName}")
+						params[bindName] = value
+					conditions.append(f"`{column}` in ({','.join(bindNames)})")
+
+				query = f"select {','.join(f'`{column}`' for column in keyColumns)} from `{table}` where {' and '.join(conditions)}"
+				for res in self._sql.getSet(session, query, params):
+					existing.add(self._normalizedKey(res))
+		return existing
+
+	def _getRowsByKey(  # pylint: disable=too-many-arguments
+		self, session: Any, table: str, keyColumn: str, keys: List[Any], orderBy: str = None
+	) -> Dict[Any, List[Dict[str, Any]]]:
+		"""
+		Returns the rows of `table` grouped by the value of `keyColumn`.
+
+		This reads the rows for many keys with one query per
+		`BULK_CHUNK_SIZE` keys instead of one query per key.
+		The returned dict is keyed by the normalized key value, use
+		`self._sql.normalizeKeyValue` to look up a key.
+		"""
+		rows = {}
+		keys = list(dict.fromkeys(key for key in keys if key is not None))
+		order = f" order by `{orderBy}`" if orderBy else ""
+		for start in range(0, len(keys), self.BULK_CHUNK_SIZE):
+			params = {f"k{index}": key for (index, key) in enumerate(keys[start : start + self.BULK_CHUNK_SIZE])}
+			query = f"select * from `{table}` where `{keyColumn}` in ({','.join(f':{name}' for name in params)}){order}"
+			for res in self._sql.getSet(session, query, params):
+				rows.setdefault(self._sql.normalizeKeyValue(res[keyColumn]), []).append(res)
+		return rows
+
+	def _streamObjects(  # pylint: disable=redefined-builtin
+		self, objectClass: Any, table: str, attributes: List[str], filter: Dict[str, Any]
+	) -> Generator[Any, None, None]:
+		"""
+		Yield objects of `objectClass` while the rows of `table` are read.
+
+		Memory usage does not depend on the number of rows.
+		"""
+		(attributes, filter) = self._adjustAttributes(objectClass, attributes or [], filter)
+		query = self._createQuery(table, attributes, filter)
+		with self._sql.streamingSession() as session:
+			for res in self._sql.iterSet(session, query, self.STREAM_CHUNK_SIZE):
+				self._adjustResult(objectClass, res)
+				yield objectClass.fromHash(res)
+
+	def _upsertKeyColumns(self, table: str, keys: Dict[str, Any], data: Dict[str, Any]) -> List[str]:
+		"""
+		Returns the key columns to use for an upsert of `data` into `table`.
+
+		An empty list is returned if the row has to be written with
+		read-then-write because upserts are disabled or not supported,
+		or because `keys` do not match the primary key of the table.
+		"""
+		if not self.upsert or not self._sql.UPSERT_SUPPORTED:
+			return []
+
+		primaryKey = self._TABLE_PRIMARY_KEYS.get(table)
+		if not primaryKey or set(keys) != primaryKey:
+			return []
+
+		if any(data.get(column) is None for column in primaryKey):
+			return []
+
+		return sorted(primaryKey)
+
+	def _insertOrUpdate(self, session: Any, table: str, object: Any, data: Dict[str, Any]) -> None:  # pylint: disable=redefined-builtin
+		"""
+		Inserts `data` into `table` or updates the row matching `object`.
+
+		Uses a single upsert statement where possible and falls back to
+		selecting the row by its unique condition followed by an insert
+		or update otherwise. Both reach the same end state.
+		"""
+		keyColumns = self._upsertKeyColumns(table, self._uniqueKeyHash(object), data)
+		if keyColumns:
+			self._sql.upsert(session, table, keyColumns, data)
+			return
+
+		where = self._uniqueCondition(object)
+		if self._sql.getRow(session, f"select * from `{table}` where {where}"):
+			self._sql.update(session, table, where, data, updateWhereNone=True)
+		else:
+			self._sql.insert(session, table, data)
+
+	def _bulkInsertRows(self, session: Any, table: str, rows: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+		"""
+		Inserts or updates many rows of `table` with a few statements.
+
+		`rows` is a list of `(uniqueKeys, data)` tuples as created by
+		`_uniqueKeyHash` and `_objectToDatabaseHash`.
+		Rows already present in the table are updated, all others are
+		inserted. If the same key is given more than once the last row
+		wins, as it would when inserting the objects one by one.
+		"""
+		for start in range(0, len(rows), self.BULK_CHUNK_SIZE):
+			chunk = {}
+			for (keys, data) in rows[start : start + self.BULK_CHUNK_SIZE]:
+				chunk[self._normalizedKey(keys)] = (keys, data)
+
+			upserts = {}
+			for (normalizedKey, (keys, data)) in list(chunk.items()):
+				keyColumns = self._upsertKeyColumns(table, keys, data)
+				if keyColumns:
+					upserts.setdefault(tuple(keyColumns), []).append(data)
+					del chunk[normalizedKey]
+
+			for (keyColumns, data) in upserts.items():
+				logger.debug("Bulk upserting %d rows to %s", len(data), table)
+				self._sql.upsertMany(session, table, keyColumns, data)
+
+			if not chunk:
+				continue
+
+			existing = self._getExistingKeys(session, table, [keys for (keys, _data) in chunk.values()])
+			inserts = []
+			updates = {}
+			for (normalizedKey, (keys, data)) in chunk.items():
+				if normalizedKey in existing:
+					updates.setdefault(tuple(keys), []).append(data)
+				else:
+					inserts.append(data)
+
+			logger.debug("Bulk writing %d rows to %s: %d inserts, %d updates", len(chunk), table, len(inserts), len(chunk) - len(inserts))
+			for (keyColumns, data) in updates.items():
+				self._sql.updateMany(session, table, keyColumns, data, updateWhereNone=True)
+			self._sql.insertMany(session, table, inserts)
+
 	def backend_exit(self) -> None:
 		logger.debug("%s backend_exit", self)
 		if self._sql and self._sql.engine:
@@ -1191,13 +1597,47 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.host_insertObject(self, host)
 		data = self._objectToDatabaseHash(host)
 		data.pop("systemUUID", None)
-		where = self._uniqueCondition(host)
 		with self._sql.session() as session:
 			self._host_check_duplicates(host, session)
-			if self._sql.getRow(session, f"select * from `HOST` where {where}"):
-				self._sql.update(session, "HOST", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "HOST", data)
+			self._insertOrUpdate(session, "HOST", host, data)
+
+	def _hosts_check_duplicates(self, hosts: List[Host], session: Any) -> None:
+		if not self.unique_hardware_addresses:
+			return
+
+		hostIdsByAddress = {}
+		for host in hosts:
+			if not host.hardwareAddress or host.hardwareAddress.startswith("00:00:00"):
+				continue
+			usedBy = hostIdsByAddress.setdefault(host.hardwareAddress, host.id)
+			if usedBy != host.id:
+				raise BackendBadValueError(f"Hardware address {host.hardwareAddress!r} is already used by host {usedBy!r}")
+
+		if not hostIdsByAddress:
+			return
+
+		addresses = list(hostIdsByAddress)
+		for start in range(0, len(addresses), self.BULK_CHUNK_SIZE):
+			params = {f"a{index}": address for (index, address) in enumerate(addresses[start : start + self.BULK_CHUNK_SIZE])}
+			query = f"SELECT hostId, hardwareAddress FROM `HOST` WHERE hardwareAddress in ({','.join(f':{name}' for name in params)})"
+			for res in self._sql.getSet(session, query, params):
+				hostId = hostIdsByAddress.get(res["hardwareAddress"])
+				if hostId and res["hostId"] != hostId:
+					raise BackendBadValueError(f"Hardware address {res['hardwareAddress']!r} is already used by host {res['hostId']!r}")
+
+	@no_export
+	def host_bulkInsertObjects(self, hosts: List[Host]) -> None:
+		hosts = forceObjectClassList(hosts, Host)
+		rows = []
+		for host in hosts:
+			ConfigDataBackend.host_insertObject(self, host)
+			data = self._objectToDatabaseHash(host)
+			data.pop("systemUUID", None)
+			rows.append((self._uniqueKeyHash(host), data))
+
+		with self._sql.session() as session:
+			self._hosts_check_duplicates(hosts, session)
+			self._bulkInsertRows(session, "HOST", rows)
 
 	def host_updateObject(self, host: Host) -> None:
 		ConfigDataBackend.host_updateObject(self, host)
@@ -1259,10 +1699,7 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 
 		where = self._uniqueCondition(config)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `CONFIG` where {where}"):
-				self._sql.update(session, "CONFIG", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "CONFIG", data)
+			self._insertOrUpdate(session, "CONFIG", config, data)
 
 			self._sql.delete(session, "CONFIG_VALUE", where)
 			for value in possibleValues:
@@ -1335,14 +1772,20 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 			readValues = not attributes or "possibleValues" in attributes or "defaultValues" in attributes
 
 			attrs = [attr for attr in attributes if attr not in ("defaultValues", "possibleValues")]
-			for res in self._sql.getSet(session, self._createQuery("CONFIG", attrs, filter)):
+			results = self._sql.getSet(session, self._createQuery("CONFIG", attrs, filter))
+			configValues = {}
+			if readValues:
+				configValues = self._getRowsByKey(
+					session, "CONFIG_VALUE", "configId", [res["configId"] for res in results], orderBy="config_value_id"
+				)
+
+			for res in results:
 				res["possibleValues"] = []
 				res["defaultValues"] = []
-				if readValues:
-					for res2 in self._sql.getSet(session, f"select * from CONFIG_VALUE where `configId` = '{res['configId']}'"):
-						res["possibleValues"].append(res2["value"])
-						if res2["isDefault"]:
-							res["defaultValues"].append(res2["value"])
+				for res2 in configValues.get(self._sql.normalizeKeyValue(res["configId"]), []):
+					res["possibleValues"].append(res2["value"])
+					if res2["isDefault"]:
+						res["defaultValues"].append(res2["value"])
 				self._adjustResult(Config, res)
 				configs.append(Config.fromHash(res))
 			return configs
@@ -1365,12 +1808,30 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		data = self._objectToDatabaseHash(configState)
 		data["values"] = json.dumps(data["values"])
 
-		where = self._uniqueCondition(configState)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `CONFIG_STATE` where {where}"):
-				self._sql.update(session, "CONFIG_STATE", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "CONFIG_STATE", data)
+			self._insertOrUpdate(session, "CONFIG_STATE", configState, data)
+
+	@no_export
+	def configState_bulkInsertObjects(self, configStates: List[ConfigState]) -> None:
+		self._check_module("mysql_backend")
+		configStates = forceObjectClassList(configStates, ConfigState)
+		for configState in configStates:
+			configState.setDefaults()
+
+		if configStates and self._options["additionalReferentialIntegrityChecks"]:
+			configIds = {config.id for config in self._context.config_getObjects(attributes=["id"])}
+			for configState in configStates:
+				if configState.configId not in configIds:
+					raise BackendReferentialIntegrityError(f"Config with id '{configState.configId}' not found")
+
+		rows = []
+		for configState in configStates:
+			data = self._objectToDatabaseHash(configState)
+			data["values"] = json.dumps(data["values"])
+			rows.append((self._uniqueKeyHash(configState), data))
+
+		with self._sql.session() as session:
+			self._bulkInsertRows(session, "CONFIG_STATE", rows)
 
 	def configState_updateObject(self, configState: ConfigState) -> None:
 		self._check_module("mysql_backend")
@@ -1416,12 +1877,8 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		del data["windowsSoftwareIds"]
 		del data["productClassIds"]
 
-		where = self._uniqueCondition(product)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `PRODUCT` where {where}"):
-				self._sql.update(session, "PRODUCT", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "PRODUCT", data)
+			self._insertOrUpdate(session, "PRODUCT", product, data)
 
 			self._sql.delete(session, "WINDOWS_SOFTWARE_ID_TO_PRODUCT", f"`productId` = '{data['productId']}'")
 
@@ -1452,16 +1909,21 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		(attributes, filter) = self._adjustAttributes(Product, attributes or [], filter)
 
 		readWindowsSoftwareIDs = not attributes or "windowsSoftwareIds" in attributes
+		attrs = [attr for attr in attributes if attr not in ("windowsSoftwareIds", "productClassIds")]
 		products = []
 		with self._sql.session() as session:
-			for res in self._sql.getSet(session, self._createQuery("PRODUCT", attributes, filter)):
-				res["windowsSoftwareIds"] = []
+			results = self._sql.getSet(session, self._createQuery("PRODUCT", attrs, filter))
+			windowsSoftwareIds = {}
+			if readWindowsSoftwareIDs:
+				windowsSoftwareIds = self._getRowsByKey(
+					session, "WINDOWS_SOFTWARE_ID_TO_PRODUCT", "productId", [res["productId"] for res in results]
+				)
+
+			for res in results:
+				res["windowsSoftwareIds"] = [
+					res2["windowsSoftwareId"] for res2 in windowsSoftwareIds.get(self._sql.normalizeKeyValue(res["productId"]), [])
+				]
 				res["productClassIds"] = []
-				if readWindowsSoftwareIDs:
-					for res2 in self._sql.getSet(
-						session, f"select * from WINDOWS_SOFTWARE_ID_TO_PRODUCT where `productId` = '{res['productId']}'"
-					):
-						res["windowsSoftwareIds"].append(res2["windowsSoftwareId"])
 
 				if not attributes or "productClassIds" in attributes:
 					# TODO: is this missing an query?
@@ -1498,10 +1960,7 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 
 		where = self._uniqueCondition(productProperty)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `PRODUCT_PROPERTY` where {where}"):
-				self._sql.update(session, "PRODUCT_PROPERTY", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "PRODUCT_PROPERTY", data)
+			self._insertOrUpdate(session, "PRODUCT_PROPERTY", productProperty, data)
 
 			self._sql.delete(session, "PRODUCT_PROPERTY_VALUE", where)
 			for value in possibleValues:
@@ -1597,12 +2056,8 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.productDependency_insertObject(self, productDependency)
 		data = self._objectToDatabaseHash(productDependency)
 
-		where = self._uniqueCondition(productDependency)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `PRODUCT_DEPENDENCY` where {where}"):
-				self._sql.update(session, "PRODUCT_DEPENDENCY", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "PRODUCT_DEPENDENCY", data)
+			self._insertOrUpdate(session, "PRODUCT_DEPENDENCY", productDependency, data)
 
 	def productDependency_updateObject(self, productDependency: ProductDependency) -> None:
 		self._check_module("mysql_backend")
@@ -1642,12 +2097,8 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		productOnDepotClone.productVersion = None
 		productOnDepotClone.packageVersion = None
 		productOnDepotClone.productType = None
-		where = self._uniqueCondition(productOnDepotClone)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `PRODUCT_ON_DEPOT` where {where}"):
-				self._sql.update(session, "PRODUCT_ON_DEPOT", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "PRODUCT_ON_DEPOT", data)
+			self._insertOrUpdate(session, "PRODUCT_ON_DEPOT", productOnDepotClone, data)
 
 	def productOnDepot_updateObject(self, productOnDepot: ProductOnDepot) -> None:
 		self._check_module("mysql_backend")
@@ -1685,13 +2136,9 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		productOnClientClone.productVersion = None
 		productOnClientClone.packageVersion = None
 		productOnClientClone.productType = None
-		where = self._uniqueCondition(productOnClientClone)
 
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `PRODUCT_ON_CLIENT` where {where}"):
-				self._sql.update(session, "PRODUCT_ON_CLIENT", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "PRODUCT_ON_CLIENT", data)
+			self._insertOrUpdate(session, "PRODUCT_ON_CLIENT", productOnClientClone, data)
 
 	def productOnClient_updateObject(self, productOnClient: ProductOnClient) -> None:
 		self._check_module("mysql_backend")
@@ -1730,12 +2177,7 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 				raise BackendReferentialIntegrityError(f"Object '{productPropertyState.objectId}' does not exist")
 			data = self._objectToDatabaseHash(productPropertyState)
 			data["values"] = json.dumps(data["values"])
-
-			where = self._uniqueCondition(productPropertyState)
-			if self._sql.getRow(session, f"select * from `PRODUCT_PROPERTY_STATE` where {where}"):
-				self._sql.update(session, "PRODUCT_PROPERTY_STATE", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "PRODUCT_PROPERTY_STATE", data)
+			self._insertOrUpdate(session, "PRODUCT_PROPERTY_STATE", productPropertyState, data)
 
 	def productPropertyState_updateObject(self, productPropertyState: ProductPropertyState) -> None:
 		self._check_module("mysql_backend")
@@ -1776,12 +2218,8 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.group_insertObject(self, group)
 		data = self._objectToDatabaseHash(group)
 
-		where = self._uniqueCondition(group)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `GROUP` where {where}"):
-				self._sql.update(session, "GROUP", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "GROUP", data)
+			self._insertOrUpdate(session, "GROUP", group, data)
 
 	def group_updateObject(self, group: Group) -> None:
 		self._check_module("mysql_backend")
@@ -1818,12 +2256,19 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.objectToGroup_insertObject(self, objectToGroup)
 		data = self._objectToDatabaseHash(objectToGroup)
 
-		where = self._uniqueCondition(objectToGroup)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `OBJECT_TO_GROUP` where {where}"):
-				self._sql.update(session, "OBJECT_TO_GROUP", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "OBJECT_TO_GROUP", data)
+			self._insertOrUpdate(session, "OBJECT_TO_GROUP", objectToGroup, data)
+
+	@no_export
+	def objectToGroup_bulkInsertObjects(self, objectToGroups: List[ObjectToGroup]) -> None:
+		self._check_module("mysql_backend")
+		rows = []
+		for objectToGroup in forceObjectClassList(objectToGroups, ObjectToGroup):
+			ConfigDataBackend.objectToGroup_insertObject(self, objectToGroup)
+			rows.append((self._uniqueKeyHash(objectToGroup), self._objectToDatabaseHash(objectToGroup)))
+
+		with self._sql.session() as session:
+			self._bulkInsertRows(session, "OBJECT_TO_GROUP", rows)
 
 	def objectToGroup_updateObject(self, objectToGroup: ObjectToGroup) -> None:
 		self._check_module("mysql_backend")
@@ -1859,12 +2304,8 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.licenseContract_insertObject(self, licenseContract)
 		data = self._objectToDatabaseHash(licenseContract)
 
-		where = self._uniqueCondition(licenseContract)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `LICENSE_CONTRACT` where {where}"):
-				self._sql.update(session, "LICENSE_CONTRACT", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "LICENSE_CONTRACT", data)
+			self._insertOrUpdate(session, "LICENSE_CONTRACT", licenseContract, data)
 
 	def licenseContract_updateObject(self, licenseContract: LicenseContract) -> None:
 		self._check_module("license_management")
@@ -1905,12 +2346,8 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.softwareLicense_insertObject(self, softwareLicense)
 		data = self._objectToDatabaseHash(softwareLicense)
 
-		where = self._uniqueCondition(softwareLicense)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `SOFTWARE_LICENSE` where {where}"):
-				self._sql.update(session, "SOFTWARE_LICENSE", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "SOFTWARE_LICENSE", data)
+			self._insertOrUpdate(session, "SOFTWARE_LICENSE", softwareLicense, data)
 
 	def softwareLicense_updateObject(self, softwareLicense: SoftwareLicense) -> None:
 		self._check_module("license_management")
@@ -1951,12 +2388,8 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		productIds = data["productIds"]
 		del data["productIds"]
 
-		where = self._uniqueCondition(licensePool)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `LICENSE_POOL` where {where}"):
-				self._sql.update(session, "LICENSE_POOL", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "LICENSE_POOL", data)
+			self._insertOrUpdate(session, "LICENSE_POOL", licensePool, data)
 
 			self._sql.delete(session, "PRODUCT_ID_TO_LICENSE_POOL", f"`licensePoolId` = '{data['licensePoolId']}'")
 
@@ -2008,13 +2441,15 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 
 			licensePools = []
 			attrs = [attr for attr in attributes if attr != "productIds"]
-			for res in self._sql.getSet(session, self._createQuery("LICENSE_POOL", attrs, filter)):
-				res["productIds"] = []
-				if readProductIds:
-					for res2 in self._sql.getSet(
-						session, f"select * from PRODUCT_ID_TO_LICENSE_POOL where `licensePoolId` = '{res['licensePoolId']}'"
-					):
-						res["productIds"].append(res2["productId"])
+			results = self._sql.getSet(session, self._createQuery("LICENSE_POOL", attrs, filter))
+			productIds = {}
+			if readProductIds:
+				productIds = self._getRowsByKey(
+					session, "PRODUCT_ID_TO_LICENSE_POOL", "licensePoolId", [res["licensePoolId"] for res in results]
+				)
+
+			for res in results:
+				res["productIds"] = [res2["productId"] for res2 in productIds.get(self._sql.normalizeKeyValue(res["licensePoolId"]), [])]
 				self._adjustResult(LicensePool, res)
 				licensePools.append(LicensePool.fromHash(res))
 			return licensePools
@@ -2039,12 +2474,8 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.softwareLicenseToLicensePool_insertObject(self, softwareLicenseToLicensePool)
 		data = self._objectToDatabaseHash(softwareLicenseToLicensePool)
 
-		where = self._uniqueCondition(softwareLicenseToLicensePool)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `SOFTWARE_LICENSE_TO_LICENSE_POOL` where {where}"):
-				self._sql.update(session, "SOFTWARE_LICENSE_TO_LICENSE_POOL", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "SOFTWARE_LICENSE_TO_LICENSE_POOL", data)
+			self._insertOrUpdate(session, "SOFTWARE_LICENSE_TO_LICENSE_POOL", softwareLicenseToLicensePool, data)
 
 	def softwareLicenseToLicensePool_updateObject(self, softwareLicenseToLicensePool: SoftwareLicenseToLicensePool) -> None:
 		self._check_module("license_management")
@@ -2084,12 +2515,8 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.licenseOnClient_insertObject(self, licenseOnClient)
 		data = self._objectToDatabaseHash(licenseOnClient)
 
-		where = self._uniqueCondition(licenseOnClient)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `LICENSE_ON_CLIENT` where {where}"):
-				self._sql.update(session, "LICENSE_ON_CLIENT", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "LICENSE_ON_CLIENT", data)
+			self._insertOrUpdate(session, "LICENSE_ON_CLIENT", licenseOnClient, data)
 
 	def licenseOnClient_updateObject(self, licenseOnClient: LicenseOnClient) -> None:
 		self._check_module("license_management")
@@ -2125,12 +2552,18 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.auditSoftware_insertObject(self, auditSoftware)
 		data = self._objectToDatabaseHash(auditSoftware)
 
-		where = self._uniqueCondition(auditSoftware)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `SOFTWARE` where {where}"):
-				self._sql.update(session, "SOFTWARE", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "SOFTWARE", data)
+			self._insertOrUpdate(session, "SOFTWARE", auditSoftware, data)
+
+	@no_export
+	def auditSoftware_bulkInsertObjects(self, auditSoftwares: List[AuditSoftware]) -> None:
+		rows = []
+		for auditSoftware in forceObjectClassList(auditSoftwares, AuditSoftware):
+			ConfigDataBackend.auditSoftware_insertObject(self, auditSoftware)
+			rows.append((self._uniqueKeyHash(auditSoftware), self._objectToDatabaseHash(auditSoftware)))
+
+		with self._sql.session() as session:
+			self._bulkInsertRows(session, "SOFTWARE", rows)
 
 	def auditSoftware_updateObject(self, auditSoftware: AuditSoftware) -> None:
 		ConfigDataBackend.auditSoftware_updateObject(self, auditSoftware)
@@ -2150,6 +2583,18 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		logger.info("Getting auditSoftware, filter: %s", filter)
 		return [AuditSoftware.fromHash(h) for h in self.auditSoftware_getHashes(attributes, **filter)]
 
+	@no_export
+	def auditSoftware_streamObjects(  # pylint: disable=redefined-builtin
+		self, attributes: List[str] = None, **filter
+	) -> Generator[AuditSoftware, None, None]:
+		"""
+		Like `auditSoftware_getObjects` but returns a generator
+		yielding the objects while they are read from the database.
+		"""
+		ConfigDataBackend.auditSoftware_getObjects(self, attributes=[], **filter)
+		logger.info("Streaming auditSoftware, filter: %s", filter)
+		return self._streamObjects(AuditSoftware, "SOFTWARE", attributes, filter)
+
 	def auditSoftware_deleteObjects(self, auditSoftwares: List[AuditSoftware]) -> None:
 		ConfigDataBackend.auditSoftware_deleteObjects(self, auditSoftwares)
 		with self._sql.session() as session:
@@ -2165,12 +2610,18 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.auditSoftwareToLicensePool_insertObject(self, auditSoftwareToLicensePool)
 		data = self._objectToDatabaseHash(auditSoftwareToLicensePool)
 
-		where = self._uniqueCondition(auditSoftwareToLicensePool)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `AUDIT_SOFTWARE_TO_LICENSE_POOL` where {where}"):
-				self._sql.update(session, "AUDIT_SOFTWARE_TO_LICENSE_POOL", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "AUDIT_SOFTWARE_TO_LICENSE_POOL", data)
+			self._insertOrUpdate(session, "AUDIT_SOFTWARE_TO_LICENSE_POOL", auditSoftwareToLicensePool, data)
+
+	@no_export
+	def auditSoftwareToLicensePool_bulkInsertObjects(self, auditSoftwareToLicensePools: List[AuditSoftwareToLicensePool]) -> None:
+		rows = []
+		for auditSoftwareToLicensePool in forceObjectClassList(auditSoftwareToLicensePools, AuditSoftwareToLicensePool):
+			ConfigDataBackend.auditSoftwareToLicensePool_insertObject(self, auditSoftwareToLicensePool)
+			rows.append((self._uniqueKeyHash(auditSoftwareToLicensePool), self._objectToDatabaseHash(auditSoftwareToLicensePool)))
+
+		with self._sql.session() as session:
+			self._bulkInsertRows(session, "AUDIT_SOFTWARE_TO_LICENSE_POOL", rows)
 
 	def auditSoftwareToLicensePool_updateObject(self, auditSoftwareToLicensePool: AuditSoftwareToLicensePool) -> None:
 		ConfigDataBackend.auditSoftwareToLicensePool_updateObject(self, auditSoftwareToLicensePool)
@@ -2205,12 +2656,18 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		ConfigDataBackend.auditSoftwareOnClient_insertObject(self, auditSoftwareOnClient)
 		data = self._objectToDatabaseHash(auditSoftwareOnClient)
 
-		where = self._uniqueCondition(auditSoftwareOnClient)
 		with self._sql.session() as session:
-			if self._sql.getRow(session, f"select * from `SOFTWARE_CONFIG` where {where}"):
-				self._sql.update(session, "SOFTWARE_CONFIG", where, data, updateWhereNone=True)
-			else:
-				self._sql.insert(session, "SOFTWARE_CONFIG", data)
+			self._insertOrUpdate(session, "SOFTWARE_CONFIG", auditSoftwareOnClient, data)
+
+	@no_export
+	def auditSoftwareOnClient_bulkInsertObjects(self, auditSoftwareOnClients: List[AuditSoftwareOnClient]) -> None:
+		rows = []
+		for auditSoftwareOnClient in forceObjectClassList(auditSoftwareOnClients, AuditSoftwareOnClient):
+			ConfigDataBackend.auditSoftwareOnClient_insertObject(self, auditSoftwareOnClient)
+			rows.append((self._uniqueKeyHash(auditSoftwareOnClient), self._objectToDatabaseHash(auditSoftwareOnClient)))
+
+		with self._sql.session() as session:
+			self._bulkInsertRows(session, "SOFTWARE_CONFIG", rows)
 
 	def auditSoftwareOnClient_updateObject(self, auditSoftwareOnClient: AuditSoftwareOnClient) -> None:
 		ConfigDataBackend.auditSoftwareOnClient_updateObject(self, auditSoftwareOnClient)
@@ -2230,6 +2687,18 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 		logger.info("Getting auditSoftwareOnClient, filter: %s", filter)
 		return [AuditSoftwareOnClient.fromHash(h) for h in self.auditSoftwareOnClient_getHashes(attributes, **filter)]
 
+	@no_export
+	def auditSoftwareOnClient_streamObjects(  # pylint: disable=redefined-builtin
+		self, attributes: List[str] = None, **filter
+	) -> Generator[AuditSoftwareOnClient, None, None]:
+		"""
+		Like `auditSoftwareOnClient_getObjects` but returns a generator
+		yielding the objects while they are read from the database.
+		"""
+		ConfigDataBackend.auditSoftwareOnClient_getObjects(self, attributes=[], **filter)
+		logger.info("Streaming auditSoftwareOnClient, filter: %s", filter)
+		return self._streamObjects(AuditSoftwareOnClient, "SOFTWARE_CONFIG", attributes, filter)
+
 	def auditSoftwareOnClient_deleteObjects(self, auditSoftwareOnClients: List[AuditSoftwareOnClient]) -> None:
 		ConfigDataBackend.auditSoftwareOnClient_deleteObjects(self, auditSoftwareOnClients)
 		with self._sql.session() as session:
@@ -2533,6 +3002,20 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 			with self._sql.session() as session:
 				self._sql.update(session, f"HARDWARE_CONFIG_{auditHardwareOnHost.hardwareClass}", where, update)
 
+	def _getHardwareDevices(self, session: Any, hardwareClass: str, hardwareIds: List[int]) -> Dict[int, Dict[str, Any]]:
+		"""
+		Returns the device rows of `hardwareClass` keyed by hardware id.
+
+		The rows are read with one query per chunk of hardware ids.
+		"""
+		logger.trace("Reading %d hardware devices of class '%s' from database", len(hardwareIds), hardwareClass)
+		devices = {}
+		rows = self._getRowsByKey(session, f"HARDWARE_DEVICE_{hardwareClass}", "hardware_id", hardwareIds)
+		for rowsOfId in rows.values():
+			device = rowsOfId[0]
+			devices[device["hardware_id"]] = device
+		return devices
+
 	def auditHardwareOnHost_getHashes(  # pylint: disable=redefined-builtin,too-many-branches,too-many-locals,too-many-statements
 		self, attributes: List[str] = None, **filter
 	) -> List[Dict[str, Any]]:
@@ -2609,16 +3092,15 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 				logger.debug(
 					"Getting auditHardwareOnHosts, hardwareClass '%s', hardwareIds: %s, filter: %s", hardwareClass, hardwareIds, classFilter
 				)
-				for res in self._sql.getSet(session, self._createQuery(f"HARDWARE_CONFIG_{hardwareClass}", attributes, classFilter)):
-					data = self._sql.getSet(
-						session, f"SELECT * from `HARDWARE_DEVICE_{hardwareClass}` where `hardware_id` = {res['hardware_id']}"
-					)
-
-					if not data:
+				results = self._sql.getSet(session, self._createQuery(f"HARDWARE_CONFIG_{hardwareClass}", attributes, classFilter))
+				devices = self._getHardwareDevices(session, hardwareClass, [res["hardware_id"] for res in results])
+				for res in results:
+					device = devices.get(res["hardware_id"])
+					if not device:
 						logger.error("Hardware device of class '%s' with hardware_id '%s' not found", hardwareClass, res["hardware_id"])
 						continue
 
-					data = data[0]
+					data = dict(device)
 					data.update(res)
 					data["hardwareClass"] = hardwareClass
 					del data["hardware_id"]
@@ -2652,24 +3134,47 @@ class SQLBackend(ConfigDataBackend):  # pylint: disable=too-many-public-methods
 	# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 	# -   Extension for direct connect to db
 	# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-	def getData(self, query: str) -> Generator[Any, None, None]:
+	def getData(self, query: str, stream: bool = False) -> Generator[Any, None, None]:
+		"""
+		Yield the rows of `query` as dicts.
+
+		With `stream` the rows are read from the database while iterating
+		instead of reading all rows into memory first.
+		"""
 		onlyAllowSelect(query)
 
-		with self._sql.session() as session:
-			with timeQuery(query):
-				for row in self._sql.getSet(session, query):
-					for key, val in row.items():
-						if isinstance(val, datetime):
-							row[key] = val.strftime("%Y-%m-%d %H:%M:%S")
-					yield row
+		with timeQuery(query):
+			for row in self._getResultRows(query, stream, asDict=True):
+				for key, val in row.items():
+					if isinstance(val, datetime):
+						row[key] = val.strftime("%Y-%m-%d %H:%M:%S")
+				yield row
+
+	def getRawData(self, query: str, stream: bool = False) -> Generator[Any, None, None]:
+		"""
+		Yield the rows of `query` as lists of values.
 
-	def getRawData(self, query: str) -> Generator[Any, None, None]:
+		See `getData` for `stream`.
+		"""
 		onlyAllowSelect(query)
 
-		with self._sql.session() as session:
-			with timeQuery(query):
-				for row in self._sql.getRows(session, query):
-					for idx, val in enumerate(row):
-						if isinstance(val, datetime):
-							row[idx] = val.strftime("%Y-%m-%d %H:%M:%S")
-					yield row
+		with timeQuery(query):
+			for row in self._getResultRows(query, stream, asDict=False):
+				for idx, val in enumerate(row):
+					if isinstance(val, datetime):
+						row[idx] = val.strftime("%Y-%m-%d %H:%M:%S")
+				yield row
+
+	def _getResultRows(self, query: str, stream: bool, asDict: bool) -> Generator[Any, None, None]:
+		if stream:
+			with self._sql.streamingSession() as session:
+				if asDict:
+					yield from self._sql.iterSet(session, query, self.STREAM_CHUNK_SIZE)
+				else:
+					yield from self._sql.iterRows(session, query, self.STREAM_CHUNK_SIZE)
+		else:
+			with self._sql.session() as session:
+				if asDict:
+					yield from self._sql.getSet(session, query)
+				else:
+					yield from self._sql.getRows(session, query)
@@ -9,7 +9,7 @@ SQLite backend.
 import os
 import sqlite3
 import threading
-from typing import Any, Dict, Generator
+from typing import Any, Dict, Generator, List
 
 from opsicommon.logging import get_logger
 from sqlalchemy import create_engine
@@ -32,6 +32,8 @@ class SQLite(SQL):
 	ESCAPED_BACKSLASH = "\\"
 	ESCAPED_APOSTROPHE = "''"
 	ESCAPED_ASTERISK = "**"
+	# ON CONFLICT ... DO UPDATE is available since SQLite 3.24
+	UPSERT_SUPPORTED = sqlite3.sqlite_version_info >= (3, 24, 0)
 	_WRITE_LOCK = threading.Lock()
 
 	def __init__(self, **kwargs) -> None:
@@ -122,6 +124,15 @@ class SQLite(SQL):
 	def getTableCreationOptions(self, table: Any) -> str:
 		return ''
 
+	def upsertQuery(self, table: str, keyColumns: List[str], columns: List[str]) -> str:
+		updates = [f"`{column}` = excluded.`{column}`" for column in columns if column not in keyColumns]
+		action = f"DO UPDATE SET {','.join(updates)}" if updates else "DO NOTHING"
+		return (
+			f"INSERT INTO `{table}` ({','.join(f'`{column}`' for column in columns)}) "
+			f"VALUES ({','.join(f':{column}' for column in columns)}) "
+			f"ON CONFLICT ({','.join(f'`{column}`' for column in keyColumns)}) {action}"
+		)
+
 
 class SQLiteBackend(SQLBackend):
 	"""Backend holding information in SQLite form."""
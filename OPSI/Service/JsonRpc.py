@@ -10,8 +10,10 @@ http://www.jsonrpc.org/specification
 """
 
 import sys
+import threading
 import time
 import traceback
+from collections import OrderedDict
 
 from opsicommon.exceptions import OpsiBadRpcError, OpsiRpcError
 from opsicommon.logging import get_logger
@@ -20,6 +22,90 @@ from opsicommon.types import forceUnicode
 
 logger = get_logger("opsi.general")
 
+DISPATCH_TABLE_CACHE_SIZE = 32
+_dispatchTables = OrderedDict()
+_dispatchTablesLock = threading.Lock()
+
+
+class CallDescriptor:  # pylint: disable=too-few-public-methods
+	"""
+	Describes how to call a method of the interface.
+
+	Created once per interface method from the description returned
+	by `backend_getInterface`.
+	"""
+
+	def __init__(self, methodInterface):
+		self.name = methodInterface["name"]
+		self.args = methodInterface.get("args") or []
+		self.varargs = methodInterface.get("varargs")
+		self.keywords = methodInterface.get("keywords")
+		self.defaults = methodInterface.get("defaults")
+
+		self.parameterCount = 0
+		if self.keywords:
+			self.parameterCount = len(self.args)
+			if self.varargs:
+				self.parameterCount += len(self.varargs)
+
+	def getArguments(self, params):
+		"""
+		Splits the rpc params into positional and keyword arguments.
+
+		:returns: Positional arguments and keyword arguments.
+		:rtype: (list, dict)
+		"""
+		params = list(params)
+		keywords = {}
+		if self.keywords and len(params) >= self.parameterCount:
+			kwargs = params.pop(-1)
+			if not isinstance(kwargs, dict):
+				raise TypeError(f"kwargs param is not a dict: {params[-1]}")
+
+			for (key, value) in kwargs.items():
+				keywords[str(key)] = deserialize(value)
+
+		return (deserialize(params), keywords)
+
+
+def getDispatchTable(interface):
+	"""
+	Get a dict mapping the method names of `interface` to their `CallDescriptor`.
+
+	Tables are built once per interface object and then looked up by \
+	its identity. Owners that change an interface in place have to \
+	call `invalidateDispatchTable` afterwards.
+	The cache keeps the interface referenced, so its id cannot be \
+	reused by another object while cached.
+	"""
+	cached = _dispatchTables.get(id(interface))
+	if cached and cached[0] is interface:
+		return cached[1]
+
+	table = {}
+	for methodInterface in interface:
+		if methodInterface["name"] not in table:
+			table[methodInterface["name"]] = CallDescriptor(methodInterface)
+
+	with _dispatchTablesLock:
+		_dispatchTables[id(interface)] = (interface, table)
+		while len(_dispatchTables) > DISPATCH_TABLE_CACHE_SIZE:
+			_dispatchTables.popitem(last=False)
+	return table
+
+
+def invalidateDispatchTable(interface):
+	"""
+	Drop the cached dispatch table of `interface`.
+
+	Has to be called after methods of the interface were added, \
+	removed or replaced.
+	"""
+	with _dispatchTablesLock:
+		cached = _dispatchTables.get(id(interface))
+		if cached and cached[0] is interface:
+			del _dispatchTables[id(interface)]
+
 
 class JsonRpc:  # pylint: disable=too-many-instance-attributes
 	def __init__(self, instance, interface, rpc):
@@ -61,42 +147,17 @@ class JsonRpc:  # pylint: disable=too-many-instance-attributes
 
 		return round(self.ended - self.started, 3)
 
-	def execute(self, result=None):  # pylint: disable=unused-argument,too-many-locals,too-many-branches,too-many-statements
+	def execute(self, result=None):  # pylint: disable=unused-argument
 		self.result = None
-		params = list(self.params)
 		self.started = time.time()
 
 		try:
 			methodName = self.getMethodName()
-			for method in self._interface:
-				if methodName == method["name"]:
-					methodInterface = method
-					break
-			else:
-				methodInterface = None
-
-			if not methodInterface:
+			callDescriptor = getDispatchTable(self._interface).get(methodName)
+			if not callDescriptor:
 				raise OpsiRpcError(f"Method '{methodName}' is not valid")
 
-			keywords = {}
-			if methodInterface["keywords"]:
-				parameterCount = 0
-				if methodInterface["args"]:
-					parameterCount += len(methodInterface["args"])
-				if methodInterface["varargs"]:
-					parameterCount += len(methodInterface["varargs"])
-
-				if len(params) >= parameterCount:
-					kwargs = params.pop(-1)
-					if not isinstance(kwargs, dict):
-						raise TypeError(f"kwargs param is not a dict: {params[-1]}")
-
-					for (key, value) in kwargs.items():
-						keywords[str(key)] = deserialize(value)
-
-				del parameterCount
-
-			params = deserialize(params)
+			(params, keywords) = callDescriptor.getArguments(self.params)
 
 			pString = forceUnicode(params)[1:-1]
 			if keywords:
@@ -8,8 +8,11 @@ Handling of sessions.
 Sessions are managed by a SessionHandler.
 It tracks all the present sessions.
 Sessions do timeout after a specified time.
+Expiry of all sessions is handled by a single shared scheduler thread.
 """
 
+import heapq
+import itertools
 import threading
 import time
 
@@ -22,6 +25,97 @@ from OPSI.Util import randomString
 logger = get_logger("opsi.general")
 
 
+class SessionExpiryScheduler:
+	"""
+	Expires sessions after their inactive interval has passed.
+
+	Pending expiries are kept in a heap ordered by deadline and processed
+	by one thread that only runs while sessions are scheduled.
+	Touching an already scheduled session does not change the heap:
+	when its entry comes due the deadline is recalculated from
+	`lastModified` and the session is scheduled again if it was used
+	in the meantime.
+	"""
+
+	def __init__(self):
+		self._heap = []
+		self._scheduled = set()
+		self._counter = itertools.count()
+		self._condition = threading.Condition()
+		self._thread = None
+
+	def __len__(self):
+		with self._condition:
+			return len(self._scheduled)
+
+	def schedule(self, session):
+		with self._condition:
+			if session in self._scheduled:
+				return
+
+			self._scheduled.add(session)
+			deadline = session.lastModified + session.sessionMaxInactiveInterval
+			heapq.heappush(self._heap, (deadline, next(self._counter), session))
+			if self._heap[0][2] is session:
+				self._condition.notify()
+
+			if not self._thread:
+				self._thread = threading.Thread(target=self._run, name="SessionExpiryScheduler", daemon=True)
+				self._thread.start()
+
+	def _getNextExpiredSession(self):
+		"""
+		Waits for the next session to expire.
+
+		Returns `None` once no more sessions are scheduled.
+		"""
+		with self._condition:
+			while self._heap:
+				(deadline, _count, session) = self._heap[0]
+				now = time.time()
+				if deadline > now:
+					self._condition.wait(deadline - now)
+					continue
+
+				heapq.heappop(self._heap)
+				if session.deleted:
+					self._scheduled.discard(session)
+					continue
+
+				deadline = session.lastModified + session.sessionMaxInactiveInterval
+				if deadline > now:
+					heapq.heappush(self._heap, (deadline, next(self._counter), session))
+					continue
+
+				self._scheduled.discard(session)
+				return session
+
+			self._thread = None
+			return None
+
+	def _run(self):
+		while True:
+			session = self._getNextExpiredSession()
+			if not session:
+				return
+
+			if not session.setMarkedForDeletionIfUnused():
+				# Expiring a session in use waits for it to be released,
+				# this must not hold up the expiry of other sessions.
+				threading.Thread(target=session.expire, daemon=True).start()
+				continue
+
+			# The session is marked for deletion and cannot be taken
+			# into use anymore, so expiring it does not wait.
+			try:
+				session.expire()
+			except Exception as err:  # pylint: disable=broad-except
+				logger.error("Failed to expire session %s: %s", session.uid, err, exc_info=True)
+
+
+_expiryScheduler = SessionExpiryScheduler()
+
+
 class Session:  # pylint: disable=too-many-instance-attributes
 	def __init__(self, sessionHandler, name="OPSISID", sessionMaxInactiveInterval=120):
 		self.sessionHandler = sessionHandler
@@ -29,17 +123,16 @@ class Session:  # pylint: disable=too-many-instance-attributes
 		self.sessionMaxInactiveInterval = forceInt(sessionMaxInactiveInterval)
 		self.created = time.time()
 		self.lastModified = time.time()
-		self.sessionTimer = None
 		self.uid = randomString(32)
-		self.ip = ""  # pylint: disable=invalid-name
+		self._ip = ""
 		self.userAgent = ""
 		self.hostname = ""
-		self.user = ""
+		self._user = ""
 		self.password = ""
 		self.authenticated = False
 		self.postpath = []
 		self.usageCount = 0
-		self.usageCountLock = threading.Lock()
+		self.usageCountLock = threading.Condition()
 		self.markedForDeletion = False
 		self.deleted = False
 		self.touch()
@@ -50,12 +143,42 @@ class Session:  # pylint: disable=too-many-instance-attributes
 			f"({self.sessionHandler}, name={self.name}, sessionMaxInactiveInterval={self.sessionMaxInactiveInterval})>"
 		)
 
+	@property
+	def ip(self):  # pylint: disable=invalid-name
+		return self._ip
+
+	@ip.setter
+	def ip(self, ip):  # pylint: disable=invalid-name
+		(previous, self._ip) = (self._ip, ip)
+		self._indexedAttributeChanged("ip", previous, ip)
+
+	@property
+	def user(self):
+		return self._user
+
+	@user.setter
+	def user(self, user):
+		(previous, self._user) = (self._user, user)
+		self._indexedAttributeChanged("user", previous, user)
+
+	def _indexedAttributeChanged(self, attribute, previous, value):
+		if previous == value or self.deleted:
+			return
+
+		try:
+			updateIndex = self.sessionHandler.updateSessionIndex
+		except AttributeError:
+			# Handler does not keep indexes
+			return
+		updateIndex(self, attribute, previous, value)
+
 	def decreaseUsageCount(self):
 		if self.deleted:
 			return
 
 		with self.usageCountLock:
 			self.usageCount -= 1
+			self.usageCountLock.notify_all()
 
 	def increaseUsageCount(self):
 		if self.deleted:
@@ -65,20 +188,42 @@ class Session:  # pylint: disable=too-many-instance-attributes
 			self.usageCount += 1
 			self.touch()
 
+	def increaseUsageCountIfNotMarked(self):
+		"""
+		Increases the usage count unless the session is marked for deletion.
+
+		:returns: `True` if the usage count was increased, `False` otherwise.
+		:rtype: bool
+		"""
+		with self.usageCountLock:
+			if self.markedForDeletion:
+				return False
+			self.increaseUsageCount()
+			return True
+
 	def touch(self):
 		if self.deleted:
 			return
 
 		self.lastModified = time.time()
-		if self.sessionTimer:
-			self.sessionTimer.cancel()
-			self.sessionTimer.join(1)
-		self.sessionTimer = threading.Timer(self.sessionMaxInactiveInterval, self.expire)
-		self.sessionTimer.start()
+		_expiryScheduler.schedule(self)
 
 	def setMarkedForDeletion(self):
 		self.markedForDeletion = True
 
+	def setMarkedForDeletionIfUnused(self):
+		"""
+		Marks the session for deletion if it is not in use.
+
+		:returns: `True` if the session got marked, `False` if it is in use.
+		:rtype: bool
+		"""
+		with self.usageCountLock:
+			if self.usageCount > 0:
+				return False
+			self.markedForDeletion = True
+			return True
+
 	def getMarkedForDeletion(self):
 		return self.markedForDeletion
 
@@ -88,27 +233,29 @@ class Session:  # pylint: disable=too-many-instance-attributes
 
 		return int(self.lastModified - time.time() + self.sessionMaxInactiveInterval)
 
+	def waitUntilUnused(self, timeout):
+		"""
+		Waits until the session is no longer in use or got deleted.
+
+		:returns: `False` if the timeout occurred, `True` otherwise.
+		:rtype: bool
+		"""
+		with self.usageCountLock:
+			return self.usageCountLock.wait_for(lambda: self.usageCount <= 0 or self.deleted, timeout)
+
 	def expire(self):
-		self.sessionHandler.sessionExpired(self)
+		return self.sessionHandler.sessionExpired(self)
 
 	def delete(self):
 		if self.deleted:
 			return
 
-		self.deleted = True
-		if self.usageCount > 0:
-			logger.debug("Deleting session in use: %s", self)
-
-		if self.sessionTimer:
-			try:
-				self.sessionTimer.cancel()
-				try:
-					self.sessionTimer.join(1)
-				except Exception:  # pylint: disable=broad-except
-					pass
-				logger.info("Session timer %s canceled", self.sessionTimer)
-			except Exception as err:  # pylint: disable=broad-except
-				logger.error("Failed to cancel session timer: %s", err)
+		with self.usageCountLock:
+			self.deleted = True
+			if self.usageCount > 0:
+				logger.debug("Deleting session in use: %s", self)
+			# Wake up anyone waiting for the session to get unused
+			self.usageCountLock.notify_all()
 
 
 class SessionHandler:
@@ -118,50 +265,98 @@ class SessionHandler:
 		self.maxSessionsPerIp = forceInt(maxSessionsPerIp)
 		self.sessionDeletionTimeout = forceInt(sessionDeletionTimeout)
 		self.sessions = {}
+		self._indexes = {"ip": {}, "user": {}}
+		self._indexLock = threading.Lock()
 
 	def cleanup(self):
 		self.deleteAllSessions()
 
-	def getSessions(self, ip=None):  # pylint: disable=invalid-name
+	def getSessions(self, ip=None, user=None):  # pylint: disable=invalid-name
 		"""
 		Get the sessions handled by this handler.
 
 		:param ip: Limit the returned values to sessions coming from this IP.
 		:type ip: str
+		:param user: Limit the returned values to sessions of this user.
+		:type user: str
 		:returns: a dict where the uid of the session is the key and \
 the value holds the sesion.
 		:rtype: {str: Session}
 		"""
-		if not ip:
+		if not ip and not user:
 			return self.sessions
 
-		return {uid: session for uid, session in self.sessions.items() if session.ip == ip}
+		with self._indexLock:
+			if ip:
+				sessions = dict(self._indexes["ip"].get(ip, {}))
+				if user:
+					sessions = {uid: session for uid, session in sessions.items() if session.user == user}
+				return sessions
+
+			return dict(self._indexes["user"].get(user, {}))
+
+	def getSessionCount(self, ip=None):  # pylint: disable=invalid-name
+		if not ip:
+			return len(self.sessions)
+
+		with self._indexLock:
+			return len(self._indexes["ip"].get(ip, {}))
+
+	def updateSessionIndex(self, session, attribute, previous, value):
+		"""
+		Moves `session` to another key of the index of `attribute`.
+
+		Called by sessions whenever an indexed attribute changes.
+		"""
+		with self._indexLock:
+			if self.sessions.get(session.uid) is not session:
+				return
+
+			index = self._indexes[attribute]
+			self._removeFromIndex(index, previous, session.uid)
+			if value:
+				index.setdefault(value, {})[session.uid] = session
+
+	@staticmethod
+	def _removeFromIndex(index, key, uid):
+		sessions = index.get(key)
+		if sessions is None:
+			return
+
+		sessions.pop(uid, None)
+		if not sessions:
+			del index[key]
+
+	def _removeSession(self, uid):
+		with self._indexLock:
+			session = self.sessions.pop(uid, None)
+			if session:
+				self._removeFromIndex(self._indexes["ip"], session.ip, uid)
+				self._removeFromIndex(self._indexes["user"], session.user, uid)
+			return session
 
 	def getSession(self, uid=None, ip=None):  # pylint: disable=invalid-name
 		if uid:
 			session = self.sessions.get(uid)
 			if session:
-				if session.getMarkedForDeletion():
-					logger.info("Session found but marked for deletion")
-				else:
-					# Set last modified to current time
-					session.increaseUsageCount()
+				# Set last modified to current time
+				if session.increaseUsageCountIfNotMarked():
 					logger.confidential("Returning session: %s (count: %d)", session.uid, session.usageCount)
 					return session
+				logger.info("Session found but marked for deletion")
 			else:
 				logger.info("Failed to get session: session id %s not found", uid)
 
 		if ip and self.maxSessionsPerIp > 0:
-			sessions = self.getSessions(ip)
-			if len(sessions) >= self.maxSessionsPerIp:
+			if self.getSessionCount(ip) >= self.maxSessionsPerIp:
 				logger.warning("Session limit for ip '%s' reached", ip)
-				for sessionUid, session in sessions.items():
+				for sessionUid, session in self.getSessions(ip).items():
 					if session.usageCount > 0:
 						continue
 					logger.info("Deleting unused session")
 					self.deleteSession(sessionUid)
 
-				if len(self.getSessions(ip)) >= self.maxSessionsPerIp:
+				if self.getSessionCount(ip) >= self.maxSessionsPerIp:
 					raise OpsiServiceAuthenticationError(f"Session limit for ip '{ip}' reached")
 
 		session = self.createSession()
@@ -170,7 +365,8 @@ the value holds the sesion.
 
 	def createSession(self):
 		session = Session(self, self.sessionName, self.sessionMaxInactiveInterval)
-		self.sessions[session.uid] = session
+		with self._indexLock:
+			self.sessions[session.uid] = session
 		logger.notice("New session created")
 		return session
 
@@ -183,21 +379,15 @@ the value holds the sesion.
 			(time.time() - session.lastModified),
 		)
 
+		session.setMarkedForDeletion()
 		if session.usageCount > 0:
 			logger.notice("Session %s currently in use, waiting before deletion", session.uid)
+			if not session.waitUntilUnused(self.sessionDeletionTimeout):
+				logger.warning("Session '%s': timeout occurred while waiting for session to get free for deletion", session.uid)
 
-		session.setMarkedForDeletion()
-		timeout = self.sessionDeletionTimeout
-		sleepInSeconds = 0.01
-		while session.usageCount > 0 and timeout > 0:
 			if not self.sessions.get(session.uid):
 				# Session deleted (closed by client)
 				return False
-			time.sleep(sleepInSeconds)
-			timeout -= sleepInSeconds
-
-		if timeout == 0:
-			logger.warning("Session '%s': timeout occurred while waiting for session to get free for deletion", session.uid)
 
 		self.deleteSession(session.uid)
 		return True
@@ -213,35 +403,28 @@ the value holds the sesion.
 		except Exception:  # pylint: disable=broad-except
 			pass
 
-		try:
-			del self.sessions[uid]
+		if self._removeSession(uid):
 			logger.notice("Session '%s' from ip '%s', application '%s' deleted", session.uid, session.ip, session.userAgent)
-			del session
-		except KeyError:
-			pass
 
 	def deleteAllSessions(self):
-		logger.notice("Deleting all sessions")
-
-		class SessionDeletionThread(threading.Thread):
-			def __init__(self, sessionHandler, uid):
-				threading.Thread.__init__(self)
-				self._sessionHandler = sessionHandler
-				self._uid = uid
-
-			def run(self):
-				self._sessionHandler.deleteSession(self._uid)
-
-		deletionThreads = []
-		for uid in self.sessions:
-			logger.debug("Deleting session %s", uid)
-			thread = SessionDeletionThread(self, uid)
-			deletionThreads.append(thread)
+		"""
+		Deletes all sessions.
 
-		for thread in deletionThreads:
-			thread.start()
+		The sessions are detached from the handler at once and then
+		deleted one after another. Deleting a session only marks it
+		as deleted and wakes up its waiters, so this does not block.
+		"""
+		logger.notice("Deleting all sessions")
 
-		for thread in deletionThreads:
-			thread.join(2)
+		with self._indexLock:
+			sessions = list(self.sessions.values())
+			self.sessions = {}
+			self._indexes = {"ip": {}, "user": {}}
 
-		self.sessions = {}
+		for session in sessions:
+			logger.debug("Deleting session %s", session.uid)
+			try:
+				session.delete()
+			except Exception as err:  # pylint: disable=broad-except
+				logger.warning("Failed to delete session %s: %s", session.uid, err)
+		logger.info("Deleted %d sessions", len(sessions))
@@ -7,7 +7,10 @@ Worker for the various interfaces.
 """
 
 import base64
+import json
 import os
+import re
+import struct
 import tempfile
 import urllib
 import uuid
@@ -18,7 +21,7 @@ from OPSI.Exceptions import OpsiBadRpcError, OpsiServiceAuthenticationError
 from OPSI.Service.JsonRpc import JsonRpc
 from OPSI.Types import forceList, forceUnicode
 from OPSI.Util import fromJson, objectToHtml, toJson
-from OPSI.Util.HTTP import deflateDecode, deflateEncode, gzipDecode, gzipEncode
+from OPSI.Util.HTTP import StreamCompressor, deflateDecode, gzipDecode
 from opsicommon.logging import get_logger
 from opsicommon.objects import serialize, deserialize
 from twisted.internet import defer, threads
@@ -212,6 +215,153 @@ INTERFACE_PAGE = """<?xml version="1.0" encoding="UTF-8"?>
 
 logger = get_logger("opsi.general")
 
+READ_ONLY_METHOD_REGEX = re.compile(r"^(\w+_)?(get|read)[A-Z0-9]\w*$")
+READ_ONLY_METHODS = frozenset(("backend_info", "log_read", "accessControl_authenticated", "accessControl_userIsAdmin"))
+
+
+RESPONSE_CHUNK_SIZE = 256 * 1024
+
+
+def iterJsonChunks(obj, depth=0):
+	"""
+	Encodes `obj` as JSON in pieces.
+
+	Lists and dicts are streamed element by element up to `depth`
+	levels deep, everything below is encoded at once.
+
+	:rtype: generator of bytes
+	"""
+	if depth > 0 and isinstance(obj, list):
+		yield b"["
+		for index, element in enumerate(obj):
+			if index:
+				yield b", "
+			yield from iterJsonChunks(element, depth - 1)
+		yield b"]"
+	elif depth > 0 and isinstance(obj, dict):
+		yield b"{"
+		for index, (key, value) in enumerate(obj.items()):
+			if index:
+				yield b", "
+			yield json.dumps(str(key)).encode("utf-8") + b": "
+			yield from iterJsonChunks(value, depth - 1)
+		yield b"}"
+	else:
+		yield toJson(obj).encode("utf-8")
+
+
+def _msgpackContainerHeader(length, fixType, type16, type32):
+	if length < 16:
+		return bytes((fixType | length,))
+	if length < 0x10000:
+		return type16 + struct.pack(">H", length)
+	return type32 + struct.pack(">I", length)
+
+
+def iterMsgpackChunks(obj, depth=0):
+	"""
+	Encodes `obj` as msgpack in pieces.
+
+	Works like `iterJsonChunks`.
+
+	:rtype: generator of bytes
+	"""
+	if depth > 0 and isinstance(obj, list):
+		yield _msgpackContainerHeader(len(obj), 0x90, b"\xdc", b"\xdd")
+		for element in obj:
+			yield from iterMsgpackChunks(element, depth - 1)
+	elif depth > 0 and isinstance(obj, dict):
+		yield _msgpackContainerHeader(len(obj), 0x80, b"\xde", b"\xdf")
+		for (key, value) in obj.items():
+			yield msgpack.encode(key)
+			yield from iterMsgpackChunks(value, depth - 1)
+	else:
+		yield msgpack.encode(serialize(obj, deep=True))
+
+
+class ResponseProducer:
+	"""
+	Writes a response to a request in chunks.
+
+	Registered as pull producer, so the next chunk is only encoded
+	and compressed when the transport is ready to send more data.
+
+	Headers and parts of the body are already sent when encoding
+	fails or the connection is lost. The response can not be replaced
+	by an error response anymore, so the connection is aborted and
+	`aborted` is set instead of failing the deferred.
+	"""
+
+	def __init__(self, request, chunks, compressor=None, chunkSize=RESPONSE_CHUNK_SIZE):
+		self.request = request
+		self.compressor = compressor
+		self.chunkSize = chunkSize
+		self.aborted = False
+		self._chunks = iter(chunks)
+		self._deferred = defer.Deferred()
+
+	def start(self):
+		"""
+		Starts writing the response.
+
+		:returns: Deferred firing after all data was written.
+		"""
+		self.request.registerProducer(self, False)
+		return self._deferred
+
+	def _readChunk(self):
+		buffer = []
+		size = 0
+		for chunk in self._chunks:
+			buffer.append(chunk)
+			size += len(chunk)
+			if size >= self.chunkSize:
+				break
+		return b"".join(buffer)
+
+	def resumeProducing(self):
+		if self._deferred.called:
+			return
+
+		try:
+			data = self._readChunk()
+			if data:
+				if self.compressor:
+					data = self.compressor.compress(data)
+				if data:
+					self.request.write(data)
+				return
+
+			if self.compressor:
+				data = self.compressor.flush()
+				if data:
+					self.request.write(data)
+		except Exception as err:  # pylint: disable=broad-except
+			logger.error("Failed to send response, aborting connection: %s", err, exc_info=True)
+			self.aborted = True
+			self.request.unregisterProducer()
+			self.request.transport.abortConnection()
+			self._deferred.callback(None)
+			return
+
+		self.request.unregisterProducer()
+		self._deferred.callback(None)
+
+	def stopProducing(self):
+		if not self._deferred.called:
+			logger.warning("Connection lost while sending response")
+			self.aborted = True
+			self._deferred.callback(None)
+
+
+def isReadOnlyMethod(methodName):
+	"""
+	Checks if the rpc method `methodName` only reads data.
+
+	Read-only rpcs of a batch may be executed in parallel.
+	"""
+	return methodName in READ_ONLY_METHODS or bool(READ_ONLY_METHOD_REGEX.match(methodName))
+
 
 class WorkerOpsi:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
 	"""Base worker class"""
@@ -493,12 +643,19 @@ class WorkerOpsi:  # pylint: disable=too-few-public-methods,too-many-instance-at
 
 
 class WorkerOpsiJsonRpc(WorkerOpsi):  # pylint: disable=too-few-public-methods
+	# Execute read-only rpcs of a batch in parallel, disabled by default
+	PARALLEL_RPCS = False
+	MAX_PARALLEL_RPCS = 8
+
 	def __init__(self, service, request, resource):
 		WorkerOpsi.__init__(self, service, request, resource)
 
 		self._callInstance = None
 		self._callInterface = {}
+		self._responseProducer = None
 		self._rpcs = []
+		self.parallelRpcs = self.PARALLEL_RPCS
+		self.maxParallelRpcs = self.MAX_PARALLEL_RPCS
 
 	def _getCallInstance(self, result):  # pylint: disable=unused-argument
 		logger.warning("Class %s should overwrite _getCallInstance", self.__class__.__name__)
@@ -544,10 +701,49 @@ class WorkerOpsiJsonRpc(WorkerOpsi):  # pylint: disable=too-few-public-methods
 		deferred = threads.deferToThread(rpc.execute)
 		return deferred
 
+	def _isParallelizableRpc(self, rpc):  # pylint: disable=no-self-use
+		return isReadOnlyMethod(rpc.getMethodName())
+
+	def _groupRpcs(self):
+		"""
+		Splits the rpcs into groups to execute one after another.
+
+		Consecutive read-only rpcs form a group that can be executed
+		in parallel. Every other rpc is a group of its own, so rpcs
+		are never reordered across a modifying rpc.
+		"""
+		groups = []
+		parallelGroup = None
+		for rpc in self._rpcs:
+			if not self._isParallelizableRpc(rpc):
+				groups.append([rpc])
+				parallelGroup = None
+				continue
+
+			if parallelGroup is None:
+				parallelGroup = []
+				groups.append(parallelGroup)
+			parallelGroup.append(rpc)
+
+		return groups
+
+	def _executeRpcsInParallel(self, result, rpcs):
+		semaphore = defer.DeferredSemaphore(self.maxParallelRpcs)
+		deferreds = [semaphore.run(self._executeRpc, result, rpc) for rpc in rpcs]
+		return defer.gatherResults(deferreds, consumeErrors=True)
+
 	def _executeRpcs(self, result):  # pylint: disable=unused-argument
 		deferred = defer.Deferred()
-		for rpc in self._rpcs:
-			deferred.addCallback(self._executeRpc, rpc)
+		if self.parallelRpcs and self.maxParallelRpcs > 1 and len(self._rpcs) > 1:
+			for rpcs in self._groupRpcs():
+				if len(rpcs) == 1:
+					deferred.addCallback(self._executeRpc, rpcs[0])
+				else:
+					logger.debug("Executing %d read-only rpcs in parallel", len(rpcs))
+					deferred.addCallback(self._executeRpcsInParallel, rpcs)
+		else:
+			for rpc in self._rpcs:
+				deferred.addCallback(self._executeRpc, rpc)
 		# deferred.addErrback(self._errback)
 		deferred.callback(None)
 		return deferred
@@ -585,48 +781,51 @@ class WorkerOpsiJsonRpc(WorkerOpsi):  # pylint: disable=too-few-public-methods
 		except Exception as err:  # pylint: disable=broad-except
 			logger.error("Failed to get accepted mime types from header: %s", err)
 
-		response = [serialize(rpc.getResponse()) for rpc in self._rpcs]
-
+		# Results are encoded while sending instead of serializing the
+		# complete response up front. Lists are streamed element by element
+		# down to the elements of the rpc results.
+		response = [rpc.getResponse() for rpc in self._rpcs]
+		depth = 3
 		if len(response) == 1:
 			response = response[0]
+			depth = 2
 		if not response:
 			response = ""
 
 		self.request.setResponseCode(200)
 
-		data = b""
 		if self.request.getHeader("Content-Type") == "application/msgpack":
 			self.request.setHeader("Content-Type", "application/msgpack")
-			data = msgpack.encode(serialize(response, deep=True))
+			chunks = iterMsgpackChunks(response, depth)
 		else:
 			self.request.setHeader("Content-Type", "application/json; charset=utf-8")
-			data = toJson(response).encode("utf-8")
+			chunks = iterJsonChunks(response, depth)
 
+		compressor = None
 		if invalidMime:
 			# The invalid requests expect the encoding set to
 			# gzip but the content is deflated.
 			self.request.setHeader("Content-Encoding", "gzip")
 			self.request.setHeader("Content-Type", "gzip-application/json; charset=utf-8")
 			logger.debug("Sending deflated data (backwards compatible - with Content-Encoding 'gzip')")
-			data = deflateEncode(data)
-		elif encoding == "lz4":
-			logger.debug("Sending lz4 compressed data")
+			compressor = StreamCompressor("deflate")
+		elif encoding in ("lz4", "deflate", "gzip"):
+			logger.debug("Sending %s compressed data", encoding)
 			self.request.setHeader("Content-Encoding", encoding)
-			data = lz4.frame.compress(data, compression_level=0, block_linked=True)
-		elif encoding == "deflate":
-			logger.debug("Sending deflated data")
-			self.request.setHeader("Content-Encoding", encoding)
-			data = deflateEncode(data)
-		elif encoding == "gzip":
-			logger.debug("Sending gzip compressed data")
-			self.request.setHeader("Content-Encoding", encoding)
-			data = gzipEncode(data)
+			compressor = StreamCompressor(encoding)
 		else:
 			logger.debug("Sending plain data")
 
-		logger.trace("Sending response: %s", data)
-		self.request.write(data)
-		return result
+		self._responseProducer = ResponseProducer(self.request, chunks, compressor)
+		deferred = self._responseProducer.start()
+		deferred.addCallback(lambda _: result)
+		return deferred
+
+	def _finishRequest(self, result):
+		if self._responseProducer and self._responseProducer.aborted:
+			# The connection is gone, there is nothing left to finish.
+			return
+		WorkerOpsi._finishRequest(self, result)
 
 	def _renderError(self, failure):
 		error = "Unknown error"
@@ -269,6 +269,9 @@ class BackendACLFile(ConfigFile):
 class BackendDispatchConfigFile(ConfigFile):
 
 	DISPATCH_ENTRY_REGEX = re.compile(r"^([^:]+)+\s*:\s*(\S.*)$")
+	# Lines like "@sequential : productOnClient_.*" exclude matching
+	# methods from being dispatched to their backends concurrently.
+	SEQUENTIAL_DIRECTIVE = "@sequential"
 
 	def parse(self, lines=None):
 		"""
@@ -285,6 +288,7 @@ class BackendDispatchConfigFile(ConfigFile):
 
 		dispatch = []
 		used_backends = set()
+		self._sequentialMethods = []
 		for line in ConfigFile.parse(self, lines):
 			match = self.DISPATCH_ENTRY_REGEX.search(line)
 			if not match:
@@ -292,6 +296,10 @@ class BackendDispatchConfigFile(ConfigFile):
 				continue
 
 			method = match.group(1).strip()
+			if method == self.SEQUENTIAL_DIRECTIVE:
+				self._sequentialMethods.append(match.group(2).strip())
+				continue
+
 			backends = (entry.strip() for entry in match.group(2).strip(",").split(","))
 			backends = tuple(backend for backend in backends if backend)
 			used_backends.update(backends)
@@ -309,6 +317,16 @@ class BackendDispatchConfigFile(ConfigFile):
 		self._parsed = True
 		return dispatch
 
+	def getSequentialMethods(self, lines=None):
+		"""
+		Returns the RegEx of methods that must be dispatched to their
+		backends one after another.
+
+		:rtype: ['regex',]
+		"""
+		self.parse(lines=lines)
+		return list(self._sequentialMethods)
+
 	def getUsedBackends(self, lines=None):
 		"""
 		Returns the backends used by the dispatch configuration.
@@ -16,11 +16,14 @@ import functools
 import locale
 import os
 import re
+import stat
+import tempfile
 import threading
 import time
 from configparser import (  # pylint: disable=deprecated-class
 	RawConfigParser,
 	SafeConfigParser,
+	SectionProxy,
 )
 from io import StringIO
 from itertools import islice
@@ -539,9 +542,7 @@ class IniFile(ConfigFile):
 	def setKeepOrdering(self, keepOrdering):
 		self._keepOrdering = forceBool(keepOrdering)
 
-	def parse(
-		self, lines=None, returnComments=False
-	):  # pylint: disable=arguments-differ,too-many-branches,too-many-statements,too-many-locals
+	def parse(self, lines=None, returnComments=False):  # pylint: disable=arguments-differ
 		logger.debug("Parsing ini file '%s'", self._filename)
 		start = time.time()
 		if lines:
@@ -550,6 +551,100 @@ class IniFile(ConfigFile):
 			self.readlines()
 		self._parsed = False
 
+		self._configParser = None
+		comments = {}
+		if self._raw and not returnComments:
+			self._configParser = self._parseSinglePass()
+		if self._configParser is None:
+			self._configParser, comments = self._parseWithConfigParser(returnComments)
+
+		logger.debug("Finished reading file after %0.3f seconds", time.time() - start)
+
+		self._parsed = True
+		if returnComments:
+			return (self._configParser, comments)
+		return self._configParser
+
+	def _stripComment(self, line):
+		"""
+		Returns `line` without its comment and the comment.
+
+		Comment chars in quotes or escaped by a backslash do not start a comment.
+		"""
+		comment = None
+		for cc in self._commentChars:
+			if cc not in line:
+				continue
+
+			parts = line.split(cc)
+			quote = 0
+			doublequote = 0
+			cut = -1
+			for i, part in enumerate(islice(parts, len(parts) - 1)):
+				quote += part.count("'")
+				doublequote += part.count('"')
+				if len(part) > 0 and part[-1] == "\\":
+					# escaped comment
+					continue
+				if not quote % 2 and not doublequote % 2:
+					cut = i
+					break
+
+			if cut > -1:
+				line = cc.join(parts[: cut + 1])
+				comment = cc + cc.join(parts[cut + 1 :])
+		return line, comment
+
+	def _parseSinglePass(self):
+		"""
+		Parse the lines into a RawConfigParser in a single pass.
+
+		Sections and options are read the same way RawConfigParser reads them.
+		Returns `None` if the lines need the complete handling of the \
+configparser, i.e. for errors, duplicates and default sections.
+		"""
+		configParser = RawConfigParser()
+		sectionRegex = configParser.SECTCRE
+		optionRegex = configParser._optcre  # pylint: disable=protected-access
+		sections = {}
+		options = None
+		for line in self._lines:
+			line = line.strip()
+			if not line:
+				continue
+			if self._ignoreCase and line.startswith("["):
+				line = line.lower()
+			if line[0] in self._commentChars:
+				continue
+			line = self._stripComment(line)[0].strip()
+			if not line or line.startswith(("#", ";")):
+				continue
+			if "\n" in line:
+				return None
+
+			match = sectionRegex.match(line) if line[0] == "[" else None
+			if match:
+				section = match.group("header")
+				if section in sections or section == configParser.default_section:
+					return None
+				options = sections[section] = {}
+				continue
+
+			match = optionRegex.match(line)
+			if options is None or not match or not match.group("option"):
+				return None
+			option = match.group("option").rstrip().lower()
+			if option in options:
+				return None
+			options[option] = match.group("value").strip()
+
+		# Filled like RawConfigParser.read_file() does, read_dict() would check everything again
+		for (section, options) in sections.items():
+			configParser._sections[section] = options  # pylint: disable=protected-access
+			configParser._proxies[section] = SectionProxy(configParser, section)  # pylint: disable=protected-access
+		return configParser
+
+	def _parseWithConfigParser(self, returnComments=False):  # pylint: disable=too-many-branches
 		lines = []
 		currentSection = None
 		comments = {}
@@ -569,29 +664,9 @@ class IniFile(ConfigFile):
 					line = line.lower()
 			if line[0] in self._commentChars and not returnComments:
 				continue
-			comment = None
-			for cc in self._commentChars:
-				if cc not in line:
-					continue
-
-				parts = line.split(cc)
-				quote = 0
-				doublequote = 0
-				cut = -1
-				for i, part in enumerate(islice(parts, len(parts) - 1)):
-					quote += part.count("'")
-					doublequote += part.count('"')
-					if len(part) > 0 and part[-1] == "\\":
-						# escaped comment
-						continue
-					if not quote % 2 and not doublequote % 2:
-						cut = i
-						break
-
-				if cut > -1:
-					line = cc.join(parts[: cut + 1])
-					if returnComments:
-						comment = cc + cc.join(parts[cut + 1 :])
+			line, comment = self._stripComment(line)
+			if not returnComments:
+				comment = None
 
 			if self._ignoreCase or comment:
 				match = self.optionMatch.search(line)
@@ -608,23 +683,17 @@ class IniFile(ConfigFile):
 			if not line:
 				continue
 			lines.append(line)
-		self._configParser = None
+
 		if self._raw:
-			self._configParser = RawConfigParser()
+			configParser = RawConfigParser()
 		else:
-			self._configParser = SafeConfigParser()
+			configParser = SafeConfigParser()
 
 		try:
-			self._configParser.read_file(StringIO("\r\n".join(lines)))
+			configParser.read_file(StringIO("\r\n".join(lines)))
 		except Exception as err:
 			raise RuntimeError(f"Failed to parse ini file '{self._filename}': {err}") from err
-
-		logger.debug("Finished reading file after %0.3f seconds", time.time() - start)
-
-		self._parsed = True
-		if returnComments:
-			return (self._configParser, comments)
-		return self._configParser
+		return configParser, comments
 
 	def generate(self, configParser, comments={}):  # pylint: disable=dangerous-default-value,too-many-branches
 		self._configParser = configParser
@@ -685,8 +754,57 @@ class IniFile(ConfigFile):
 				self._lines.append(f"{option} = {self._configParser.get(section, option)}")
 			if not comments:
 				self._lines.append("")
+		self._writeLines()
+
+	def _writeLines(self):
+		"""
+		Write the lines to the file.
+
+		An unchanged file is not written at all. An existing file is \
+replaced atomically if owner and mode can be kept, otherwise it is \
+rewritten in place.
+		"""
+		self._lines = [f"{line}{self._lineSeperator}" for line in self._lines]
+		data = "".join(self._lines).encode("utf-8", "replace")
+		try:
+			fileStat = os.stat(self._filename)
+		except FileNotFoundError:
+			fileStat = None
+
+		if fileStat and fileStat.st_size == len(data):
+			file = LockableFile.open(self, "rb")
+			try:
+				unchanged = file.read() == data
+			finally:
+				self.close()
+			if unchanged:
+				logger.trace("File '%s' is unchanged", self._filename)
+				return
+
+		if fileStat and os.name == "posix" and not os.path.islink(self._filename) and os.geteuid() in (0, fileStat.st_uid):
+			try:
+				handle, tempFilename = tempfile.mkstemp(
+					prefix=f".{os.path.basename(self._filename)}.", dir=os.path.dirname(os.path.abspath(self._filename))
+				)
+			except OSError as err:
+				logger.debug("Failed to create temporary file for '%s': %s", self._filename, err)
+			else:
+				try:
+					with os.fdopen(handle, "wb") as file:
+						file.write(data)
+					os.chown(tempFilename, fileStat.st_uid, fileStat.st_gid)
+					os.chmod(tempFilename, stat.S_IMODE(fileStat.st_mode))
+					os.replace(tempFilename, self._filename)
+					return
+				except OSError as err:
+					logger.debug("Failed to replace '%s', rewriting it in place: %s", self._filename, err)
+					try:
+						os.unlink(tempFilename)
+					except OSError:
+						pass
+
 		self.open("w")
-		self.writelines()
+		self._fileHandle.writelines(self._lines)
 		self.close()
 
 
@@ -1557,25 +1675,15 @@ class DHCPDConf_Block(DHCPDConf_Component):  # pylint: disable=invalid-name
 		self.lineRefs[component.startLine].append(component)
 
 	def removeComponent(self, component):
-		index = -1
-		for i, currentComponent in enumerate(self.components):
-			if currentComponent == component:
-				index = i
-				break
-
-		if index < 0:
-			raise BackendMissingDataError(f"Component '{component}' not found")
-
-		del self.components[index]
+		try:
+			self.components.remove(component)
+		except ValueError as err:
+			raise BackendMissingDataError(f"Component '{component}' not found") from err
 
-		index = -1
-		if component.startLine in self.lineRefs:
-			for i, currentComponent in enumerate(self.lineRefs[component.startLine]):
-				if currentComponent == component:
-					index = i
-					break
-		if index >= 0:
-			del self.lineRefs[component.startLine][index]
+		try:
+			self.lineRefs.get(component.startLine, []).remove(component)
+		except ValueError:
+			pass
 
 	def getOptions_hash(self, inherit=None):
 		options = {}
@@ -1641,7 +1749,7 @@ class DHCPDConf_Block(DHCPDConf_Component):  # pylint: disable=invalid-name
 		if not isinstance(self, DHCPDConf_GlobalBlock):
 			text += shifting + " ".join(self.settings) + " {\n"
 
-		notWritten = self.components
+		written = set()
 		lineNumber = max(self.startLine, 1)
 
 		while lineNumber <= self.endLine:
@@ -1654,14 +1762,13 @@ class DHCPDConf_Block(DHCPDConf_Component):  # pylint: disable=invalid-name
 				if i > 0 and isinstance(lineRef, DHCPDConf_Comment):
 					compText = " " + compText.lstrip()
 				text += compText
-				# Mark component as written
-				if lineRef in notWritten:
-					notWritten.remove(lineRef)
+				written.add(id(lineRef))
 			text += "\n"
 			lineNumber += 1
 
-		for component in notWritten:
-			text += component.asText() + "\n"
+		for component in self.components:
+			if id(component) not in written:
+				text += component.asText() + "\n"
 
 		if not isinstance(self, DHCPDConf_GlobalBlock):
 			# Write '}' to close block
@@ -1676,6 +1783,14 @@ class DHCPDConf_GlobalBlock(DHCPDConf_Block):  # pylint: disable=invalid-name
 
 
 class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
+	"""
+	The dhcpd configuration as a tree of blocks.
+
+	Host blocks are indexed by hostname, hardware address and fixed \
+address. Parsing the file again is skipped while it is unchanged and \
+the parsed data was only modified by the methods of this class.
+	"""
+
 	def __init__(self, filename, lockFailTimeout=2000):
 		TextFile.__init__(self, filename, lockFailTimeout)
 
@@ -1686,13 +1801,38 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 		self._currentBlock = None
 		self._globalBlock = None
 		self._parsed = False
+		self._signature = None
+		self._modified = False
+		self._hostsByName = {}
+		self._hostsByHardwareAddress = {}
+		self._hostsByFixedAddress = {}
+		self._hostIndexKeys = {}
+		self._subnetBlocks = []
+		self._groupBlocks = {}
+		self._inheritedParameters = {}
 
 		logger.debug("Parsing dhcpd conf file '%s'", self._filename)
 
 	def getGlobalBlock(self):
+		# The returned blocks can be changed, so the file has to be parsed again
+		self._modified = True
 		return self._globalBlock
 
+	def _getSignature(self):
+		try:
+			fileStat = os.stat(self._filename)
+		except FileNotFoundError:
+			return None
+		return (fileStat.st_mtime_ns, fileStat.st_size, fileStat.st_ino)
+
 	def parse(self, lines=None):  # pylint: disable=too-many-branches
+		signature = None
+		if not lines:
+			signature = self._getSignature()
+			if self._parsed and not self._modified and signature and signature == self._signature:
+				logger.debug("Dhcpd conf file '%s' is unchanged, using parsed data", self._filename)
+				return
+
 		self._currentLine = 0
 		self._currentToken = None
 		self._currentIndex = -1
@@ -1743,6 +1883,9 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 			elif self._currentToken == "{":
 				self._parse_lbracket()
 
+		self._signature = signature
+		self._modified = False
+		self._indexHosts()
 		self._parsed = True
 
 	def generate(self):
@@ -1752,6 +1895,59 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 		self.open("w")
 		self.write(self._globalBlock.asText())
 		self.close()
+		# The parsed data now matches the file
+		self._signature = self._getSignature()
+		self._modified = False
+
+	def _indexHosts(self):
+		self._hostsByName = {}
+		self._hostsByHardwareAddress = {}
+		self._hostsByFixedAddress = {}
+		self._hostIndexKeys = {}
+		self._groupBlocks = {}
+		self._inheritedParameters = {}
+		self._subnetBlocks = self._globalBlock.getBlocks("subnet", recursive=True)
+		for block in self._globalBlock.getBlocks("host", recursive=True):
+			self._indexHost(block)
+
+	def _indexHost(self, block):
+		keys = []
+		if len(block.settings) > 1:
+			keys.append((self._hostsByName, block.settings[1].lower()))
+		for key, value in block.getParameters_hash().items():
+			if not isinstance(value, str):
+				continue
+			if key == "fixed-address":
+				keys.append((self._hostsByFixedAddress, value.lower()))
+			elif key == "hardware":
+				keys.append((self._hostsByHardwareAddress, value.lower()))
+
+		for index, key in keys:
+			index.setdefault(key, []).append(block)
+		self._hostIndexKeys[block] = keys
+
+	def _unindexHost(self, block):
+		for hostBlock in [block] + block.getBlocks("host", recursive=True):
+			for index, key in self._hostIndexKeys.pop(hostBlock, []):
+				index[key].remove(hostBlock)
+				if not index[key]:
+					del index[key]
+
+	def _getInheritedParameters(self, block):
+		if block not in self._inheritedParameters:
+			self._inheritedParameters[block] = block.getParameters_hash(inherit="global")
+		return self._inheritedParameters[block]
+
+	def _findHostBlocks(self, hostname):
+		"""
+		Returns the blocks of host `hostname` and the blocks of other \
+hosts using `hostname` as fixed address.
+		"""
+		hostBlocks = [block for block in self._hostsByName.get(hostname.lower(), []) if block.settings[1] == hostname]
+		for block in self._hostsByFixedAddress.get(hostname.lower(), []):
+			if block.settings[1] != hostname and block.getParameters_hash().get("fixed-address") == hostname:
+				hostBlocks.append(block)
+		return hostBlocks
 
 	@requiresParsing
 	def addHost(
@@ -1766,18 +1962,14 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 		fixedAddress = forceUnicodeLower(fixedAddress)
 		parameters = forceDict(parameters)
 
-		existingHost = None
-		for block in self._globalBlock.getBlocks("host", recursive=True):
-			if block.settings[1].lower() == hostname:
-				existingHost = block
-			else:
-				for key, value in block.getParameters_hash().items():
-					if key == "fixed-address" and value.lower() == fixedAddress:
-						raise BackendBadValueError(f"Host '{block.settings[1]}' uses the same fixed address")
-					if key == "hardware" and value.lower() == f"ethernet {hardwareAddress}":
-						raise BackendBadValueError(f"Host '{block.settings[1]}' uses the same hardware ethernet address")
+		for block in self._hostsByFixedAddress.get(fixedAddress, []):
+			if block.settings[1].lower() != hostname:
+				raise BackendBadValueError(f"Host '{block.settings[1]}' uses the same fixed address")
+		for block in self._hostsByHardwareAddress.get(f"ethernet {hardwareAddress}", []):
+			if block.settings[1].lower() != hostname:
+				raise BackendBadValueError(f"Host '{block.settings[1]}' uses the same hardware ethernet address")
 
-		if existingHost:
+		if self._hostsByName.get(hostname):
 			logger.info("Host '%s' already exists in config file '%s', deleting first", hostname, self._filename)
 			self.deleteHost(hostname)
 
@@ -1798,7 +1990,7 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 		parentBlock = self._globalBlock
 
 		# Search the right subnet block
-		for block in self._globalBlock.getBlocks("subnet", recursive=True):
+		for block in self._subnetBlocks:
 			if ipAddressInNetwork(ipAddress, f"{block.settings[1]}/{block.settings[3]}"):
 				logger.debug("Choosing subnet %s/%s for host %s", block.settings[1], block.settings[3], hostname)
 				parentBlock = block
@@ -1806,9 +1998,11 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 		# Search the right group for the host
 		bestGroup = None
 		bestMatchCount = 0
-		for block in parentBlock.getBlocks("group"):
+		if parentBlock not in self._groupBlocks:
+			self._groupBlocks[parentBlock] = parentBlock.getBlocks("group")
+		for block in self._groupBlocks[parentBlock]:
 			matchCount = 0
-			blockParameters = block.getParameters_hash(inherit="global")
+			blockParameters = self._getInheritedParameters(block)
 			if blockParameters:
 				# Block has parameters set, check if they match the hosts parameters
 				for key, value in blockParameters.items():
@@ -1828,7 +2022,7 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 			parentBlock = bestGroup
 
 		# Remove parameters which are already defined in parents
-		blockParameters = parentBlock.getParameters_hash(inherit="global")
+		blockParameters = self._getInheritedParameters(parentBlock)
 		if blockParameters:
 			for key, value in blockParameters.items():
 				if key in parameters and parameters[key] == value:
@@ -1843,12 +2037,14 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 			hostBlock.addComponent(DHCPDConf_Parameter(startLine=-1, parentBlock=hostBlock, key=key, value=value))
 
 		parentBlock.addComponent(hostBlock)
+		self._indexHost(hostBlock)
+		self._modified = True
 
 	@requiresParsing
 	def getHost(self, hostname):
 		hostname = forceHostname(hostname)
 
-		for block in self._globalBlock.getBlocks("host", recursive=True):
+		for block in self._hostsByName.get(hostname.lower(), []):
 			if block.settings[1] == hostname:
 				return block.getParameters_hash()
 		return None
@@ -1858,21 +2054,15 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 		hostname = forceHostname(hostname)
 
 		logger.notice("Deleting host '%s' from dhcpd config file '%s'", hostname, self._filename)
-		hostBlocks = []
-		for block in self._globalBlock.getBlocks("host", recursive=True):
-			if block.settings[1] == hostname:
-				hostBlocks.append(block)
-			else:
-				for key, value in block.getParameters_hash().items():
-					if key == "fixed-address" and value == hostname:
-						hostBlocks.append(block)
-
+		hostBlocks = self._findHostBlocks(hostname)
 		if not hostBlocks:
 			logger.warning("Failed to remove host '%s': not found", hostname)
 			return
 
 		for block in hostBlocks:
 			block.parentBlock.removeComponent(block)
+			self._unindexHost(block)
+		self._modified = True
 
 	@requiresParsing
 	def modifyHost(self, hostname, parameters):
@@ -1881,27 +2071,23 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 
 		logger.notice("Modifying host '%s' in dhcpd config file '%s'", hostname, self.filename)
 
-		hostBlocks = []
-		for block in self._globalBlock.getBlocks("host", recursive=True):
-			if block.settings[1] == hostname:
-				hostBlocks.append(block)
-			else:
-				for key, value in block.getParameters_hash().items():
-					if key == "fixed-address" and value == hostname:
-						hostBlocks.append(block)
-					elif key == "hardware" and value.lower() == parameters.get("hardware"):
-						raise BackendBadValueError(f"Host '{block.settings[1]}' uses the same hardware ethernet address")
+		for block in self._hostsByHardwareAddress.get(parameters.get("hardware"), []):
+			if block.settings[1] != hostname:
+				raise BackendBadValueError(f"Host '{block.settings[1]}' uses the same hardware ethernet address")
 
+		hostBlocks = self._findHostBlocks(hostname)
 		if len(hostBlocks) != 1:
 			raise BackendBadValueError(f"Host '{hostname}' found {len(hostBlocks)} times")
 
 		hostBlock = hostBlocks[0]
+		self._unindexHost(hostBlock)
+		self._modified = True
 		hostBlock.removeComponents()
 
 		for key, value in parameters.items():
 			parameters[key] = DHCPDConf_Parameter(-1, None, key, value).asHash()[key]
 
-		for key, value in hostBlock.parentBlock.getParameters_hash(inherit="global").items():
+		for key, value in self._getInheritedParameters(hostBlock.parentBlock).items():
 			if key not in parameters:
 				continue
 
@@ -1910,6 +2096,7 @@ class DHCPDConfFile(TextFile):  # pylint: disable=too-many-instance-attributes
 
 		for key, value in parameters.items():
 			hostBlock.addComponent(DHCPDConf_Parameter(startLine=-1, parentBlock=hostBlock, key=key, value=value))
+		self._indexHost(hostBlock)
 
 	def _getNewData(self):
 		if self._currentLine >= len(self._lines):
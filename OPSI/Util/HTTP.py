@@ -11,6 +11,8 @@ import gzip
 import zlib
 from urllib.parse import urlparse
 
+import lz4.frame
+
 
 def urlsplit(url):
 	_url = urlparse(url)
@@ -65,3 +67,48 @@ def gzipDecode(data):
 	:rtype: str
 	"""
 	return gzip.decompress(data)
+
+
+class StreamCompressor:
+	"""
+	Compresses data incrementally.
+
+	Produces the same formats as `deflateEncode`, `gzipEncode` and
+	lz4 frames, without holding the complete data in memory.
+	"""
+
+	def __init__(self, encoding, level=1):
+		self.encoding = encoding
+		self._header = b""
+		if encoding == "deflate":
+			self._compressor = zlib.compressobj(level)
+		elif encoding == "gzip":
+			self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+		elif encoding == "lz4":
+			self._compressor = lz4.frame.LZ4FrameCompressor(compression_level=0, block_linked=True)
+			self._header = self._compressor.begin()
+		else:
+			raise ValueError(f"Unsupported encoding '{encoding}'")
+
+	def compress(self, data):
+		"""
+		Compress the next part of the data.
+
+		:type data: bytes
+		:rtype: bytes
+		"""
+		data = self._compressor.compress(data)
+		if self._header:
+			data = self._header + data
+			self._header = b""
+		return data
+
+	def flush(self):
+		"""
+		Get the remaining compressed data. Call once after the last `compress`.
+
+		:rtype: bytes
+		"""
+		data = self._header + self._compressor.flush()
+		self._header = b""
+		return data
@@ -8,6 +8,7 @@ OPSI.Util.Repository
 """
 
 import ipaddress
+import json
 import os
 import posixpath
 import re
@@ -15,8 +16,10 @@ import shutil
 import socket
 import stat
 import statistics
+import threading
 import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from urllib.parse import quote, unquote, urlparse
 
 import requests
@@ -35,10 +38,9 @@ from OPSI.Types import (
 	forceUnicode,
 	forceUnicodeList,
 )
-from OPSI.Util import md5sum, randomString
+from OPSI.Util import ChecksumCache, md5sum, randomString
 from OPSI.Util.File.Opsi import PackageContentFile
 from OPSI.Util.Message import ProgressSubject
-from OPSI.Util.Path import cd
 
 if os.name == "nt":
 	from OPSI.System.Windows import getFreeDrive
@@ -137,6 +139,8 @@ class SpeedLimiter:  # pylint: disable=too-many-instance-attributes
 		self._network_performance_counter = None
 		self._min_buffer_size = int(min_buffer_size)
 		self._max_buffer_size = int(max_buffer_size)
+		# Concurrent transfers of a repository share the limiter and with it the bandwidth
+		self._lock = threading.Lock()
 
 		self._transfer_direction = "out"
 
@@ -387,13 +391,14 @@ class SpeedLimiter:  # pylint: disable=too-many-instance-attributes
 		self._max_bandwidth = max(forceInt(max_bandwidth), 0)
 
 	def transfer_started(self, transfer_direction: str):
-		self._transfer_direction = transfer_direction
-		if self._dynamic:
-			if not self._network_performance_counter:
-				self._start_network_performance_counter()
-		else:
-			if self._network_performance_counter:
-				self._stop_network_performance_counter()
+		with self._lock:
+			self._transfer_direction = transfer_direction
+			if self._dynamic:
+				if not self._network_performance_counter:
+					self._start_network_performance_counter()
+			else:
+				if self._network_performance_counter:
+					self._stop_network_performance_counter()
 
 	def transfer_ended(self):
 		pass
@@ -404,13 +409,14 @@ class SpeedLimiter:  # pylint: disable=too-many-instance-attributes
 		self._reset()
 
 	def limit(self, num_bytes_received: int):
-		new_buffer_size = num_bytes_received
-		self._calc_speed(num_bytes_received)
-		if self._dynamic or self._max_bandwidth:
-			new_buffer_size = self._limit(buffer_size=num_bytes_received)
-		else:
-			new_buffer_size = self._max_buffer_size
-		return new_buffer_size
+		with self._lock:
+			new_buffer_size = num_bytes_received
+			self._calc_speed(num_bytes_received)
+			if self._dynamic or self._max_bandwidth:
+				new_buffer_size = self._limit(buffer_size=num_bytes_received)
+			else:
+				new_buffer_size = self._max_buffer_size
+			return new_buffer_size
 
 
 class Repository:  # pylint: disable=too-many-instance-attributes
@@ -493,36 +499,40 @@ class Repository:  # pylint: disable=too-many-instance-attributes
 		try:
 			self.speed_limiter.transfer_started(transfer_direction=transferDirection)
 			self._transferDirection = transferDirection
+			# Local state, a repository can be used by several threads at once
+			bytesTransfered = 0
+			bufferSize = self.bufferSize
 			self._bytesTransfered = 0
 			transferStartTime = time.time()
 			buf = True
 
-			while buf and self._bytesTransfered < size:
-				remainingBytes = size - self._bytesTransfered
+			while buf and bytesTransfered < size:
+				remainingBytes = size - bytesTransfered
 				logger.trace(
-					"self.bufferSize: %d, self._bytesTransfered: %d, size: %d, remainingBytes: %d, dynamic bandwidth=%s, max bandwidth=%s",
-					self.bufferSize,
-					self._bytesTransfered,
+					"bufferSize: %d, bytesTransfered: %d, size: %d, remainingBytes: %d, dynamic bandwidth=%s, max bandwidth=%s",
+					bufferSize,
+					bytesTransfered,
 					size,
 					remainingBytes,
 					self._dynamicBandwidth,
 					self._maxBandwidth,
 				)
 
-				if 0 < remainingBytes < self.bufferSize:
+				if 0 < remainingBytes < bufferSize:
 					buf = src.read(remainingBytes)
 				elif remainingBytes > 0:
-					buf = src.read(self.bufferSize)
+					buf = src.read(bufferSize)
 				else:
 					break
 
 				read = len(buf)
 
 				if read > 0:
-					if (self._bytesTransfered + read) > size >= 0:
-						buf = buf[: size - self._bytesTransfered]
+					if (bytesTransfered + read) > size >= 0:
+						buf = buf[: size - bytesTransfered]
 						read = len(buf)
-					self._bytesTransfered += read
+					bytesTransfered += read
+					self._bytesTransfered = bytesTransfered
 
 					if hasattr(dst, "send"):
 						dst.send(buf)
@@ -532,7 +542,7 @@ class Repository:  # pylint: disable=too-many-instance-attributes
 					if progressSubject:
 						progressSubject.addToState(read)
 
-					self.bufferSize = self.speed_limiter.limit(read)
+					bufferSize = self.bufferSize = self.speed_limiter.limit(read)
 
 			transferTime = time.time() - transferStartTime
 			if transferTime == 0:
@@ -540,11 +550,11 @@ class Repository:  # pylint: disable=too-many-instance-attributes
 			self.speed_limiter.transfer_ended()
 			logger.info(
 				"Transfered %0.2fkByte in %0.2f minutes, average speed was %0.2fkByte/s",
-				float(self._bytesTransfered) / 1000,
+				float(bytesTransfered) / 1000,
 				float(transferTime) / 60,
-				(float(self._bytesTransfered) / transferTime) / 1000,
+				(float(bytesTransfered) / transferTime) / 1000,
 			)
-			return self._bytesTransfered
+			return bytesTransfered
 		except Exception as error:
 			logger.info(error, exc_info=True)
 			raise
@@ -1316,24 +1326,141 @@ class CIFSRepository(FileRepository):  # pylint: disable=too-many-instance-attri
 		self._umount()
 
 
-class DepotToLocalDirectorySychronizer:  # pylint: disable=too-few-public-methods
+class SyncJournal:
+	"""
+	Journal of a parallel depot to local directory synchronization.
+
+	Synced files and products are appended as json lines, so a sync
+	that was interrupted skips them when it is started again.
+	"""
+
+	def __init__(self, path):
+		self._path = forceFilename(path)
+		self._lock = threading.Lock()
+		self._products = {}
+		self._load()
+		self._file = open(self._path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+
+	def _load(self):
+		if not os.path.exists(self._path):
+			return
+
+		with open(self._path, encoding="utf-8") as file:
+			for line in file:
+				try:
+					entry = json.loads(line)
+					productId = entry["product"]
+					if "contentHash" in entry:
+						self._products[productId] = {"contentHash": entry["contentHash"], "done": False, "files": {}}
+					elif entry.get("done"):
+						self._products[productId]["done"] = True
+					else:
+						self._products[productId]["files"][entry["file"]] = (entry["md5sum"], entry["size"], entry["mtime"])
+				except (ValueError, KeyError) as err:
+					# The last line may be incomplete if the sync was interrupted
+					logger.debug("Ignoring invalid journal entry %r: %s", line, err)
+
+		if self._products:
+			logger.notice("Resuming synchronization from journal '%s'", self._path)
+
+	def _write(self, entry):
+		with self._lock:
+			self._file.write(json.dumps(entry) + "\n")
+			self._file.flush()
+
+	def startProduct(self, productId, contentHash):
+		"""
+		Start syncing a product.
+
+		:returns: `True` if the product was already synced with the same package content.
+		"""
+		product = self._products.get(productId)
+		if product and product["contentHash"] == contentHash:
+			return product["done"]
+
+		self._products[productId] = {"contentHash": contentHash, "done": False, "files": {}}
+		self._write({"product": productId, "contentHash": contentHash})
+		return False
+
+	def isFileSynced(self, productId, path, md5, destination):
+		entry = self._products.get(productId, {}).get("files", {}).get(path)
+		if not entry or entry[0] != md5:
+			return False
+		try:
+			fileStat = os.stat(destination)
+		except OSError:
+			return False
+		return (fileStat.st_size, fileStat.st_mtime_ns) == (entry[1], entry[2])
+
+	def fileSynced(self, productId, path, md5, destination):
+		fileStat = os.stat(destination)
+		self._write({"product": productId, "file": path, "md5sum": md5, "size": fileStat.st_size, "mtime": fileStat.st_mtime_ns})
+
+	def productSynced(self, productId):
+		self._write({"product": productId, "done": True})
+
+	def close(self):
+		self._file.close()
+
+	def remove(self):
+		self.close()
+		os.remove(self._path)
+
+
+class _ProductSync:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+	def __init__(self, productId, destination, progressSubject):
+		self.productId = productId
+		self.destination = destination
+		self.packageContentFile = os.path.join(destination, f"{productId}.files")
+		self.progressSubject = progressSubject
+		self.files = []
+		self.links = {}
+		self.remaining = 0
+		self.started = False
+		self.finished = False
+		self.alreadySynced = False
+
+
+class DepotToLocalDirectorySychronizer:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+	JOURNAL_FILENAME = ".opsi_sync_journal"
+
 	def __init__(
-		self, sourceDepot, destinationDirectory, productIds=None, maxBandwidth=0, dynamicBandwidth=False
+		self,
+		sourceDepot,
+		destinationDirectory,
+		productIds=None,
+		maxBandwidth=0,
+		dynamicBandwidth=False,
+		workers=1,
+		journalFile=None,
+		useChecksumCache=True,
 	):  # pylint: disable=too-many-arguments
+		"""
+		:param workers: Number of files transferred at the same time. With \
+		more than one worker the files of all products are synced in parallel, \
+		sharing the bandwidth limits of the source depot.
+		:param journalFile: Journal of a parallel sync, used to resume an \
+		interrupted sync. Defaults to a file in the destination directory.
+		:param useChecksumCache: Keep the md5sums of local files in a \
+		`ChecksumCache` in the destination directory instead of reading \
+		every local file on every sync.
+		"""
 		productIds = productIds or []
 		self._sourceDepot = sourceDepot
-		self._destinationDirectory = forceUnicode(destinationDirectory)
+		self._destinationDirectory = os.path.abspath(forceUnicode(destinationDirectory))
 		self._productIds = forceUnicodeList(productIds)
 		self._productId = None
 		self._linkFiles = {}
 		self._fileInfo = None
+		self._workers = max(forceInt(workers), 1)
+		self._journalFile = forceFilename(journalFile or os.path.join(self._destinationDirectory, self.JOURNAL_FILENAME))
 		if not os.path.isdir(self._destinationDirectory):
 			os.mkdir(self._destinationDirectory)
+		self._useChecksumCache = forceBool(useChecksumCache)
+		self._checksumCache = None
 		self._sourceDepot.setBandwidth(dynamicBandwidth=dynamicBandwidth, maxBandwidth=maxBandwidth)
 
-	def _synchronizeDirectories(
-		self, source, destination, progressSubject=None
-	):  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+	def _synchronizeDirectories(self, source, destination, progressSubject=None):
 		source = forceUnicode(source)
 		destination = forceUnicode(destination)
 		logger.debug("Syncing directory %s to %s", source, destination)
@@ -1358,7 +1485,7 @@ class DepotToLocalDirectorySychronizer:  # pylint: disable=too-few-public-method
 				os.remove(path)
 
 		# Start sync
-		for item in self._sourceDepot.content(source):  # pylint: disable=too-many-nested-blocks
+		for item in self._sourceDepot.content(source):
 			source = forceUnicode(source)
 			sourcePath = source + "/" + item["name"]
 			destinationPath = os.path.join(destination, item["name"])
@@ -1374,85 +1501,258 @@ class DepotToLocalDirectorySychronizer:  # pylint: disable=too-few-public-method
 				if self._fileInfo[relSource]["type"] == "l":
 					self._linkFiles[relSource] = self._fileInfo[relSource]["target"]
 					continue
-				size = 0
-				localSize = 0
+				self._synchronizeFile(sourcePath, destinationPath, self._fileInfo[relSource], progressSubject)
+
+	def _synchronizeFile(
+		self, sourcePath, destinationPath, fileInfo, progressSubject=None
+	):  # pylint: disable=too-many-branches,too-many-statements
+		name = sourcePath.rsplit("/", 1)[-1]
+		size = 0
+		localSize = 0
+		exists = False
+		if fileInfo["type"] == "f":
+			size = int(fileInfo["size"])
+			exists = os.path.exists(destinationPath)
+			if exists and os.path.isdir(destinationPath):
+				shutil.rmtree(destinationPath)
 				exists = False
-				if self._fileInfo[relSource]["type"] == "f":
-					size = int(self._fileInfo[relSource]["size"])
-					exists = os.path.exists(destinationPath)
-					if exists and os.path.isdir(destinationPath):
-						shutil.rmtree(destinationPath)
-						exists = False
-					if exists:
-						md5s = md5sum(destinationPath)
-						logger.debug("Destination file '%s' already exists (size: %s, md5sum: %s)", destinationPath, size, md5s)
-						localSize = os.path.getsize(destinationPath)
-						if localSize == size and md5s == self._fileInfo[relSource]["md5sum"]:
-							continue
-
-				if progressSubject:
-					progressSubject.setMessage(_("Downloading file '%s'") % item["name"])
-
-				partialEndFile = f"{destinationPath}.opsi_sync_endpart"
-				partialStartFile = f"{destinationPath}.opsi_sync_startpart"
-
-				composed = False
-				if exists and (localSize < size):
-					try:
-						# First byte needed is byte number <localSize>
-						logger.info("Downloading file '%s' starting at byte number %d", item["name"], localSize)
-						if os.path.exists(partialEndFile):
-							os.remove(partialEndFile)
-						self._sourceDepot.download(sourcePath, partialEndFile, startByteNumber=localSize)
-
-						with open(destinationPath, "ab") as f1:
-							with open(partialEndFile, "rb") as f2:
-								shutil.copyfileobj(f2, f1)
-
-						md5s = md5sum(destinationPath)
-						if md5s != self._fileInfo[relSource]["md5sum"]:
-							logger.info("MD5sum of composed file differs after downloading end part")
-							if os.path.exists(partialStartFile):
-								os.remove(partialStartFile)
-							# Last byte needed is byte number <localSize> - 1
-							logger.info("Downloading file '%s' ending at byte number %d", item["name"], localSize - 1)
-							self._sourceDepot.download(sourcePath, partialStartFile, endByteNumber=localSize - 1)
-
-							with open(partialStartFile, "ab") as f1:
-								with open(partialEndFile, "rb") as f2:
-									shutil.copyfileobj(f2, f1)
-
-							if os.path.exists(destinationPath):
-								os.remove(destinationPath)
-							os.rename(partialStartFile, destinationPath)
-							md5s = md5sum(destinationPath)
-							if md5s != self._fileInfo[relSource]["md5sum"]:
-								logger.info("MD5sum of composed file differs after downloading start part")
-								raise RuntimeError("MD5sum differs")
-						composed = True
-					except Exception as err:  # pylint: disable=broad-except
-						logger.warning("Error completing a partially downloaded file '%s': %s", item["name"], err, exc_info=True)
-
-				for fn in (partialEndFile, partialStartFile):
-					if os.path.exists(fn):
-						os.remove(fn)
-
-				if not composed:
+			if exists:
+				md5s = md5sum(destinationPath, cache=self._checksumCache)
+				logger.debug("Destination file '%s' already exists (size: %s, md5sum: %s)", destinationPath, size, md5s)
+				localSize = os.path.getsize(destinationPath)
+				if localSize == size and md5s == fileInfo["md5sum"]:
+					return
+
+		if progressSubject:
+			progressSubject.setMessage(_("Downloading file '%s'") % name)
+
+		partialEndFile = f"{destinationPath}.opsi_sync_endpart"
+		partialStartFile = f"{destinationPath}.opsi_sync_startpart"
+
+		composed = False
+		if exists and (localSize < size):
+			try:
+				# First byte needed is byte number <localSize>
+				logger.info("Downloading file '%s' starting at byte number %d", name, localSize)
+				if os.path.exists(partialEndFile):
+					os.remove(partialEndFile)
+				self._sourceDepot.download(sourcePath, partialEndFile, startByteNumber=localSize)
+
+				with open(destinationPath, "ab") as f1:
+					with open(partialEndFile, "rb") as f2:
+						shutil.copyfileobj(f2, f1)
+
+				md5s = md5sum(destinationPath, cache=self._checksumCache)
+				if md5s != fileInfo["md5sum"]:
+					logger.info("MD5sum of composed file differs after downloading end part")
+					if os.path.exists(partialStartFile):
+						os.remove(partialStartFile)
+					# Last byte needed is byte number <localSize> - 1
+					logger.info("Downloading file '%s' ending at byte number %d", name, localSize - 1)
+					self._sourceDepot.download(sourcePath, partialStartFile, endByteNumber=localSize - 1)
+
+					with open(partialStartFile, "ab") as f1:
+						with open(partialEndFile, "rb") as f2:
+							shutil.copyfileobj(f2, f1)
+
 					if os.path.exists(destinationPath):
 						os.remove(destinationPath)
-					logger.info("Downloading file '%s'", item["name"])
-					self._sourceDepot.download(sourcePath, destinationPath, progressSubject=progressSubject)
-
-				md5s = md5sum(destinationPath)
-				if md5s != self._fileInfo[relSource]["md5sum"]:
-					error = (
-						f"Failed to download '{item['name']}': "
-						f"MD5sum mismatch (local:{md5s} != remote:{self._fileInfo[relSource]['md5sum']})"
-					)
-					logger.error(error)
-					raise RuntimeError(error)
-
-	def synchronize(
+					os.rename(partialStartFile, destinationPath)
+					md5s = md5sum(destinationPath, cache=self._checksumCache)
+					if md5s != fileInfo["md5sum"]:
+						logger.info("MD5sum of composed file differs after downloading start part")
+						raise RuntimeError("MD5sum differs")
+				composed = True
+			except Exception as err:  # pylint: disable=broad-except
+				logger.warning("Error completing a partially downloaded file '%s': %s", name, err, exc_info=True)
+
+		for fn in (partialEndFile, partialStartFile):
+			if os.path.exists(fn):
+				os.remove(fn)
+
+		if not composed:
+			if os.path.exists(destinationPath):
+				os.remove(destinationPath)
+			logger.info("Downloading file '%s'", name)
+			self._sourceDepot.download(sourcePath, destinationPath, progressSubject=progressSubject)
+
+		md5s = md5sum(destinationPath, cache=self._checksumCache)
+		if md5s != fileInfo["md5sum"]:
+			error = f"Failed to download '{name}': MD5sum mismatch (local:{md5s} != remote:{fileInfo['md5sum']})"
+			logger.error(error)
+			raise RuntimeError(error)
+
+	@staticmethod
+	def _createLinks(productDestinationDirectory, linkFiles):
+		"""
+		Create the links of a product.
+
+		Only absolute paths are used, the working directory of the process \
+is shared with the threads downloading other products.
+		"""
+		for linkDestination in sorted(linkFiles):
+			linkSource = linkFiles[linkDestination]
+
+			if os.name == "nt":
+				if linkSource.startswith("/"):
+					linkSource = linkSource[1:]
+				if linkDestination.startswith("/"):
+					linkDestination = linkDestination[1:]
+				linkSource = os.path.join(productDestinationDirectory, linkSource.replace("/", "\\"))
+				linkDestination = os.path.join(productDestinationDirectory, linkDestination.replace("/", "\\"))
+				if os.path.exists(linkDestination):
+					if os.path.isdir(linkDestination):
+						shutil.rmtree(linkDestination)
+					else:
+						os.remove(linkDestination)
+				logger.info("Symlink => copying '%s' to '%s'", linkSource, linkDestination)
+				if os.path.isdir(linkSource):
+					shutil.copytree(linkSource, linkDestination)
+				else:
+					shutil.copyfile(linkSource, linkDestination)
+			else:
+				linkPath = os.path.join(productDestinationDirectory, linkDestination)
+				if os.path.lexists(linkPath):
+					if os.path.isdir(linkPath) and not os.path.islink(linkPath):
+						shutil.rmtree(linkPath)
+					else:
+						os.remove(linkPath)
+				parts = len(linkDestination.split("/"))
+				parts -= len(linkSource.split("/"))
+				for _counter in range(parts):
+					linkSource = os.path.join("..", linkSource)
+				logger.info("Symlink '%s' to '%s'", linkDestination, linkSource)
+				os.symlink(linkSource, linkPath)
+
+	def _prepareProduct(self, product, journal):  # pylint: disable=too-many-branches
+		"""
+		Download the package content file of a product, clean up the local
+		directory and collect the files which need to be transferred.
+		"""
+		product.started = True
+		productId = product.productId
+		logger.notice("Syncing product %s of depot %s with local directory %s", productId, self._sourceDepot, self._destinationDirectory)
+		if not os.path.isdir(product.destination):
+			os.mkdir(product.destination)
+
+		logger.info("Downloading package content file of product %s", productId)
+		self._sourceDepot.download(f"{productId}/{productId}.files", product.packageContentFile)
+		fileInfo = PackageContentFile(product.packageContentFile).parse()
+
+		size = sum(int(value["size"]) for value in fileInfo.values() if "size" in value)
+		product.progressSubject.setMessage(_("Synchronizing product %s (%.2fkByte)") % (productId, (size / 1000)))
+		product.progressSubject.setEnd(size)
+		product.progressSubject.setEndChangable(False)
+
+		if journal.startProduct(productId, md5sum(product.packageContentFile)):
+			logger.info("Product %s was already synchronized", productId)
+			product.alreadySynced = True
+			return product
+
+		for root, dirnames, filenames in os.walk(product.destination):
+			relRoot = os.path.relpath(root, product.destination).replace(os.sep, "/")
+			for name in dirnames + filenames:
+				relPath = name if relRoot == "." else f"{relRoot}/{name}"
+				if relPath in fileInfo or relPath == f"{productId}.files":
+					continue
+				path = os.path.join(root, name)
+				logger.info("Deleting '%s'", relPath)
+				if os.path.isdir(path) and not os.path.islink(path):
+					shutil.rmtree(path)
+					dirnames.remove(name)
+				else:
+					os.remove(path)
+
+		for relPath in sorted(fileInfo):
+			info = fileInfo[relPath]
+			destinationPath = os.path.join(product.destination, *relPath.split("/"))
+			if info["type"] == "d":
+				if os.path.exists(destinationPath) and not os.path.isdir(destinationPath):
+					os.remove(destinationPath)
+				os.makedirs(destinationPath, exist_ok=True)
+			elif info["type"] == "l":
+				product.links[relPath] = info["target"]
+			elif not journal.isFileSynced(productId, relPath, info["md5sum"], destinationPath):
+				product.files.append((f"{productId}/{relPath}", destinationPath, relPath, info))
+		product.remaining = len(product.files)
+		return product
+
+	def _synchronizeProductFile(self, product, file, journal):
+		sourcePath, destinationPath, relPath, info = file
+		logger.debug("Syncing %s with %s %s", sourcePath, destinationPath, info)
+		self._synchronizeFile(sourcePath, destinationPath, info, product.progressSubject)
+		journal.fileSynced(product.productId, relPath, info["md5sum"], destinationPath)
+
+	def _finishProduct(self, product, journal):
+		if not product.alreadySynced:
+			self._createLinks(product.destination, product.links)
+			journal.productSynced(product.productId)
+		product.finished = True
+		logger.info("Product %s synchronized", product.productId)
+
+	def _synchronizeParallel(self, productProgressObserver=None, overallProgressSubject=None):  # pylint: disable=too-many-branches
+		journal = SyncJournal(self._journalFile)
+		products = []
+		futures = {}
+		executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="DepotSync")
+		try:
+			for productId in self._productIds:
+				progressSubject = ProgressSubject(id="sync_product_" + productId, type="product_sync", fireAlways=True)
+				progressSubject.setMessage(_("Synchronizing product %s") % productId)
+				if productProgressObserver:
+					progressSubject.attachObserver(productProgressObserver)
+				product = _ProductSync(productId, os.path.join(self._destinationDirectory, productId), progressSubject)
+				products.append(product)
+				futures[executor.submit(self._prepareProduct, product, journal)] = (product, None)
+
+			while futures:
+				done, _notDone = wait(futures, return_when=FIRST_COMPLETED)
+				for future in done:
+					product, file = futures.pop(future)
+					future.result()
+					if file:
+						product.remaining -= 1
+					else:
+						# Transfers of all products share the workers
+						for productFile in product.files:
+							futures[executor.submit(self._synchronizeProductFile, product, productFile, journal)] = (product, productFile)
+
+					if not product.remaining:
+						self._finishProduct(product, journal)
+						if overallProgressSubject:
+							overallProgressSubject.addToState(1)
+						if productProgressObserver:
+							product.progressSubject.detachObserver(productProgressObserver)
+		except BaseException as error:
+			executor.shutdown(wait=True, cancel_futures=True)
+			journal.close()
+			for product in products:
+				if product.started and not product.finished:
+					product.progressSubject.setMessage(_("Failed to sync product %s: %s") % (product.productId, error))
+					if os.path.exists(product.packageContentFile):
+						os.unlink(product.packageContentFile)
+			raise
+
+		executor.shutdown()
+		journal.remove()
+
+	def synchronize(self, productProgressObserver=None, overallProgressObserver=None):
+		if self._useChecksumCache:
+			try:
+				self._checksumCache = ChecksumCache(os.path.join(self._destinationDirectory, ChecksumCache.DEFAULT_FILENAME))
+			except Exception as err:  # pylint: disable=broad-except
+				logger.warning("Failed to open checksum cache, calculating all checksums: %s", err)
+
+		try:
+			self._synchronize(productProgressObserver, overallProgressObserver)
+			if self._checksumCache:
+				self._checksumCache.purge()
+		finally:
+			if self._checksumCache:
+				self._checksumCache.close()
+				self._checksumCache = None
+
+	def _synchronize(
 		self, productProgressObserver=None, overallProgressObserver=None
 	):  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
 		if not self._productIds:
@@ -1467,6 +1767,12 @@ class DepotToLocalDirectorySychronizer:  # pylint: disable=too-few-public-method
 		if overallProgressObserver:
 			overallProgressSubject.attachObserver(overallProgressObserver)
 
+		if self._workers > 1:
+			self._synchronizeParallel(productProgressObserver, overallProgressSubject)
+			if overallProgressObserver:
+				overallProgressSubject.detachObserver(overallProgressObserver)
+			return
+
 		for self._productId in self._productIds:
 			productProgressSubject = ProgressSubject(id="sync_product_" + self._productId, type="product_sync", fireAlways=True)
 			productProgressSubject.setMessage(_("Synchronizing product %s") % self._productId)
@@ -1502,41 +1808,7 @@ class DepotToLocalDirectorySychronizer:  # pylint: disable=too-few-public-method
 
 				self._synchronizeDirectories(self._productId, productDestinationDirectory, productProgressSubject)
 
-				links = list(self._linkFiles.keys())
-				links.sort()
-				for linkDestination in links:
-					linkSource = self._linkFiles[linkDestination]
-
-					with cd(productDestinationDirectory):
-						if os.name == "nt":
-							if linkSource.startswith("/"):
-								linkSource = linkSource[1:]
-							if linkDestination.startswith("/"):
-								linkDestination = linkDestination[1:]
-							linkSource = os.path.join(productDestinationDirectory, linkSource.replace("/", "\\"))
-							linkDestination = os.path.join(productDestinationDirectory, linkDestination.replace("/", "\\"))
-							if os.path.exists(linkDestination):
-								if os.path.isdir(linkDestination):
-									shutil.rmtree(linkDestination)
-								else:
-									os.remove(linkDestination)
-							logger.info("Symlink => copying '%s' to '%s'", linkSource, linkDestination)
-							if os.path.isdir(linkSource):
-								shutil.copytree(linkSource, linkDestination)
-							else:
-								shutil.copyfile(linkSource, linkDestination)
-						else:
-							if os.path.exists(linkDestination):
-								if os.path.isdir(linkDestination) and not os.path.islink(linkDestination):
-									shutil.rmtree(linkDestination)
-								else:
-									os.remove(linkDestination)
-							parts = len(linkDestination.split("/"))
-							parts -= len(linkSource.split("/"))
-							for _counter in range(parts):
-								linkSource = os.path.join("..", linkSource)
-							logger.info("Symlink '%s' to '%s'", linkDestination, linkSource)
-							os.symlink(linkSource, linkDestination)
+				self._createLinks(productDestinationDirectory, self._linkFiles)
 			except Exception as error:
 				productProgressSubject.setMessage(_("Failed to sync product %s: %s") % (self._productId, error))
 				if packageContentFile and os.path.exists(packageContentFile):
@@ -18,6 +18,7 @@ from contextlib import contextmanager
 
 from opsicommon.logging import get_logger
 
+from OPSI.Backend.File import FileBackend
 from OPSI.Util.Task.ConfigureBackend import getBackendConfiguration
 
 from . import BackendUpdateError
@@ -63,9 +64,11 @@ read from `backendConfigFile`.
 		schemaVersion = readBackendVersion(baseDirectory)
 		assert schemaVersion == 0
 
-	# Placeholder to see the usage for the first update :)
-	# if schemaVersion < 1:
-	#     print("Update goes here")
+	if schemaVersion < 1:
+		logger.notice("Migrating to schema version 1: sharding audit software.")
+		with updateBackendVersion(baseDirectory, 1):
+			FileBackend(**config)._shardAuditSoftware()  # pylint: disable=protected-access
+		logger.notice("Migrated to schema version 1.")
 
 
 def readBackendVersion(baseDirectory):
@@ -70,6 +70,10 @@ DEFAULT_CONFIG = {
 	"forceDownload": False,
 	"proxy": None,
 	"ignoreErrors": False,
+	"maxConcurrentDownloads": 4,
+	"maxBandwidth": 0,
+	"downloadRetries": 3,
+	"downloadRetryDelay": 5,
 }
 
 logger = get_logger("opsi.general")
@@ -152,6 +156,14 @@ overriden based on values in configuration file.
 								config["proxy"] = forceUrl(value.strip())
 						elif option.lower() == "ignoreerrors" and value.strip():
 							config["ignoreErrors"] = forceBool(value.strip())
+						elif option.lower() == "maxconcurrentdownloads" and value.strip():
+							config["maxConcurrentDownloads"] = max(1, forceInt(value.strip()))
+						elif option.lower() == "maxbandwidth" and value.strip():
+							config["maxBandwidth"] = max(0, forceInt(value.strip()))
+						elif option.lower() == "downloadretries" and value.strip():
+							config["downloadRetries"] = max(0, forceInt(value.strip()))
+						elif option.lower() == "downloadretrydelay" and value.strip():
+							config["downloadRetryDelay"] = max(0, forceInt(value.strip()))
 
 				elif section.lower() == "notification":
 					for (option, value) in configIni.items(section):
@@ -339,6 +351,8 @@ overriden based on values in configuration file.
 				repository.autoSetup = forceBool(value.strip())
 			elif option.lower() == "onlydownload":
 				repository.onlyDownload = forceBool(value.strip())
+			elif option.lower() == "maxconcurrentdownloads" and value.strip():
+				repository.maxConcurrentDownloads = max(1, forceInt(value.strip()))
 			elif option.lower() == "inheritproductproperties":
 				if not opsiDepotId:
 					logger.warning("InheritProductProperties not possible with normal http ressource.")
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) uib GmbH <info@uib.de>
+# License: AGPL-3.0
+"""
+Scheduling of concurrent package downloads.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from opsicommon.logging import get_logger
+
+__all__ = ("BandwidthLimiter", "DownloadJob", "DownloadScheduler")
+
+logger = get_logger("opsi.general")
+
+
+class BandwidthLimiter:  # pylint: disable=too-few-public-methods
+	"""
+	Token bucket shared by concurrent downloads.
+
+	:param maxBandwidth: Maximum bandwidth in bytes per second. \
+`0` disables the limit.
+	"""
+
+	def __init__(self, maxBandwidth=0):
+		self.maxBandwidth = max(0, int(maxBandwidth or 0))
+		self._lock = threading.Lock()
+		self._tokens = float(self.maxBandwidth)
+		self._lastRefill = time.monotonic()
+
+	def consume(self, size):
+		"""
+		Account for `size` transferred bytes.
+
+		Blocks until the transfer of the bytes fits into the limit.
+		Concurrent callers reserve their share in turn, so the limit \
+holds for all downloads together.
+		"""
+		if not self.maxBandwidth:
+			return
+
+		with self._lock:
+			now = time.monotonic()
+			self._tokens = min(self.maxBandwidth, self._tokens + (now - self._lastRefill) * self.maxBandwidth)
+			self._lastRefill = now
+			self._tokens -= size
+			delay = -self._tokens / self.maxBandwidth if self._tokens < 0 else 0
+
+		if delay > 0:
+			time.sleep(delay)
+
+
+class DownloadJob:  # pylint: disable=too-few-public-methods
+	"""
+	A download to be run by the `DownloadScheduler`.
+
+	:param name: Name used in log messages.
+	:param group: Jobs of the same group share a concurrency limit, \
+i.e. the repository the package is downloaded from.
+	:param function: Callable running the download. Its return value \
+is reported as result of the job.
+	:param data: Additional data of the caller.
+	"""
+
+	def __init__(self, name, group, function, data=None):
+		self.name = name
+		self.group = group
+		self.function = function
+		self.data = data
+		self.attempt = 0
+		self.notBefore = 0.0
+
+	def __repr__(self):
+		return f"<{self.__class__.__name__}(name={self.name!r}, attempt={self.attempt})>"
+
+
+class DownloadScheduler:  # pylint: disable=too-few-public-methods
+	"""
+	Run download jobs concurrently.
+
+	At most `maxWorkers` jobs run at the same time, and at most \
+`groupLimits.get(group, maxPerGroup)` of them belong to the same group.
+	A failed job is retried `retries` times, the delay before each retry \
+starts at `retryDelay` seconds and doubles up to `maxRetryDelay`.
+	Delayed retries do not block a worker.
+	"""
+
+	def __init__(  # pylint: disable=too-many-arguments
+		self, maxWorkers=4, maxPerGroup=2, groupLimits=None, retries=3, retryDelay=5.0, maxRetryDelay=300.0
+	):
+		self.maxWorkers = max(1, int(maxWorkers))
+		self.maxPerGroup = max(1, int(maxPerGroup))
+		self.groupLimits = groupLimits or {}
+		self.retries = max(0, int(retries))
+		self.retryDelay = max(0.0, float(retryDelay))
+		self.maxRetryDelay = max(self.retryDelay, float(maxRetryDelay))
+
+	def _getGroupLimit(self, group):
+		return max(1, int(self.groupLimits.get(group) or self.maxPerGroup))
+
+	def _getRetryDelay(self, attempt):
+		return min(self.maxRetryDelay, self.retryDelay * 2 ** (attempt - 1))
+
+	def run(self, jobs):  # pylint: disable=too-many-locals,too-many-branches
+		"""
+		Run the `jobs` and yield `(job, result, error)` as soon as a job \
+is done.
+
+		`error` is `None` if the job succeeded, otherwise it is the \
+exception of the last attempt.
+		Results are yielded in the thread iterating over this generator.
+		"""
+		queues = defaultdict(deque)
+		for job in jobs:
+			queues[job.group].append(job)
+		if not queues:
+			return
+
+		running = defaultdict(int)
+		futures = {}
+		executor = ThreadPoolExecutor(max_workers=self.maxWorkers, thread_name_prefix="package-download")
+		try:
+			while queues or futures:
+				now = time.monotonic()
+				nextStart = None
+				for group in list(queues):
+					queue = queues[group]
+					limit = self._getGroupLimit(group)
+					while queue and running[group] < limit and len(futures) < self.maxWorkers:
+						job = next((job for job in queue if job.notBefore <= now), None)
+						if not job:
+							notBefore = min(job.notBefore for job in queue)
+							nextStart = notBefore if nextStart is None else min(nextStart, notBefore)
+							break
+						queue.remove(job)
+						job.attempt += 1
+						logger.debug("Starting %r", job)
+						futures[executor.submit(job.function)] = job
+						running[group] += 1
+					if not queue:
+						del queues[group]
+
+				timeout = None
+				if nextStart is not None:
+					timeout = max(0.0, nextStart - time.monotonic())
+				if not futures:
+					time.sleep(timeout or 0)
+					continue
+
+				done, _pending = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+				for future in done:
+					job = futures.pop(future)
+					running[job.group] -= 1
+					try:
+						result = future.result()
+					except Exception as err:  # pylint: disable=broad-except
+						if job.attempt <= self.retries:
+							delay = self._getRetryDelay(job.attempt)
+							logger.warning(
+								"%s failed (attempt %d of %d), retrying in %0.1fs: %s", job.name, job.attempt, self.retries + 1, delay, err
+							)
+							job.notBefore = time.monotonic() + delay
+							queues[job.group].append(job)
+							continue
+						logger.debug("%s failed after %d attempts: %s", job.name, job.attempt, err)
+						yield job, None, err
+					else:
+						yield job, result, None
+		finally:
+			executor.shutdown(wait=True, cancel_futures=True)
@@ -8,7 +8,7 @@ Handling repositories.
 
 from html.parser import HTMLParser
 
-from OPSI.Types import forceBool, forceUnicode, forceUnicodeList
+from OPSI.Types import forceBool, forceInt, forceUnicode, forceUnicodeList
 
 __all__ = ('LinksExtractor', 'ProductRepositoryInfo')
 
@@ -32,7 +32,8 @@ class ProductRepositoryInfo:  # pylint: disable=dangerous-default-value,too-many
 		includes=[],
 		active=False,
 		autoSetupExcludes=[],
-		verifyCert=False
+		verifyCert=False,
+		maxConcurrentDownloads=2
 	):
 		self.name = forceUnicode(name)
 		self.baseUrl = forceUnicode(baseUrl)
@@ -53,6 +54,7 @@ class ProductRepositoryInfo:  # pylint: disable=dangerous-default-value,too-many
 		self.description = ''
 		self.active = forceBool(active)
 		self.verifyCert = forceBool(verifyCert)
+		self.maxConcurrentDownloads = forceInt(maxConcurrentDownloads)
 
 		self.proxy = None
 		if proxy:
@@ -14,7 +14,8 @@ import os.path
 import re
 import subprocess
 import time
-from contextlib import contextmanager
+from contextlib import closing, contextmanager
+from functools import partial
 from urllib.parse import quote
 
 from OpenSSL.crypto import FILETYPE_PEM, load_certificate
@@ -22,10 +23,9 @@ from OPSI import System
 from OPSI.Backend.BackendManager import BackendManager
 from OPSI.Object import NetbootProduct, ProductOnClient
 from OPSI.Types import forceHostId, forceProductId
-from OPSI.Util import compareVersions, formatFileSize, getfqdn, md5sum
+from OPSI.Util import ChecksumCache, compareVersions, formatFileSize, getfqdn, md5sum
 from OPSI.Util.File import ZsyncFile
 from OPSI.Util.File.Opsi import parseFilename
-from OPSI.Util.Path import cd
 from OPSI.Util.Product import ProductPackageFile
 from OPSI.Util.Task.Rights import setRights
 from opsicommon.logging import get_logger, secret_filter
@@ -35,6 +35,7 @@ from requests.packages import urllib3
 from requests.exceptions import ChunkedEncodingError
 
 from .Config import DEFAULT_USER_AGENT, ConfigurationParser
+from .Download import BandwidthLimiter, DownloadJob, DownloadScheduler
 from .Notifier import DummyNotifier, EmailNotifier
 from .Repository import LinksExtractor
 
@@ -49,6 +50,54 @@ class HashsumMissmatchError(ValueError):
 	pass
 
 
+class _InstallQueue:
+	"""
+	Releases packages for installation in dependency order.
+
+	A package is released as soon as none of the packages it depends on \
+is pending anymore. If all pending packages wait for each other because \
+of circular dependencies the package added first is released.
+
+	:param productIds: Ids of the products pending installation.
+	"""
+
+	def __init__(self, productIds):
+		self._pending = set(productIds)
+		self._waiting = []
+
+	def isPending(self, productId):
+		return productId in self._pending
+
+	def add(self, package, dependencies):
+		"""
+		Add a downloaded package.
+
+		:returns: The packages released for installation.
+		"""
+		self._waiting.append((package, set(dependencies) - {package["productId"]}))
+		return self._release()
+
+	def finish(self, productId):
+		"""
+		Mark the product as done, whether it was installed or not.
+
+		:returns: The packages released for installation.
+		"""
+		self._pending.discard(productId)
+		return self._release()
+
+	def _release(self):
+		ready = []
+		waiting = []
+		for entry in self._waiting:
+			(waiting if entry[1] & self._pending else ready).append(entry)
+		if not ready and waiting and len(waiting) == len(self._pending):
+			logger.info("Circular dependencies between packages %s", ", ".join(sorted(self._pending)))
+			ready.append(waiting.pop(0))
+		self._waiting = waiting
+		return [package for package, _dependencies in ready]
+
+
 class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 	def __init__(self, config):
 		self.config = config
@@ -56,6 +105,7 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 		self.configBackend = None
 		self.depotId = forceHostId(getfqdn(conf="/etc/opsi/global.conf").lower())
 		self.errors = []
+		self.checksumCache = None
 
 		try:
 			self.config["zsyncCommand"] = System.which("zsync-curl")
@@ -78,6 +128,7 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 		secret_filter.add_secrets(self.depotKey)
 
 		self.readConfigFile()
+		self.bandwidthLimiter = BandwidthLimiter(self.config.get("maxBandwidth", 0))
 
 	def __enter__(self):
 		return self
@@ -87,6 +138,23 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 			self.configBackend.backend_exit()
 		except Exception:  # pylint: disable=broad-except
 			pass
+		if self.checksumCache:
+			self.checksumCache.close()
+			self.checksumCache = None
+
+	def getChecksumCache(self):
+		"""
+		Get the checksum cache of the package directory.
+
+		Returns `None` if the cache can not be used.
+		"""
+		if self.checksumCache is None:
+			try:
+				self.checksumCache = ChecksumCache(os.path.join(self.config["packageDir"], ChecksumCache.DEFAULT_FILENAME))
+			except Exception as err:  # pylint: disable=broad-except
+				logger.warning("Failed to open checksum cache: %s", err)
+				self.checksumCache = False
+		return self.checksumCache or None
 
 	def getActiveRepositories(self):
 		"""
@@ -183,13 +251,11 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 
 		notifier = self._getNotifier()
 		try:  # pylint: disable=too-many-nested-blocks
-			newPackages = self.get_packages(notifier)
-			if not newPackages:
+			plannedPackages = self.get_planned_packages()
+			if not plannedPackages:
 				logger.notice("No new packages available")
 				return
 
-			logger.info("New packages available: %s", ", ".join(sorted([np["productId"] for np in newPackages])))
-
 			def in_installation_window(start_str, end_str):
 				now = datetime.datetime.now().time()
 				start = datetime.time(int(start_str.split(":")[0]), int(start_str.split(":")[1]))
@@ -224,93 +290,41 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 				)
 				insideInstallWindow = False
 
-			sequence = []
-			for package in newPackages:
-				if not insideInstallWindow and package["productId"] not in self.config["installationWindowExceptions"]:
-					continue
-				sequence.append(package["productId"])
-
-			for package in newPackages:
-				if package["productId"] not in sequence:
-					continue
-				packageFile = os.path.join(self.config["packageDir"], package["filename"])
-				productId = package["productId"]
-				ppf = ProductPackageFile(packageFile, tempDir=self.config.get("tempdir", "/tmp"))
-				ppf.getMetaData()
-				dependencies = ppf.packageControlFile.getPackageDependencies()
-				ppf.cleanup()
-				for dependency in dependencies:
-					try:
-						ppos = sequence.index(productId)
-						dpos = sequence.index(dependency["package"])
-						if ppos < dpos:
-							sequence.remove(dependency["package"])
-							sequence.insert(ppos, dependency["package"])
-					except Exception as err:  # pylint: disable=broad-except
-						logger.debug("While processing package '%s', dependency '%s': %s", packageFile, dependency["package"], err)
-
-			sortedPackages = []
-			for productId in sequence:
-				for package in newPackages:
-					if productId == package["productId"]:
-						sortedPackages.append(package)
-						break
-			newPackages = sortedPackages
+			installQueue = _InstallQueue(
+				package["productId"]
+				for package, _localPackage in plannedPackages
+				if not package["repository"].onlyDownload
+				and (insideInstallWindow or package["productId"] in (self.config["installationWindowExceptions"] or []))
+			)
 
-			backend = self.getConfigBackend()
+			# Packages are installed while the remaining downloads are still running
+			newPackages = []
 			installedPackages = []
-			for package in newPackages:
-				packageFile = os.path.join(self.config["packageDir"], package["filename"])
-
-				if package["repository"].onlyDownload:
-					logger.debug("Download only is set for repository, not installing package '%s'", packageFile)
-					continue
-
-				try:
-					propertyDefaultValues = {}
-					try:
-						if package["repository"].inheritProductProperties and package["repository"].opsiDepotId:
-							logger.info("Trying to get product property defaults from repository")
-							productPropertyStates = backend.productPropertyState_getObjects(  # pylint: disable=no-member
-								productId=package["productId"], objectId=package["repository"].opsiDepotId
-							)
-						else:
-							productPropertyStates = backend.productPropertyState_getObjects(  # pylint: disable=no-member
-								productId=package["productId"], objectId=self.depotId
-							)
-						if productPropertyStates:
-							for pps in productPropertyStates:
-								propertyDefaultValues[pps.propertyId] = pps.values
-						logger.notice("Using product property defaults: %s", propertyDefaultValues)
-					except Exception as err:  # pylint: disable=broad-except
-						logger.warning("Failed to get product property defaults: %s", err)
+			with closing(self.iter_downloaded_packages(plannedPackages, notifier)) as downloads:
+				for package, error in downloads:
+					ready = []
+					if error:
+						ready = installQueue.finish(package["productId"])
+					else:
+						newPackages.append(package)
+						if installQueue.isPending(package["productId"]):
+							ready = installQueue.add(package, self._getPackageDependencies(package))
+						elif package["repository"].onlyDownload:
+							logger.debug("Download only is set for repository, not installing package '%s'", package["filename"])
+
+					while ready:
+						readyPackage = ready.pop(0)
+						if self.installPackage(readyPackage, notifier):
+							installedPackages.append(readyPackage)
+						ready.extend(installQueue.finish(readyPackage["productId"]))
 
-					logger.info("Installing package '%s'", packageFile)
-					backend.depot_installPackage(  # pylint: disable=no-member
-						filename=packageFile, propertyDefaultValues=propertyDefaultValues, tempDir=self.config.get("tempdir", "/tmp")
-					)
-					productOnDepots = backend.productOnDepot_getObjects(  # pylint: disable=no-member
-						depotId=self.depotId, productId=package["productId"]
-					)
-					if not productOnDepots:
-						raise ValueError(f"Product '{package['productId']}' not found on depot '{self.depotId}' after installation")
-					package["product"] = backend.product_getObjects(  # pylint: disable=no-member
-						id=productOnDepots[0].productId,
-						productVersion=productOnDepots[0].productVersion,
-						packageVersion=productOnDepots[0].packageVersion,
-					)[0]
-
-					message = f"Package '{packageFile}' successfully installed"
-					notifier.appendLine(message, pre="\n")
-					logger.notice(message)
-					installedPackages.append(package)
+			if not newPackages:
+				logger.notice("No new packages available")
+				return
 
-				except Exception as err:  # pylint: disable=broad-except
-					if not self.config.get("ignoreErrors"):
-						raise
-					logger.error("Ignoring error for package %s: %s", package["productId"], err, exc_info=True)
-					notifier.appendLine(f"Ignoring error for package {package['productId']}: {err}")
+			logger.info("New packages available: %s", ", ".join(sorted([np["productId"] for np in newPackages])))
 
+			backend = self.getConfigBackend()
 			if not installedPackages:
 				logger.notice("No new packages installed")
 				return
@@ -428,6 +442,73 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 			if notifier and notifier.hasMessage():
 				notifier.notify()
 
+	def _getPackageDependencies(self, package):
+		packageFile = os.path.join(self.config["packageDir"], package["filename"])
+		ppf = ProductPackageFile(packageFile, tempDir=self.config.get("tempdir", "/tmp"))
+		try:
+			ppf.getMetaData()
+			return [dependency["package"] for dependency in ppf.packageControlFile.getPackageDependencies()]
+		except Exception as err:  # pylint: disable=broad-except
+			logger.warning("Failed to read dependencies of package '%s': %s", packageFile, err)
+			return []
+		finally:
+			ppf.cleanup()
+
+	def installPackage(self, package, notifier):
+		"""
+		Install a downloaded package on the depot.
+
+		:returns: `True` if the package was installed, `False` if the \
+installation failed and errors are ignored.
+		:rtype: bool
+		"""
+		backend = self.getConfigBackend()
+		packageFile = os.path.join(self.config["packageDir"], package["filename"])
+		try:
+			propertyDefaultValues = {}
+			try:
+				if package["repository"].inheritProductProperties and package["repository"].opsiDepotId:
+					logger.info("Trying to get product property defaults from repository")
+					productPropertyStates = backend.productPropertyState_getObjects(  # pylint: disable=no-member
+						productId=package["productId"], objectId=package["repository"].opsiDepotId
+					)
+				else:
+					productPropertyStates = backend.productPropertyState_getObjects(  # pylint: disable=no-member
+						productId=package["productId"], objectId=self.depotId
+					)
+				if productPropertyStates:
+					for pps in productPropertyStates:
+						propertyDefaultValues[pps.propertyId] = pps.values
+				logger.notice("Using product property defaults: %s", propertyDefaultValues)
+			except Exception as err:  # pylint: disable=broad-except
+				logger.warning("Failed to get product property defaults: %s", err)
+
+			logger.info("Installing package '%s'", packageFile)
+			backend.depot_installPackage(  # pylint: disable=no-member
+				filename=packageFile, propertyDefaultValues=propertyDefaultValues, tempDir=self.config.get("tempdir", "/tmp")
+			)
+			productOnDepots = backend.productOnDepot_getObjects(  # pylint: disable=no-member
+				depotId=self.depotId, productId=package["productId"]
+			)
+			if not productOnDepots:
+				raise ValueError(f"Product '{package['productId']}' not found on depot '{self.depotId}' after installation")
+			package["product"] = backend.product_getObjects(  # pylint: disable=no-member
+				id=productOnDepots[0].productId,
+				productVersion=productOnDepots[0].productVersion,
+				packageVersion=productOnDepots[0].packageVersion,
+			)[0]
+		except Exception as err:  # pylint: disable=broad-except
+			if not self.config.get("ignoreErrors"):
+				raise
+			logger.error("Ignoring error for package %s: %s", package["productId"], err, exc_info=True)
+			notifier.appendLine(f"Ignoring error for package {package['productId']}: {err}")
+			return False
+
+		message = f"Package '{packageFile}' successfully installed"
+		notifier.appendLine(message, pre="\n")
+		logger.notice(message)
+		return True
+
 	def _getNotifier(self):
 		if not self.config["notification"]:
 			return DummyNotifier()
@@ -488,7 +569,7 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 			logger.warning("%s: Cannot verify download of package: missing md5sum file", availablePackage["productId"])
 			return True
 
-		md5 = md5sum(packageFile)
+		md5 = md5sum(packageFile, cache=self.getChecksumCache())
 		if md5 != availablePackage["md5sum"]:
 			logger.info("%s: md5sum mismatch, package download failed", availablePackage["productId"])
 			return False
@@ -524,7 +605,7 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 			and localPackageFound["md5sum"] == availablePackage["md5sum"]
 		):
 			# Recalculate md5sum
-			localPackageFound["md5sum"] = md5sum(localPackageFound["packageFile"])
+			localPackageFound["md5sum"] = md5sum(localPackageFound["packageFile"], cache=self.getChecksumCache())
 			if localPackageFound["md5sum"] == availablePackage["md5sum"]:
 				logger.info(
 					"%s - download of package is not required: found local package %s with matching md5sum",
@@ -600,47 +681,104 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 		)
 		return False
 
-	def get_packages(self, notifier, all_packages=False):  # pylint: disable=too-many-locals
+	def get_packages(self, notifier, all_packages=False):
+		"""
+		Download and verify the packages which need to be processed.
+
+		:param all_packages: Process all available packages, not only \
+the ones which need to be installed.
+		:returns: The downloaded packages.
+		:rtype: [{}]
+		"""
+		plannedPackages = self.get_planned_packages(all_packages=all_packages)
+		return [package for package, error in self.iter_downloaded_packages(plannedPackages, notifier) if not error]
+
+	def get_planned_packages(self, all_packages=False):
+		"""
+		Get the packages which need to be processed.
+
+		:returns: Tuples of the available package and the matching local \
+package or `None`.
+		:rtype: [({}, {})]
+		"""
 		installedProducts = self.getInstalledProducts()
 		localPackages = self.getLocalPackages()
 		packages_per_repository = self.get_new_packages_per_repository()
-		newPackages = []
+		plannedPackages = []
 		if not any(packages_per_repository.values()):
 			logger.warning("No downloadable packages found")
-			return newPackages
+			return plannedPackages
 
 		for repository, downloadablePackages in packages_per_repository.items():
 			logger.debug("Processing downloadable packages on repository %s", repository)
-			with self.makeSession(repository) as session:
-				for availablePackage in downloadablePackages:
-					logger.debug("Processing available package %s", availablePackage)
+			for availablePackage in downloadablePackages:
+				logger.debug("Processing available package %s", availablePackage)
+				# This ís called to keep the logs consistent
+				product = self.get_installed_package(availablePackage, installedProducts)
+				if not all_packages and not self.is_install_needed(availablePackage, product):
+					continue
+				plannedPackages.append((availablePackage, self.get_local_package(availablePackage, localPackages)))
+		return plannedPackages
+
+	def iter_downloaded_packages(self, plannedPackages, notifier):
+		"""
+		Download and verify the planned packages concurrently.
+
+		Yields `(package, error)` as soon as a package is done, `error` \
+is `None` if the package was downloaded and verified. Failed packages \
+are only yielded if errors are ignored, otherwise the error is raised.
+
+		:param plannedPackages: Packages as returned by `get_planned_packages`.
+		"""
+		# Open the cache before it is shared by the download threads
+		self.getChecksumCache()
+		scheduler = DownloadScheduler(
+			maxWorkers=self.config.get("maxConcurrentDownloads", 1),
+			groupLimits={package["repository"]: package["repository"].maxConcurrentDownloads for package, _local in plannedPackages},
+			retries=self.config.get("downloadRetries", 0),
+			retryDelay=self.config.get("downloadRetryDelay", 0),
+		)
+		jobs = [
+			DownloadJob(
+				availablePackage["filename"],
+				availablePackage["repository"],
+				partial(self._fetchPackage, availablePackage, localPackageFound, notifier),
+				data=availablePackage,
+			)
+			for availablePackage, localPackageFound in plannedPackages
+		]
+		transferring = {availablePackage["filename"] for availablePackage, _local in plannedPackages}
+		with closing(scheduler.run(jobs)) as results:
+			for job, _result, error in results:
+				availablePackage = job.data
+				transferring.discard(availablePackage["filename"])
+				if not error:
 					try:
-						# This ís called to keep the logs consistent
-						product = self.get_installed_package(availablePackage, installedProducts)
-						if not all_packages and not self.is_install_needed(availablePackage, product):
-							continue
+						self.cleanupPackages(availablePackage, keepFiles=transferring)
+					except Exception as err:  # pylint: disable=broad-except
+						error = err
 
-						localPackageFound = self.get_local_package(availablePackage, localPackages)
-						zsync = self._useZsync(session, availablePackage, localPackageFound)
-						if self.is_download_needed(localPackageFound, availablePackage, notifier=notifier):
-							self.get_package(availablePackage, localPackageFound, session, zsync=zsync, notifier=notifier)
-						packageFile = os.path.join(self.config["packageDir"], availablePackage["filename"])
-						verified = self._verifyDownloadedPackage(packageFile, availablePackage)
-						if not verified and zsync:
-							logger.warning("%s: zsync download has failed, trying full download", availablePackage["productId"])
-							self.get_package(availablePackage, localPackageFound, session, zsync=False, notifier=notifier)
-							verified = self._verifyDownloadedPackage(packageFile, availablePackage)
-						if not verified:
-							raise HashsumMissmatchError(f"{availablePackage['productId']}: md5sum mismatch")
-						self.cleanupPackages(availablePackage)
-						newPackages.append(availablePackage)
-					except Exception as exc:  # pylint: disable=broad-except
-						if self.config.get("ignoreErrors"):
-							logger.error("Ignoring Error for package %s: %s", availablePackage["productId"], exc, exc_info=True)
-							notifier.appendLine(f"Ignoring Error for package {availablePackage['productId']}: {exc}")
-						else:
-							raise exc
-		return newPackages
+				if error:
+					if not self.config.get("ignoreErrors"):
+						raise error
+					logger.error("Ignoring Error for package %s: %s", availablePackage["productId"], error, exc_info=error)
+					notifier.appendLine(f"Ignoring Error for package {availablePackage['productId']}: {error}")
+				yield availablePackage, error
+
+	def _fetchPackage(self, availablePackage, localPackageFound, notifier):
+		with self.makeSession(availablePackage["repository"]) as session:
+			zsync = self._useZsync(session, availablePackage, localPackageFound)
+			if self.is_download_needed(localPackageFound, availablePackage, notifier=notifier):
+				self.get_package(availablePackage, localPackageFound, session, zsync=zsync, notifier=notifier)
+			packageFile = os.path.join(self.config["packageDir"], availablePackage["filename"])
+			verified = self._verifyDownloadedPackage(packageFile, availablePackage)
+			if not verified and zsync:
+				logger.warning("%s: zsync download has failed, trying full download", availablePackage["productId"])
+				self.get_package(availablePackage, localPackageFound, session, zsync=False, notifier=notifier)
+				verified = self._verifyDownloadedPackage(packageFile, availablePackage)
+			if not verified:
+				raise HashsumMissmatchError(f"{availablePackage['productId']}: md5sum mismatch")
+		return availablePackage
 
 	def get_package(self, availablePackage, localPackageFound, session, notifier=None, zsync=True):  # pylint: disable=too-many-arguments
 		packageFile = os.path.join(self.config["packageDir"], availablePackage["filename"])
@@ -684,53 +822,56 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 
 	def zsyncPackage(self, availablePackage, packageFile):  # pylint: disable=too-many-locals
 		repository = availablePackage["repository"]
-		with cd(os.path.dirname(packageFile)):
-			logger.info("Zsyncing %s to %s", availablePackage["packageFile"], packageFile)
-
-			url = availablePackage["zsyncFile"]
-			if repository.username:
-				quoted_password = quote(repository.password)
-				secret_filter.add_secrets(quoted_password)
-				auth = f"{quote(repository.username)}:{quoted_password}"
-				tmp = url.split("://", 1)
-				url = f"{tmp[0]}://{auth}@{tmp[1]}"
-			cmd = [self.config["zsyncCommand"], "-o", packageFile, url]
-
-			env = System.get_subprocess_environment()
-			if repository.proxy:
-				if repository.proxy != "system":
-					env.update({"http_proxy": repository.proxy, "https_proxy": repository.proxy})
-			else:
-				env.update({"http_proxy": "", "https_proxy": "", "no_proxy": "*"})
-
-			stateRegex = re.compile(r"\s([\d.]+)%\s+([\d.]+)\skBps(.*)$")
-			data = b""
-			buffer = b""
-			exit_code = 0
-			percent = 0
-			logger.info("Executing zsync command %r with env %r", cmd, env)
-			with subprocess.Popen(
-				cmd, shell=False, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env
-			) as proc:
-				while True:
-					inp = proc.stdout.read(16)
-					if inp:
-						data += inp
-						buffer += inp
-						match = stateRegex.search(buffer.decode("utf-8", "replace"))
-						if match:
-							buffer = match.group(3).encode()
-							new_percent = float(match.group(1))
-							speed = float(match.group(2)) * 8
-							if percent != new_percent:
-								percent = new_percent
-								logger.info("Zsyncing %s: %d%% (%d kbit/s)", availablePackage["packageFile"], percent, speed)
-					exit_code = proc.poll()
-					if exit_code is not None:
-						break
-			if exit_code != 0:
-				data = data.decode("utf-8", "replace")
-				raise RuntimeError(f"Command {cmd} failed with exit code {exit_code}: {data}")
+		# Run zsync in the package directory without changing the working
+		# directory of the process, packages are downloaded in parallel
+		packageFile = os.path.abspath(packageFile)
+		workingDirectory = os.path.dirname(packageFile)
+		logger.info("Zsyncing %s to %s", availablePackage["packageFile"], packageFile)
+
+		url = availablePackage["zsyncFile"]
+		if repository.username:
+			quoted_password = quote(repository.password)
+			secret_filter.add_secrets(quoted_password)
+			auth = f"{quote(repository.username)}:{quoted_password}"
+			tmp = url.split("://", 1)
+			url = f"{tmp[0]}://{auth}@{tmp[1]}"
+		cmd = [self.config["zsyncCommand"], "-o", packageFile, url]
+
+		env = System.get_subprocess_environment()
+		if repository.proxy:
+			if repository.proxy != "system":
+				env.update({"http_proxy": repository.proxy, "https_proxy": repository.proxy})
+		else:
+			env.update({"http_proxy": "", "https_proxy": "", "no_proxy": "*"})
+
+		stateRegex = re.compile(r"\s([\d.]+)%\s+([\d.]+)\skBps(.*)$")
+		data = b""
+		buffer = b""
+		exit_code = 0
+		percent = 0
+		logger.info("Executing zsync command %r with env %r", cmd, env)
+		with subprocess.Popen(
+			cmd, shell=False, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env, cwd=workingDirectory
+		) as proc:
+			while True:
+				inp = proc.stdout.read(16)
+				if inp:
+					data += inp
+					buffer += inp
+					match = stateRegex.search(buffer.decode("utf-8", "replace"))
+					if match:
+						buffer = match.group(3).encode()
+						new_percent = float(match.group(1))
+						speed = float(match.group(2)) * 8
+						if percent != new_percent:
+							percent = new_percent
+							logger.info("Zsyncing %s: %d%% (%d kbit/s)", availablePackage["packageFile"], percent, speed)
+				exit_code = proc.poll()
+				if exit_code is not None:
+					break
+		if exit_code != 0:
+			data = data.decode("utf-8", "replace")
+			raise RuntimeError(f"Command {cmd} failed with exit code {exit_code}: {data}")
 
 	def downloadPackage(self, availablePackage, session, notifier=None):  # pylint: disable=too-many-locals
 		url = availablePackage["packageFile"]
@@ -763,6 +904,7 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 			for attempt in range(1, 11):  # pylint: disable=too-many-nested-blocks
 				try:
 					for chunk in response.iter_content(chunk_size=32768):
+						self.bandwidthLimiter.consume(len(chunk))
 						position += len(chunk)
 						out.write(chunk)
 
@@ -804,7 +946,13 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 		if notifier:
 			notifier.appendLine(message)
 
-	def cleanupPackages(self, newPackage):
+	def cleanupPackages(self, newPackage, keepFiles=()):
+		"""
+		Remove obsolete files of `newPackage` and create its md5 and zsync files.
+
+		:param keepFiles: Names of packages still being transferred, \
+their zsync leftovers are kept.
+		"""
 		logger.info("Cleaning up in %s", self.config["packageDir"])
 
 		try:
@@ -817,7 +965,8 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 			if not os.path.isfile(path):
 				continue
 			if path.endswith(".zs-old"):
-				os.unlink(path)
+				if filename[:-7] not in keepFiles:
+					os.unlink(path)
 				continue
 
 			try:
@@ -836,7 +985,7 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 		logger.info("Creating md5sum file '%s'", md5sumFile)
 
 		with open(md5sumFile, mode="w", encoding="utf-8") as hashFile:
-			hashFile.write(md5sum(packageFile))
+			hashFile.write(md5sum(packageFile, cache=self.getChecksumCache()))
 
 		setRights(md5sumFile)
 
@@ -866,7 +1015,11 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 		return newestPackages
 
 	def getLocalPackages(self):
-		return getLocalPackages(self.config["packageDir"], forceChecksumCalculation=self.config["forceChecksumCalculation"])
+		return getLocalPackages(
+			self.config["packageDir"],
+			forceChecksumCalculation=self.config["forceChecksumCalculation"],
+			checksumCache=self.getChecksumCache(),
+		)
 
 	def getInstalledProducts(self):
 		logger.info("Getting installed products")
@@ -1029,7 +1182,7 @@ class OpsiPackageUpdater:  # pylint: disable=too-many-public-methods
 			session.close()
 
 
-def getLocalPackages(packageDirectory, forceChecksumCalculation=False):
+def getLocalPackages(packageDirectory, forceChecksumCalculation=False, checksumCache=None):
 	"""
 	Show what packages are available in the given `packageDirectory`.
 
@@ -1041,6 +1194,7 @@ def getLocalPackages(packageDirectory, forceChecksumCalculation=False):
 `.md5` of a package will be used. If this is `True` then the checksum \
 will be calculated for each package independent of the possible \
 existance of a corresponding `.md5` file.
+	:param checksumCache: `ChecksumCache` used when calculating checksums.
 	:returns: Information about the found opsi packages. For each \
 package there will be the following information: _productId_, \
 _version_, _packageFile_ (complete path), _filename_ and _md5sum_.
@@ -1064,7 +1218,7 @@ _version_, _packageFile_ (complete path), _filename_ and _md5sum_.
 					packageMd5 = hashFile.read().strip()
 			else:
 				logger.debug("Calculating checksum for %s", packageFile)
-				packageMd5 = md5sum(packageFile)
+				packageMd5 = md5sum(packageFile, cache=checksumCache)
 
 			packageInfo = {
 				"productId": forceProductId(productId),
@@ -20,8 +20,11 @@ import random
 import re
 import shutil
 import socket
+import sqlite3
 import struct
 import sys
+import threading
+import time
 from collections import namedtuple
 from functools import lru_cache
 from hashlib import md5
@@ -63,6 +66,7 @@ __all__ = (
 	"UNIT_REGEX",
 	"CryptoError",
 	"BlowfishError",
+	"ChecksumCache",
 	"PickleString",
 	"blowfishDecrypt",
 	"blowfishEncrypt",
@@ -157,8 +161,15 @@ def formatFileSize(sizeInBytes, base: int = 2):  # pylint: disable=too-many-retu
 	return f"{sizeInBytes / 1_099_511_627_776:0.0f}TiB"
 
 
-def md5sum(filename):
-	"""Returns the md5sum of the given file."""
+def md5sum(filename, cache=None):
+	"""
+	Returns the md5sum of the given file.
+
+	:param cache: A `ChecksumCache` to look up and store the checksum.
+	"""
+	if cache:
+		return cache.md5sum(filename)
+
 	md5object = md5()
 
 	with open(filename, "rb") as fileToHash:
@@ -168,6 +179,76 @@ def md5sum(filename):
 	return md5object.hexdigest()
 
 
+class ChecksumCache:
+	"""
+	Persistent cache of file md5sums.
+
+	Path, size, mtime_ns and inode of every hashed file are stored with
+	the checksum in a SQLite database. A cached checksum is used as long
+	as the stat data of the file is unchanged.
+	"""
+
+	DEFAULT_FILENAME = ".opsi_checksums.sqlite"
+	# Files modified this recently can change again within the timestamp resolution
+	MIN_AGE_NS = 2_000_000_000
+
+	def __init__(self, filename):
+		self.filename = forceFilename(filename)
+		self._lock = threading.Lock()
+		self._db = sqlite3.connect(self.filename, timeout=30, check_same_thread=False, isolation_level=None)
+		self._db.execute("PRAGMA synchronous = NORMAL")
+		self._db.execute(
+			"CREATE TABLE IF NOT EXISTS checksum "
+			"(path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL, md5 TEXT NOT NULL)"
+		)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def close(self):
+		with self._lock:
+			self._db.close()
+
+	@staticmethod
+	def _getStat(path):
+		fileStat = os.stat(path)
+		return (fileStat.st_size, fileStat.st_mtime_ns, fileStat.st_ino)
+
+	def md5sum(self, filename):
+		path = os.path.abspath(filename)
+		stat = self._getStat(path)
+		with self._lock:
+			row = self._db.execute("SELECT size, mtime_ns, inode, md5 FROM checksum WHERE path = ?", (path,)).fetchone()
+		if row and tuple(row[:3]) == stat:
+			logger.trace("Using cached md5sum of '%s'", path)
+			return row[3]
+
+		checksum = md5sum(path)
+		if time.time_ns() - stat[1] < self.MIN_AGE_NS or self._getStat(path) != stat:
+			logger.debug("Not caching md5sum of recently modified file '%s'", path)
+			return checksum
+
+		with self._lock:
+			self._db.execute("INSERT OR REPLACE INTO checksum VALUES (?, ?, ?, ?, ?)", (path, *stat, checksum))
+		return checksum
+
+	def remove(self, filename):
+		with self._lock:
+			self._db.execute("DELETE FROM checksum WHERE path = ?", (os.path.abspath(filename),))
+
+	def purge(self):
+		"""Remove the entries of files which do not exist anymore."""
+		with self._lock:
+			paths = [row[0] for row in self._db.execute("SELECT path FROM checksum")]
+		missing = [(path,) for path in paths if not os.path.exists(path)]
+		if missing:
+			with self._lock:
+				self._db.executemany("DELETE FROM checksum WHERE path = ?", missing)
+
+
 def randomString(length, characters=_ACCEPTED_CHARACTERS):
 	"""
 	Generates a random string for a given length.
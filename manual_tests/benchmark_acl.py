@@ -0,0 +1,85 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) uib GmbH <info@uib.de>
+# License: AGPL-3.0
+"""
+Micro-benchmark for access control checks of protected backend methods.
+"""
+
+import argparse
+import time
+
+from OPSI.Backend.Manager.AccessControl import BackendAccessControl, UserStore
+from OPSI.Object import OpsiClient
+
+ACL = [
+	[r"^backend_.*", [{"type": "sys_group", "ids": ["opsiadmin"], "denyAttributes": [], "allowAttributes": []}]],
+	[r"^config_.*", [{"type": "sys_group", "ids": ["opsiadmin"], "denyAttributes": [], "allowAttributes": []}]],
+	[r"^product_.*", [{"type": "sys_group", "ids": ["opsiadmin"], "denyAttributes": [], "allowAttributes": []}]],
+	[r"^productOnClient_.*", [{"type": "sys_group", "ids": ["opsiadmin"], "denyAttributes": [], "allowAttributes": []}]],
+	[r"^host_get.*", [
+		{"type": "sys_group", "ids": ["opsiadmin"], "denyAttributes": [], "allowAttributes": []},
+		{"type": "opsi_client", "ids": [], "denyAttributes": ["opsiHostKey"], "allowAttributes": []},
+	]],
+	[r".*", [{"type": "sys_group", "ids": ["opsiadmin"], "denyAttributes": [], "allowAttributes": []}]],
+]
+
+
+class FakeBackend:
+	def __init__(self, hosts):
+		self.hosts = hosts
+
+	def host_getObjects(self, attributes=None, **filter):  # pylint: disable=redefined-builtin,unused-argument
+		return list(self.hosts)
+
+
+class FakeAuthModule:  # pylint: disable=too-few-public-methods
+	def get_admin_groupname(self):  # pylint: disable=no-self-use
+		return "opsiadmin"
+
+
+def createAccessControl(hosts, cacheSize, asClient):
+	userStore = UserStore()
+	userStore.authenticated = True
+	if asClient:
+		userStore.username = hosts[0].id
+		userStore.host = hosts[0]
+	else:
+		userStore.username = "adminuser"
+		userStore.userGroups = {"opsiadmin"}
+
+	return BackendAccessControl(
+		backend=FakeBackend(hosts),
+		acl=[list(entry) for entry in ACL],
+		user_store=userStore,
+		auth_module=FakeAuthModule(),
+		aclDecisionCacheSize=cacheSize,
+	)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Call a protected backend method many times.")
+	parser.add_argument("--calls", type=int, default=100000, help="Number of protected calls.")
+	parser.add_argument("--hosts", type=int, default=1, help="Number of objects returned by every call.")
+	args = parser.parse_args()
+
+	hosts = [
+		OpsiClient(id=f"client{index}.test.invalid", opsiHostKey="00000000000000000000000000000000")
+		for index in range(args.hosts)
+	]
+	for asClient in (False, True):
+		for cacheSize in (0, BackendAccessControl.ACL_DECISION_CACHE_SIZE):
+			accessControl = createAccessControl(hosts, cacheSize, asClient)
+			start = time.perf_counter()
+			for _ in range(args.calls):
+				accessControl.host_getObjects()
+			duration = time.perf_counter() - start
+			print(
+				f"{'Client' if asClient else 'Admin'} with decision cache {'enabled' if cacheSize else 'disabled'}: "
+				f"{args.calls} calls in {duration:0.3f}s ({duration / args.calls * 1000000:0.2f}us per call)"
+			)
+
+
+if __name__ == "__main__":
+	main()
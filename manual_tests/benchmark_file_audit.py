@@ -0,0 +1,85 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) uib GmbH <info@uib.de>
+# License: AGPL-3.0
+"""
+Benchmark for storing audit software in the file backend.
+"""
+
+import argparse
+import grp
+import os
+import pwd
+import tempfile
+import time
+
+from OPSI.Backend.File import FileBackend
+from OPSI.Object import AuditSoftware, AuditSoftwareOnClient, OpsiClient
+
+
+def createBackend(tempDir):
+	baseDir = os.path.join(tempDir, "config")
+	os.makedirs(baseDir)
+	backend = FileBackend(
+		baseDir=baseDir,
+		hostKeyFile=os.path.join(tempDir, "pckeys"),
+		fileUserName=pwd.getpwuid(os.getuid())[0],
+		fileGroupName=grp.getgrgid(os.getgid())[0],
+	)
+	backend.backend_createBase()
+	return backend
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Insert audit software into a file backend.")
+	parser.add_argument("--entries", type=int, default=100000, help="Number of audit software entries.")
+	parser.add_argument("--client-entries", type=int, default=2000, help="Number of audit software entries of one client.")
+	parser.add_argument("--report", type=int, default=10000, help="Print the progress every REPORT entries.")
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as tempDir:
+		backend = createBackend(tempDir)
+
+		start = time.perf_counter()
+		lastReport = start
+		for index in range(args.entries):
+			backend.auditSoftware_insertObject(
+				AuditSoftware(
+					name=f"software{index}", version="1.0", subVersion="", language="en", architecture="x64",
+					windowsDisplayName=f"Software {index}"
+				)
+			)
+			if (index + 1) % args.report == 0:
+				now = time.perf_counter()
+				print(f"Inserted {index + 1} entries, last {args.report} in {now - lastReport:0.3f}s")
+				lastReport = now
+		duration = time.perf_counter() - start
+		print(f"Inserted {args.entries} entries in {duration:0.3f}s ({duration / args.entries * 1000000:0.2f}us per entry)")
+
+		start = time.perf_counter()
+		for index in range(0, args.entries, max(1, args.entries // 1000)):
+			backend.auditSoftware_getObjects(
+				name=f"software{index}", version="1.0", subVersion="", language="en", architecture="x64"
+			)
+		print(f"Read single entries in {time.perf_counter() - start:0.3f}s")
+
+		start = time.perf_counter()
+		count = len(backend.auditSoftware_getObjects())
+		print(f"Read all {count} entries in {time.perf_counter() - start:0.3f}s")
+
+		client = OpsiClient(id="client.test.invalid")
+		backend.host_insertObject(client)
+		start = time.perf_counter()
+		for index in range(args.client_entries):
+			backend.auditSoftwareOnClient_insertObject(
+				AuditSoftwareOnClient(
+					name=f"software{index}", version="1.0", subVersion="", language="en", architecture="x64", clientId=client.id
+				)
+			)
+		duration = time.perf_counter() - start
+		print(f"Inserted {args.client_entries} entries of one client in {duration:0.3f}s")
+
+
+if __name__ == "__main__":
+	main()
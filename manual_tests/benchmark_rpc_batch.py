@@ -0,0 +1,64 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) uib GmbH <info@uib.de>
+# License: AGPL-3.0
+"""
+Benchmark for executing a batch of read-only rpcs serially and in parallel.
+"""
+
+import argparse
+import time
+
+from twisted.internet import defer, task
+
+from OPSI.Service.JsonRpc import JsonRpc
+from OPSI.Service.Worker import WorkerOpsiJsonRpc
+
+
+class FakeBackend:
+	def __init__(self, delay):
+		self.delay = delay
+
+	def host_getObjects(self, id=None):  # pylint: disable=invalid-name,redefined-builtin
+		time.sleep(self.delay)
+		return [id]
+
+
+INTERFACE = [{"name": "host_getObjects", "args": ["self", "id"], "varargs": None, "keywords": None, "defaults": None}]
+
+
+def createWorker(rpcCount, backend, parallel, maxParallel):
+	worker = WorkerOpsiJsonRpc(service=None, request=None, resource=None)
+	worker.parallelRpcs = parallel
+	worker.maxParallelRpcs = maxParallel
+	worker._rpcs = [  # pylint: disable=protected-access
+		JsonRpc(backend, INTERFACE, {"id": index + 1, "method": "host_getObjects", "params": [f"client{index}.test.invalid"]})
+		for index in range(rpcCount)
+	]
+	return worker
+
+
+async def run(reactor, args):  # pylint: disable=unused-argument
+	backend = FakeBackend(args.delay)
+	for parallel in (False, True):
+		worker = createWorker(args.rpcs, backend, parallel, args.max_parallel)
+		start = time.perf_counter()
+		await worker._executeRpcs(None)  # pylint: disable=protected-access
+		duration = time.perf_counter() - start
+		mode = f"parallel (max {args.max_parallel})" if parallel else "serial"
+		print(f"Executed {args.rpcs} rpcs {mode} in {duration:0.3f}s")
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Execute a batch of rpcs serially and in parallel.")
+	parser.add_argument("--rpcs", type=int, default=200, help="Number of rpcs in the batch.")
+	parser.add_argument("--delay", type=float, default=0.005, help="Time every rpc takes in seconds.")
+	parser.add_argument("--max-parallel", type=int, default=WorkerOpsiJsonRpc.MAX_PARALLEL_RPCS, help="Concurrency limit.")
+	args = parser.parse_args()
+
+	task.react(lambda reactor: defer.ensureDeferred(run(reactor, args)))
+
+
+if __name__ == "__main__":
+	main()
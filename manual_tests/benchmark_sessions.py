@@ -0,0 +1,54 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) uib GmbH <info@uib.de>
+# License: AGPL-3.0
+"""
+Benchmark for creating and touching many sessions.
+"""
+
+import argparse
+import threading
+import time
+
+from OPSI.Service.Session import SessionHandler
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Create and touch sessions of a SessionHandler.")
+	parser.add_argument("--sessions", type=int, default=100000, help="Number of sessions to create.")
+	parser.add_argument("--touches", type=int, default=3, help="How often every session is touched.")
+	args = parser.parse_args()
+
+	handler = SessionHandler(sessionMaxInactiveInterval=3600)
+	try:
+		start = time.perf_counter()
+		sessions = [handler.createSession() for _ in range(args.sessions)]
+		created = time.perf_counter() - start
+		print(f"Created {args.sessions} sessions in {created:0.3f}s ({threading.active_count()} threads)")
+
+		start = time.perf_counter()
+		for _ in range(args.touches):
+			for session in sessions:
+				session.touch()
+		touched = time.perf_counter() - start
+		touchCount = args.sessions * args.touches
+		print(
+			f"Touched sessions {touchCount} times in {touched:0.3f}s "
+			f"({touched / touchCount * 1000000:0.2f}us per touch, {threading.active_count()} threads)"
+		)
+
+		start = time.perf_counter()
+		for session in sessions:
+			session.increaseUsageCount()
+			session.decreaseUsageCount()
+		used = time.perf_counter() - start
+		print(f"Used every session once in {used:0.3f}s")
+	finally:
+		start = time.perf_counter()
+		handler.deleteAllSessions()
+		print(f"Deleted all sessions in {time.perf_counter() - start:0.3f}s")
+
+
+if __name__ == "__main__":
+	main()
@@ -109,3 +109,44 @@ def fakeGlobalConf(fqdn="opsi.test.invalid", dir=None):  # pylint: disable=redef
 			conf.write("[global]\n")
 			conf.write(f"hostname = {fqdn}\n")
 		yield configPath
+
+
+@contextmanager
+def countQueries(backend):
+	"""
+	Collect the SQL statements executed by `backend` during the context.
+
+	Yields a list that is filled with the executed statements.
+	Statements setting up a connection (`SET ...`) are not collected.
+
+	:param backend: A SQL backend, not an extended or wrapped backend.
+	"""
+	# Lazy imports to not hinder other tests.
+	from sqlalchemy.event import listen, remove  # pylint: disable=import-outside-toplevel
+
+	statements = []
+
+	def collectStatement(conn, cursor, statement, *_):  # pylint: disable=unused-argument
+		if not statement.lstrip().upper().startswith("SET "):
+			statements.append(statement)
+
+	engine = backend._sql.engine  # pylint: disable=protected-access
+	listen(engine, "before_cursor_execute", collectStatement)
+	try:
+		yield statements
+	finally:
+		remove(engine, "before_cursor_execute", collectStatement)
+
+
+@contextmanager
+def assertQueryCount(backend, expected):
+	"""
+	Assert that `backend` executes exactly `expected` SQL statements \
+during the context.
+
+	See `countQueries` for details.
+	"""
+	with countQueries(backend) as statements:
+		yield statements
+
+	assert len(statements) == expected, f"Expected {expected} queries but {len(statements)} were made: {statements}"
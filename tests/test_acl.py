@@ -21,6 +21,7 @@ from .test_backend_replicator import (fillBackendWithHosts,
 	fillBackendWithProducts, fillBackendWithProductOnClients)
 from .test_hosts import getClients
 from .test_products import getProducts
+from .test_software_and_hardware_audit import getAuditHardwareOnHost
 
 
 def testParsingBackendACLFile(tempDir):
@@ -400,3 +401,205 @@ def testAccessingSelfProductOnClients(extendedConfigDataBackend):
 
 	with pytest.raises(Exception):
 		backend.productOnClient_updateObjects(productOnClient)
+
+
+def testAccessDecisionsAreCached(extendedConfigDataBackend):
+	backend = extendedConfigDataBackend
+	_, _, clients = fillBackendWithHosts(backend)
+	client1 = clients[0]
+
+	backendAccessControl = BackendAccessControl(
+		username=client1.id,
+		password=client1.opsiHostKey,
+		backend=backend,
+		acl=[
+			['host_getObjects', [{'type': 'opsi_client', 'ids': [client1.id], 'denyAttributes': [], 'allowAttributes': []}]],
+			['config_getObjects', [{'type': 'self', 'ids': [], 'denyAttributes': [], 'allowAttributes': []}]],
+		]
+	)
+
+	resolved = []
+	resolveAccess = backendAccessControl._resolveAccess
+
+	def countingResolveAccess(methodName):
+		resolved.append(methodName)
+		return resolveAccess(methodName)
+
+	backendAccessControl._resolveAccess = countingResolveAccess
+
+	for _ in range(3):
+		backendAccessControl.host_getObjects()
+		with pytest.raises(BackendPermissionDeniedError):
+			backendAccessControl.group_getObjects()
+
+	assert ['host_getObjects', 'group_getObjects'] == resolved
+
+	backendAccessControl.user_store.username = clients[1].id
+	backendAccessControl.config_getObjects()
+	backendAccessControl.config_getObjects()
+	assert ['host_getObjects', 'group_getObjects', 'config_getObjects'] == resolved
+
+
+def testDisablingAccessDecisionCache(extendedConfigDataBackend):
+	backend = extendedConfigDataBackend
+	configServer, _, _ = fillBackendWithHosts(backend)
+
+	backendAccessControl = BackendAccessControl(
+		username=configServer.id,
+		password=configServer.opsiHostKey,
+		backend=backend,
+		aclDecisionCacheSize=0,
+		acl=[['.*', [{'type': 'opsi_depotserver', 'ids': [], 'denyAttributes': [], 'allowAttributes': []}]]]
+	)
+
+	backendAccessControl.host_getObjects()
+	assert not backendAccessControl._aclDecisionCache
+
+
+def testFullAccessReturnsObjectsUnchanged(extendedConfigDataBackend):
+	backend = extendedConfigDataBackend
+	_, _, clients = fillBackendWithHosts(backend)
+	client1 = clients[0]
+
+	backendAccessControl = BackendAccessControl(
+		username=client1.id,
+		password=client1.opsiHostKey,
+		backend=backend,
+		acl=[['host_getObjects', [{'type': 'self', 'ids': [], 'denyAttributes': [], 'allowAttributes': []}]]]
+	)
+
+	hosts = backendAccessControl.host_getObjects()
+	assert [client1.id] == [host.id for host in hosts]
+	assert client1.opsiHostKey == hosts[0].opsiHostKey
+
+
+@pytest.mark.parametrize("requestedAttributes, expectedAttributes", [
+	([], ['description', 'id', 'notes', 'type']),
+	(['id', 'opsiHostKey', 'notes'], ['id', 'notes']),
+	(['opsiHostKey'], ['id']),
+])
+def testRestrictedAttributesAreNotRequestedFromBackend(extendedConfigDataBackend, requestedAttributes, expectedAttributes):
+	backend = extendedConfigDataBackend
+	configServer, _, _ = fillBackendWithHosts(backend)
+
+	allowAttributes = ['type', 'id', 'description', 'notes']
+	backendAccessControl = BackendAccessControl(
+		backend=backend,
+		username=configServer.id,
+		password=configServer.opsiHostKey,
+		acl=[['.*', [{'type': 'opsi_depotserver', 'ids': [], 'denyAttributes': [], 'allowAttributes': allowAttributes}]]]
+	)
+
+	requests = []
+	getHosts = backend.host_getObjects
+
+	def recordingGetHosts(attributes=[], **filter):
+		requests.append(attributes)
+		return getHosts(attributes=attributes, **filter)
+
+	backend.host_getObjects = recordingGetHosts
+
+	hosts = backendAccessControl.host_getObjects(attributes=requestedAttributes)
+
+	assert [expectedAttributes] == requests
+	assert hosts
+	for host in hosts:
+		assert host.opsiHostKey is None
+
+
+def testDeniedAttributesAreNotRequestedFromBackend(extendedConfigDataBackend):
+	backend = extendedConfigDataBackend
+	configServer, _, clients = fillBackendWithHosts(backend)
+
+	backendAccessControl = BackendAccessControl(
+		backend=backend,
+		username=configServer.id,
+		password=configServer.opsiHostKey,
+		acl=[['.*', [{'type': 'opsi_depotserver', 'ids': [], 'denyAttributes': ['opsiHostKey'], 'allowAttributes': []}]]]
+	)
+
+	requests = []
+	getHosts = backend.host_getObjects
+
+	def recordingGetHosts(attributes=[], **filter):
+		requests.append(list(attributes))
+		return getHosts(attributes=attributes, **filter)
+
+	backend.host_getObjects = recordingGetHosts
+
+	hosts = backendAccessControl.host_getObjects()
+
+	assert len(requests) == 1
+	assert 'opsiHostKey' not in requests[0]
+	assert {'id', 'type', 'lastSeen', 'description'}.issubset(requests[0])
+
+	expected = {client.id: client for client in clients}
+	for host in hosts:
+		assert host.opsiHostKey is None
+		if host.id in expected:
+			assert expected[host.id].lastSeen == host.lastSeen
+
+
+def testAttributesAreNotRestrictedForSelfAccess(extendedConfigDataBackend):
+	backend = extendedConfigDataBackend
+	_, _, clients = fillBackendWithHosts(backend)
+	client1 = clients[0]
+
+	backendAccessControl = BackendAccessControl(
+		username=client1.id,
+		password=client1.opsiHostKey,
+		backend=backend,
+		acl=[['host_getObjects', [{'type': 'self', 'ids': [], 'denyAttributes': ['description'], 'allowAttributes': []}]]]
+	)
+
+	(_granted, acls) = backendAccessControl._resolveAccess('host_getObjects')
+	assert backendAccessControl._getProjectedAttributes('host_getObjects', acls, []) is None
+
+
+def testDenyingAttributesOfRelationships(extendedConfigDataBackend):
+	backend = extendedConfigDataBackend
+	configServer, _, clients = fillBackendWithHosts(backend)
+	products = fillBackendWithProducts(backend)
+	fillBackendWithProductOnClients(backend, products, clients)
+	productOnClients = backend.productOnClient_getObjects()
+
+	backendAccessControl = BackendAccessControl(
+		backend=backend,
+		username=configServer.id,
+		password=configServer.opsiHostKey,
+		acl=[['.*', [{'type': 'opsi_depotserver', 'ids': [], 'denyAttributes': ['actionRequest'], 'allowAttributes': []}]]]
+	)
+
+	expected = {(poc.productId, poc.clientId): poc for poc in productOnClients}
+	filtered = backendAccessControl.productOnClient_getObjects()
+	assert len(productOnClients) == len(filtered)
+	for productOnClient in filtered:
+		assert productOnClient.actionRequest is None
+		original = expected[(productOnClient.productId, productOnClient.clientId)]
+		assert original.installationStatus == productOnClient.installationStatus
+		assert original.productType == productOnClient.productType
+
+
+def testDenyingAttributesKeepsDynamicAttributesOfAuditHardware(extendedConfigDataBackend):
+	backend = extendedConfigDataBackend
+	configServer, _, clients = fillBackendWithHosts(backend)
+	auditHardwareOnHosts = getAuditHardwareOnHost(clients=clients)
+	backend.auditHardwareOnHost_getObjects = lambda attributes=[], **filter: [obj.clone() for obj in auditHardwareOnHosts]
+
+	backendAccessControl = BackendAccessControl(
+		backend=backend,
+		username=configServer.id,
+		password=configServer.opsiHostKey,
+		acl=[['.*', [{'type': 'opsi_depotserver', 'ids': [], 'denyAttributes': ['serialNumber'], 'allowAttributes': []}]]]
+	)
+
+	filtered = backendAccessControl.auditHardwareOnHost_getObjects()
+	assert len(auditHardwareOnHosts) == len(filtered)
+	for original, auditHardwareOnHost in zip(auditHardwareOnHosts, filtered):
+		assert auditHardwareOnHost.serialNumber is None
+		originalHash = original.toHash()
+		del originalHash['serialNumber']
+		filteredHash = auditHardwareOnHost.toHash()
+		del filteredHash['serialNumber']
+		assert originalHash == filteredHash
+	assert filtered[0].totalPhysicalMemory == 1073741824
@@ -10,7 +10,8 @@ import os.path
 
 from OPSI.Backend.Backend import temporaryBackendOptions
 from OPSI.Backend.Backend import Backend, ExtendedBackend
-from OPSI.Exceptions import BackendMissingDataError
+from OPSI.Backend.Base import compileObjectHashFilter
+from OPSI.Exceptions import BackendError, BackendMissingDataError
 from OPSI.Object import BoolConfig, OpsiClient, UnicodeConfig
 from OPSI.Util import (
 	BlowfishError, blowfishDecrypt, generateOpsiHostKey, randomString)
@@ -292,3 +293,54 @@ def testSettingUserCredentialsWithDomain(fakeCredentialsBackend, user, password)
 	backend.user_setCredentials(username=user, password=password)
 	credentials = backend.user_getCredentials(username=user)
 	assert password == credentials['password']
+
+
+@pytest.mark.parametrize("objHash, filter, expected", [
+	({"id": "client.test.invalid"}, {"id": "client.test.invalid"}, True),
+	({"id": "client.test.invalid"}, {"id": "other.test.invalid"}, False),
+	({"id": "client.test.invalid"}, {"id": "client*"}, True),
+	({"id": "client.test.invalid"}, {"id": "*.other.invalid"}, False),
+	({"id": "client.test.invalid"}, {"id": ["other.test.invalid", "client.test.invalid"]}, True),
+	({"id": "client.test.invalid"}, {"id": None}, True),
+	({"id": "client.test.invalid"}, {"id": []}, True),
+	({"productVersion": "1.2"}, {"productVersion": ">=1.0"}, True),
+	({"productVersion": "1.2"}, {"productVersion": "<1.0"}, False),
+	({"priority": 10}, {"priority": 10}, True),
+	({"priority": 10}, {"priority": ">5"}, True),
+	({"priority": 10}, {"priority": "<5"}, False),
+	({"groupIds": ["a", "b"]}, {"groupIds": "b"}, True),
+	({"groupIds": ["a", "b"]}, {"groupIds": "c"}, False),
+	({"description": None}, {"description": "text"}, False),
+	({"type": "OpsiClient"}, {"type": "Host"}, True),
+	({"type": "OpsiClient"}, {"type": "OpsiDepotserver"}, False),
+	({"type": "OpsiConfigserver"}, {"type": "OpsiDepotserver"}, True),
+])
+def testObjectHashMatches(objHash, filter, expected):  # pylint: disable=redefined-builtin
+	backend = Backend()
+
+	assert backend._objectHashMatches(objHash, **filter) == expected  # pylint: disable=protected-access
+	assert compileObjectHashFilter(filter)(objHash) == expected
+
+
+def testCompilingObjectHashFilterIsCached():
+	filter = {"id": ["a*", "b"], "type": "OpsiClient"}  # pylint: disable=redefined-builtin
+
+	assert compileObjectHashFilter(filter) is compileObjectHashFilter(dict(filter))
+
+
+def testCompilingFilterDistinguishesEqualValuesOfDifferentTypes():
+	objHash = {"isMasterDepot": True}
+
+	for _ in range(2):
+		assert not compileObjectHashFilter({"isMasterDepot": 1})(objHash)
+		assert compileObjectHashFilter({"isMasterDepot": True})(objHash)
+		assert not compileObjectHashFilter({"isMasterDepot": [1]})(objHash)
+		assert compileObjectHashFilter({"isMasterDepot": [True]})(objHash)
+
+
+def testCompilingFilterWithInvalidTypeFailsOnMatching():
+	matches = compileObjectHashFilter({"type": "NoSuchClass"})
+
+	assert matches({"id": "client.test.invalid"})
+	with pytest.raises(BackendError):
+		matches({"type": "OpsiClient"})
@@ -7,11 +7,14 @@ Testing BackendDispatcher.
 """
 
 import os
+import threading
+import time
 
 import pytest
 
 from OPSI.Backend.BackendManager import BackendDispatcher
 from OPSI.Exceptions import BackendConfigurationError
+from OPSI.Object import OpsiClient
 
 from .Backends.File import getFileBackend
 from .conftest import _backendBase
@@ -53,6 +56,14 @@ def testLoadingDispatchConfig(dispatcher):
 	assert [(u'.*', (u'file', ))] == dispatcher.dispatcher_getConfig()
 
 
+def testDispatchingMethodsThatAreNotExported(dispatcher):
+	methodNames = {method['name'] for method in dispatcher.backend_getInterface()}
+	assert 'host_bulkInsertObjects' not in methodNames
+
+	dispatcher.host_bulkInsertObjects([OpsiClient(id='bulk.test.invalid')])
+	assert ['bulk.test.invalid'] == [host.id for host in dispatcher.host_getObjects()]
+
+
 @pytest.fixture
 def dispatcherBackend(tempDir):
 	"A file backend for dispatching"
@@ -83,3 +94,66 @@ def _patchDispatchConfigForFileBackend(targetDirectory):
 """)
 
 	return dispatchConfigPath
+
+
+class SlowBackend:
+	def __init__(self, result, delay=0.2, error=None):
+		self.result = result
+		self.delay = delay
+		self.error = error
+		self.threads = []
+
+	def host_getObjects(self, **kwargs):
+		self.threads.append(threading.current_thread().name)
+		time.sleep(self.delay)
+		if self.error:
+			raise self.error
+		return list(self.result)
+
+	def backend_exit(self):
+		pass
+
+
+@pytest.fixture
+def concurrentDispatcher(dispatcher):
+	dispatcher._dispatchConcurrency = 2
+	dispatcher._backends = {
+		"first": {"instance": SlowBackend(["a"])},
+		"second": {"instance": SlowBackend(["b"], delay=0.05)},
+	}
+	try:
+		yield dispatcher
+	finally:
+		dispatcher.backend_exit()
+
+
+def testDispatchingConcurrentlyKeepsConfiguredOrder(concurrentDispatcher):
+	start = time.time()
+	result = concurrentDispatcher._dispatchMethod(["first", "second"], "host_getObjects")
+
+	assert ["a", "b"] == result
+	assert time.time() - start < 0.4
+
+	for backend in concurrentDispatcher._backends.values():
+		assert backend["instance"].threads[0].startswith("BackendDispatcher")
+
+
+def testDispatchingSequentialMethods(concurrentDispatcher):
+	concurrentDispatcher._dispatchSequentialMethods = ["^host_"]
+
+	result = concurrentDispatcher._dispatchMethod(["second", "first"], "host_getObjects")
+
+	assert ["b", "a"] == result
+	mainThread = threading.current_thread().name
+	for backend in concurrentDispatcher._backends.values():
+		assert backend["instance"].threads == [mainThread]
+
+
+def testDispatchingConcurrentlyCollectsErrors(concurrentDispatcher):
+	concurrentDispatcher._backends["first"]["instance"].error = ValueError("first failed")
+	concurrentDispatcher._backends["second"]["instance"].error = RuntimeError("second failed")
+
+	with pytest.raises(ValueError) as excinfo:
+		concurrentDispatcher._dispatchMethod(["first", "second"], "host_getObjects")
+
+	assert "second failed" in excinfo.value.__notes__[0]
@@ -171,3 +171,90 @@ def testUpdatingHostTriggersChangeInDHCPDConfiguration(dhcpBackendWithoutLookup)
 
 		assert isMacAddressInConfigFile(clientConfig.newMAC), getMissingInfo(clientConfig.newMAC)
 		assert not isMacAddressInConfigFile(clientConfig.oldMAC)
+
+
+def testUpdatingManyHosts(dhcpBackendWithoutLookup):
+	backend = dhcpBackendWithoutLookup
+	clients = [
+		OpsiClient(id=f'client{index}.test.invalid', hardwareAddress=f'00:01:02:03:04:{index:02x}', ipAddress=f'192.168.99.{index + 10}')
+		for index in range(20)
+	]
+	clients.append(OpsiClient(id='unknown-client.test.invalid', hardwareAddress='00:99:88:77:77:21'))
+
+	with mock.patch.object(backend, '_triggerReload') as triggerReload:
+		with pytest.raises(BackendIOError):
+			backend.dhcpd_updateHosts(clients)
+		assert triggerReload.call_count == 1
+
+	backend._dhcpdConfFile.parse()
+	for client in clients[:-1]:
+		hostConfig = backend._dhcpdConfFile.getHost(client.id.split('.')[0])
+		assert hostConfig['hardware'] == f'ethernet {client.hardwareAddress}'
+		assert hostConfig['fixed-address'] == client.ipAddress
+	assert not backend._dhcpdConfFile.getHost('unknown-client')
+
+
+def testUpdatingHostsRaisesErrorsOfHostsThatCannotBeAdded(dhcpBackendWithoutLookup):
+	backend = dhcpBackendWithoutLookup
+	clients = [
+		OpsiClient(id='client1.test.invalid', hardwareAddress='00:01:02:03:04:01', ipAddress='192.168.99.11'),
+		OpsiClient(id='client2.test.invalid', hardwareAddress='00:01:02:03:04:01', ipAddress='192.168.99.12'),
+	]
+
+	with mock.patch.object(backend, '_triggerReload'):
+		with pytest.raises(BackendIOError) as excinfo:
+			backend.dhcpd_updateHosts(clients)
+
+	assert 'client2' in str(excinfo.value)
+	backend._dhcpdConfFile.parse()
+	assert backend._dhcpdConfFile.getHost('client1')
+	assert not backend._dhcpdConfFile.getHost('client2')
+
+
+def testQueuedHostChangesAreAppliedTogether(dhcpdConf):
+	backend = DHCPDBackend(
+		dhcpdConfigFile=dhcpdConf._filename,
+		reloadConfigCommand=u'/bin/echo "Reloading dhcpd.conf"',
+		updateDelay=60
+	)
+
+	def lookup(hostId):
+		return '192.168.99.{0}'.format(int(hostId.split('.')[0][6:]) + 10)
+
+	with mock.patch('socket.gethostbyname', lookup), mock.patch.object(backend, '_triggerReload') as triggerReload:
+		for index in range(10):
+			backend.host_insertObject(
+				OpsiClient(id=f'client{index}.test.invalid', hardwareAddress=f'00:01:02:03:04:{index:02x}')
+			)
+		backend.host_deleteObjects([OpsiClient(id='client3.test.invalid')])
+
+		with open(dhcpdConf._filename) as config:
+			assert 'client1' not in config.read()
+
+		backend.backend_exit()
+		assert triggerReload.call_count == 1
+
+	backend._dhcpdConfFile.parse()
+	assert backend._dhcpdConfFile.getHost('client1')['fixed-address'] == '192.168.99.11'
+	assert backend._dhcpdConfFile.getHost('client9')['hardware'] == 'ethernet 00:01:02:03:04:09'
+	assert not backend._dhcpdConfFile.getHost('client3')
+
+
+def testQueuedInsertIsMergedWithPartialUpdate(dhcpdConf):
+	backend = DHCPDBackend(
+		dhcpdConfigFile=dhcpdConf._filename,
+		reloadConfigCommand=u'/bin/echo "Reloading dhcpd.conf"',
+		updateDelay=60
+	)
+
+	with mock.patch.object(backend, '_triggerReload'):
+		backend.host_insertObject(
+			OpsiClient(id='client1.test.invalid', hardwareAddress='00:01:02:03:04:05', ipAddress='192.168.99.11')
+		)
+		backend.host_updateObject(OpsiClient(id='client1.test.invalid', ipAddress='192.168.99.12'))
+		backend.backend_exit()
+
+	backend._dhcpdConfFile.parse()
+	host = backend._dhcpdConfFile.getHost('client1')
+	assert host['hardware'] == 'ethernet 00:01:02:03:04:05'
+	assert host['fixed-address'] == '192.168.99.12'
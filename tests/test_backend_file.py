@@ -6,10 +6,15 @@
 Testing the opsi file backend.
 """
 
+import os
+import time
+
 import pytest
 
-from OPSI.Backend.File import FileBackend
+from OPSI.Backend.File import AuditSoftwareFile, FileBackend, FileBackendCache
 from OPSI.Exceptions import BackendConfigurationError
+from OPSI.Object import AuditSoftware, AuditSoftwareOnClient, OpsiClient
+from OPSI.Util.File import IniFile
 
 from .Backends.File import getFileBackend
 
@@ -31,3 +36,122 @@ def testGetDataFailsOnFileBackendBecauseMissingQuerySupport():
 ])
 def testProductFilenamePattern(filename):
 	assert FileBackend.PRODUCT_FILENAME_REGEX.search(filename) is not None
+
+
+def age_backend_files(backend):
+	# Cached values are only used for files which have not been modified recently
+	timestamp = time.time_ns() - 10 * FileBackendCache.MIN_AGE_NS
+	paths = [backend._FileBackend__hostKeyFile]  # pylint: disable=protected-access
+	for root, _dirs, files in os.walk(backend._FileBackend__baseDir):  # pylint: disable=protected-access
+		paths.append(root)
+		paths.extend(os.path.join(root, filename) for filename in files)
+	for path in paths:
+		os.utime(path, ns=(timestamp, timestamp))
+
+
+def test_file_backend_cache_reuses_unchanged_files(monkeypatch):
+	parsed = []
+	parse = IniFile.parse
+
+	def countingParse(self, *args, **kwargs):
+		parsed.append(self.getFilename())
+		return parse(self, *args, **kwargs)
+
+	with getFileBackend() as backend:
+		backend.backend_createBase()
+		backend.host_createObjects([OpsiClient(id=f"client{index}.test.invalid") for index in range(3)])
+		age_backend_files(backend)
+		FileBackend.CACHE.clear()
+		monkeypatch.setattr(IniFile, "parse", countingParse)
+
+		assert len(backend.host_getObjects(type="OpsiClient")) == 3
+		assert parsed
+		parsed.clear()
+		assert len(backend.host_getObjects(type="OpsiClient")) == 3
+		assert not parsed
+
+
+def test_file_backend_cache_notices_changes():
+	with getFileBackend() as backend:
+		backend.backend_createBase()
+		client = OpsiClient(id="client.test.invalid", description="original")
+		backend.host_createObjects([client])
+		age_backend_files(backend)
+		assert backend.host_getObjects(id=client.id)[0].description == "original"
+
+		client.setDescription("updated by backend")
+		backend.host_updateObjects([client])
+		assert backend.host_getObjects(id=client.id)[0].description == "updated by backend"
+
+		age_backend_files(backend)
+		assert backend.host_getObjects(id=client.id)[0].description == "updated by backend"
+		filename = os.path.join(backend._FileBackend__clientConfigDir, f"{client.id}.ini")  # pylint: disable=protected-access
+		iniFile = IniFile(filename=filename, ignoreCase=False)
+		config = iniFile.parse()
+		config.set("info", "description", "updated by other process")
+		iniFile.generate(config)
+		assert backend.host_getObjects(id=client.id)[0].description == "updated by other process"
+
+		backend.host_deleteObjects([client])
+		assert not backend.host_getObjects(id=client.id)
+
+
+def test_audit_software_is_sharded():
+	with getFileBackend() as backend:
+		backend.backend_createBase()
+		softwares = [
+			AuditSoftware(name=f"software{index}", version="1.0", subVersion="", language="en", architecture="x64")
+			for index in range(50)
+		]
+		backend.auditSoftware_createObjects(softwares)
+
+		softwareDir = os.path.join(backend._FileBackend__auditDir, "software")  # pylint: disable=protected-access
+		assert len(os.listdir(softwareDir)) > 1
+		assert len(backend.auditSoftware_getObjects()) == 50
+
+		softwares[0].setWindowsDisplayName("Software; #0 100%")
+		backend.auditSoftware_insertObject(softwares[0])
+		assert len(backend.auditSoftware_getObjects()) == 50
+		found = backend.auditSoftware_getObjects(name="software0", version="1.0", subVersion="", language="en", architecture="x64")
+		assert len(found) == 1
+		assert found[0].windowsDisplayName == "Software; #0 100%"
+
+		backend.auditSoftware_deleteObjects(softwares[:10])
+		assert len(backend.auditSoftware_getObjects()) == 40
+		assert not backend.auditSoftware_getObjects(name="software0")
+
+
+def test_audit_software_on_client_appends_entries():
+	with getFileBackend() as backend:
+		backend.backend_createBase()
+		client = OpsiClient(id="client.test.invalid")
+		backend.host_createObjects([client])
+		entries = [
+			AuditSoftwareOnClient(
+				name=f"software{index}", version="1.0", subVersion="", language="en", architecture="x64", clientId=client.id
+			)
+			for index in range(3)
+		]
+		backend.auditSoftwareOnClient_createObjects(entries)
+		filename = os.path.join(backend._FileBackend__auditDir, f"{client.id}.sw")  # pylint: disable=protected-access
+		with open(filename, encoding="utf-8") as file:
+			assert file.read().count("[software_") == 3
+
+		entries[1].setUsageFrequency(5)
+		backend.auditSoftwareOnClient_updateObject(entries[1])
+		assert backend.auditSoftwareOnClient_getObjects(name="software1")[0].usageFrequency == 5
+		assert len(backend.auditSoftwareOnClient_getObjects(clientId=client.id)) == 3
+
+
+def test_audit_software_migrated_from_single_file():
+	with getFileBackend() as backend:
+		backend.backend_createBase()
+		auditDir = backend._FileBackend__auditDir  # pylint: disable=protected-access
+		with open(os.path.join(auditDir, "global.sw"), "w", encoding="utf-8") as file:
+			for index in range(20):
+				file.write(f"[software_{index}]\nname = software{index}\nversion = 1.0\nlanguage = en\narchitecture = x86\n\n")
+
+		assert len(backend.auditSoftware_getObjects()) == 20
+		assert not os.path.exists(os.path.join(auditDir, "global.sw"))
+		for filename in os.listdir(os.path.join(auditDir, "software")):
+			assert AuditSoftwareFile.get(os.path.join(auditDir, "software", filename)).getEntries()
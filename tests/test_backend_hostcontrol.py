@@ -6,12 +6,18 @@
 Testing the Host Control backend.
 """
 
+import base64
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from ipaddress import IPv4Network, IPv4Address
 import pytest
 
-from opsicommon.objects import OpsiClient
+from opsicommon.objects import ConfigState, OpsiClient, UnicodeConfig
 
-from OPSI.Backend.HostControl import HostControlBackend
+from OPSI.Backend.HostControl import HostControlBackend, HostControlEngine, HostControlTarget, WakeOnLanSender
 from OPSI.Exceptions import BackendMissingDataError
 
 from .test_hosts import getClients
@@ -178,3 +184,209 @@ def test_calling_start_and_stop_method(host_control_backend):  # pylint: disable
 def test_host_control_reachable_without_hosts(host_control_backend):  # pylint: disable=redefined-outer-name
 	with pytest.raises(BackendMissingDataError):
 		host_control_backend.hostControl_reachable()
+
+
+class FakeOpsiclientd(ThreadingHTTPServer):
+	daemon_threads = True
+	request_queue_size = 1024
+
+
+class FakeOpsiclientdHandler(BaseHTTPRequestHandler):
+	def do_POST(self):  # pylint: disable=invalid-name
+		request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+		self.server.requests.append((self.headers["Authorization"], request))
+		if request["method"] == "sleep":
+			time.sleep(request["params"][0])
+		if request["method"] == "fail":
+			response = {"id": request["id"], "result": None, "error": {"class": "ValueError", "message": "failed on purpose"}}
+		else:
+			response = {"id": request["id"], "result": [request["method"], request["params"]], "error": None}
+		body = json.dumps(response).encode("utf-8")
+		self.send_response(200)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+		pass
+
+
+@pytest.fixture
+def fake_opsiclientd():
+	server = FakeOpsiclientd(("127.0.0.1", 0), FakeOpsiclientdHandler)
+	server.requests = []
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	try:
+		yield server
+	finally:
+		server.shutdown()
+		server.server_close()
+
+
+def getTargets(count, port, password="secret"):
+	return [HostControlTarget(f"client{index}.test.invalid", "127.0.0.1", port, password) for index in range(count)]
+
+
+def test_engine_executes_rpc_on_many_hosts(fake_opsiclientd):  # pylint: disable=redefined-outer-name
+	targets = getTargets(200, fake_opsiclientd.server_port)
+	engine = HostControlEngine(maxConnections=100)
+
+	result = engine.executeRpc(targets, method="fireEvent", params=["on_demand"], timeout=10)
+
+	assert result == {target.hostId: {"result": ["fireEvent", ["on_demand"]], "error": None} for target in targets}
+	assert len(fake_opsiclientd.requests) == 200
+	authorization, request = fake_opsiclientd.requests[0]
+	assert authorization == "Basic " + base64.b64encode(b":secret").decode("ascii")
+	assert request["method"] == "fireEvent"
+
+
+def test_engine_returns_rpc_errors(fake_opsiclientd):  # pylint: disable=redefined-outer-name
+	engine = HostControlEngine()
+	result = engine.executeRpc(getTargets(1, fake_opsiclientd.server_port), method="fail", timeout=5)
+	assert result == {"client0.test.invalid": {"result": None, "error": "failed on purpose"}}
+
+
+def test_engine_uses_timeout_per_host(fake_opsiclientd):  # pylint: disable=redefined-outer-name
+	targets = getTargets(20, fake_opsiclientd.server_port)
+	engine = HostControlEngine(maxConnections=20)
+
+	start = time.time()
+	result = engine.executeRpc(targets, method="sleep", params=[3], timeout=0.5)
+
+	assert time.time() - start < 2.5
+	for hostResult in result.values():
+		assert hostResult["result"] is None
+		assert hostResult["error"].startswith("timed out after")
+
+
+def test_engine_checks_reachability(fake_opsiclientd):  # pylint: disable=redefined-outer-name
+	with socket.socket() as sock:
+		sock.bind(("127.0.0.1", 0))
+		closedPort = sock.getsockname()[1]
+
+	targets = getTargets(50, fake_opsiclientd.server_port)
+	targets.append(HostControlTarget("closed.test.invalid", "127.0.0.1", closedPort))
+	targets.append(HostControlTarget("unresolvable.test.invalid", None, closedPort))
+
+	result = HostControlEngine(maxConnections=10).reachable(targets, timeout=2)
+
+	assert result.pop("closed.test.invalid") is False
+	assert result.pop("unresolvable.test.invalid") is False
+	assert result == {target.hostId: True for target in targets[:50]}
+
+
+def test_host_control_rpc_against_fake_opsiclientd(host_control_backend, fake_opsiclientd):  # pylint: disable=redefined-outer-name
+	clients = [OpsiClient(id=f"client{index}.test.invalid", ipAddress="127.0.0.1") for index in range(10)]
+	host_control_backend.host_createObjects(clients)
+	host_control_backend._opsiclientdPort = fake_opsiclientd.server_port  # pylint: disable=protected-access
+	host_control_backend._sslContext = None  # The fake opsiclientd does not use TLS # pylint: disable=protected-access
+
+	result = host_control_backend.hostControl_fireEvent("on_demand", [client.id for client in clients])
+	assert result == {client.id: {"result": ["fireEvent", ["on_demand"]], "error": None} for client in clients}
+
+	result = host_control_backend.hostControl_reachable([client.id for client in clients])
+	assert result == {client.id: True for client in clients}
+
+
+def countCalls(calls, name, method):
+	def countingMethod(*args, **kwargs):
+		calls.append(name)
+		return method(*args, **kwargs)
+
+	return countingMethod
+
+
+def test_opsiclientd_ports_resolved_in_bulk(host_control_backend, fake_opsiclientd, monkeypatch):  # pylint: disable=redefined-outer-name
+	with socket.socket() as sock:
+		sock.bind(("127.0.0.1", 0))
+		closedPort = sock.getsockname()[1]
+
+	clients = [OpsiClient(id=f"client{index}.test.invalid", ipAddress="127.0.0.1") for index in range(20)]
+	host_control_backend.host_createObjects(clients)
+	host_control_backend.config_createObjects(
+		[UnicodeConfig(id="opsiclientd.control_server.port", defaultValues=[str(fake_opsiclientd.server_port)])]
+	)
+	host_control_backend.configState_createObjects(
+		[ConfigState(configId="opsiclientd.control_server.port", objectId=clients[0].id, values=[str(closedPort)])]
+	)
+	host_control_backend._sslContext = None  # The fake opsiclientd does not use TLS # pylint: disable=protected-access
+
+	context = host_control_backend._context  # pylint: disable=protected-access
+	calls = []
+	for methodName in ("host_getObjects", "config_getObjects", "configState_getObjects"):
+		monkeypatch.setattr(context, methodName, countCalls(calls, methodName, getattr(context, methodName)))
+
+	hostIds = [client.id for client in clients]
+	result = host_control_backend._opsiclientdRpc(hostIds, "fireEvent", ["on_demand"])  # pylint: disable=protected-access
+
+	assert sorted(calls) == ["config_getObjects", "configState_getObjects", "host_getObjects"]
+	assert result.pop(clients[0].id)["error"]
+	assert result == {client.id: {"result": ["fireEvent", ["on_demand"]], "error": None} for client in clients[1:]}
+
+
+@pytest.fixture
+def udp_sink():
+	with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+		sock.bind(("127.0.0.1", 0))
+		sock.settimeout(2)
+		yield sock
+
+
+def receivePackets(sock, count):
+	return [sock.recvfrom(1024)[0] for _ in range(count)]
+
+
+def test_magic_packet():
+	packet = WakeOnLanSender.createMagicPacket("00:01:02:03:04:05")
+	assert len(packet) == 102
+	assert packet == bytes.fromhex("ffffffffffff" + "000102030405" * 16)
+
+	with pytest.raises(ValueError):
+		WakeOnLanSender.createMagicPacket("00:01:02")
+
+
+def test_wake_on_lan_sender_reports_per_host_results(udp_sink):  # pylint: disable=redefined-outer-name
+	port = udp_sink.getsockname()[1]
+	packets = {
+		f"client{index}.test.invalid": (WakeOnLanSender.createMagicPacket(f"00:00:00:00:00:{index:02x}"), [("127.0.0.1", (port, port))])
+		for index in range(10)
+	}
+	packets["broken.test.invalid"] = (WakeOnLanSender.createMagicPacket("00:00:00:00:00:ff"), [("not-an-address", (port,))])
+
+	result = WakeOnLanSender().send(packets)
+
+	assert result.pop("broken.test.invalid")["error"]
+	assert result == {hostId: {"result": "sent", "error": None} for hostId in list(packets)[:10]}
+	received = receivePackets(udp_sink, 20)
+	assert sorted(received) == sorted(packet for packet, _destinations in list(packets.values())[:10] for _ in range(2))
+
+
+def test_wake_on_lan_sender_rate_limit(udp_sink):  # pylint: disable=redefined-outer-name
+	port = udp_sink.getsockname()[1]
+	packets = {
+		f"client{index}.test.invalid": (WakeOnLanSender.createMagicPacket("00:01:02:03:04:05"), [("127.0.0.1", (port,))])
+		for index in range(21)
+	}
+
+	start = time.monotonic()
+	WakeOnLanSender(packetsPerSecond=100).send(packets)
+	assert time.monotonic() - start >= 0.2
+	assert len(receivePackets(udp_sink, 21)) == 21
+
+
+def test_host_control_start_sends_to_broadcast_addresses(host_control_backend, udp_sink):  # pylint: disable=redefined-outer-name
+	port = udp_sink.getsockname()[1]
+	clients = [
+		OpsiClient(id="client1.test.invalid", hardwareAddress="00:01:02:03:04:05", ipAddress="127.0.0.2"),
+		OpsiClient(id="client2.test.invalid"),
+	]
+	host_control_backend.host_createObjects(clients)
+	host_control_backend._set_broadcast_addresses({"127.0.0.0/8": {"127.0.0.1": [port]}})  # pylint: disable=protected-access
+
+	result = host_control_backend.hostControl_start([client.id for client in clients])
+
+	assert result["client1.test.invalid"] == {"result": "sent", "error": None}
+	assert result["client2.test.invalid"]["result"] is None
+	assert receivePackets(udp_sink, 1) == [WakeOnLanSender.createMagicPacket("00:01:02:03:04:05")]
@@ -6,13 +6,22 @@
 Testing opsi SQL backend.
 """
 
+import inspect
 import os.path
+import sqlite3
 
 import OPSI.Backend.SQL as sql
 import OPSI.Object as ob
 import pytest
 
-from .helpers import createTemporaryTestfile
+from .helpers import assertQueryCount, countQueries, createTemporaryTestfile
+from .test_configs import getConfigs
+from .test_groups import getHostGroups, getObjectToGroups
+from .test_hosts import getClients, getConfigServer, getDepotServers
+from .test_products import (
+	getLocalbootProducts, getProductDepdencies, getProductProperties,
+	getProductsOnClients, getProductsOnDepot)
+from .test_software_and_hardware_audit import getAuditSoftwareOnClient, getAuditSoftwares
 
 
 @pytest.fixture
@@ -209,6 +218,89 @@ def testUniqueConditionMandatoryParametersAreSkippedIfValueIsNone(sqlBackendWith
 	assert "" == sqlBackendWithoutConnection._uniqueCondition(FooParam(None))
 
 
+def testUpsertKeyColumnsMatchPrimaryKey(sqlBackendWithoutConnection):
+	sqlBackendWithoutConnection._sql.UPSERT_SUPPORTED = True
+	host = ob.Host("foo.bar.baz")
+	data = sqlBackendWithoutConnection._objectToDatabaseHash(host)
+
+	keys = sqlBackendWithoutConnection._uniqueKeyHash(host)
+	assert ["hostId"] == sqlBackendWithoutConnection._upsertKeyColumns("HOST", keys, data)
+
+
+def testUpsertKeyColumnsForTableWithoutMatchingPrimaryKey(sqlBackendWithoutConnection):
+	sqlBackendWithoutConnection._sql.UPSERT_SUPPORTED = True
+	configState = ob.ConfigState("foo.bar", "client.test.invalid")
+	data = sqlBackendWithoutConnection._objectToDatabaseHash(configState)
+
+	keys = sqlBackendWithoutConnection._uniqueKeyHash(configState)
+	assert [] == sqlBackendWithoutConnection._upsertKeyColumns("CONFIG_STATE", keys, data)
+
+
+def testUpsertKeyColumnsWithUpsertDisabled(sqlBackendWithoutConnection):
+	sqlBackendWithoutConnection._sql.UPSERT_SUPPORTED = True
+	sqlBackendWithoutConnection.upsert = False
+	host = ob.Host("foo.bar.baz")
+	data = sqlBackendWithoutConnection._objectToDatabaseHash(host)
+
+	keys = sqlBackendWithoutConnection._uniqueKeyHash(host)
+	assert [] == sqlBackendWithoutConnection._upsertKeyColumns("HOST", keys, data)
+
+
+def testUpsertKeyColumnsWithoutDatabaseSupport(sqlBackendWithoutConnection):
+	host = ob.Host("foo.bar.baz")
+	data = sqlBackendWithoutConnection._objectToDatabaseHash(host)
+
+	keys = sqlBackendWithoutConnection._uniqueKeyHash(host)
+	assert [] == sqlBackendWithoutConnection._upsertKeyColumns("HOST", keys, data)
+
+
+class SQLiteSession:
+	def __init__(self):
+		self.connection = sqlite3.connect(":memory:")
+
+	def execute(self, query, params=None):
+		if isinstance(params, list):
+			return self.connection.executemany(query, params)
+		return self.connection.execute(query, params or {})
+
+
+def testUpsertWithoutDatabaseSupport():
+	session = SQLiteSession()
+	session.execute("CREATE TABLE `HOST` (`hostId` varchar(255) PRIMARY KEY, `description` varchar(100), `notes` varchar(500))")
+	session.execute("INSERT INTO `HOST` (`hostId`, `description`, `notes`) VALUES ('a.test.invalid', 'old', 'keep')")
+
+	database = sql.SQL()
+	assert not database.UPSERT_SUPPORTED
+	database.upsertMany(
+		session, "HOST", ["hostId"], [
+			{"hostId": "a.test.invalid", "description": "new"},
+			{"hostId": "b.test.invalid", "description": "first", "notes": None},
+			{"hostId": "b.test.invalid", "notes": "second"},
+		]
+	)
+
+	rows = session.execute("SELECT `hostId`, `description`, `notes` FROM `HOST` ORDER BY `hostId`").fetchall()
+	assert [("a.test.invalid", "new", "keep"), ("b.test.invalid", "first", "second")] == rows
+
+
+def testGettingExistingKeysInChunksWithBoundParameters(sqlBackendWithoutConnection):
+	session = SQLiteSession()
+	session.connection.row_factory = sqlite3.Row
+	session.execute("CREATE TABLE `SOFTWARE` (`name` varchar(100), `version` varchar(100))")
+	session.execute("INSERT INTO `SOFTWARE` (`name`, `version`) VALUES ('it''s', '1.0'), ('other', '2.0')")
+
+	sqlBackendWithoutConnection.BULK_CHUNK_SIZE = 1
+	existing = sqlBackendWithoutConnection._getExistingKeys(
+		session, "SOFTWARE", [
+			{"name": "it's", "version": "1.0"},
+			{"name": "other", "version": "3.0"},
+			{"name": "missing", "version": "1.0"},
+		]
+	)
+
+	assert {(("name", "it's"), ("version", "1.0"))} == existing
+
+
 @pytest.mark.parametrize("number", [1, 2.3, 4])
 def testParameterIsNumber(sqlBackendWithoutConnection, number):
 	assert "`param` = {0!s}".format(number) == sqlBackendWithoutConnection._uniqueCondition(FooParam(number))
@@ -300,3 +392,163 @@ def testAlteringTableAfterChangeOfHardwareAuditConfig(test_data_path, sqlBackend
 				backend._setAuditHardwareConfig(backend.auditHardware_getConfig())
 
 				backend.backend_createBase()
+
+
+def getUpsertParityObjects():
+	configServer = getConfigServer()
+	depotServer = getDepotServers()[0]
+	clients = getClients()
+	products = getLocalbootProducts()
+	groups = getHostGroups()
+
+	return [
+		("host", [configServer, depotServer] + list(clients)),
+		("config", getConfigs(depotServer.id)),
+		("product", products),
+		("productProperty", getProductProperties(products)),
+		("productDependency", getProductDepdencies(products)),
+		("productOnDepot", getProductsOnDepot(products, configServer, depotServer)),
+		("productOnClient", getProductsOnClients(products, clients)),
+		("group", groups),
+		("objectToGroup", getObjectToGroups(groups, clients)),
+		("auditSoftware", getAuditSoftwares()),
+	]
+
+
+def writeUpsertParityObjects(backend):
+	"""
+	Inserts, re-inserts and overwrites objects through `*_insertObject`.
+
+	Every other object is overwritten by a copy holding only its
+	identifying attributes to check that unset values are written as well.
+	Returns the resulting hashes per backend method prefix.
+	"""
+	result = {}
+	for prefix, objects in getUpsertParityObjects():
+		insertObject = getattr(backend, f"{prefix}_insertObject")
+		for obj in objects:
+			insertObject(obj)
+			insertObject(obj)
+
+		for obj in objects[::2]:
+			insertObject(obj.clone(identOnly=True))
+
+		result[prefix] = sorted(
+			(obj.toHash() for obj in getattr(backend, f"{prefix}_getObjects")()),
+			key=lambda objHash: sorted((key, str(value)) for key, value in objHash.items())
+		)
+	return result
+
+
+def testUpsertReachesSameStateAsReadThenWrite(sqlBackendCreationContextManager):
+	results = {}
+	for upsert in (False, True):
+		with sqlBackendCreationContextManager() as backend:
+			backend.backend_createBase()
+			try:
+				backend.upsert = upsert
+				results[upsert] = writeUpsertParityObjects(backend)
+			finally:
+				backend.backend_deleteBase()
+
+	for prefix, expected in results[False].items():
+		assert expected, f"No {prefix} objects written"
+		assert expected == results[True][prefix], f"{prefix} differs between upsert and read-then-write"
+
+
+def testGettingConfigsReadsValuesWithOneQuery(sqlBackendCreationContextManager):
+	configsIn = getConfigs()
+
+	with sqlBackendCreationContextManager() as backend:
+		backend.backend_createBase()
+		try:
+			for config in configsIn:
+				backend.config_insertObject(config)
+
+			with assertQueryCount(backend, 2):
+				configs = backend.config_getObjects()
+			assert len(configsIn) == len(configs)
+
+			configsById = {config.id: config for config in configs}
+			for config in configsIn:
+				assert sorted(config.possibleValues) == sorted(configsById[config.id].possibleValues)
+				assert sorted(config.defaultValues) == sorted(configsById[config.id].defaultValues)
+
+			with assertQueryCount(backend, 1):
+				backend.config_getObjects(attributes=["description"])
+		finally:
+			backend.backend_deleteBase()
+
+
+def testGettingProductsQueryCountDoesNotDependOnProductCount(sqlBackendCreationContextManager):
+	productsIn = getLocalbootProducts()
+
+	with sqlBackendCreationContextManager() as backend:
+		backend.backend_createBase()
+		try:
+			for product in productsIn:
+				backend.product_insertObject(product)
+
+			with countQueries(backend) as statements:
+				products = backend.product_getObjects()
+			assert len(productsIn) == len(products)
+			assert len(statements) <= 2
+
+			productsByIdent = {product.getIdent(): product for product in products}
+			for product in productsIn:
+				assert sorted(product.windowsSoftwareIds or []) == sorted(productsByIdent[product.getIdent()].windowsSoftwareIds or [])
+		finally:
+			backend.backend_deleteBase()
+
+
+def testStreamingAuditSoftwareOnClients(sqlBackendCreationContextManager):
+	auditSoftwares = getAuditSoftwares()
+	clients = getClients()
+
+	with sqlBackendCreationContextManager() as backend:
+		backend.backend_createBase()
+		try:
+			for client in clients:
+				backend.host_insertObject(client)
+			for auditSoftware in auditSoftwares:
+				backend.auditSoftware_insertObject(auditSoftware)
+			for auditSoftwareOnClient in getAuditSoftwareOnClient(auditSoftwares, clients):
+				backend.auditSoftwareOnClient_insertObject(auditSoftwareOnClient)
+
+			stream = backend.auditSoftwareOnClient_streamObjects()
+			assert inspect.isgenerator(stream)
+
+			streamed = []
+			for auditSoftwareOnClient in stream:
+				# Streaming uses its own session, other queries are possible
+				assert backend.host_getObjects(id=auditSoftwareOnClient.clientId)
+				streamed.append(auditSoftwareOnClient)
+
+			expected = backend.auditSoftwareOnClient_getObjects()
+			assert expected
+			assert sorted(expected, key=lambda obj: obj.getIdent()) == sorted(streamed, key=lambda obj: obj.getIdent())
+
+			clientId = clients[0].id
+			assert sorted(obj.getIdent() for obj in backend.auditSoftwareOnClient_getObjects(clientId=clientId)) == sorted(
+				obj.getIdent() for obj in backend.auditSoftwareOnClient_streamObjects(clientId=clientId)
+			)
+			assert len(auditSoftwares) == len(list(backend.auditSoftware_streamObjects()))
+		finally:
+			backend.backend_deleteBase()
+
+
+@pytest.mark.parametrize("method", ["getData", "getRawData"])
+def testStreamingDataReturnsSameRows(sqlBackendCreationContextManager, method):
+	with sqlBackendCreationContextManager() as backend:
+		backend.backend_createBase()
+		try:
+			for client in getClients():
+				backend.host_insertObject(client)
+
+			query = "SELECT * FROM HOST ORDER BY hostId"
+			getData = getattr(backend, method)
+			rows = list(getData(query))
+			assert rows
+			assert rows == list(getData(query, stream=True))
+		finally:
+			backend.backend_deleteBase()
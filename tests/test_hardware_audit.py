@@ -6,9 +6,16 @@
 Testing hardware audit behaviour.
 """
 
+import os
+
 import pytest
+from OPSI.Backend.Base import ExtendedConfigDataBackend
 from OPSI.Object import AuditHardwareOnHost, OpsiClient
 
+from .Backends.SQLite import SQLiteconfiguration
+from .conftest import _backendBase
+from .helpers import assertQueryCount
+
 
 def testHardwareAuditAcceptingHugeMemoryClockSpeeds(hardwareAuditBackendWithHistory):
 	"""
@@ -109,6 +116,67 @@ def testHardwareAuditObsoletingAllObjects(hardwareAuditBackendWithHistory, objec
 	backend.auditHardwareOnHost_setObsolete(None)
 
 
+def getMemoryModule(hostId, index):
+	return {
+		"hostId": hostId,
+		"vendor": "Micron",
+		"description": "Physikalischer Speicher",
+		"tag": f"Physical Memory {index}",
+		"speed": 2400000000,
+		"hardwareClass": "MEMORY_MODULE",
+		"formFactor": "SODIMM",
+		"capacity": "8589934592",
+		"name": f"DIMM {index}",
+		"serialNumber": f"15E6410{index}",
+		"memoryType": "Unknown",
+		"type": "AuditHardwareOnHost",
+		"deviceLocator": f"DIMM {index}",
+		"dataWidth": 64,
+		"state": 1
+	}
+
+
+def testGettingAuditHardwareOnHostReadsDevicesOncePerClass(hardwareAuditBackendWithHistory):
+	backend = hardwareAuditBackendWithHistory
+
+	client = OpsiClient(id='foo.bar.invalid')
+	backend.host_insertObject(client)
+
+	for index in range(10):
+		backend.auditHardwareOnHost_createObjects([getMemoryModule(client.id, index)])
+
+	def sortedHashes():
+		return sorted(backend.auditHardwareOnHost_getHashes(hardwareClass="MEMORY_MODULE"), key=lambda ahoh: ahoh["serialNumber"])
+
+	# One query for the config rows and one for the device rows
+	with assertQueryCount(backend._backend, 2):
+		hashes = sortedHashes()
+	assert 10 == len(hashes)
+	assert [f"15E6410{index}" for index in range(10)] == [ahoh["serialNumber"] for ahoh in hashes]
+
+
+def testGettingAuditHardwareOnHostReadsDevicesChangedByOtherBackend(tempDir, hardwareAuditConfigPath):
+	sqliteModule = pytest.importorskip("OPSI.Backend.SQLite")
+	options = dict(
+		SQLiteconfiguration,
+		database=os.path.join(tempDir, "opsi.sqlite3"),
+		auditHardwareConfigFile=hardwareAuditConfigPath
+	)
+	backend = ExtendedConfigDataBackend(sqliteModule.SQLiteBackend(**options))
+	otherBackend = ExtendedConfigDataBackend(sqliteModule.SQLiteBackend(**options))
+
+	with _backendBase(backend._backend):
+		client = OpsiClient(id='foo.bar.invalid')
+		backend.host_insertObject(client)
+		backend.auditHardwareOnHost_createObjects([getMemoryModule(client.id, 1)])
+		assert ["15E64101"] == [ahoh["serialNumber"] for ahoh in backend.auditHardwareOnHost_getHashes()]
+
+		# The hardware id of the deleted device is reused for the new one
+		otherBackend.auditHardware_deleteObjects(otherBackend.auditHardware_getObjects())
+		otherBackend.auditHardwareOnHost_createObjects([getMemoryModule(client.id, 2)])
+		assert ["15E64102"] == [ahoh["serialNumber"] for ahoh in backend.auditHardwareOnHost_getHashes()]
+
+
 def testUpdatingAuditHardware(hardwareAuditBackendWithHistory):
 	backend = hardwareAuditBackendWithHistory
 
@@ -3,9 +3,11 @@
 # Copyright (c) uib GmbH <info@uib.de>
 # License: AGPL-3.0
 
+import threading
+
 import pytest
 
-from OPSI.Service.JsonRpc import JsonRpc
+from OPSI.Service.JsonRpc import DISPATCH_TABLE_CACHE_SIZE, JsonRpc, getDispatchTable, invalidateDispatchTable
 
 from .helpers import mock
 
@@ -97,3 +99,82 @@ def testGettingMetainformation():
 	assert j.isStarted()
 	assert j.hasEnded()
 	assert j.getDuration() != None
+
+
+def getTestInterface():
+	return [
+		{"name": "host_getObjects", "args": ["self", "attributes"], "varargs": None, "keywords": "filter", "defaults": ([],)},
+		{"name": "backend_info", "args": ["self"], "varargs": None, "keywords": None, "defaults": None},
+	]
+
+
+def testDispatchTableIsCachedPerInterface():
+	interface = getTestInterface()
+
+	table = getDispatchTable(interface)
+	assert set(table) == {"host_getObjects", "backend_info"}
+	assert getDispatchTable(interface) is table
+
+	assert getDispatchTable(getTestInterface()) is not table
+
+
+def testDispatchTableIsRebuiltAfterInvalidation():
+	interface = getTestInterface()
+	table = getDispatchTable(interface)
+
+	interface[1] = {"name": "backend_exit", "args": ["self"], "varargs": None, "keywords": None, "defaults": None}
+	interface.append({"name": "host_getIdents", "args": ["self"], "varargs": None, "keywords": "filter", "defaults": None})
+	assert getDispatchTable(interface) is table
+
+	invalidateDispatchTable(interface)
+	changedTable = getDispatchTable(interface)
+	assert changedTable is not table
+	assert set(changedTable) == {"host_getObjects", "backend_exit", "host_getIdents"}
+
+
+def testDispatchTableCacheIsThreadSafe():
+	interfaces = [getTestInterface() for _ in range(DISPATCH_TABLE_CACHE_SIZE * 2)]
+	errors = []
+
+	def lookup():
+		try:
+			for _ in range(20):
+				for interface in interfaces:
+					assert "backend_info" in getDispatchTable(interface)
+		except Exception as err:  # pylint: disable=broad-except
+			errors.append(err)
+
+	threads = [threading.Thread(target=lookup) for _ in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert not errors
+
+
+@pytest.mark.parametrize("params, expectedArgs, expectedKeywords", [
+	([], [], {}),
+	([["id"]], [["id"]], {}),
+	([["id"], {"type": "OpsiClient"}], [["id"]], {"type": "OpsiClient"}),
+])
+def testCallDescriptorSplitsKeywords(params, expectedArgs, expectedKeywords):
+	descriptor = getDispatchTable(getTestInterface())["host_getObjects"]
+
+	assert descriptor.getArguments(params) == (expectedArgs, expectedKeywords)
+
+
+def testExecutingMethodWithKeywords():
+	class TestInstance:
+		def host_getObjects(self, attributes=[], **filter):
+			return [attributes, filter]
+
+	j = JsonRpc(
+		instance=TestInstance(),
+		interface=getTestInterface(),
+		rpc={"id": 42, "method": "host_getObjects", "params": [["id"], {"type": "OpsiClient"}]}
+	)
+	j.execute()
+
+	assert not j.exception
+	assert j.result == [["id"], {"type": "OpsiClient"}]
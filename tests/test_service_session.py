@@ -6,10 +6,11 @@
 Testing session and sessionhandler.
 """
 
+import threading
 import time
 from contextlib import contextmanager
 
-from OPSI.Service.Session import Session, SessionHandler
+from OPSI.Service.Session import Session, SessionExpiryScheduler, SessionHandler
 from OPSI.Exceptions import OpsiServiceAuthenticationError
 
 import pytest
@@ -21,15 +22,7 @@ def session():
 	try:
 		yield testSession
 	finally:
-		# This may leave a thread running afterwards
-		# if testSession and testSession.sessionTimer:
-		try:
-			testSession.sessionTimer.cancel()
-			testSession.sessionTimer.join(1)
-		except AttributeError:
-			pass
-
-		testSession.sessionTimer = None
+		testSession.delete()
 
 
 class FakeSessionHandler(object):
@@ -224,3 +217,168 @@ def testGettingNewSessionDoesIgnoreSessionMarkedForDeletion(sessionHandler):
 
 	secondSession = sessionHandler.getSession(uid=session.uid)
 	assert secondSession != session
+
+
+class ExpiringSession:
+	def __init__(self, sessionMaxInactiveInterval):
+		self.uid = "expiring"
+		self.sessionMaxInactiveInterval = sessionMaxInactiveInterval
+		self.lastModified = time.time()
+		self.usageCount = 0
+		self.deleted = False
+		self.expired = threading.Event()
+
+	def setMarkedForDeletionIfUnused(self):
+		return self.usageCount <= 0
+
+	def expire(self):
+		self.expired.set()
+
+
+def testSchedulerExpiresSession():
+	scheduler = SessionExpiryScheduler()
+	session = ExpiringSession(0.1)
+
+	scheduler.schedule(session)
+	assert len(scheduler) == 1
+
+	assert session.expired.wait(2)
+	assert len(scheduler) == 0
+
+
+def testSchedulerPostponesExpiryOfTouchedSession():
+	scheduler = SessionExpiryScheduler()
+	session = ExpiringSession(1)
+	scheduler.schedule(session)
+
+	time.sleep(0.5)
+	session.lastModified = time.time()
+	scheduler.schedule(session)
+	assert len(scheduler) == 1
+
+	assert not session.expired.wait(0.8)
+	assert session.expired.wait(2)
+
+
+def testSchedulerSkipsDeletedSessions():
+	scheduler = SessionExpiryScheduler()
+	session = ExpiringSession(0.1)
+	scheduler.schedule(session)
+	session.deleted = True
+
+	assert not session.expired.wait(0.5)
+	assert len(scheduler) == 0
+
+
+def testTouchingSessionDoesNotStartThreads(sessionHandler):
+	sessions = [sessionHandler.createSession() for _ in range(50)]
+	threadCount = threading.active_count()
+
+	for session in sessions:
+		session.touch()
+
+	assert threading.active_count() <= threadCount
+
+
+def testExpiringSessionInUseWaitsForRelease():
+	handler = SessionHandler(sessionDeletionTimeout=5)
+	with deleteSessionsAfterContext(handler) as handler:
+		session = handler.createSession()
+		session.increaseUsageCount()
+
+		releaser = threading.Timer(0.2, session.decreaseUsageCount)
+		releaser.start()
+		start = time.time()
+		assert session.expire()
+		assert time.time() - start < 4
+
+		releaser.join()
+		assert not handler.sessions
+
+
+def testMarkingSessionForDeletionIfUnused(sessionHandler):
+	session = sessionHandler.createSession()
+	session.increaseUsageCount()
+	assert not session.setMarkedForDeletionIfUnused()
+	assert not session.getMarkedForDeletion()
+
+	session.decreaseUsageCount()
+	assert session.setMarkedForDeletionIfUnused()
+	assert not session.increaseUsageCountIfNotMarked()
+	assert 0 == session.usageCount
+	assert sessionHandler.getSession(session.uid) is not session
+
+
+def waitForSessionRemoval(handler, session, timeout):
+	end = time.time() + timeout
+	while session.uid in handler.sessions and time.time() < end:
+		time.sleep(0.05)
+	return session.uid not in handler.sessions
+
+
+def testExpiringSessionInUseDoesNotHoldUpOtherSessions():
+	handler = SessionHandler(sessionMaxInactiveInterval=1, sessionDeletionTimeout=10)
+	with deleteSessionsAfterContext(handler) as handler:
+		sessionInUse = handler.createSession()
+		sessionInUse.increaseUsageCount()
+		unusedSession = handler.createSession()
+
+		assert waitForSessionRemoval(handler, unusedSession, 4)
+		assert sessionInUse.uid in handler.sessions
+
+		sessionInUse.decreaseUsageCount()
+		assert waitForSessionRemoval(handler, sessionInUse, 2)
+
+
+def testGetSessionsByUser(sessionHandler):
+	session = sessionHandler.createSession()
+	otherSession = sessionHandler.createSession()
+	sessionHandler.createSession()
+
+	session.user = "hans"
+	otherSession.user = "hans"
+	assert {session.uid: session, otherSession.uid: otherSession} == sessionHandler.getSessions(user="hans")
+
+	otherSession.user = "franz"
+	assert {session.uid: session} == sessionHandler.getSessions(user="hans")
+	assert {otherSession.uid: otherSession} == sessionHandler.getSessions(user="franz")
+
+
+def testGetSessionsByIPAndUser(sessionHandler):
+	testIP = '12.34.56.78'
+	session = sessionHandler.createSession()
+	session.ip = testIP
+	session.user = "hans"
+	otherSession = sessionHandler.createSession()
+	otherSession.ip = testIP
+
+	assert 2 == sessionHandler.getSessionCount(ip=testIP)
+	assert {session.uid: session} == sessionHandler.getSessions(ip=testIP, user="hans")
+
+
+def testDeletedSessionsAreRemovedFromIndexes(sessionHandler):
+	testIP = '12.34.56.78'
+	session = sessionHandler.createSession()
+	session.ip = testIP
+	session.user = "hans"
+
+	sessionHandler.deleteSession(session.uid)
+
+	assert {} == sessionHandler.getSessions(ip=testIP)
+	assert {} == sessionHandler.getSessions(user="hans")
+	assert 0 == sessionHandler.getSessionCount(ip=testIP)
+
+	session.ip = '23.45.67.89'
+	assert {} == sessionHandler.getSessions(ip='23.45.67.89')
+
+
+def testDeletingAllSessions(sessionHandler):
+	sessions = [sessionHandler.createSession() for _ in range(10)]
+	for session in sessions:
+		session.ip = '12.34.56.78'
+
+	sessionHandler.deleteAllSessions()
+
+	assert not sessionHandler.sessions
+	assert {} == sessionHandler.getSessions(ip='12.34.56.78')
+	assert all(session.deleted for session in sessions)
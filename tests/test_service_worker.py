@@ -7,12 +7,21 @@ Testing the workers.
 """
 
 import gzip
+import json
+import tracemalloc
 import zlib
 from io import StringIO
 
 import pytest
+from msgspec import msgpack
 
-from OPSI.Service.Worker import WorkerOpsi, WorkerOpsiJsonRpc
+from OPSI.Service.Worker import (
+	ResponseProducer, WorkerOpsi, WorkerOpsiJsonRpc,
+	isReadOnlyMethod, iterJsonChunks, iterMsgpackChunks
+)
+from OPSI.Util import toJson
+from OPSI.Util.HTTP import StreamCompressor
+from twisted.internet import defer
 
 
 class FakeHeader(object):
@@ -237,3 +246,217 @@ def testDecodingOldCallQuery():
 	worker.query = zlib.compress("Test 1234")
 	worker._decodeQuery(None)
 	assert 'Test 1234' == worker.query
+
+
+@pytest.mark.parametrize("methodName, expected", [
+	("host_getObjects", True),
+	("auditHardwareOnHost_getHashes", True),
+	("backend_getInterface", True),
+	("backend_info", True),
+	("getClientIds_list", True),
+	("host_createObjects", False),
+	("productOnClient_updateObjects", False),
+	("setProductActionRequest", False),
+	("backend_exit", False),
+])
+def testReadOnlyMethodClassification(methodName, expected):
+	assert isReadOnlyMethod(methodName) == expected
+
+
+class FakeNamedRPC(FakeRPC):
+	def __init__(self, methodName):
+		FakeRPC.__init__(self, methodName)
+		self.methodName = methodName
+
+	def getMethodName(self):
+		return self.methodName
+
+
+class RecordingWorker(WorkerOpsiJsonRpc):
+	def __init__(self):
+		WorkerOpsiJsonRpc.__init__(self, service=None, request=FakeRequest(), resource=None)
+		self.pending = {}
+		self.executed = []
+
+	def _executeRpc(self, result, rpc):
+		self.pending[rpc.methodName] = defer.Deferred()
+		self.executed.append(rpc.methodName)
+		return self.pending[rpc.methodName]
+
+	def finish(self, methodName):
+		self.pending.pop(methodName).callback(None)
+
+
+def testGroupingRpcsForParallelExecution():
+	worker = WorkerOpsiJsonRpc(service=None, request=FakeRequest(), resource=None)
+	worker._rpcs = [
+		FakeNamedRPC("host_getObjects"), FakeNamedRPC("config_getObjects"),
+		FakeNamedRPC("host_createObjects"),
+		FakeNamedRPC("host_getIdents"),
+	]
+
+	groups = [[rpc.getMethodName() for rpc in group] for group in worker._groupRpcs()]
+	assert groups == [["host_getObjects", "config_getObjects"], ["host_createObjects"], ["host_getIdents"]]
+
+
+def testExecutingRpcsSeriallyByDefault():
+	worker = RecordingWorker()
+	worker._rpcs = [FakeNamedRPC("host_getObjects"), FakeNamedRPC("config_getObjects")]
+
+	worker._executeRpcs(None)
+	assert worker.executed == ["host_getObjects"]
+
+	worker.finish("host_getObjects")
+	assert worker.executed == ["host_getObjects", "config_getObjects"]
+
+
+def testExecutingReadOnlyRpcsInParallel():
+	worker = RecordingWorker()
+	worker.parallelRpcs = True
+	worker.maxParallelRpcs = 2
+	worker._rpcs = [
+		FakeNamedRPC("host_getObjects"), FakeNamedRPC("config_getObjects"), FakeNamedRPC("group_getObjects"),
+		FakeNamedRPC("host_createObjects"),
+	]
+
+	deferred = worker._executeRpcs(None)
+	assert worker.executed == ["host_getObjects", "config_getObjects"]
+
+	worker.finish("config_getObjects")
+	assert worker.executed == ["host_getObjects", "config_getObjects", "group_getObjects"]
+
+	worker.finish("group_getObjects")
+	worker.finish("host_getObjects")
+	assert worker.executed[-1] == "host_createObjects"
+
+	worker.finish("host_createObjects")
+	assert deferred.called
+	assert [rpc.getResponse() for rpc in worker._rpcs] == [
+		"host_getObjects", "config_getObjects", "group_getObjects", "host_createObjects"
+	]
+
+
+def getStreamedResponses():
+	return [
+		"",
+		{"id": 1, "result": None, "error": None},
+		{"id": 1, "result": [{"id": f"client{index}.test.invalid"} for index in range(20)], "error": None},
+		[
+			{"id": 1, "result": list(range(70000)), "error": None},
+			{"id": 2, "result": {"key": ["value"], "ümlaut": "ö"}, "error": None},
+		],
+	]
+
+
+@pytest.mark.parametrize("response", getStreamedResponses())
+@pytest.mark.parametrize("depth", [0, 2, 3])
+def testStreamingJsonResponse(response, depth):
+	data = b"".join(iterJsonChunks(response, depth))
+
+	assert json.loads(data) == json.loads(toJson(response))
+
+
+@pytest.mark.parametrize("response", getStreamedResponses())
+@pytest.mark.parametrize("depth", [0, 2, 3])
+def testStreamingMsgpackResponse(response, depth):
+	data = b"".join(iterMsgpackChunks(response, depth))
+
+	assert msgpack.decode(data) == msgpack.decode(msgpack.encode(response))
+
+
+class ProducerTransport:
+	def __init__(self):
+		self.aborted = False
+
+	def abortConnection(self):
+		self.aborted = True
+
+
+class ProducerRequest:
+	def __init__(self):
+		self.data = []
+		self.producer = None
+		self.transport = ProducerTransport()
+
+	def registerProducer(self, producer, streaming):
+		assert not streaming
+		self.producer = producer
+		while self.producer:
+			producer.resumeProducing()
+
+	def unregisterProducer(self):
+		self.producer = None
+
+	def write(self, data):
+		self.data.append(data)
+
+
+@pytest.mark.parametrize("encoding, decompress", [
+	(None, lambda data: data),
+	("gzip", gzip.decompress),
+	("deflate", zlib.decompress),
+])
+def testResponseProducerWritesChunks(encoding, decompress):
+	request = ProducerRequest()
+	chunks = [b"x" * 100 for _ in range(100)]
+	compressor = StreamCompressor(encoding) if encoding else None
+
+	deferred = ResponseProducer(request, chunks, compressor, chunkSize=1000).start()
+
+	assert deferred.called
+	assert len(request.data) > 1
+	assert decompress(b"".join(request.data)) == b"x" * 10000
+
+
+def testResponseProducerAbortsConnectionOnFailure():
+	def failingChunks():
+		yield b"x" * 1000
+		raise ValueError("Encoding failed")
+
+	request = ProducerRequest()
+	producer = ResponseProducer(request, failingChunks(), chunkSize=1000)
+	deferred = producer.start()
+
+	assert request.data == [b"x" * 1000]
+	assert producer.aborted
+	assert request.transport.aborted
+	assert request.producer is None
+	assert deferred.called
+	assert deferred.result is None
+
+
+def testResponseProducerHandlesLostConnection():
+	class LosingRequest(ProducerRequest):
+		def registerProducer(self, producer, streaming):
+			self.producer = producer
+			producer.resumeProducing()
+			producer.stopProducing()
+
+	request = LosingRequest()
+	producer = ResponseProducer(request, [b"x" * 1000] * 3, chunkSize=1000)
+	deferred = producer.start()
+
+	assert producer.aborted
+	assert deferred.called
+	assert deferred.result is None
+
+
+def testStreamingLargeResponseHasLimitedMemoryUsage():
+	class CountingRequest(ProducerRequest):
+		def write(self, data):
+			self.data.append(len(data))
+
+	objectCount = 1000000
+	response = {"id": 1, "result": [{"id": "client.test.invalid", "type": "OpsiClient"}] * objectCount, "error": None}
+	request = CountingRequest()
+
+	tracemalloc.start()
+	try:
+		ResponseProducer(request, iterJsonChunks(response, depth=2), StreamCompressor("gzip")).start()
+		(_current, peak) = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+
+	assert sum(request.data) > 0
+	# The uncompressed response is about 50MB
+	assert peak < 10 * 1024 * 1024
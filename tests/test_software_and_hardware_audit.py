@@ -381,6 +381,53 @@ def test_insertAuditSoftware(auditDataBackend):
 	assert len(auditSoftwares) == len(auditSoftwaresIn)
 
 
+def testBulkInsertingAuditSoftware(auditDataBackend):
+	auditSoftwaresIn = getAuditSoftwares()
+	auditDataBackend._backend.auditSoftware_bulkInsertObjects(auditSoftwaresIn)
+
+	auditSoftwaresOut = auditDataBackend.auditSoftware_getObjects()
+	assert len(auditSoftwaresIn) == len(auditSoftwaresOut)
+
+
+def testBulkInsertingAuditSoftwareUpdatesExistingObjects(auditDataBackend):
+	auditSoftwaresIn = getAuditSoftwares()
+	auditDataBackend.auditSoftware_createObjects(auditSoftwaresIn)
+
+	for auditSoftware in auditSoftwaresIn:
+		auditSoftware.setWindowsDisplayName('bulkDN')
+	auditDataBackend._backend.auditSoftware_bulkInsertObjects(auditSoftwaresIn)
+
+	auditSoftwares = auditDataBackend.auditSoftware_getObjects()
+	assert len(auditSoftwaresIn) == len(auditSoftwares)
+	assert all(auditSoftware.windowsDisplayName == 'bulkDN' for auditSoftware in auditSoftwares)
+
+
+def testBulkInsertingDuplicatesKeepsLastObject(auditDataBackend):
+	auditSoftware = getAuditSoftwares()[0]
+	duplicate = auditSoftware.clone()
+	duplicate.setWindowsDisplayName('lastDN')
+
+	auditDataBackend._backend.auditSoftware_bulkInsertObjects([auditSoftware, duplicate])
+
+	auditSoftwares = auditDataBackend.auditSoftware_getObjects()
+	assert 1 == len(auditSoftwares)
+	assert 'lastDN' == auditSoftwares[0].windowsDisplayName
+
+
+def testBulkInsertingAuditSoftwareOnClient(auditDataBackend):
+	auditSoftwares = getAuditSoftwares()
+	auditDataBackend.auditSoftware_createObjects(auditSoftwares)
+	clients = getClients()
+	auditDataBackend.host_createObjects(clients)
+
+	asoc = getAuditSoftwareOnClient(auditSoftwares, clients)
+	auditDataBackend._backend.auditSoftwareOnClient_bulkInsertObjects(asoc)
+	auditDataBackend._backend.auditSoftwareOnClient_bulkInsertObjects(asoc)
+
+	auditSoftwareOnClients = auditDataBackend.auditSoftwareOnClient_getObjects()
+	assert len(asoc) == len(auditSoftwareOnClients)
+
+
 def test_getAuditSoftwareOnClients(auditDataBackend):
 	asoc, _, _ = fillBackendWithAuditSoftwareOnClient(auditDataBackend)
 	auditDataBackend.auditSoftwareOnClient_createObjects(asoc)
@@ -18,6 +18,7 @@ import pytest
 from OPSI.Object import ConfigState, LocalbootProduct, OpsiClient
 from OPSI.Util import (
 	BlowfishError,
+	ChecksumCache,
 	blowfishDecrypt,
 	blowfishEncrypt,
 	chunk,
@@ -370,6 +371,50 @@ def testCreatingMd5sum(test_data_path, test_file, expected_hash):
 	assert md5sum(os.path.join(test_data_path, test_file)) == expected_hash
 
 
+def writeOldFile(path, content, age=3600):
+	path.write_text(content)
+	mtime = os.stat(path).st_mtime_ns - age * 1_000_000_000
+	os.utime(path, ns=(mtime, mtime))
+	return mtime
+
+
+def testChecksumCacheTrustsUnchangedStat(tmp_path):
+	dataFile = tmp_path / "data.txt"
+	mtime = writeOldFile(dataFile, "aaaa")
+	expectedHash = md5sum(str(dataFile))
+
+	with ChecksumCache(str(tmp_path / "checksums.sqlite")) as cache:
+		assert md5sum(str(dataFile), cache=cache) == expectedHash
+
+	# Same size, mtime and inode: the stored checksum is used
+	with open(dataFile, "r+", encoding="utf-8") as file:
+		file.write("bbbb")
+	os.utime(dataFile, ns=(mtime, mtime))
+	with ChecksumCache(str(tmp_path / "checksums.sqlite")) as cache:
+		assert cache.md5sum(str(dataFile)) == expectedHash
+
+		os.utime(dataFile, ns=(mtime + 1, mtime + 1))
+		assert cache.md5sum(str(dataFile)) == md5sum(str(dataFile)) != expectedHash
+
+
+def testChecksumCacheSkipsRecentlyModifiedFiles(tmp_path):
+	dataFile = tmp_path / "data.txt"
+	dataFile.write_text("aaaa")
+	with ChecksumCache(str(tmp_path / "checksums.sqlite")) as cache:
+		assert cache.md5sum(str(dataFile)) == md5sum(str(dataFile))
+		assert not list(cache._db.execute("SELECT path FROM checksum"))  # pylint: disable=protected-access
+
+
+def testChecksumCachePurgesMissingFiles(tmp_path):
+	dataFile = tmp_path / "data.txt"
+	writeOldFile(dataFile, "aaaa")
+	with ChecksumCache(str(tmp_path / "checksums.sqlite")) as cache:
+		cache.md5sum(str(dataFile))
+		dataFile.unlink()
+		cache.purge()
+		assert not list(cache._db.execute("SELECT path FROM checksum"))  # pylint: disable=protected-access
+
+
 def testChunkingList():
 	base = list(range(10))
 
@@ -39,6 +39,72 @@ key = \;\;\;\;\;\;\;\;\;\;\;\;
 	iniFile.parse(iniTestData.split('\n'))
 
 
+def getParsedIniFile(configParser):
+	return [(section, configParser.items(section)) for section in configParser.sections()], configParser.defaults()
+
+
+@pytest.mark.parametrize("filename", [
+	os.path.join('util', 'task', 'updatePackages', 'example_updater.conf'),
+	os.path.join('util', 'task', 'updatePackages', 'experimental.repo'),
+	os.path.join('util', 'task', 'smb.conf'),
+	os.path.join('util', 'file', 'opsi', 'opsi.conf'),
+])
+@pytest.mark.parametrize("ignoreCase", [True, False])
+def testSinglePassIniParserReadsLikeConfigParser(test_data_path, filename, ignoreCase):
+	iniFile = IniFile(os.path.join(test_data_path, filename), ignoreCase=ignoreCase)
+	iniFile.readlines()
+
+	configParser = iniFile._parseSinglePass()
+	assert configParser is not None
+	assert getParsedIniFile(configParser) == getParsedIniFile(iniFile._parseWithConfigParser()[0])
+
+
+@pytest.mark.parametrize("lines", [
+	['[section]', '[section]'],
+	['[DEFAULT]', 'key = value', '[section]'],
+	['key = value', '[section]'],
+	['[section]', 'no value'],
+	['[section]', 'key = 1', 'KEY = 2'],
+])
+def testSinglePassIniParserFallsBackToConfigParser(lines):
+	iniFile = IniFile('filename_is_irrelevant_for_this', ignoreCase=False)
+	iniFile._lines = lines
+	assert iniFile._parseSinglePass() is None
+
+	try:
+		expected = getParsedIniFile(iniFile._parseWithConfigParser()[0])
+	except RuntimeError:
+		with pytest.raises(RuntimeError):
+			iniFile.parse(lines)
+	else:
+		assert getParsedIniFile(iniFile.parse(lines)) == expected
+
+
+def testGeneratingIniFileOnlyWritesChanges(tempDir):
+	filename = os.path.join(tempDir, 'test.ini')
+	with open(filename, 'w') as file:
+		file.write('[section]\nkey = value\n')
+	os.chmod(filename, 0o640)
+
+	iniFile = IniFile(filename)
+	configParser = iniFile.parse()
+	iniFile.generate(configParser)
+	with open(filename) as file:
+		assert file.read() == '[section]\nkey = value\n\n'
+	fileStat = os.stat(filename)
+
+	iniFile.generate(configParser)
+	assert os.stat(filename).st_mtime_ns == fileStat.st_mtime_ns
+	assert os.stat(filename).st_ino == fileStat.st_ino
+
+	configParser.set('section', 'other', 'value')
+	iniFile.generate(configParser)
+	with open(filename) as file:
+		assert file.read() == '[section]\nkey = value\nother = value\n\n'
+	assert os.stat(filename).st_mode & 0o777 == 0o640
+	assert os.listdir(tempDir) == ['test.ini']
+
+
 @pytest.fixture(params=[
 	'inf_testdata_1.inf',
 	'inf_testdata_2.inf',
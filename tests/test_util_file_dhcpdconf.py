@@ -11,6 +11,7 @@ import os
 
 import pytest
 
+from OPSI.Exceptions import BackendBadValueError
 from OPSI.Util.File import DHCPDConfFile
 
 from .helpers import createTemporaryTestfile
@@ -97,3 +98,53 @@ def testGeneratingConfig(dhcpdConf):
 
 	dhcpdConf.generate()
 	# TODO: check generated file
+
+
+def testAddingHostWithUsedAddressFails(dhcpdConf):
+	dhcpdConf.parse()
+
+	dhcpdConf.addHost('client1', '00:01:09:08:99:11', '192.168.99.113', '192.168.99.113', None)
+	with pytest.raises(BackendBadValueError):
+		dhcpdConf.addHost('client2', '00:01:09:08:99:11', '192.168.99.114', '192.168.99.114', None)
+	with pytest.raises(BackendBadValueError):
+		dhcpdConf.addHost('client2', '00:01:09:08:99:12', '192.168.99.113', '192.168.99.113', None)
+
+	# Replacing a host with the same addresses is fine
+	dhcpdConf.addHost('client1', '00:01:09:08:99:11', '192.168.99.113', '192.168.99.113', None)
+
+
+def testDeletingAndModifyingHosts(dhcpdConf):
+	dhcpdConf.parse()
+
+	dhcpdConf.addHost('client1', '00:01:09:08:99:11', '192.168.99.113', '192.168.99.113', None)
+	dhcpdConf.modifyHost('client1', {'hardware': 'ethernet 00:01:09:08:99:12'})
+	dhcpdConf.addHost('client2', '00:01:09:08:99:11', '192.168.99.114', '192.168.99.114', None)
+	assert dhcpdConf.getHost('client1')['hardware'] == 'ethernet 00:01:09:08:99:12'
+
+	dhcpdConf.deleteHost('client1')
+	assert dhcpdConf.getHost('client1') is None
+	dhcpdConf.addHost('client3', '00:01:09:08:99:12', '192.168.99.113', '192.168.99.113', None)
+
+	dhcpdConf.generate()
+	dhcpdConf.parse()
+	assert dhcpdConf.getHost('client1') is None
+	assert dhcpdConf.getHost('client2')['fixed-address'] == '192.168.99.114'
+	assert dhcpdConf.getHost('client3')['hardware'] == 'ethernet 00:01:09:08:99:12'
+
+
+def testParsingUnchangedFileKeepsModel(dhcpdConf):
+	dhcpdConf.parse()
+	dhcpdConf.addHost('client1', '00:01:09:08:99:11', '192.168.99.113', '192.168.99.113', None)
+	dhcpdConf.generate()
+
+	globalBlock = dhcpdConf._globalBlock
+	dhcpdConf.parse()
+	assert dhcpdConf._globalBlock is globalBlock
+	assert dhcpdConf.getHost('client1') is not None
+
+	# Changes made by someone else are picked up
+	with open(dhcpdConf._filename, 'a') as f:
+		f.write('host client2 {\n\thardware ethernet 00:01:09:08:99:12;\n\tfixed-address 192.168.99.114;\n}\n')
+	dhcpdConf.parse()
+	assert dhcpdConf._globalBlock is not globalBlock
+	assert dhcpdConf.getHost('client2')['fixed-address'] == '192.168.99.114'
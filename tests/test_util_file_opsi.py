@@ -83,6 +83,22 @@ empty_backends:\t, ,
 	assert tuple() == backends
 
 
+def testBackendDispatchConfigFileReadsSequentialMethods():
+	exampleConfig = """
+@sequential : productOnClient_(insert|update)Object
+@sequential : host_.*
+host_.*			: file, opsipxeconfd
+.*				 : mysql
+"""
+
+	dispatchConfig = BackendDispatchConfigFile("not_reading_file")
+	lines = exampleConfig.split("\n")
+
+	assert ["productOnClient_(insert|update)Object", "host_.*"] == dispatchConfig.getSequentialMethods(lines=lines)
+	assert [("host_.*", ("file", "opsipxeconfd")), (".*", ("mysql",))] == dispatchConfig.parse(lines=lines)
+	assert set(("file", "opsipxeconfd", "mysql")) == dispatchConfig.getUsedBackends(lines=lines)
+
+
 @pytest.fixture
 def opsiConfigFile(test_data_path):
 	path = os.path.join(test_data_path, "util", "file", "opsi", "opsi.conf")
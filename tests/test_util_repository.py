@@ -284,3 +284,105 @@ def test_depot_to_local_sync(tmp_path: pathlib.Path):  # pylint: disable=too-man
 				assert request["headers"]["range"] == "bytes=0-499999"
 
 			shutil.rmtree(local_product_path)
+
+
+def create_depot_product(depot_path: pathlib.Path, product_id: str, file_count: int = 5):
+	product_path = depot_path / product_id
+	(product_path / "subdir").mkdir(parents=True)
+	for num in range(file_count):
+		(product_path / f"file{num}.txt").write_text(f"{product_id} {num} " * 1000)
+		(product_path / "subdir" / f"file{num}.txt").write_text(f"{product_id} subdir {num} " * 1000)
+
+	package_content_file = PackageContentFile(str(product_path / f"{product_id}.files"))
+	package_content_file.setProductClientDataDir(str(product_path))
+	package_content_file.setClientDataFiles(list(findFilesGenerator(directory=str(product_path), followLinks=True, returnLinks=False)))
+	package_content_file.generate()
+	return product_path
+
+
+def test_depot_to_local_sync_parallel(tmp_path: pathlib.Path):
+	depot_path = tmp_path / "depot"
+	product_ids = [f"product{num}" for num in range(4)]
+	for product_id in product_ids:
+		create_depot_product(depot_path, product_id)
+
+	local_path = tmp_path / "local"
+	stale_file = local_path / "product0" / "subdir" / "stale.txt"
+	stale_file.parent.mkdir(parents=True)
+	stale_file.write_text("stale")
+
+	depot = getRepository(f"file://{depot_path}")
+	sync = DepotToLocalDirectorySychronizer(sourceDepot=depot, destinationDirectory=str(local_path), productIds=product_ids, workers=4)
+	sync.synchronize()
+
+	for product_id in product_ids:
+		for file in (depot_path / product_id).rglob("*.txt"):
+			local_file = local_path / file.relative_to(depot_path)
+			assert local_file.read_text() == file.read_text()
+		assert (local_path / product_id / f"{product_id}.files").exists()
+	assert not stale_file.exists()
+	assert not (local_path / DepotToLocalDirectorySychronizer.JOURNAL_FILENAME).exists()
+
+
+def test_depot_to_local_sync_parallel_resume(tmp_path: pathlib.Path):
+	depot_path = tmp_path / "depot"
+	product_ids = ["product1", "product2"]
+	for product_id in product_ids:
+		create_depot_product(depot_path, product_id)
+	local_path = tmp_path / "local"
+
+	depot = getRepository(f"file://{depot_path}")
+	original_download = depot.download
+	downloads = []
+
+	def failing_download(source, destination, *args, **kwargs):
+		if source == "product2/subdir/file3.txt":
+			raise RepositoryError("Connection lost")
+		downloads.append(source)
+		return original_download(source, destination, *args, **kwargs)
+
+	sync = DepotToLocalDirectorySychronizer(sourceDepot=depot, destinationDirectory=str(local_path), productIds=product_ids, workers=2)
+	with mock.patch.object(depot, "download", failing_download):
+		with pytest.raises(RepositoryError):
+			sync.synchronize()
+	assert (local_path / DepotToLocalDirectorySychronizer.JOURNAL_FILENAME).exists()
+	synced_files = {source for source in downloads if not source.endswith(".files")}
+
+	def recording_download(source, destination, *args, **kwargs):
+		downloads.append(source)
+		return original_download(source, destination, *args, **kwargs)
+
+	downloads.clear()
+	with mock.patch.object(depot, "download", recording_download):
+		sync = DepotToLocalDirectorySychronizer(sourceDepot=depot, destinationDirectory=str(local_path), productIds=product_ids, workers=2)
+		sync.synchronize()
+
+	assert "product2/subdir/file3.txt" in downloads
+	assert not synced_files.intersection(downloads)
+	for file in depot_path.rglob("*.txt"):
+		assert (local_path / file.relative_to(depot_path)).read_text() == file.read_text()
+	assert not (local_path / DepotToLocalDirectorySychronizer.JOURNAL_FILENAME).exists()
+
+
+def test_depot_to_local_sync_relative_destination(tmp_path: pathlib.Path, monkeypatch):
+	depot_path = tmp_path / "depot"
+	product_ids = ["product1", "product2"]
+	for product_id in product_ids:
+		product_path = create_depot_product(depot_path, product_id)
+		(product_path / "link.txt").symlink_to("file0.txt")
+		package_content_file = product_path / f"{product_id}.files"
+		content = package_content_file.read_text().rstrip("\n")
+		package_content_file.write_text(f"{content}\nl 'link.txt' 0 'file0.txt'\n")
+
+	monkeypatch.chdir(tmp_path)
+	depot = getRepository(f"file://{depot_path}")
+	sync = DepotToLocalDirectorySychronizer(sourceDepot=depot, destinationDirectory="local", productIds=product_ids, workers=2)
+	sync.synchronize()
+
+	assert pathlib.Path.cwd() == tmp_path
+	for product_id in product_ids:
+		for file in (depot_path / product_id).rglob("*.txt"):
+			assert (tmp_path / "local" / file.relative_to(depot_path)).read_text() == file.read_text()
+		link = tmp_path / "local" / product_id / "link.txt"
+		assert link.is_symlink()
+		assert os.readlink(link) == "file0.txt"
@@ -10,6 +10,8 @@ import json
 import os
 import shutil
 import subprocess
+import threading
+import time
 
 import pytest
 from opsicommon.testing.helpers import http_test_server
@@ -18,6 +20,7 @@ from OPSI.Util import md5sum
 from OPSI.Util.File import ZsyncFile
 from OPSI.Util.Task.UpdatePackages import OpsiPackageUpdater
 from OPSI.Util.Task.UpdatePackages.Config import DEFAULT_CONFIG
+from OPSI.Util.Task.UpdatePackages.Download import DownloadJob, DownloadScheduler
 from OPSI.Util.Task.UpdatePackages.Notifier import DummyNotifier
 from OPSI.Util.Task.UpdatePackages.Repository import (
 	LinksExtractor,
@@ -132,6 +135,14 @@ def test_parsing_config_file(tmpdir, example_config_path, package_updater_class)
 	assert config["wolShutdownWanted"] is True
 	assert config["wolStartGap"] == 10
 
+	# Download settings
+	assert config["maxConcurrentDownloads"] == 3
+	assert config["maxBandwidth"] == 0
+	assert config["downloadRetries"] == 2
+	assert config["downloadRetryDelay"] == 5
+	for repo in config["repositories"]:
+		assert repo.maxConcurrentDownloads == (1 if repo.name == "uib_linux_experimental" else 2)
+
 
 def patch_config_file(filename, **values):
 	with open(filename, encoding="utf-8") as config_file:
@@ -302,3 +313,152 @@ def test_check_accept_ranges(tmp_path, package_updater_class):  # pylint: disabl
 					assert "Range" in request["headers"]
 				else:
 					assert "Range" not in request["headers"]
+
+
+def create_fake_repository(tmp_path, packages, general="", repository=""):
+	"""
+	Create the files of a repository and the configuration of an updater.
+
+	:param packages: Mapping of package filename to the content and the \
+md5sum announced by the repository. If the md5sum is `None` the correct \
+one is used.
+	"""
+	config_file = tmp_path / "updater.conf"
+	local_dir = tmp_path / "local_packages"
+	local_dir.mkdir()
+	server_dir = tmp_path / "server_packages"
+	server_dir.mkdir()
+	repo_conf_path = tmp_path / "repos.d"
+	repo_conf_path.mkdir()
+
+	config_file.write_text(
+		data=f"[general]\npackageDir = {local_dir}\nrepositoryConfigDir = {repo_conf_path}\n{general}", encoding="utf-8"
+	)
+	for filename, (content, checksum) in packages.items():
+		(server_dir / filename).write_bytes(content)
+		(server_dir / f"{filename}.md5").write_text(checksum or md5sum(str(server_dir / filename)), encoding="ascii")
+
+	config = DEFAULT_CONFIG.copy()
+	config["configFile"] = str(config_file)
+	config["packageDir"] = str(local_dir)
+
+	def write_repo_conf(base_url):
+		(repo_conf_path / "test.repo").write_text(
+			data=f"[repository_test]\nactive = true\nbaseUrl = {base_url}\ndirs = /\nautoInstall = true\n{repository}", encoding="utf-8"
+		)
+
+	return config, local_dir, write_repo_conf
+
+
+def test_concurrent_package_downloads(tmp_path, package_updater_class, monkeypatch):  # pylint: disable=redefined-outer-name,too-many-locals
+	packages = {f"product{index}_1.0-1.opsi": (os.urandom(200_000), None) for index in range(6)}
+	packages["broken_1.0-1.opsi"] = (b"broken", "0" * 32)
+	config, local_dir, write_repo_conf = create_fake_repository(
+		tmp_path,
+		packages,
+		general="maxConcurrentDownloads = 4\ndownloadRetries = 1\ndownloadRetryDelay = 0\nignoreErrors = true\n",
+		repository="maxConcurrentDownloads = 2\n",
+	)
+
+	lock = threading.Lock()
+	running = []
+	maxRunning = []
+	fetched = []
+
+	with http_test_server(serve_directory=str(tmp_path / "server_packages")) as server:
+		write_repo_conf(f"http://localhost:{server.port}")
+		package_updater = package_updater_class(config)
+		fetchPackage = package_updater._fetchPackage  # pylint: disable=protected-access
+
+		def fetch(availablePackage, *args):
+			with lock:
+				fetched.append(availablePackage["productId"])
+				running.append(availablePackage["productId"])
+				maxRunning.append(len(running))
+			try:
+				time.sleep(0.05)
+				return fetchPackage(availablePackage, *args)
+			finally:
+				with lock:
+					running.remove(availablePackage["productId"])
+
+		monkeypatch.setattr(package_updater, "_fetchPackage", fetch)
+		new_packages = package_updater.get_packages(DummyNotifier())
+
+	assert sorted(package["productId"] for package in new_packages) == [f"product{index}" for index in range(6)]
+	assert fetched.count("broken") == 2
+	assert max(maxRunning) == 2
+	for filename, (content, _checksum) in packages.items():
+		if filename.startswith("product"):
+			assert (local_dir / filename).read_bytes() == content
+			assert (local_dir / f"{filename}.md5").read_text(encoding="ascii") == md5sum(str(local_dir / filename))
+
+
+def test_zsync_does_not_change_working_directory(tmp_path, package_updater_class, monkeypatch):  # pylint: disable=redefined-outer-name
+	config, local_dir, _write_repo_conf = create_fake_repository(tmp_path, {})
+	zsync = tmp_path / "zsync"
+	zsync.write_text('#!/bin/sh\npwd > "$2"\n', encoding="utf-8")
+	zsync.chmod(0o755)
+	config["zsyncCommand"] = str(zsync)
+
+	package_updater = package_updater_class(config)
+	monkeypatch.chdir(tmp_path)
+	repository = ProductRepositoryInfo("test", "http://repository.test.invalid")
+	availablePackage = {
+		"repository": repository,
+		"packageFile": "http://repository.test.invalid/product_1.0-1.opsi",
+		"zsyncFile": "http://repository.test.invalid/product_1.0-1.opsi.zsync",
+	}
+	package_updater.zsyncPackage(availablePackage, os.path.join(local_dir.name, "product_1.0-1.opsi"))
+
+	assert os.getcwd() == str(tmp_path)
+	assert (local_dir / "product_1.0-1.opsi").read_text(encoding="utf-8").strip() == str(local_dir)
+
+
+def test_packages_installed_in_dependency_order(tmp_path, package_updater_class, monkeypatch):  # pylint: disable=redefined-outer-name
+	dependencies = {"first": [], "second": ["first"], "third": ["second"], "other": []}
+	packages = {f"{productId}_1.0-1.opsi": (productId.encode("ascii"), None) for productId in dependencies}
+	config, _local_dir, write_repo_conf = create_fake_repository(
+		tmp_path, packages, general="maxConcurrentDownloads = 4\n", repository="maxConcurrentDownloads = 4\n"
+	)
+
+	installed = []
+	with http_test_server(serve_directory=str(tmp_path / "server_packages")) as server:
+		write_repo_conf(f"http://localhost:{server.port}")
+		package_updater = package_updater_class(config)
+		fetchPackage = package_updater._fetchPackage  # pylint: disable=protected-access
+
+		def fetch(availablePackage, *args):
+			# Dependencies are downloaded last
+			time.sleep({"first": 0.3, "second": 0.2}.get(availablePackage["productId"], 0))
+			return fetchPackage(availablePackage, *args)
+
+		def install(package, notifier):  # pylint: disable=unused-argument
+			installed.append(package["productId"])
+			return False
+
+		monkeypatch.setattr(package_updater, "_fetchPackage", fetch)
+		monkeypatch.setattr(package_updater, "_getPackageDependencies", lambda package: dependencies[package["productId"]])
+		monkeypatch.setattr(package_updater, "installPackage", install)
+		package_updater.processUpdates()
+
+	assert sorted(installed) == sorted(dependencies)
+	assert installed.index("first") < installed.index("second") < installed.index("third")
+	assert installed[0] == "other"
+
+
+def test_download_scheduler_retries_with_backoff():
+	attempts = []
+
+	def failing():
+		attempts.append(time.monotonic())
+		raise ConnectionError("unreachable")
+
+	scheduler = DownloadScheduler(maxWorkers=2, retries=2, retryDelay=0.1)
+	results = list(scheduler.run([DownloadJob("failing", "repo", failing), DownloadJob("working", "repo", lambda: "done")]))
+
+	assert [(job.name, result) for job, result, _error in results] == [("working", "done"), ("failing", None)]
+	assert isinstance(results[1][2], ConnectionError)
+	assert len(attempts) == 3
+	assert attempts[1] - attempts[0] >= 0.1
+	assert attempts[2] - attempts[1] >= 0.2